@@ -0,0 +1,440 @@
+# api/server.py
+
+"""
+Lokaler HTTP/JSON-Server über dem PromptService (nur Standardbibliothek, asyncio).
+
+Lesende Anfragen laufen in einem Thread-Pool. Sie greifen auf den
+versionsgestempelten Ergebnis-Cache des Service zu; jede Antwort nennt die
+Datenversion, auf der sie beruht (``X-Data-Version``). Das Repository
+serialisiert seine Lesezugriffe über eine Sperre; parallel laufen daher nur
+Cache-Treffer und die Aufbereitung der Antworten. Schreibende Anfragen
+werden in eine Warteschlange gestellt und von genau einer Writer-Task
+nacheinander ausgeführt. Exporte werden blockweise (chunked) gestreamt.
+
+Endpunkte::
+
+    GET    /health
+    GET    /prompts?q=&category=&tag=&platform=&language=&purpose=&mode=&sort=&desc=&limit=&offset=
+           (mit format=ndjson bzw. Accept: application/x-ndjson ein Datensatz pro Zeile,
+           Seiteninformation in X-Total-Count, X-Next-Offset und Link: rel="next")
+    GET    /prompts/<id>
+    POST   /prompts            (ein Datensatz oder eine Liste von Datensätzen)
+    PATCH  /prompts/<id>      (optional If-Match: <Revision>; veraltete Revision → 409)
+    DELETE /prompts/<id>
+    GET    /export?format=csv|markdown|ndjson&gzip=1 (+ Filter wie bei /prompts)
+
+Start::
+
+    python -m api.server --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from models.prompt_model import SORT_RELEVANCE, RevisionConflictError
+from models.prompt_record import Prompt
+from services.prompt_service import PromptService
+from utils.helpers import EXPORT_FORMATS, iter_export
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BODY_SIZE = 1024 * 1024
+NDJSON_TYPE = "application/x-ndjson"
+RECORD_FIELDS = ("title", "category", "platform", "tags", "prompt", "language", "purpose", "notes")
+STATUS_TEXT = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """Fehler, der als JSON-Antwort mit HTTP-Status an den Client geht."""
+
+    def __init__(self, status: int, message: str, details: Optional[List] = None):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class Request:
+    """Geparste HTTP-Anfrage."""
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path.rstrip("/") or "/"
+        self.query = parse_qs(parts.query)
+        self.headers = headers
+        self.body = body
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[-1] if values else default
+
+    def int_param(self, name: str, default: int, maximum: Optional[int] = None) -> int:
+        value = self.param(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ApiError(400, f"Parameter {name} muss eine Zahl sein.")
+        if number < 0:
+            raise ApiError(400, f"Parameter {name} darf nicht negativ sein.")
+        return min(number, maximum) if maximum is not None else number
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise ApiError(400, "Ungültiger JSON-Body.")
+
+
+def _record(prompt: Prompt) -> Dict:
+    return dict(prompt.to_dict(), id=prompt.doc_id)
+
+
+def _parse_record(data: Any, partial: bool = False) -> Dict:
+    if not isinstance(data, dict):
+        raise ApiError(400, "Erwartet wird ein JSON-Objekt.")
+    unknown = sorted(set(data) - set(RECORD_FIELDS))
+    if unknown:
+        raise ApiError(400, f"Unbekannte Felder: {', '.join(unknown)}")
+    if partial:
+        return dict(data)
+    record = {field: data.get(field, "") for field in RECORD_FIELDS}
+    record["tags"] = data.get("tags", [])
+    return record
+
+
+class PromptApiServer:
+    """
+    asyncio-Server mit parallelen Lesern und einer einzigen Writer-Task.
+    """
+
+    def __init__(self, service: PromptService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 reader_threads: int = 4):
+        """
+        :param service: PromptService, über den alle Zugriffe laufen
+        :param host: Adresse (Standard: nur localhost)
+        :param port: Port; 0 wählt einen freien Port
+        :param reader_threads: Anzahl paralleler Lese-Threads
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self._readers = ThreadPoolExecutor(max_workers=reader_threads, thread_name_prefix="api-read")
+        self._writer_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-write")
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # === Lebenszyklus ===
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Startet Server und Writer-Task.
+
+        :return: Tatsächliche (Host, Port)
+        """
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        logger.info("API-Server läuft auf http://%s:%s", self.host, self.port)
+        return self.host, self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Beendet den Server; bereits angenommene Schreibaufträge werden noch ausgeführt."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            await self._writes.put(None)
+            await self._writer_task
+        self._readers.shutdown(wait=True)
+        self._writer_thread.shutdown(wait=True)
+
+    # === Ausführung ===
+
+    async def _read(self, func: Callable, *args) -> Any:
+        """
+        Führt einen Lesezugriff im Lese-Pool aus.
+
+        Zugriffe auf das Repository warten dort auf dessen Sperre (``PromptRepository._lock``);
+        nur Treffer im Ergebnis-Cache des Service laufen tatsächlich parallel.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._readers, func, *args)
+
+    async def _write(self, func: Callable, *args) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((func, args, future))
+        return await future
+
+    async def _writer_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._writes.get()
+            if job is None:
+                return
+            func, args, future = job
+            try:
+                result = await loop.run_in_executor(self._writer_thread, func, *args)
+            except Exception as error:  # an den wartenden Handler weiterreichen
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    # === HTTP ===
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Ungültige Anfragezeile.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise ApiError(413, "Anfrage zu groß.")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, headers, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await self._read_request(reader)
+                if request is None:
+                    return
+                await self._dispatch(request, writer)
+            except ApiError as error:
+                await self._send_json(writer, error.status, {"error": str(error), "details": error.details})
+            except RevisionConflictError as error:
+                await self._send_json(writer, 409, {"error": str(error), "revision": error.actual})
+            except ValueError as error:
+                await self._send_json(writer, 400, {"error": str(error),
+                                                    "details": getattr(error, "errors", None)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                return
+            except Exception:
+                logger.exception("Fehler bei der Verarbeitung einer API-Anfrage")
+                await self._send_json(writer, 500, {"error": "Interner Fehler"})
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any = None,
+                         headers: Optional[Dict[str, str]] = None) -> None:
+        body = b"" if status == 204 else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(self._head(status, {"Content-Type": "application/json; charset=utf-8",
+                                         "Content-Length": str(len(body)), "Connection": "close",
+                                         **(headers or {})}) + body)
+        await writer.drain()
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, content_type: str, chunks: AsyncIterator[bytes],
+                           headers: Optional[Dict[str, str]] = None) -> None:
+        writer.write(self._head(200, {"Content-Type": content_type, "Transfer-Encoding": "chunked",
+                                      "Connection": "close", **(headers or {})}))
+        async for chunk in chunks:
+            if chunk:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _iterate_in_reader(self, iterator) -> AsyncIterator[bytes]:
+        """Holt die Blöcke eines (blockierenden) Iterators nacheinander im Lese-Pool."""
+        done = object()
+        while True:
+            chunk = await self._read(next, iterator, done)
+            if chunk is done:
+                return
+            yield chunk
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        segments = [part for part in request.path.split("/") if part]
+        if segments == ["health"] and request.method == "GET":
+            version = await self._read(self.service.get_data_version)
+            return await self._send_json(writer, 200, {"status": "ok", "data_version": version})
+        if segments == ["export"] and request.method == "GET":
+            return await self._export(request, writer)
+        if segments == ["prompts"]:
+            if request.method == "GET":
+                return await self._list_prompts(request, writer)
+            if request.method == "POST":
+                return await self._create_prompts(request, writer)
+        elif len(segments) == 2 and segments[0] == "prompts":
+            try:
+                doc_id = int(segments[1])
+            except ValueError:
+                raise ApiError(404, "Unbekannte Ressource.")
+            if request.method == "GET":
+                return await self._get_prompt(doc_id, writer)
+            if request.method in ("PATCH", "PUT"):
+                return await self._update_prompt(doc_id, request, writer)
+            if request.method == "DELETE":
+                return await self._delete_prompt(doc_id, writer)
+        else:
+            raise ApiError(404, "Unbekannte Ressource.")
+        raise ApiError(405, f"Methode {request.method} wird hier nicht unterstützt.")
+
+    # === Endpunkte ===
+
+    @staticmethod
+    def _filters(request: Request) -> Dict:
+        return dict(keyword=request.param("q", ""), category=request.param("category"),
+                    tags=request.query.get("tag"), platform=request.param("platform"),
+                    language=request.param("language"), purpose=request.param("purpose"),
+                    mode=request.param("mode", "keyword"))
+
+    async def _list_prompts(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        filters = self._filters(request)
+        limit = request.int_param("limit", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        offset = request.int_param("offset", 0)
+        default_sort = SORT_RELEVANCE if filters["keyword"] and filters["mode"] != "substring" else "doc_id"
+        sort_by = request.param("sort", default_sort)
+        descending = request.param("desc", "0") in ("1", "true")
+
+        def query():
+            # Ein Schreibvorgang zwischen Versionsabfrage und Abfrage würde ein Ergebnis mit
+            # falscher Version stempeln: Version danach erneut lesen und ggf. wiederholen.
+            version = self.service.get_data_version()
+            while True:
+                result = self.service.query_prompts(**filters, sort_by=sort_by, descending=descending,
+                                                    limit=limit, offset=offset)
+                current = self.service.get_data_version()
+                if current == version:
+                    return version, result
+                version = current
+
+        version, result = await self._read(query)
+        next_offset = offset + limit if offset + limit < result.total else None
+        items = [_record(prompt) for prompt in result.items]
+
+        if request.param("format") == "ndjson" or NDJSON_TYPE in request.headers.get("accept", ""):
+            headers = {"X-Total-Count": str(result.total), "X-Data-Version": str(version)}
+            if next_offset is not None:
+                query_string = {key: values for key, values in request.query.items() if key != "offset"}
+                query_string["offset"] = [str(next_offset)]
+                headers["X-Next-Offset"] = str(next_offset)
+                headers["Link"] = f'<{request.path}?{urlencode(query_string, doseq=True)}>; rel="next"'
+
+            async def lines():
+                for item in items:
+                    yield (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+
+            return await self._send_stream(writer, NDJSON_TYPE, lines(), headers)
+
+        await self._send_json(writer, 200, {"items": items, "total": result.total, "offset": offset,
+                                            "limit": limit, "next_offset": next_offset,
+                                            "data_version": version})
+
+    async def _get_prompt(self, doc_id: int, writer: asyncio.StreamWriter) -> None:
+        prompt = await self._read(self.service.get_prompt, doc_id)
+        if prompt is None:
+            raise ApiError(404, f"Prompt {doc_id} nicht gefunden.")
+        await self._send_json(writer, 200, _record(prompt), {"ETag": f'"{prompt.get("revision", 1)}"'})
+
+    async def _create_prompts(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        data = request.json()
+        records = [_parse_record(item) for item in (data if isinstance(data, list) else [data])]
+        doc_ids = await self._write(self.service.create_prompts_bulk, records)
+        payload = {"ids": doc_ids} if isinstance(data, list) else {"id": doc_ids[0]}
+        await self._send_json(writer, 201, payload)
+
+    async def _update_prompt(self, doc_id: int, request: Request, writer: asyncio.StreamWriter) -> None:
+        updated_data = _parse_record(request.json(), partial=True)
+        if not updated_data:
+            raise ApiError(400, "Keine Felder zum Aktualisieren angegeben.")
+        if_match = request.headers.get("if-match", "").strip('" ')
+        expected = None
+        if if_match:
+            try:
+                expected = {doc_id: int(if_match)}
+            except ValueError:
+                raise ApiError(400, "If-Match muss eine Revisionsnummer sein.")
+        updated = await self._write(self.service.update_many, {doc_id: updated_data}, expected)
+        if not updated:
+            raise ApiError(404, f"Prompt {doc_id} nicht gefunden.")
+        await self._get_prompt(doc_id, writer)
+
+    async def _delete_prompt(self, doc_id: int, writer: asyncio.StreamWriter) -> None:
+        deleted = await self._write(self.service.delete_many, [doc_id])
+        if not deleted:
+            raise ApiError(404, f"Prompt {doc_id} nicht gefunden.")
+        await self._send_json(writer, 204)
+
+    async def _export(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        fmt = request.param("format", "ndjson")
+        if fmt not in EXPORT_FORMATS:
+            raise ApiError(400, f"Unbekanntes Exportformat: {fmt}")
+        compress = request.param("gzip", "0") in ("1", "true")
+        chunks = iter_export(self.service.iter_prompts(**self._filters(request)), fmt, compress=compress)
+        content_type = "application/gzip" if compress else EXPORT_FORMATS[fmt][1]
+        await self._send_stream(writer, content_type, self._iterate_in_reader(chunks))
+
+
+async def _serve(args) -> None:
+    from config.database_config import load_database_settings
+    from models.repository_factory import create_repository
+
+    settings = load_database_settings()
+    if args.db:
+        settings["path"] = args.db
+    repo = create_repository(settings)
+    server = PromptApiServer(PromptService(repo), args.host, args.port, args.readers)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        repo.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Lokaler HTTP/JSON-Server für die Prompt-Datenbank")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", help="Pfad zur Datenbankdatei (Standard: settings/database.json)")
+    parser.add_argument("--readers", type=int, default=4, help="Anzahl paralleler Lese-Threads")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
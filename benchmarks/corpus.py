@@ -0,0 +1,101 @@
+# benchmarks/corpus.py
+
+"""
+Deterministischer Generator für synthetische Prompt-Bestände.
+
+Erzeugt realistisch wirkende deutsche und englische Prompts mit Kategorien,
+Tags, Plattformen und Platzhaltern wie ``[Thema]``. Gleicher Seed ergibt
+immer denselben Bestand, sodass Benchmark-Läufe vergleichbar bleiben.
+"""
+
+import random
+from typing import Dict, Iterator, List
+
+CATEGORIES = [
+    "Marketing", "SEO", "Code", "Bildung", "Recht", "Vertrieb", "Support",
+    "HR", "Finanzen", "Forschung", "Produkt", "Social Media",
+]
+PLATFORMS = ["ChatGPT", "Claude", "Gemini", "Andere"]
+TAGS = [
+    "blog", "newsletter", "python", "sql", "email", "zusammenfassung", "analyse",
+    "übersetzung", "brainstorming", "checkliste", "strategie", "review", "tutorial",
+    "onboarding", "kampagne", "faq", "präsentation", "tabelle", "refactoring", "tests",
+]
+
+_GERMAN = {
+    "language": "Deutsch",
+    "verbs": ["Schreibe", "Erstelle", "Fasse", "Analysiere", "Übersetze", "Optimiere", "Prüfe", "Entwirf"],
+    "objects": ["einen Blogartikel", "eine Checkliste", "eine Zusammenfassung", "eine Produktbeschreibung",
+                "einen Newsletter", "eine Schritt-für-Schritt-Anleitung", "eine Vergleichstabelle",
+                "Schlüsselwörter", "einen Gliederungsvorschlag", "Testfälle"],
+    "connectors": ["zum Thema [Thema]", "für [Zielgruppe]", "im Stil von [Stil]",
+                   "mit maximal [Anzahl] Wörtern", "unter Berücksichtigung von [Kontext]"],
+    "sentences": ["Achte auf eine klare Struktur und kurze Absätze.",
+                  "Nutze Zwischenüberschriften und eine Aufzählung am Ende.",
+                  "Vermeide Fachjargon, erkläre Begriffe bei Bedarf.",
+                  "Gib am Schluss drei konkrete Handlungsempfehlungen.",
+                  "Berücksichtige die Größenordnung des Budgets und mögliche Risiken."],
+    "purposes": ["Blogplanung", "Kundenkommunikation", "Code-Review", "Schulung", "Recherche", "Vertragsprüfung"],
+    "notes": ["Funktioniert gut mit niedriger Temperatur.", "Vorher Kontext einfügen.",
+              "Für lange Texte in Teilen ausführen.", ""],
+}
+_ENGLISH = {
+    "language": "Englisch",
+    "verbs": ["Write", "Create", "Summarize", "Analyze", "Translate", "Optimize", "Review", "Draft"],
+    "objects": ["a blog post", "a checklist", "a summary", "a product description", "a newsletter",
+                "a step-by-step guide", "a comparison table", "keywords", "an outline", "unit tests"],
+    "connectors": ["about [topic]", "for [audience]", "in the style of [style]",
+                   "with at most [count] words", "considering [context]"],
+    "sentences": ["Keep the structure clear and paragraphs short.",
+                  "Use subheadings and end with a bullet list.",
+                  "Avoid jargon and explain terms when needed.",
+                  "Finish with three concrete recommendations.",
+                  "Consider budget constraints and potential risks."],
+    "purposes": ["Content planning", "Customer communication", "Code review", "Training", "Research"],
+    "notes": ["Works best with low temperature.", "Paste context first.", ""],
+}
+
+
+def _make_prompt(rng: random.Random, index: int) -> Dict:
+    lang = _GERMAN if rng.random() < 0.6 else _ENGLISH
+    verb = rng.choice(lang["verbs"])
+    obj = rng.choice(lang["objects"])
+    connectors = rng.sample(lang["connectors"], k=rng.randint(1, 3))
+    sentences = rng.sample(lang["sentences"], k=rng.randint(1, 4))
+    prompt = f"{verb} {obj} {' '.join(connectors)}. {' '.join(sentences)}"
+    return {
+        "title": f"{verb} {obj} #{index}",
+        "category": rng.choice(CATEGORIES),
+        "platform": rng.choice(PLATFORMS),
+        "tags": rng.sample(TAGS, k=rng.randint(0, 4)),
+        "prompt": prompt,
+        "language": lang["language"],
+        "purpose": rng.choice(lang["purposes"]),
+        "notes": rng.choice(lang["notes"]),
+    }
+
+
+def generate_prompts(count: int, seed: int = 42) -> Iterator[Dict]:
+    """
+    Erzeugt ``count`` synthetische Prompt-Datensätze.
+
+    :param count: Anzahl der Datensätze
+    :param seed: Startwert des Zufallsgenerators (gleicher Seed, gleicher Bestand)
+    :return: Iterator über Datensätze im Format von ``PromptRepository.add_prompts``
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        yield _make_prompt(rng, index)
+
+
+def sample_queries(seed: int = 42, count: int = 20) -> List[str]:
+    """
+    Liefert typische Suchbegriffe (deutsch/englisch, teils Wortanfänge).
+
+    :param seed: Startwert des Zufallsgenerators
+    :param count: Anzahl der Suchbegriffe
+    """
+    rng = random.Random(seed)
+    words = ["newsletter", "checkliste", "schlüsselwörter", "zusammen", "blog", "analyse",
+             "summary", "review", "struktur", "budget", "guide", "zielgruppe"]
+    return [" ".join(rng.sample(words, k=rng.randint(1, 2))) for _ in range(count)]
@@ -0,0 +1,87 @@
+# benchmarks/memory_footprint.py
+
+"""
+Speicherbedarf gelesener Prompts: TinyDB-``Document`` gegenüber ``Prompt``.
+
+Der synthetische Bestand wird wie von der TinyDB-Storage als JSON gelesen
+und einmal als ``Document``-Liste, einmal als ``Prompt``-Liste gehalten.
+Gemessen wird mit ``tracemalloc`` der Speicher, der nach dem Verwerfen der
+JSON-Rohdaten noch belegt ist.
+
+Beispiel::
+
+    python -m benchmarks.memory_footprint --size 100000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from tinydb.table import Document
+
+from benchmarks.corpus import generate_prompts
+from models.prompt_record import Prompt
+
+
+def _corpus_json(size: int, seed: int) -> str:
+    table = {}
+    for doc_id, record in enumerate(generate_prompts(size, seed), start=1):
+        table[str(doc_id)] = dict(record, last_modified="2025-01-01 12:00:00", revision=1)
+    return json.dumps({"_default": table}, ensure_ascii=False)
+
+
+def _retained_bytes(content: str, convert: Callable[[Dict, int], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        table = json.loads(content)["_default"]
+        records = [convert(doc, int(doc_id)) for doc_id, doc in table.items()]
+        del table
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del records
+    return retained
+
+
+def measure_memory(size: int, seed: int = 42) -> Dict[str, float]:
+    """
+    Misst den Speicher von ``size`` gelesenen Prompts in beiden Darstellungen.
+
+    :param size: Anzahl der Prompts
+    :param seed: Seed des Korpusgenerators
+    :return: Bytes gesamt und je Prompt sowie die Einsparung in Prozent
+    """
+    content = _corpus_json(size, seed)
+    documents = _retained_bytes(content, lambda doc, doc_id: Document(doc, doc_id))
+    prompts = _retained_bytes(content, Prompt.from_document)
+    return {
+        "size": size,
+        "document_bytes": documents,
+        "prompt_bytes": prompts,
+        "document_bytes_per_prompt": round(documents / size, 1),
+        "prompt_bytes_per_prompt": round(prompts / size, 1),
+        "reduction_percent": round(100 * (1 - prompts / documents), 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Speicherbedarf von Document und Prompt vergleichen")
+    parser.add_argument("--size", type=int, default=100000, help="Anzahl der Prompts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    result = measure_memory(args.size, args.seed)
+    print(f"{result['size']} Prompts")
+    print(f"  Document: {result['document_bytes'] / 2**20:8.1f} MiB ({result['document_bytes_per_prompt']} B/Prompt)")
+    print(f"  Prompt:   {result['prompt_bytes'] / 2**20:8.1f} MiB ({result['prompt_bytes_per_prompt']} B/Prompt)")
+    print(f"  Einsparung: {result['reduction_percent']} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
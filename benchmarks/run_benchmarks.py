@@ -0,0 +1,261 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Benchmark-Suite für PromptRepository / PromptService.
+
+Baut für jede Bestandsgröße eine frische Datenbank aus dem synthetischen
+Korpus auf, misst die zentralen Operationen und schreibt die Ergebnisse als
+JSON. Optional wird mit einer gespeicherten Baseline verglichen; langsamere
+Operationen werden als Regression gemeldet (Exit-Code 1).
+
+Beispiele::
+
+    python -m benchmarks.run_benchmarks --sizes 10000 100000
+    python -m benchmarks.run_benchmarks --sizes 10000 --backend sqlite --output results.json
+    python -m benchmarks.run_benchmarks --sizes 10000 --save-baseline
+    python -m benchmarks.run_benchmarks --sizes 10000 --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.corpus import CATEGORIES, TAGS, generate_prompts, sample_queries
+from services.prompt_service import PromptService
+from utils.backup import backup_database
+from utils.helpers import iter_export
+
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_REPEAT = 20
+LOAD_BATCH_SIZE = 5000
+
+
+class Regression(NamedTuple):
+    """Eine Operation, die langsamer als die Baseline (plus Toleranz) ist."""
+    size: str
+    operation: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+    }
+
+
+def _measure(operation: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        operation(run)
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+def _create_repository(backend: str, workdir: str):
+    if backend == "sqlite":
+        from models.sqlite_repository import SQLitePromptRepository
+        return SQLitePromptRepository(os.path.join(workdir, "bench.sqlite3"))
+    from models.prompt_model import PromptRepository
+    if backend == "journal":
+        from models.journal_storage import JournalStorage
+        return PromptRepository(os.path.join(workdir, "bench.json"), storage=JournalStorage)
+    return PromptRepository(os.path.join(workdir, "bench.json"))
+
+
+def run_size(size: int, backend: str = "tinydb", repeat: int = DEFAULT_REPEAT,
+             seed: int = 42, cached: bool = False) -> Dict[str, Dict]:
+    """
+    Misst alle Operationen für einen Bestand von ``size`` Prompts.
+
+    :param size: Anzahl der vorab geladenen Prompts
+    :param backend: "tinydb", "journal" oder "sqlite"
+    :param repeat: Wiederholungen je Operation
+    :param seed: Seed des Korpusgenerators
+    :param cached: Ergebnis-Cache des PromptService aktiv lassen
+    :return: Zuordnung Operation → Kennzahlen (Millisekunden)
+    """
+    workdir = tempfile.mkdtemp(prefix="prompt_bench_")
+    repo = _create_repository(backend, workdir)
+    service = PromptService(repo, cache_size=256 if cached else 0)
+    results: Dict[str, Dict] = {}
+    try:
+        start = time.perf_counter()
+        batch: List[Dict] = []
+        for record in generate_prompts(size, seed):
+            batch.append(record)
+            if len(batch) >= LOAD_BATCH_SIZE:
+                service.create_prompts_bulk(batch)
+                batch = []
+        if batch:
+            service.create_prompts_bulk(batch)
+        results["load_bulk"] = {"runs": 1, "total_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+        queries = sample_queries(seed)
+        extra = list(generate_prompts(repeat, seed + 1))
+        added_ids: List[int] = []
+
+        def add(run):
+            record = extra[run]
+            added_ids.append(service.create_prompt(
+                record["title"], record["category"], record["platform"], record["tags"],
+                record["prompt"], record["language"], record["purpose"], record["notes"],
+                check_duplicates=False))
+
+        results["add_prompt"] = _measure(add, repeat)
+        results["search_keyword"] = _measure(
+            lambda run: service.search_prompts(queries[run % len(queries)]), repeat)
+        results["search_keyword_top10"] = _measure(
+            lambda run: service.search_prompts(queries[run % len(queries)], limit=10), repeat)
+        results["search_fuzzy"] = _measure(
+            lambda run: service.search_prompts(queries[run % len(queries)] + "x", mode="fuzzy", limit=10), repeat)
+        results["search_category"] = _measure(
+            lambda run: service.search_prompts(category=CATEGORIES[run % len(CATEGORIES)]), repeat)
+        results["search_tags"] = _measure(
+            lambda run: service.search_prompts(tags=[TAGS[run % len(TAGS)], TAGS[(run + 7) % len(TAGS)]]), repeat)
+        results["search_combined"] = _measure(
+            lambda run: service.search_prompts(queries[run % len(queries)],
+                                               category=CATEGORIES[run % len(CATEGORIES)],
+                                               tags=[TAGS[run % len(TAGS)]]), repeat)
+        results["query_page"] = _measure(
+            lambda run: service.query_prompts(limit=25, offset=run * 25, descending=True), repeat)
+        # Erster Aufruf baut den TF-IDF-Index auf; gemessen werden die Abfragen für 25 Einträge je Seite.
+        service.find_similar_prompts(added_ids[:1])
+        results["similar_prompts_page"] = _measure(
+            lambda run: service.find_similar_prompts(range(run * 25 + 1, run * 25 + 26)), repeat)
+        results["update_prompt"] = _measure(
+            lambda run: service.update_prompt(added_ids[run], {"title": f"Aktualisiert {run}"}), repeat)
+        results["get_all_tags"] = _measure(lambda run: service.get_all_tags(), repeat)
+        results["get_all_categories"] = _measure(lambda run: service.get_all_categories(), repeat)
+        results["delete_prompt"] = _measure(lambda run: service.delete_prompt(added_ids[run]), repeat)
+
+        export_runs = max(1, min(repeat, 3))
+        for fmt in ("csv", "ndjson"):
+            results[f"export_{fmt}"] = _measure(
+                lambda run: sum(len(chunk) for chunk in iter_export(service.iter_prompts(), fmt)), export_runs)
+
+        backup_dir = os.path.join(workdir, "backups")
+
+        def backup(run):
+            service.checkpoint()
+            backup_database(repo.db_path, backup_dir)
+
+        results["backup"] = _measure(backup, export_runs)
+    finally:
+        repo.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run_benchmarks(sizes: List[int], backend: str = "tinydb", repeat: int = DEFAULT_REPEAT,
+                   seed: int = 42, cached: bool = False) -> Dict:
+    """
+    Führt die Benchmarks für alle Bestandsgrößen aus.
+
+    :return: JSON-fähiges Ergebnis mit Metadaten und Kennzahlen je Größe
+    """
+    return {
+        "meta": {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "backend": backend,
+            "repeat": repeat,
+            "seed": seed,
+            "cached": cached,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {str(size): run_size(size, backend, repeat, seed, cached) for size in sizes},
+    }
+
+
+def compare_with_baseline(current: Dict, baseline: Dict,
+                          tolerance: float = DEFAULT_TOLERANCE) -> List[Regression]:
+    """
+    Vergleicht die Mediane mit einer Baseline.
+
+    Verglichen werden nur Größen und Operationen, die in beiden Läufen vorkommen.
+
+    :param current: Ergebnis von ``run_benchmarks``
+    :param baseline: Früheres Ergebnis von ``run_benchmarks``
+    :param tolerance: Erlaubte relative Verlangsamung, z. B. 0.2 für 20 %
+    :return: Liste der Regressionen
+    """
+    regressions = []
+    for size, operations in current.get("results", {}).items():
+        baseline_operations = baseline.get("results", {}).get(size, {})
+        for operation, stats in operations.items():
+            reference = baseline_operations.get(operation)
+            if reference is None or "median_ms" not in stats or "median_ms" not in reference:
+                continue
+            if stats["median_ms"] > reference["median_ms"] * (1 + tolerance):
+                regressions.append(Regression(size, operation, reference["median_ms"], stats["median_ms"]))
+    return regressions
+
+
+def _print_table(results: Dict) -> None:
+    for size, operations in results["results"].items():
+        print(f"\n== {size} Prompts ({results['meta']['backend']}) ==")
+        for operation, stats in operations.items():
+            value = stats.get("median_ms", stats.get("total_ms"))
+            label = "median" if "median_ms" in stats else "gesamt"
+            print(f"  {operation:<22} {label:>6} {value:>12.3f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks für die Prompt-Datenbank")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000], help="Bestandsgrößen")
+    parser.add_argument("--backend", choices=["tinydb", "journal", "sqlite"], default="tinydb")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Wiederholungen je Operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cached", action="store_true", help="Ergebnis-Cache des Service aktiv lassen")
+    parser.add_argument("--output", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", help="Mit dieser Baseline vergleichen")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Erlaubte Verlangsamung gegenüber der Baseline (0.2 = 20 %%)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, metavar="PFAD",
+                        help="Ergebnisse als neue Baseline speichern")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.backend, args.repeat, args.seed, args.cached)
+    _print_table(results)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nErgebnisse gespeichert: {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("backend", "repeat", "cached"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(f"\nHinweis: Baseline wurde mit {key}={baseline.get('meta', {}).get(key)!r} erstellt.")
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en) gegenüber {args.baseline}:")
+            for r in regressions:
+                print(f"  [{r.size}] {r.operation}: {r.baseline_ms:.3f} ms → {r.current_ms:.3f} ms ({r.ratio:.2f}x)")
+            return 1
+        print(f"\nKeine Regressionen gegenüber {args.baseline} (Toleranz {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
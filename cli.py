@@ -0,0 +1,338 @@
+"""
+cli.py – Kommandozeile für die Prompt-Datenbank (ohne Streamlit)
+
+Für Skripte, Shell-Pipelines und Cronjobs. Jeder Unterbefehl importiert erst
+bei Ausführung, was er braucht; ``--help`` lädt weder Datenbank noch Service.
+
+Beispiele::
+
+    python -m cli add --title "Blogartikel" --category Marketing --tags blog,seo --prompt "Schreibe ..."
+    python -m cli add --title "Blogartikel" --prompt "Schreibe ..." --check-duplicates
+    echo "Schreibe ..." | python -m cli add --title "Blogartikel" --prompt -
+    python -m cli search newsletter --category Marketing --limit 5 --json
+    python -m cli update 12 --title "Neuer Titel" --tags a,b --if-revision 3
+    python -m cli delete 12 13
+    python -m cli export --format ndjson --gzip --output prompts.jsonl.gz
+    python -m cli backup --dir backups
+    python -m cli verify-backup backups/manifests/database_backup_20250801_120000.json
+    python -m cli restore backups/manifests/database_backup_20250801_120000.json
+    python -m cli import prompts.csv
+    python -m cli duplicates --threshold 0.8 --json
+    cat prompts.jsonl | python -m cli import - --format jsonl
+
+Mit ``--db`` wird eine andere Datenbankdatei als in settings/database.json verwendet.
+Exit-Codes: 0 = Erfolg, 1 = Validierungs- oder Eingabefehler, 2 = Aufruffehler.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+EXPORT_FORMAT_CHOICES = ("csv", "markdown", "ndjson")
+IMPORT_FORMAT_CHOICES = ("csv", "jsonl")
+SEARCH_MODE_CHOICES = ("keyword", "fuzzy", "substring")
+PROMPT_FIELDS = ("title", "category", "platform", "language", "purpose", "prompt", "notes")
+
+
+def _create_service(args):
+    from config.database_config import load_database_settings
+    from models.repository_factory import create_repository
+    from services.prompt_service import PromptService
+
+    settings = load_database_settings()
+    if args.db:
+        settings["path"] = args.db
+    return PromptService(create_repository(settings), cache_size=0)
+
+
+def _read_value(value: Optional[str]) -> Optional[str]:
+    """``-`` steht für die Standardeingabe (z. B. für lange Prompt-Texte)."""
+    return sys.stdin.read() if value == "-" else value
+
+
+def _split_tags(value: Optional[str]) -> List[str]:
+    return [tag.strip() for tag in (value or "").split(",") if tag.strip()]
+
+
+def _print_records(prompts, as_json: bool) -> None:
+    import json
+
+    for prompt in prompts:
+        if as_json:
+            record = dict(prompt.to_dict(), id=prompt.doc_id)
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            sys.stdout.write(f"{prompt.doc_id}\t{prompt.get('title', '')}\t{prompt.get('category', '')}\t"
+                             f"{', '.join(prompt.get('tags', []))}\n")
+
+
+def _filters(args) -> dict:
+    return dict(keyword=args.keyword, category=args.category, tags=args.tag or None,
+                platform=args.platform, language=args.language, purpose=args.purpose, mode=args.mode)
+
+
+# === Unterbefehle ===
+
+def cmd_add(args) -> int:
+    service = _create_service(args)
+    try:
+        # Die Duplikatprüfung baut den MinHash-Index über alle Prompts auf: nur auf Wunsch.
+        doc_id, duplicates = service.create_prompt_with_duplicates(
+            args.title, args.category, args.platform, _split_tags(args.tags), _read_value(args.prompt),
+            args.language, args.purpose, _read_value(args.notes), check_duplicates=args.check_duplicates)
+    finally:
+        service.repo.close()
+    for duplicate, similarity in duplicates:
+        print(f"Ähnlich: ID {duplicate.doc_id} {duplicate.get('title', '')} ({similarity:.0%})", file=sys.stderr)
+    print(doc_id)
+    return 0
+
+
+def cmd_search(args) -> int:
+    from models.prompt_model import SORT_RELEVANCE
+
+    service = _create_service(args)
+    try:
+        ranked = args.keyword and args.mode != "substring"
+        result = service.query_prompts(**_filters(args), sort_by=SORT_RELEVANCE if ranked else "doc_id",
+                                       limit=args.limit, offset=args.offset)
+        _print_records(result.items, args.json)
+    finally:
+        service.repo.close()
+    if not args.json:
+        print(f"{len(result.items)} von {result.total} Treffern", file=sys.stderr)
+    return 0
+
+
+def cmd_update(args) -> int:
+    updated_data = {field: _read_value(getattr(args, field)) for field in PROMPT_FIELDS
+                    if getattr(args, field) is not None}
+    if args.tags is not None:
+        updated_data["tags"] = _split_tags(args.tags)
+    if not updated_data:
+        print("Keine Felder zum Aktualisieren angegeben.", file=sys.stderr)
+        return 2
+    service = _create_service(args)
+    try:
+        expected = None if args.if_revision is None else {args.id: args.if_revision}
+        updated = service.update_many({args.id: updated_data}, expected)
+    finally:
+        service.repo.close()
+    if not updated:
+        print(f"Prompt {args.id} nicht gefunden.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_delete(args) -> int:
+    service = _create_service(args)
+    try:
+        deleted = service.delete_many(args.ids)
+    finally:
+        service.repo.close()
+    missing = sorted(set(args.ids) - set(deleted))
+    if missing:
+        print(f"Nicht gefunden: {', '.join(map(str, missing))}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_export(args) -> int:
+    from utils.helpers import iter_export
+
+    service = _create_service(args)
+    try:
+        chunks = iter_export(service.iter_prompts(**_filters(args)), args.format, compress=args.gzip)
+        if args.output:
+            from utils.helpers import write_chunks
+            write_chunks(chunks, args.output)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    finally:
+        service.repo.close()
+    return 0
+
+
+def cmd_backup(args) -> int:
+    from config.backup_config import load_backup_settings
+    from utils.backup import run_backup
+
+    settings = load_backup_settings()
+    service = _create_service(args)
+    try:
+        service.checkpoint()
+        result = run_backup(service.repo.db_path, args.dir or settings["directory"], settings["keep_hourly"],
+                            settings["keep_daily"], settings["keep_weekly"])
+    finally:
+        service.repo.close()
+    print(result["manifest"])
+    for problem in result["problems"]:
+        print(problem, file=sys.stderr)
+    return 1 if result["problems"] else 0
+
+
+def cmd_verify_backup(args) -> int:
+    from utils.backup import verify_backup
+
+    problems = verify_backup(args.manifest)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+    print("Backup in Ordnung.")
+    return 0
+
+
+def cmd_restore(args) -> int:
+    from config.database_config import load_database_settings
+    from utils.backup import restore_backup
+
+    target = args.db or load_database_settings()["path"]
+    print(restore_backup(args.manifest, target))
+    return 0
+
+
+def cmd_import(args) -> int:
+    service = _create_service(args)
+    try:
+        if args.source == "-":
+            if not args.format:
+                print("Beim Lesen von der Standardeingabe ist --format erforderlich.", file=sys.stderr)
+                return 2
+            report = service.import_prompts(sys.stdin.buffer, fmt=args.format)
+        else:
+            report = service.import_prompts(args.source, fmt=args.format)
+    finally:
+        service.repo.close()
+    print(f"{report.imported} Prompts importiert, {len(report.errors)} Zeilen übersprungen.", file=sys.stderr)
+    for line, message in report.errors:
+        print(f"Zeile {line}: {message}", file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+def cmd_duplicates(args) -> int:
+    import json
+
+    service = _create_service(args)
+    try:
+        clusters = service.find_duplicate_clusters(args.threshold)
+    finally:
+        service.repo.close()
+    for cluster in clusters:
+        if args.json:
+            sys.stdout.write(json.dumps([{"id": prompt.doc_id, "title": prompt.get("title", "")}
+                                         for prompt in cluster], ensure_ascii=False) + "\n")
+        else:
+            sys.stdout.write("\t".join(f"{prompt.doc_id}:{prompt.get('title', '')}" for prompt in cluster) + "\n")
+    if not args.json:
+        print(f"{len(clusters)} Duplikat-Cluster", file=sys.stderr)
+    return 0
+
+
+# === Parser ===
+
+def _add_filter_arguments(parser: argparse.ArgumentParser, with_keyword: bool = True) -> None:
+    if with_keyword:
+        parser.add_argument("keyword", nargs="?", default="", help="Suchbegriff")
+    else:
+        parser.add_argument("--keyword", default="", help="Suchbegriff")
+    parser.add_argument("--category", help="Kategorie")
+    parser.add_argument("--tag", action="append", help="Tag (mehrfach möglich, mindestens einer muss passen)")
+    parser.add_argument("--platform", help="Plattform")
+    parser.add_argument("--language", help="Sprache")
+    parser.add_argument("--purpose", help="Zweck / Verwendungsziel")
+    parser.add_argument("--mode", choices=SEARCH_MODE_CHOICES, default="keyword", help="Suchmodus")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Prompt-Datenbank ohne Oberfläche")
+    parser.add_argument("--db", help="Pfad zur Datenbankdatei (Standard: settings/database.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Info-Meldungen ausgeben")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Prompt anlegen (gibt die ID aus)")
+    add.add_argument("--title", required=True)
+    add.add_argument("--prompt", required=True, help="Prompt-Text oder - für die Standardeingabe")
+    add.add_argument("--category", default="")
+    add.add_argument("--platform", default="Andere")
+    add.add_argument("--tags", help="Tags, durch Komma getrennt")
+    add.add_argument("--language", default="")
+    add.add_argument("--purpose", default="")
+    add.add_argument("--notes", default="", help="Notizen oder - für die Standardeingabe")
+    add.add_argument("--check-duplicates", action="store_true",
+                     help="Vorher nach sehr ähnlichen Prompts suchen und sie auf stderr melden")
+    add.set_defaults(handler=cmd_add)
+
+    search = commands.add_parser("search", help="Prompts suchen (beste Treffer zuerst)")
+    _add_filter_arguments(search)
+    search.add_argument("--limit", type=int, default=20, help="Maximale Trefferzahl")
+    search.add_argument("--offset", type=int, default=0)
+    search.add_argument("--json", action="store_true", help="Vollständige Datensätze als NDJSON")
+    search.set_defaults(handler=cmd_search)
+
+    update = commands.add_parser("update", help="Felder eines Prompts ändern")
+    update.add_argument("id", type=int)
+    for field in PROMPT_FIELDS:
+        update.add_argument(f"--{field}")
+    update.add_argument("--tags", help="Tags, durch Komma getrennt (ersetzt die bisherigen)")
+    update.add_argument("--if-revision", type=int, help="Nur ändern, wenn der Prompt noch diese Revision hat")
+    update.set_defaults(handler=cmd_update)
+
+    delete = commands.add_parser("delete", help="Prompts löschen")
+    delete.add_argument("ids", type=int, nargs="+")
+    delete.set_defaults(handler=cmd_delete)
+
+    export = commands.add_parser("export", help="Prompts exportieren (Standard: auf die Standardausgabe)")
+    _add_filter_arguments(export, with_keyword=False)
+    export.add_argument("--format", choices=EXPORT_FORMAT_CHOICES, default="ndjson")
+    export.add_argument("--gzip", action="store_true", help="gzip-komprimiert")
+    export.add_argument("--output", "-o", help="Zieldatei")
+    export.set_defaults(handler=cmd_export)
+
+    backup = commands.add_parser("backup", help="Backup anlegen, prüfen und alte Backups aufräumen "
+                                                 "(gibt das Manifest aus)")
+    backup.add_argument("--dir", help="Zielverzeichnis (Standard: settings/backup.json bzw. backups)")
+    backup.set_defaults(handler=cmd_backup)
+
+    verify = commands.add_parser("verify-backup", help="Backup auf fehlende oder beschädigte Chunks prüfen")
+    verify.add_argument("manifest", help="Pfad zum Manifest")
+    verify.set_defaults(handler=cmd_verify_backup)
+
+    restore = commands.add_parser("restore", help="Datenbank aus einem Backup wiederherstellen")
+    restore.add_argument("manifest", help="Pfad zum Manifest")
+    restore.set_defaults(handler=cmd_restore)
+
+    import_ = commands.add_parser("import", help="Prompts aus CSV oder JSONL importieren")
+    import_.add_argument("source", help="Datei oder - für die Standardeingabe")
+    import_.add_argument("--format", choices=IMPORT_FORMAT_CHOICES, help="Standard: aus der Dateiendung")
+    import_.set_defaults(handler=cmd_import)
+
+    duplicates = commands.add_parser("duplicates", help="Gruppen nahezu identischer Prompts ausgeben")
+    duplicates.add_argument("--threshold", type=float, help="Mindestähnlichkeit (Standard: 0.6)")
+    duplicates.add_argument("--json", action="store_true", help="Ein JSON-Array je Cluster")
+    duplicates.set_defaults(handler=cmd_duplicates)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    import logging
+    previous_disable = logging.root.manager.disable
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    try:
+        return args.handler(args)
+    except ValueError as error:
+        print(f"Fehler: {error}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # z. B. "python -m cli export | head"
+        return 0
+    finally:
+        logging.disable(previous_disable)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# config/backup_config.py
+
+"""
+Einstellungen für Datenbank-Backups und deren Aufbewahrung.
+
+Die Einstellungen liegen in settings/backup.json und können über
+Umgebungsvariablen überschrieben werden:
+
+- PROMPT_BACKUP_DIR: Backup-Verzeichnis (Standard: backups)
+- PROMPT_BACKUP_KEEP_HOURLY: Anzahl aufbewahrter stündlicher Backups (Standard: 24)
+- PROMPT_BACKUP_KEEP_DAILY: Anzahl aufbewahrter täglicher Backups (Standard: 7)
+- PROMPT_BACKUP_KEEP_WEEKLY: Anzahl aufbewahrter wöchentlicher Backups (Standard: 4)
+"""
+
+import json
+import os
+from typing import Dict
+
+SETTINGS_FILE = "settings/backup.json"
+
+ENV_OVERRIDES = {
+    "directory": "PROMPT_BACKUP_DIR",
+    "keep_hourly": "PROMPT_BACKUP_KEEP_HOURLY",
+    "keep_daily": "PROMPT_BACKUP_KEEP_DAILY",
+    "keep_weekly": "PROMPT_BACKUP_KEEP_WEEKLY",
+}
+
+
+def load_backup_settings() -> Dict:
+    """
+    Lädt die Backup-Einstellungen aus Datei und Umgebung.
+
+    :return: Dictionary mit den Schlüsseln directory (str), keep_hourly, keep_daily und keep_weekly (int)
+    """
+    settings = {"directory": "backups", "keep_hourly": 24, "keep_daily": 7, "keep_weekly": 4}
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    for key, env_name in ENV_OVERRIDES.items():
+        if os.environ.get(env_name):
+            settings[key] = os.environ[env_name]
+
+    for key in ("keep_hourly", "keep_daily", "keep_weekly"):
+        settings[key] = int(settings[key])
+    return settings
@@ -0,0 +1,61 @@
+# config/database_config.py
+
+"""
+Auswahl und Konfiguration des Datenbank-Backends.
+
+Die Einstellungen liegen in settings/database.json und können über
+Umgebungsvariablen überschrieben werden:
+
+- PROMPT_DB_BACKEND: "tinydb" (Standard) oder "sqlite"
+- PROMPT_DB_PATH: Pfad zur Datenbankdatei
+- PROMPT_DB_STORAGE: TinyDB-Storage "json" (Standard), "journal" oder "split"
+  (Metadaten und Prompt-Texte in getrennten Dateien)
+"""
+
+import json
+import os
+from typing import Dict
+
+SETTINGS_FILE = "settings/database.json"
+
+DEFAULT_PATHS = {
+    "tinydb": "database.json",
+    "sqlite": "database.sqlite3",
+}
+
+ENV_OVERRIDES = {
+    "backend": "PROMPT_DB_BACKEND",
+    "path": "PROMPT_DB_PATH",
+    "storage": "PROMPT_DB_STORAGE",
+}
+
+
+def load_database_settings() -> Dict[str, str]:
+    """
+    Lädt die Datenbank-Einstellungen aus Datei und Umgebung.
+
+    :return: Dictionary mit den Schlüsseln backend, path und storage
+    """
+    settings = {"backend": "tinydb", "storage": "json"}
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    for key, env_name in ENV_OVERRIDES.items():
+        if os.environ.get(env_name):
+            settings[key] = os.environ[env_name]
+
+    settings.setdefault("path", DEFAULT_PATHS.get(settings["backend"], DEFAULT_PATHS["tinydb"]))
+    return settings
+
+
+def save_database_settings(settings: Dict[str, str]) -> None:
+    """
+    Speichert die Datenbank-Einstellungen in settings/database.json.
+    """
+    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
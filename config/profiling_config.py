@@ -0,0 +1,48 @@
+# config/profiling_config.py
+
+"""
+Einstellungen für das Profiling der Streamlit-Reruns.
+
+Die Einstellungen liegen in settings/profiling.json und können über
+Umgebungsvariablen überschrieben werden:
+
+- PROMPT_DB_PROFILE: "1" aktiviert das Profiling jedes Reruns
+- PROMPT_DB_PROFILE_DIR: Verzeichnis für die .pstats-Dateien (Standard: profiles)
+- PROMPT_DB_PROFILE_KEEP: Anzahl der langsamsten Reruns, die aufbewahrt werden (Standard: 5)
+"""
+
+import json
+import os
+from typing import Dict
+
+SETTINGS_FILE = "settings/profiling.json"
+
+ENV_OVERRIDES = {
+    "enabled": "PROMPT_DB_PROFILE",
+    "directory": "PROMPT_DB_PROFILE_DIR",
+    "keep": "PROMPT_DB_PROFILE_KEEP",
+}
+
+
+def load_profiling_settings() -> Dict:
+    """
+    Lädt die Profiling-Einstellungen aus Datei und Umgebung.
+
+    :return: Dictionary mit den Schlüsseln enabled (bool), directory (str) und keep (int)
+    """
+    settings = {"enabled": False, "directory": "profiles", "keep": 5}
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    for key, env_name in ENV_OVERRIDES.items():
+        if os.environ.get(env_name):
+            settings[key] = os.environ[env_name]
+
+    if isinstance(settings["enabled"], str):
+        settings["enabled"] = settings["enabled"].lower() in ("1", "true", "yes")
+    settings["keep"] = int(settings["keep"])
+    return settings
@@ -0,0 +1,263 @@
+"""
+BodyStorage – TinyDB-Storage mit getrennt abgelegten Prompt-Texten.
+
+Die Datenbankdatei enthält nur die kompakten Metadaten (Titel, Kategorie,
+Tags, Zeitstempel …). Die großen Textfelder ``prompt`` und ``notes`` liegen
+UTF-8-kodiert in der Blob-Datei ``<db_path>.bodies``; jedes Dokument verweist
+unter ``_body`` mit ``[Offset, Länge]`` auf seine Texte. Beim Lesen parst
+TinyDB daher nur die Metadaten. Die Texte werden über ``mmap`` erst dann
+gelesen und dekodiert, wenn ein ``Prompt`` tatsächlich nach ihnen gefragt
+wird (siehe ``lazy_body``) – Listenansichten und Filter berühren sie nicht.
+
+Neue und geänderte Texte werden an die Blob-Datei angehängt. Übersteigt der
+Anteil nicht mehr referenzierter Bytes ``compact_ratio``, wird die Datei beim
+nächsten Schreiben mit den lebenden Texten neu geschrieben – in eine neue
+Generation ``<db_path>.bodies.<n>``. Die Metadaten verweisen unter
+``_body_generation`` auf die gültige Generation; die alte Blob-Datei wird
+erst gelöscht, nachdem die Metadaten mit den neuen Offsets geschrieben sind.
+Ein Absturz dazwischen hinterlässt höchstens eine verwaiste Datei, die die
+nächste Kompaktierung entfernt. Eine bestehende
+TinyDB-JSON-Datei mit eingebetteten Texten wird beim ersten Schreiben
+automatisch umgestellt.
+"""
+
+import json
+import mmap
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from tinydb.storages import Storage, touch
+from models.prompt_record import BODY_FIELDS
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+BODY_SUFFIX = ".bodies"
+BODY_KEY = "_body"
+GENERATION_KEY = "_body_generation"
+DEFAULT_COMPACT_RATIO = 0.5
+MIN_COMPACT_BYTES = 1024 * 1024
+
+
+def body_path_for(path: str, generation: int = 0) -> str:
+    """Pfad der Blob-Datei einer Generation zu einer Datenbankdatei."""
+    return path + BODY_SUFFIX + (f".{generation}" if generation else "")
+
+
+def body_generations(path: str) -> Dict[int, str]:
+    """
+    Alle vorhandenen Blob-Dateien einer Datenbankdatei, auch verwaiste.
+
+    :param path: Pfad zur Metadaten-Datei
+    :return: Zuordnung Generation → Pfad
+    """
+    directory = os.path.dirname(path) or "."
+    pattern = re.compile(re.escape(os.path.basename(path) + BODY_SUFFIX) + r"(?:\.(\d+))?")
+    generations = {}
+    for name in os.listdir(directory):
+        match = pattern.fullmatch(name)
+        if match:
+            generations[int(match.group(1) or 0)] = os.path.join(os.path.dirname(path), name)
+    return generations
+
+
+class LazyText:
+    """
+    Verweis auf einen Text in der Blob-Datei; ``load()`` liest und dekodiert ihn.
+
+    Der Verweis hält seine eigene ``mmap``-Ansicht. Sie bleibt auch gültig, wenn
+    die Blob-Datei danach wächst oder durch eine Kompaktierung ersetzt wird.
+    """
+
+    __slots__ = ("_view", "_offset", "_length")
+
+    def __init__(self, view: mmap.mmap, offset: int, length: int):
+        self._view = view
+        self._offset = offset
+        self._length = length
+
+    def load(self) -> str:
+        return self._view[self._offset:self._offset + self._length].decode("utf-8")
+
+    def __len__(self) -> int:
+        """Länge in Bytes (ohne den Text zu lesen)."""
+        return self._length
+
+
+class BodyStorage(Storage):
+    """
+    TinyDB-Storage, die Metadaten und Prompt-Texte in getrennten Dateien ablegt.
+
+    Verwendung::
+
+        TinyDB("database.json", storage=BodyStorage)
+    """
+
+    def __init__(self, path: str, compact_ratio: float = DEFAULT_COMPACT_RATIO,
+                 min_compact_bytes: int = MIN_COMPACT_BYTES, **kwargs):
+        """
+        :param path: Pfad zur Metadaten-Datei (TinyDB-JSON-Format).
+        :param compact_ratio: Anteil toter Bytes in der Blob-Datei, ab dem neu geschrieben wird.
+        :param min_compact_bytes: Mindestgröße toter Bytes für eine Kompaktierung.
+        """
+        super().__init__()
+        self.path = path
+        self.generation = 0
+        self.body_path = body_path_for(path)
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self._lock = threading.RLock()
+        self._view: Optional[mmap.mmap] = None
+        self._view_key = (0, 0, 0)
+        touch(path, create_dirs=False)
+
+    # === Lesen ===
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        data = json.loads(content) if content.strip() else None
+        with self._lock:
+            # Verweise der gelesenen Metadaten beziehen sich auf den jetzigen Stand ihrer Blob-Datei.
+            self._set_generation(data.pop(GENERATION_KEY, 0) if data else 0)
+            self._refresh_view()
+        return data
+
+    def _set_generation(self, generation: int) -> None:
+        self.generation = generation
+        self.body_path = body_path_for(self.path, generation)
+
+    def lazy_body(self, doc: Dict, field: str) -> Union[str, LazyText]:
+        """
+        Liefert den Text eines Body-Feldes, ohne ihn zu lesen.
+
+        :param doc: Gelesenes Dokument (Metadaten mit ``_body``-Verweisen)
+        :param field: ``prompt`` oder ``notes``
+        :return: Eingebetteter Text, leerer Text oder ein ``LazyText``-Verweis
+        """
+        if field in doc:
+            return doc[field] or ""
+        ref = (doc.get(BODY_KEY) or {}).get(field)
+        if not ref or not ref[1]:
+            return ""
+        offset, length = ref
+        view = self._view
+        if view is None or len(view) < offset + length:
+            raise ValueError(f"Blob-Datei {self.body_path} ist kürzer als referenziert")
+        return LazyText(view, offset, length)
+
+    def _refresh_view(self) -> None:
+        """Bildet die Blob-Datei neu ab, wenn sie gewachsen ist oder ersetzt wurde (Kompaktierung)."""
+        with self._lock:
+            try:
+                stat = os.stat(self.body_path)
+            except FileNotFoundError:
+                self._view, self._view_key = None, (0, 0, 0)
+                return
+            key = (self.generation, stat.st_ino, stat.st_size)
+            if key == self._view_key:
+                return
+            # Ältere Ansichten werden nicht geschlossen: LazyText-Verweise können sie noch halten.
+            if stat.st_size:
+                with open(self.body_path, "rb") as f:
+                    self._view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._view = None
+            self._view_key = key
+
+    # === Schreiben ===
+
+    def write(self, data: Dict[str, Dict[str, Any]]) -> None:
+        self._write(data, force_compact=False)
+
+    def compact(self, wait: bool = True) -> None:
+        """
+        Schreibt die Blob-Datei nur mit den noch referenzierten Texten neu, z. B. vor einem Backup.
+
+        :param wait: Ohne Wirkung; die Kompaktierung läuft immer synchron.
+        """
+        self._write(self.read() or {}, force_compact=True)
+
+    def _write(self, data: Dict[str, Dict[str, Any]], force_compact: bool) -> None:
+        with self._lock:
+            data = {name: table for name, table in data.items() if name != GENERATION_KEY}
+            offset = os.path.getsize(self.body_path) if os.path.exists(self.body_path) else 0
+            appended: List[bytes] = []
+            appended_size = 0
+            live_size = 0
+            metadata: Dict[str, Dict[str, Any]] = {}
+            for table_name, table in data.items():
+                stored = metadata[table_name] = {}
+                for doc_id, doc in table.items():
+                    refs = dict(doc.get(BODY_KEY) or {})
+                    for field in BODY_FIELDS:
+                        if field not in doc:
+                            continue
+                        # Neuer oder geänderter Text: anhängen und den Verweis ersetzen.
+                        encoded = (doc[field] or "").encode("utf-8")
+                        refs.pop(field, None)
+                        if encoded:
+                            refs[field] = [offset + appended_size, len(encoded)]
+                            appended.append(encoded)
+                            appended_size += len(encoded)
+                    live_size += sum(length for _, length in refs.values())
+                    entry = {key: value for key, value in doc.items() if key not in BODY_FIELDS}
+                    entry[BODY_KEY] = refs
+                    stored[doc_id] = entry
+
+            if appended:
+                with open(self.body_path, "ab") as f:
+                    f.writelines(appended)
+                    f.flush()
+                    os.fsync(f.fileno())
+            dead_size = offset + appended_size - live_size
+            if dead_size and (force_compact or dead_size >= max(self.min_compact_bytes,
+                                                                self.compact_ratio * (offset + appended_size))):
+                generation = self.generation + 1
+                self._rewrite_bodies(metadata, body_path_for(self.path, generation))
+                self._write_metadata(metadata, generation)
+                self._set_generation(generation)
+                self._remove_stale_bodies()
+            else:
+                self._write_metadata(metadata, self.generation)
+
+    def _rewrite_bodies(self, metadata: Dict[str, Dict[str, Any]], target_path: str) -> None:
+        """Kopiert alle referenzierten Texte in eine neue Blob-Datei und passt die Verweise an."""
+        self._refresh_view()
+        source = self._view
+        position = 0
+        with open(target_path, "wb") as f:
+            for table in metadata.values():
+                for entry in table.values():
+                    refs = entry[BODY_KEY]
+                    for field, (offset, length) in list(refs.items()):
+                        f.write(source[offset:offset + length])
+                        refs[field] = [position, length]
+                        position += length
+            f.flush()
+            os.fsync(f.fileno())
+        logger.info("Blob-Datei kompaktiert: %s (%d Bytes)", target_path, position)
+
+    def _remove_stale_bodies(self) -> None:
+        """Löscht alte und verwaiste Blob-Generationen; erst nach dem Schreiben der Metadaten aufrufen."""
+        for generation, path in body_generations(self.path).items():
+            if generation != self.generation:
+                try:
+                    os.remove(path)
+                except OSError as error:
+                    logger.warning("Alte Blob-Datei %s nicht gelöscht: %s", path, error)
+
+    def _write_metadata(self, metadata: Dict[str, Dict[str, Any]], generation: int) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({GENERATION_KEY: generation, **metadata} if generation else metadata, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._view = None
+            self._view_key = (0, 0, 0)
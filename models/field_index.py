@@ -0,0 +1,109 @@
+"""
+FieldIndex – Sekundärindex für kategoriale Prompt-Felder.
+
+Bildet jeden Feldwert (z. B. eine Kategorie oder einen Tag) auf die Menge der
+Dokument-IDs ab, die diesen Wert tragen. Die Größe dieser Menge dient zugleich
+als Referenzzähler: Sinkt sie auf null, verschwindet der Wert aus der Liste
+der eindeutigen Werte.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+
+class FieldIndex:
+    """
+    Inkrementell gepflegter Index Wert → Dokument-IDs für ein einzelnes Feld.
+    """
+
+    def __init__(self, field: str, multi_valued: bool = False):
+        """
+        :param field: Name des indizierten Feldes (z. B. "category")
+        :param multi_valued: True, wenn das Feld eine Liste von Werten enthält (z. B. "tags")
+        """
+        self.field = field
+        self.multi_valued = multi_valued
+        self._postings: Dict[str, Set[int]] = {}
+        self._doc_values: Dict[int, Tuple[str, ...]] = {}
+        self._sorted_values: List[str] = []
+        self._values_dirty = False
+
+    def _extract(self, doc: Mapping) -> Tuple[str, ...]:
+        raw = doc.get(self.field)
+        if self.multi_valued:
+            if not isinstance(raw, (list, tuple)):
+                return ()
+            return tuple(dict.fromkeys(v for v in raw if v))
+        return (raw,) if raw else ()
+
+    def add_document(self, doc_id: int, doc: Mapping) -> None:
+        """
+        Nimmt ein Dokument auf bzw. ersetzt dessen bisherige Werte.
+
+        :param doc_id: Dokument-ID
+        :param doc: Dokumentinhalt
+        """
+        values = self._extract(doc)
+        if self._doc_values.get(doc_id) == values:
+            return
+        self.remove_document(doc_id)
+        for value in values:
+            ids = self._postings.get(value)
+            if ids is None:
+                ids = self._postings[value] = set()
+                self._values_dirty = True
+            ids.add(doc_id)
+        if values:
+            self._doc_values[doc_id] = values
+
+    def remove_document(self, doc_id: int) -> None:
+        """
+        Entfernt ein Dokument aus dem Index.
+
+        :param doc_id: Dokument-ID
+        """
+        for value in self._doc_values.pop(doc_id, ()):
+            ids = self._postings.get(value)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self._postings[value]
+                self._values_dirty = True
+
+    def clear(self) -> None:
+        """Leert den Index vollständig."""
+        self._postings.clear()
+        self._doc_values.clear()
+        self._sorted_values = []
+        self._values_dirty = False
+
+    def lookup(self, value: str) -> Set[int]:
+        """Gibt die Dokument-IDs mit genau diesem Wert zurück (nicht verändern)."""
+        return self._postings.get(value, set())
+
+    def lookup_any(self, values: Iterable[str]) -> Set[int]:
+        """Gibt die Dokument-IDs zurück, die mindestens einen der Werte tragen."""
+        result: Set[int] = set()
+        for value in values:
+            result |= self._postings.get(value, set())
+        return result
+
+    def lookup_containing(self, text: str) -> Set[int]:
+        """
+        Gibt die Dokument-IDs zurück, deren Wert ``text`` enthält (ohne Groß-/Kleinschreibung).
+
+        Durchläuft nur die eindeutigen Werte, nicht die Dokumente.
+        """
+        needle = text.lower()
+        return self.lookup_any(v for v in self._postings if needle in v.lower())
+
+    def count(self, value: str) -> int:
+        """Anzahl der Dokumente, die den Wert referenzieren."""
+        return len(self._postings.get(value, ()))
+
+    def values(self) -> List[str]:
+        """Alphabetisch sortierte Liste aller aktuell verwendeten Werte."""
+        if self._values_dirty:
+            self._sorted_values = sorted(self._postings)
+            self._values_dirty = False
+        return list(self._sorted_values)
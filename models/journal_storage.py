@@ -0,0 +1,338 @@
+"""
+JournalStorage – Append-only TinyDB-Storage mit Hintergrund-Kompaktierung.
+
+TinyDB übergibt bei jedem Schreibvorgang den vollständigen Datenbestand an
+``Storage.write``. Diese Storage vergleicht ihn mit dem zuletzt bekannten Stand
+und hängt nur die geänderten Dokumente als eine Zeile an das Journal
+``<db_path>.journal`` an. Die Datenbankdatei selbst bleibt eine gewöhnliche
+TinyDB-JSON-Datei (Snapshot) und wird nur bei der Kompaktierung neu geschrieben.
+
+Journalformat: eine JSON-Zeile pro Commit, ``{"ops": [...]}`` mit den
+Operationen ``put`` (Dokument setzen), ``del`` (Dokument löschen) und
+``drop`` (Tabelle entfernen). Alle Operationen sind absolut und damit
+idempotent, sodass ein erneutes Einspielen nach einem Absturz während der
+Kompaktierung denselben Stand ergibt.
+
+Die Kompaktierung rotiert das Journal nach ``<db_path>.journal.compacting``
+und schreibt den neuen Snapshot (optional im Hintergrund) in eine temporäre
+Datei. Ersetzt wird der Snapshot erst unter der exklusiven Dateisperre
+``<db_path>.lock`` – beim nächsten Schreiben, ``compact()`` oder ``close()``.
+Andere Prozesse sehen Snapshot und ``.compacting`` damit immer als
+zusammengehöriges Paar. Das Repository verwendet dieselbe Sperre
+(``file_lock``), sodass sie innerhalb eines Threads wiedereintrittsfähig ist.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from tinydb.storages import Storage, touch
+from utils.file_lock import FileLock
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".compacting"
+LOCK_SUFFIX = ".lock"
+DEFAULT_COMPACT_THRESHOLD = 1024 * 1024
+
+
+def journal_path_for(path: str) -> str:
+    """Pfad der Journaldatei zu einer Datenbankdatei."""
+    return path + JOURNAL_SUFFIX
+
+
+def _fsync_directory(path: str) -> None:
+    """Macht Umbenennungen im Verzeichnis von ``path`` dauerhaft (unter Windows ohne Wirkung)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JournalStorage(Storage):
+    """
+    TinyDB-Storage, deren Schreibkosten proportional zur Änderung sind.
+
+    Verwendung::
+
+        TinyDB("database.json", storage=JournalStorage)
+    """
+
+    def __init__(self, path: str, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+                 background_compaction: bool = True, **kwargs):
+        """
+        :param path: Pfad zur Snapshot-Datei (TinyDB-JSON-Format).
+        :param compact_threshold: Journalgröße in Bytes, ab der kompaktiert wird.
+        :param background_compaction: Kompaktierung in einem Hintergrund-Thread ausführen.
+        """
+        super().__init__()
+        self.path = path
+        self.journal_path = journal_path_for(path)
+        self.compacting_path = self.journal_path + COMPACTING_SUFFIX
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+        self.file_lock = FileLock(path + LOCK_SUFFIX)
+
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._journal_size = 0
+        self._snapshot_stat = None
+        self._external_changes = 0
+        self._reported_external_changes = 0
+        # Fertig geschriebener, noch nicht veröffentlichter Snapshot und der Stand von .compacting dazu.
+        self._ready_snapshot: Optional[Tuple[str, Any]] = None
+        self._compacting_stat = None
+
+        touch(path, create_dirs=False)
+        self._load()
+        self._journal = open(self.journal_path, "ab")
+
+    # === Laden & Einspielen ===
+
+    def _load(self) -> None:
+        with self.file_lock.shared():
+            # Erst stat, dann lesen: Ein danach ersetzter Snapshot wird beim nächsten _refresh erkannt.
+            self._snapshot_stat = self._stat(self.path)
+            self._state = self._read_snapshot()
+            if os.path.exists(self.compacting_path):
+                self._replay(self.compacting_path, repair=False)
+            self._journal_size = self._replay(self.journal_path, repair=True)
+
+    def _read_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return json.loads(content) if content.strip() else {}
+
+    def _replay(self, path: str, repair: bool, start: int = 0) -> int:
+        """
+        Spielt Journal-Einträge ab ``start`` ein und gibt die Länge des gültigen Teils zurück.
+
+        Ein unvollständiger letzter Eintrag (fehlender Zeilenumbruch oder defektes
+        JSON) wird ignoriert und bei ``repair=True`` aus der Datei abgeschnitten.
+        """
+        if not os.path.exists(path):
+            return 0
+        valid_size = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record.get("ops", []))
+                valid_size += len(line)
+            file_size = f.seek(0, os.SEEK_END)
+
+        if valid_size < file_size:
+            logger.warning("Unvollständiger Journal-Eintrag in %s verworfen (%d Bytes)",
+                           path, file_size - valid_size)
+            if repair:
+                with open(path, "r+b") as f:
+                    f.truncate(valid_size)
+                    f.flush()
+                    os.fsync(f.fileno())
+        return valid_size
+
+    def _apply(self, ops: List[Dict[str, Any]]) -> None:
+        for op in ops:
+            kind = op["op"]
+            table = op["table"]
+            if kind == "put":
+                self._state.setdefault(table, {})[op["id"]] = op["doc"]
+            elif kind == "del":
+                self._state.get(table, {}).pop(op["id"], None)
+            elif kind == "drop":
+                self._state.pop(table, None)
+
+    @staticmethod
+    def _stat(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _refresh(self) -> None:
+        """Übernimmt Änderungen, die ein anderer Prozess an den Dateien vorgenommen hat."""
+        snapshot_changed = self._stat(self.path) != self._snapshot_stat
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            journal_size = 0
+        if snapshot_changed or journal_size < self._journal_size:
+            self._journal.close()
+            self._load()
+            self._journal = open(self.journal_path, "ab")
+            self._external_changes += 1
+        elif journal_size > self._journal_size:
+            self._journal_size = self._replay(self.journal_path, repair=False, start=self._journal_size)
+            self._external_changes += 1
+
+    def has_external_changes(self) -> bool:
+        """
+        Prüft, ob seit dem letzten Aufruf ein anderer Prozess die Daten verändert hat.
+
+        Eigene Schreibvorgänge und Kompaktierungen zählen nicht als externe Änderung.
+        """
+        with self._lock:
+            self._refresh()
+            changed = self._external_changes != self._reported_external_changes
+            self._reported_external_changes = self._external_changes
+            return changed
+
+    # === Storage-Schnittstelle ===
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            if not self._state:
+                return None
+            # TinyDB verändert die gelesenen Dokumente beim Aktualisieren direkt,
+            # daher wird je Dokument eine flache Kopie herausgegeben.
+            return {table: {doc_id: dict(doc) for doc_id, doc in docs.items()}
+                    for table, docs in self._state.items()}
+
+    def write(self, data: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._publish_snapshot()
+            self._refresh()
+            ops = self._diff(data)
+            if not ops:
+                return
+            line = json.dumps({"ops": ops}, ensure_ascii=False).encode("utf-8") + b"\n"
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_size += len(line)
+            self._apply(ops)
+            if self._journal_size >= self.compact_threshold:
+                self._start_compaction()
+
+    def _diff(self, data: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ops: List[Dict[str, Any]] = []
+        for table in self._state:
+            if table not in data:
+                ops.append({"op": "drop", "table": table})
+        for table, docs in data.items():
+            old_docs = self._state.get(table, {})
+            for doc_id in old_docs:
+                if doc_id not in docs:
+                    ops.append({"op": "del", "table": table, "id": doc_id})
+            for doc_id, doc in docs.items():
+                if old_docs.get(doc_id) != doc:
+                    ops.append({"op": "put", "table": table, "id": doc_id, "doc": doc})
+        return ops
+
+    # === Kompaktierung ===
+
+    def compact(self, wait: bool = True) -> None:
+        """
+        Schreibt den aktuellen Stand als Snapshot und leert das Journal.
+
+        :param wait: Auf das Ende der Kompaktierung warten.
+        """
+        # Der Hintergrund-Thread schreibt nur die temporäre Datei und wartet auf keine Sperre.
+        self._join_compaction()
+        with self._lock:
+            self._publish_snapshot()
+            if self._journal_size or os.path.exists(self.compacting_path):
+                self._start_compaction(background=not wait)
+
+    def _join_compaction(self) -> None:
+        with self._lock:
+            thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+
+    def _start_compaction(self, background: Optional[bool] = None) -> None:
+        """Rotiert das Journal und schreibt den Snapshot (optional im Hintergrund)."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        with self.file_lock.exclusive():
+            self._publish_snapshot()
+            if os.path.exists(self.compacting_path):
+                # Eine abgebrochene Kompaktierung muss zuerst abgeschlossen werden;
+                # der aktuelle Stand enthält deren Einträge bereits.
+                self._compacting_stat = self._stat(self.compacting_path)
+                self._write_snapshot(self._copy_state())
+                self._publish_snapshot()
+            self._journal.close()
+            os.replace(self.journal_path, self.compacting_path)
+            _fsync_directory(self.path)
+            self._compacting_stat = self._stat(self.compacting_path)
+            self._journal = open(self.journal_path, "ab")
+            self._journal_size = 0
+        state_copy = self._copy_state()
+
+        if background is None:
+            background = self.background_compaction
+        if background:
+            self._compaction_thread = threading.Thread(
+                target=self._write_snapshot, args=(state_copy,),
+                name="journal-compaction", daemon=True)
+            self._compaction_thread.start()
+        else:
+            self._write_snapshot(state_copy)
+            self._publish_snapshot()
+
+    def _copy_state(self) -> Dict[str, Dict[str, Any]]:
+        return {table: dict(docs) for table, docs in self._state.items()}
+
+    def _write_snapshot(self, state: Dict[str, Dict[str, Any]]) -> None:
+        """Schreibt den Snapshot in eine temporäre Datei; veröffentlicht wird er mit _publish_snapshot."""
+        directory, name = os.path.split(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._ready_snapshot = (tmp_path, self._compacting_stat)
+
+    def _publish_snapshot(self) -> None:
+        """
+        Ersetzt den Snapshot durch einen fertig geschriebenen und entfernt ``.compacting``.
+
+        Beides geschieht unter der exklusiven Dateisperre. Hat ein anderer Prozess
+        die Kompaktierung inzwischen abgeschlossen (``.compacting`` fehlt oder ist
+        eine andere Datei), wird der eigene, dann veraltete Snapshot verworfen.
+        """
+        with self._lock:
+            if self._ready_snapshot is None:
+                return
+            tmp_path, compacting_stat = self._ready_snapshot
+            self._ready_snapshot = None
+            with self.file_lock.exclusive():
+                if self._stat(self.compacting_path) != compacting_stat:
+                    os.remove(tmp_path)
+                    logger.debug("Kompaktierung von einem anderen Prozess abgeschlossen: %s", self.path)
+                    return
+                os.replace(tmp_path, self.path)
+                _fsync_directory(self.path)
+                self._snapshot_stat = self._stat(self.path)
+                try:
+                    os.remove(self.compacting_path)
+                except FileNotFoundError:
+                    pass
+                _fsync_directory(self.path)
+        logger.debug("Journal kompaktiert: %s", self.path)
+
+    def close(self) -> None:
+        self._join_compaction()
+        with self._lock:
+            self._publish_snapshot()
+            self._journal.close()
@@ -0,0 +1,257 @@
+"""
+MinHashIndex – Erkennung nahezu identischer Prompts per MinHash und LSH.
+
+Jeder Prompt-Text wird in Wort-Shingles (zwei aufeinanderfolgende normalisierte
+Wörter) zerlegt. Die MinHash-Signatur besteht aus ``num_perm`` Minima über
+unabhängige Hashfunktionen; der Anteil übereinstimmender Positionen zweier
+Signaturen schätzt die Jaccard-Ähnlichkeit der Shingle-Mengen. Alle
+Hashwerte eines Shingles stammen aus einem einzigen ``shake_128``-Aufruf.
+
+Für das Locality-Sensitive Hashing wird die Signatur in ``bands`` Bänder
+geteilt; Prompts, die in mindestens einem Band übereinstimmen, sind Kandidaten.
+Eine Anfrage berührt daher nur wenige Buckets statt aller Prompts, und der
+Clusterbericht kommt mit einem Durchlauf über die Buckets aus.
+
+Die Signaturen lassen sich zusammen mit dem Fingerabdruck der Datenbank als
+JSON-Datei speichern (gepackt, Base64-kodiert). Kurzlebige Prozesse wie die
+Kommandozeile laden sie, statt alle Texte erneut zu hashen.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.text_normalizer import tokenize
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_DUPLICATE_THRESHOLD = 0.6
+SHINGLE_SIZE = 2
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    Zerlegt einen Text in Wort-Shingles.
+
+    :param text: Beliebiger Text
+    :param size: Anzahl Wörter je Shingle; kürzere Texte bilden ein einziges Shingle
+    :return: Menge der Shingles (leer bei Text ohne Wörter)
+    """
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text: str, num_perm: int = DEFAULT_NUM_PERM) -> Optional[Signature]:
+    """
+    Berechnet die MinHash-Signatur eines Textes.
+
+    :param text: Beliebiger Text
+    :param num_perm: Anzahl der Hashfunktionen (Länge der Signatur)
+    :return: Signatur oder None, wenn der Text keine Wörter enthält
+    """
+    parts = shingles(text)
+    if not parts:
+        return None
+    unpack = struct.Struct(f"<{num_perm}I").unpack
+    rows = [unpack(hashlib.shake_128(part.encode("utf-8")).digest(4 * num_perm)) for part in parts]
+    return tuple(map(min, zip(*rows)))
+
+
+def estimate_similarity(left: Signature, right: Signature) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen (Anteil gleicher Positionen)."""
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+class MinHashIndex:
+    """
+    LSH-Index über MinHash-Signaturen, inkrementell pflegbar und als JSON-Datei speicherbar.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                 threshold: float = DEFAULT_DUPLICATE_THRESHOLD):
+        """
+        :param num_perm: Länge der Signaturen (Vielfaches von ``bands``)
+        :param bands: Anzahl der LSH-Bänder; mehr Bänder finden auch weniger ähnliche Kandidaten
+        :param threshold: Mindestähnlichkeit, ab der ein Kandidat als Duplikat gilt
+        :raises ValueError: Wenn ``num_perm`` nicht durch ``bands`` teilbar ist.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm muss ein Vielfaches von bands sein.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._signatures: Dict[int, Signature] = {}
+        self._buckets: List[Dict[Signature, Set[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: Signature) -> Iterable[Tuple[int, Signature]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def signature(self, text: str) -> Optional[Signature]:
+        return minhash_signature(text, self.num_perm)
+
+    def add_document(self, doc_id: int, text: str) -> None:
+        """Nimmt einen Prompt auf bzw. ersetzt seine bisherige Signatur."""
+        self.remove_document(doc_id)
+        signature = self.signature(text)
+        if signature is not None:
+            self._add_signature(doc_id, signature)
+
+    def remove_document(self, doc_id: int) -> None:
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for band, key in self._band_keys(signature):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+    def _add_signature(self, doc_id: int, signature: Signature) -> None:
+        self._signatures[doc_id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+
+    def save(self, path: str, fingerprint: List[int]) -> None:
+        """
+        Schreibt die Signaturen zusammen mit dem Fingerabdruck der Datenbank.
+
+        :param path: Zielpfad der Indexdatei
+        :param fingerprint: Stand der Datenbank beim Speichern
+        """
+        pack = struct.Struct(f"<{self.num_perm}I").pack
+        data = {
+            "version": self.FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "signatures": {str(doc_id): base64.b64encode(pack(*signature)).decode("ascii")
+                           for doc_id, signature in self._signatures.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: List[int], num_perm: int = DEFAULT_NUM_PERM,
+             bands: int = DEFAULT_BANDS, threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> Optional["MinHashIndex"]:
+        """
+        Lädt gespeicherte Signaturen, sofern sie zum aktuellen Stand der Datenbank passen.
+
+        :param path: Pfad der Indexdatei
+        :param fingerprint: Aktueller Fingerabdruck der Datenbank
+        :param num_perm: Erwartete Signaturlänge
+        :param bands: Erwartete Anzahl der LSH-Bänder
+        :param threshold: Mindestähnlichkeit des geladenen Index
+        :return: Index oder None, wenn die Datei fehlt, veraltet ist oder andere Parameter nutzt
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (data.get("version") != cls.FORMAT_VERSION or data.get("fingerprint") != fingerprint
+                or data.get("num_perm") != num_perm or data.get("bands") != bands):
+            return None
+
+        index = cls(num_perm, bands, threshold)
+        unpack = struct.Struct(f"<{num_perm}I").unpack
+        try:
+            for key, encoded in data.get("signatures", {}).items():
+                index._add_signature(int(key), unpack(base64.b64decode(encoded)))
+        except (ValueError, struct.error):
+            return None
+        return index
+
+    def query(self, text: str, threshold: Optional[float] = None, exclude: Optional[int] = None,
+              limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Sucht wahrscheinliche Duplikate eines Textes.
+
+        :param text: Zu prüfender Text
+        :param threshold: Mindestähnlichkeit (Standard: ``self.threshold``)
+        :param exclude: Diese Dokument-ID ignorieren (z. B. den Prompt selbst)
+        :param limit: Höchstens so viele Treffer
+        :return: (Dokument-ID, geschätzte Ähnlichkeit), ähnlichste zuerst
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        candidates: Set[int] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(exclude)
+        matches = []
+        for doc_id in candidates:
+            similarity = estimate_similarity(signature, self._signatures[doc_id])
+            if similarity >= threshold:
+                matches.append((doc_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit] if limit is not None else matches
+
+    def clusters(self, threshold: Optional[float] = None) -> List[List[int]]:
+        """
+        Gruppiert alle Prompts in Duplikat-Cluster (ein Durchlauf über die LSH-Buckets).
+
+        Innerhalb eines Buckets wird jedes Mitglied mit dem kleinsten Mitglied
+        verglichen; ähnliche Paare werden per Union-Find zusammengeführt.
+
+        :param threshold: Mindestähnlichkeit (Standard: ``self.threshold``)
+        :return: Cluster mit mindestens zwei Dokument-IDs, aufsteigend sortiert
+        """
+        threshold = self.threshold if threshold is None else threshold
+        parent: Dict[int, int] = {}
+
+        def find(doc_id: int) -> int:
+            root = doc_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while doc_id != root:
+                parent[doc_id], doc_id = root, parent.get(doc_id, doc_id)
+            return root
+
+        for buckets in self._buckets:
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                ordered = sorted(members)
+                representative = ordered[0]
+                for doc_id in ordered[1:]:
+                    left, right = find(representative), find(doc_id)
+                    if left == right:
+                        continue
+                    similarity = estimate_similarity(self._signatures[representative], self._signatures[doc_id])
+                    if similarity >= threshold:
+                        parent[max(left, right)] = min(left, right)
+
+        groups: Dict[int, List[int]] = {}
+        for doc_id in parent:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+        for root, members in groups.items():
+            if root not in members:
+                members.append(root)
+        return sorted((sorted(members) for members in groups.values() if len(members) > 1),
+                      key=lambda cluster: cluster[0])
@@ -5,34 +5,340 @@ Diese Klasse kapselt alle Interaktionen mit der Datenbank (TinyDB) und stellt
 Methoden zum Einfügen, Suchen, Aktualisieren und Löschen von Prompts bereit.
 """
 
+import functools
+import os
+import threading
+import time
 from tinydb import TinyDB, Query
+from tinydb.storages import JSONStorage, Storage
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Dict, Set, Tuple, Type
+from models.field_index import FieldIndex
+from models.journal_storage import journal_path_for
+from models.minhash_index import MinHashIndex
+from models.prompt_record import Prompt
+from models.similarity_index import DEFAULT_SIMILAR_LIMIT, SIMILARITY_FIELDS, SimilarityIndex, similarity_text
+from models.search_index import InvertedIndex, select_top_k
+from models.trigram_index import TrigramIndex
+from utils.file_lock import FileLock
+from utils.instrumentation import instrument_methods, record_bytes, record_rows
 from utils.logger import configure_logger
 logger = configure_logger(__name__)
 
+SEARCH_MODE_KEYWORD = "keyword"
+SEARCH_MODE_SUBSTRING = "substring"
+SEARCH_MODE_FUZZY = "fuzzy"
+SEARCH_MODES = (SEARCH_MODE_KEYWORD, SEARCH_MODE_SUBSTRING, SEARCH_MODE_FUZZY)
+# Felder der Stichwortsuche mit ihrem BM25F-Gewicht
+TEXT_FIELD_WEIGHTS = {"title": 3.0, "purpose": 2.0, "prompt": 1.0, "notes": 0.5}
+TEXT_INDEX_FIELDS = tuple(TEXT_FIELD_WEIGHTS)
+FUZZY_INDEX_FIELDS = ("title", "prompt", "purpose", "notes")
+FIELD_INDEX_FIELDS = ("category", "tags", "platform", "language", "purpose")
+SORT_RELEVANCE = "relevance"
+SORT_FIELDS = ("doc_id", "title", "category", "last_modified", SORT_RELEVANCE)
+LOCK_SUFFIX = ".lock"
+# Mindestabstand in Sekunden, in dem geänderte Indizes nach Schreibvorgängen gespeichert werden.
+INDEX_SAVE_INTERVAL = 30.0
 
+
+class QueryResult(NamedTuple):
+    """Ergebnis von ``query_prompts``: angeforderte Seite und Gesamtzahl der Treffer."""
+    items: List[Prompt]
+    total: int
+
+
+class RevisionConflictError(ValueError):
+    """Ein Update beruht auf einer veralteten Revision des Prompts."""
+
+    def __init__(self, doc_id: int, expected: int, actual: int):
+        self.doc_id = doc_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"Prompt {doc_id} wurde inzwischen geändert "
+                         f"(erwartet Revision {expected}, aktuell {actual}). Bitte neu laden.")
+
+
+def synchronized(method):
+    """
+    Serialisiert Methodenaufrufe über ``self._lock`` (geteilte Instanz über mehrere Threads)
+    und hält währenddessen die gemeinsame Dateisperre (andere Prozesse dürfen parallel lesen).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self._file_lock.shared():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def synchronized_write(method):
+    """Wie ``synchronized``, aber mit exklusiver Dateisperre für Schreibvorgänge."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self._file_lock.exclusive():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@instrument_methods
 class PromptRepository:
     """
     Repository-Klasse für die Verwaltung von AI-Prompts in einer TinyDB-Datenbank.
+
+    Eine Instanz darf von mehreren Threads (z. B. Streamlit-Sessions) gemeinsam
+    genutzt werden; öffentliche Methoden sind über eine Sperre serialisiert.
+    Mehrere Prozesse koordinieren sich über ``<db_path>.lock``: Lesezugriffe
+    halten die Sperre gemeinsam, Schreibzugriffe exklusiv. Jeder Prompt trägt
+    eine Revision, die bei jedem Update um eins steigt.
     """
 
-    def __init__(self, db_path: str = "database.json"):
+    def __init__(self, db_path: str = "database.json",
+                 storage: Optional[Type[Storage]] = None, **storage_options):
         """
         Initialisiert die Datenbankverbindung.
 
+        Der Volltextindex wird aus ``<db_path>.index.json`` geladen, sofern er
+        zum aktuellen Stand der Datenbankdatei passt, und sonst neu aufgebaut
+        und sofort gespeichert. Nach Schreibvorgängen wird er höchstens alle
+        ``INDEX_SAVE_INTERVAL`` Sekunden sowie beim Schließen gespeichert.
+        Die Sekundärindizes für kategoriale Felder werden beim Start erzeugt,
+        der Trigramm-Index für die unscharfe Suche bei der ersten unscharfen
+        Suche. Liefert die Storage die Prompt-Texte verzögert (``BodyStorage``),
+        liest der Start damit keinen Prompt-Text, sofern der Volltextindex
+        geladen werden kann.
+
         :param db_path: Pfad zur JSON-Datenbankdatei.
+        :param storage: (Optional) TinyDB-Storage-Klasse, z. B. ``JournalStorage``.
+        :param storage_options: Weitere Argumente für die Storage-Klasse.
         """
-        self.db = TinyDB(db_path)
+        self._lock = threading.RLock()
+        self._data_version = 0
+        self.db_path = db_path
+        self.db = TinyDB(db_path, storage=storage or JSONStorage, **storage_options)
+        # Storages mit eigener Dateisperre (JournalStorage) teilen sie mit dem Repository.
+        self._file_lock = getattr(self.db.storage, "file_lock", None) or FileLock(db_path + LOCK_SUFFIX)
+        # Storages mit getrennt abgelegten Texten liefern Verweise statt Strings (siehe _to_prompt).
+        self._lazy_body = getattr(self.db.storage, "lazy_body", None)
         self.query = Query()
+        self.index_path = os.path.splitext(db_path)[0] + ".index.json"
+        self.similarity_path = os.path.splitext(db_path)[0] + ".similar.json"
+        self.minhash_path = os.path.splitext(db_path)[0] + ".minhash.json"
+        self._fingerprint = self._file_fingerprint()
+        weights = tuple(TEXT_FIELD_WEIGHTS.values())
+        loaded_index = InvertedIndex.load(self.index_path, self._fingerprint, weights)
+        self._text_index = loaded_index or InvertedIndex(weights)
+        # Trigramm-Index wird erst bei der ersten unscharfen Suche aufgebaut.
+        self._fuzzy_index: Optional[TrigramIndex] = None
+        # Duplikat-Index: bei der ersten Duplikatprüfung geladen bzw. aufgebaut.
+        self._minhash_index: Optional[MinHashIndex] = None
+        # TF-IDF-Index für "ähnliche Prompts": bei der ersten Abfrage geladen bzw. aufgebaut.
+        self._similarity_index: Optional[SimilarityIndex] = None
+        self._field_indexes = {
+            field: FieldIndex(field, multi_valued=(field == "tags"))
+            for field in FIELD_INDEX_FIELDS
+        }
+        self._all_doc_ids: Set[int] = set()
+        self._indexes_dirty = False
+        self._indexes_saved_at = time.monotonic()
+        with self._file_lock.shared():
+            self._rebuild_indexes(include_text=loaded_index is None)
+            if loaded_index is None:
+                self._save_indexes()
+            else:
+                self._indexes_dirty = False
 
+    @synchronized
     def close(self):
+        """Speichert geänderte Volltext- und Ähnlichkeitsindizes und schließt die Datenbank."""
         self.db.close()
+        if self._indexes_dirty and self._fingerprint == self._file_fingerprint():
+            self._save_indexes()
+
+    @synchronized_write
+    def checkpoint(self) -> None:
+        """
+        Bringt die Datenbankdatei auf den aktuellen Stand.
+
+        Bei einer Journal-Storage wird das Journal in die Datei kompaktiert,
+        z. B. vor einem Backup. Für die Standard-Storage ist dies ein No-op.
+        """
+        compact = getattr(self.db.storage, "compact", None)
+        if compact is not None:
+            compact(wait=True)
+            self._fingerprint = self._file_fingerprint()
+
+    @synchronized
+    def get_data_version(self) -> int:
+        """
+        Monoton steigende Datenversion dieser Instanz.
+
+        Erhöht sich bei jedem Schreibvorgang und wenn eine externe Änderung der
+        Datenbankdatei erkannt wird. Abgeleitete Ergebnisse können daran gebunden
+        und nur bei einer neuen Version neu berechnet werden.
+
+        :return: Aktuelle Datenversion.
+        """
+        self._ensure_indexes_current()
+        return self._data_version
+
+    # === Indexverwaltung ===
+
+    def _file_fingerprint(self) -> List[int]:
+        fingerprint = []
+        for path in (self.db_path, journal_path_for(self.db_path)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                fingerprint.extend((0, 0))
+                continue
+            fingerprint.extend((stat.st_size, stat.st_mtime_ns))
+        return fingerprint
 
+    def _rebuild_indexes(self, include_text: bool = True) -> None:
+        logger.debug("Suchindizes werden neu aufgebaut")
+        if include_text:
+            self._text_index.clear()
+        self._fuzzy_index = None
+        for index in self._field_indexes.values():
+            index.clear()
+        self._all_doc_ids.clear()
+        self._minhash_index = None
+        self._similarity_index = None
+        # Ein anderer Prozess kann Dokumente eingefügt haben: TinyDB-Caches (nächste ID, Abfragen) verwerfen.
+        self.db.table(self.db.default_table_name)._next_id = None
+        self.db.clear_cache()
+        documents = self.db.all()
+        record_rows(len(documents))
+        for doc in documents:
+            self._index_document(doc.doc_id, doc, include_text=include_text)
+        self._fingerprint = self._file_fingerprint()
+        self._data_version += 1
+        self._indexes_dirty = True
+
+    def _ensure_indexes_current(self) -> None:
+        """Baut die Indizes neu auf, falls die Datei extern verändert wurde."""
+        fingerprint = self._file_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        # Eine Storage mit eigenem Änderungsprotokoll (JournalStorage) kann bestätigen,
+        # dass die Dateien nur durch diese Instanz verändert wurden, z. B. beim Kompaktieren.
+        has_external_changes = getattr(self.db.storage, "has_external_changes", None)
+        if has_external_changes is not None and not has_external_changes():
+            self._fingerprint = fingerprint
+            return
+        self._rebuild_indexes()
+
+    def _mark_written(self) -> None:
+        previous = self._fingerprint
+        self._fingerprint = self._file_fingerprint()
+        self._data_version += 1
+        # Fingerabdruck: [Dateigröße, mtime, Journalgröße, Journal-mtime]. Eine geänderte
+        # Datei wurde vollständig neu geschrieben, das Journal nur um den Zuwachs ergänzt.
+        rewritten = self._fingerprint[0] if self._fingerprint[1] != previous[1] else 0
+        record_bytes(rewritten + max(0, self._fingerprint[2] - previous[2]))
+        self._indexes_dirty = True
+        if time.monotonic() - self._indexes_saved_at >= INDEX_SAVE_INTERVAL:
+            self._save_indexes()
+
+    def _save_indexes(self) -> None:
+        """Speichert die Indizes zum aktuellen Fingerabdruck; Fehler verhindern nur das Speichern."""
+        try:
+            self._text_index.save(self.index_path, self._fingerprint)
+            if self._similarity_index is not None:
+                self._similarity_index.save(self.similarity_path, self._fingerprint)
+            if self._minhash_index is not None:
+                self._minhash_index.save(self.minhash_path, self._fingerprint)
+        except OSError as error:
+            logger.warning("Suchindex konnte nicht gespeichert werden: %s", error)
+            return
+        self._indexes_dirty = False
+        self._indexes_saved_at = time.monotonic()
+
+    def _index_document(self, doc_id: int, doc: Dict, include_text: bool = True,
+                        include_fuzzy: bool = True, include_minhash: bool = True,
+                        include_similarity: bool = True) -> None:
+        if self._lazy_body is not None and not isinstance(doc, Prompt):
+            doc = self._to_prompt(doc, doc_id)
+        if include_minhash and self._minhash_index is not None:
+            self._minhash_index.add_document(doc_id, doc.get("prompt", "") or "")
+        if include_similarity and self._similarity_index is not None:
+            self._similarity_index.add_document(doc_id, similarity_text(doc))
+        if include_text:
+            self._text_index.add_document(doc_id, (doc.get(field, "") or "" for field in TEXT_INDEX_FIELDS))
+        if include_fuzzy and self._fuzzy_index is not None:
+            self._fuzzy_index.add_document(doc_id, (doc.get(field, "") or "" for field in FUZZY_INDEX_FIELDS))
+        for index in self._field_indexes.values():
+            index.add_document(doc_id, doc)
+        self._all_doc_ids.add(doc_id)
+
+    def _unindex_document(self, doc_id: int) -> None:
+        self._text_index.remove_document(doc_id)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove_document(doc_id)
+        if self._minhash_index is not None:
+            self._minhash_index.remove_document(doc_id)
+        if self._similarity_index is not None:
+            self._similarity_index.remove_document(doc_id)
+        for index in self._field_indexes.values():
+            index.remove_document(doc_id)
+        self._all_doc_ids.discard(doc_id)
+
+    def _to_prompt(self, doc: Dict, doc_id: Optional[int] = None) -> Prompt:
+        """Wandelt ein gelesenes Dokument in einen ``Prompt`` um; Texte ggf. als verzögert gelesene Verweise."""
+        return Prompt.from_document(doc, doc_id, self._lazy_body)
+
+    def _ensure_fuzzy_index(self) -> TrigramIndex:
+        if self._fuzzy_index is None:
+            index = TrigramIndex()
+            documents = self.db.all()
+            record_rows(len(documents))
+            for doc in map(self._to_prompt, documents):
+                index.add_document(doc.doc_id, (doc.get(field, "") or "" for field in FUZZY_INDEX_FIELDS))
+            self._fuzzy_index = index
+        return self._fuzzy_index
+
+    def _ensure_minhash_index(self) -> MinHashIndex:
+        self._ensure_indexes_current()
+        if self._minhash_index is None:
+            index = MinHashIndex.load(self.minhash_path, self._fingerprint)
+            if index is None:
+                index = MinHashIndex()
+                documents = self.db.all()
+                record_rows(len(documents))
+                for doc in map(self._to_prompt, documents):
+                    index.add_document(doc.doc_id, doc.get("prompt", "") or "")
+                index.save(self.minhash_path, self._fingerprint)
+            self._minhash_index = index
+        return self._minhash_index
+
+    def _ensure_similarity_index(self) -> SimilarityIndex:
+        self._ensure_indexes_current()
+        if self._similarity_index is None:
+            index = SimilarityIndex.load(self.similarity_path, self._fingerprint)
+            if index is None:
+                index = SimilarityIndex()
+                documents = self.db.all()
+                record_rows(len(documents))
+                for doc in map(self._to_prompt, documents):
+                    index.add_document(doc.doc_id, similarity_text(doc))
+                index.save(self.similarity_path, self._fingerprint)
+            self._similarity_index = index
+        return self._similarity_index
+
+    def _get_documents(self, doc_ids: Iterable[int], reverse: bool = False) -> List[Prompt]:
+        """Lädt gezielt die angegebenen Dokumente als ``Prompt``, sortiert nach Dokument-ID."""
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return []
+        documents = self.db.get(doc_ids=doc_ids) or []
+        record_rows(len(documents))
+        return sorted(map(self._to_prompt, documents), key=lambda doc: doc.doc_id, reverse=reverse)
+
+    @synchronized_write
     def add_prompt(self, title: str, category: str, platform: str,
                tags: List[str], prompt_text: str,
                language: str = "", purpose: str = "", notes: str = "") -> int:
-        return self.db.insert({
+        self._ensure_indexes_current()
+        document = {
             "title": title,
             "category": category,
             "platform": platform,
@@ -41,53 +347,283 @@ class PromptRepository:
             "language": language,
             "purpose": purpose,
             "notes": notes,
-            "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
+            "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": 1,
+        }
+        doc_id = self.db.insert(document)
+        self._index_document(doc_id, document)
+        self._mark_written()
+        return doc_id
+
+    @synchronized_write
+    def add_prompts(self, records: Iterable[Dict]) -> List[int]:
+        """
+        Fügt mehrere Prompts mit einem einzigen Schreibvorgang ein.
+
+        :param records: Prompt-Dictionaries mit den Feldern title, category, platform,
+                        tags, prompt, language, purpose und notes.
+        :return: Dokument-IDs in Eingabereihenfolge.
+        """
+        self._ensure_indexes_current()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        documents = [
+            {
+                "title": record.get("title", ""),
+                "category": record.get("category", ""),
+                "platform": record.get("platform", ""),
+                "tags": list(record.get("tags") or []),
+                "prompt": record.get("prompt", ""),
+                "language": record.get("language", ""),
+                "purpose": record.get("purpose", ""),
+                "notes": record.get("notes", ""),
+                "last_modified": timestamp,
+                "revision": 1,
+            }
+            for record in records
+        ]
+        if not documents:
+            return []
+        doc_ids = self.db.insert_multiple(documents)
+        for doc_id, document in zip(doc_ids, documents):
+            self._index_document(doc_id, document)
+        self._mark_written()
+        return doc_ids
 
-    def get_all_prompts(self) -> List[Dict]:
+    @synchronized
+    def get_all_prompts(self) -> List[Prompt]:
         """
         Gibt alle gespeicherten Prompts zurück.
 
         :return: Liste aller Prompt-Datensätze.
         """
-        return self.db.all()
+        documents = self.db.all()
+        record_rows(len(documents))
+        return [self._to_prompt(doc) for doc in documents]
+
+    @synchronized
+    def get_prompt(self, doc_id: int) -> Optional[Prompt]:
+        """
+        Lädt einen einzelnen Prompt.
+
+        :param doc_id: Dokument-ID.
+        :return: Prompt-Datensatz oder None, wenn die ID unbekannt ist.
+        """
+        documents = self._get_documents([doc_id])
+        return documents[0] if documents else None
+
+    @synchronized
+    def get_prompts(self, doc_ids: Iterable[int]) -> List[Prompt]:
+        """
+        Lädt mehrere Prompts mit einem Lesezugriff.
+
+        :param doc_ids: Dokument-IDs.
+        :return: Gefundene Prompts in der Reihenfolge von ``doc_ids``; unbekannte IDs fehlen.
+        """
+        doc_ids = list(doc_ids)
+        documents = {doc.doc_id: doc for doc in self._get_documents(set(doc_ids))}
+        return [documents[doc_id] for doc_id in doc_ids if doc_id in documents]
+
+    def iter_prompts(self) -> Iterator[Prompt]:
+        """
+        Iteriert über alle Prompts, ohne eine Ergebnisliste aufzubauen.
+
+        :return: Iterator über alle Prompt-Datensätze.
+        """
+        with self._lock, self._file_lock.shared():
+            self._ensure_indexes_current()
+            tables = self.db.storage.read() or {}
+        # Die gelesenen Rohdaten gehören nur diesem Aufruf und werden außerhalb der Sperre durchlaufen.
+        table = tables.get(self.db.name, {})
+        record_rows(len(table))
+        return (self._to_prompt(doc, int(doc_id)) for doc_id, doc in table.items())
 
     def search_prompts(self, keyword: str = "", category: Optional[str] = None,
-                       tags: Optional[List[str]] = None) -> List[Dict]:
+                       tags: Optional[List[str]] = None,
+                       mode: str = SEARCH_MODE_KEYWORD, limit: Optional[int] = None) -> List[Prompt]:
         """
         Durchsucht die Datenbank nach Prompts anhand von Stichwort, Kategorie und Tags.
 
+        Im Modus ``"keyword"`` wird der Volltextindex genutzt: Jedes Wort der
+        Anfrage muss als Wortanfang in Titel, Zweck, Prompt-Text oder Notizen
+        vorkommen; die Treffer sind nach BM25-Relevanz sortiert.
+        Der Modus ``"substring"`` durchsucht wie bisher alle Texte nach
+        beliebigen Teilzeichenketten. Der Modus ``"fuzzy"`` toleriert Tippfehler
+        (Trigramm-Ähnlichkeit über Titel, Prompt-Text, Zweck und Notizen) und
+        liefert die Treffer nach Ähnlichkeit sortiert.
+
         :param keyword: Suchbegriff im Titel oder Prompt-Text.
         :param category: (Optional) Kategorie-Filter.
         :param tags: (Optional) Liste von Tags zur Filterung.
+        :param mode: Suchmodus ``"keyword"``, ``"substring"`` oder ``"fuzzy"``.
+        :param limit: (Optional) Nur die besten ``limit`` Treffer liefern.
         :return: Gefilterte Liste von Prompts.
+        :raises ValueError: Bei unbekanntem Suchmodus.
+        """
+        return self.query_prompts(keyword=keyword, category=category, tags=tags, mode=mode,
+                                  sort_by=SORT_RELEVANCE, limit=limit).items
+
+    @synchronized
+    def query_prompts(self, keyword: str = "", category: Optional[str] = None,
+                      tags: Optional[List[str]] = None, platform: Optional[str] = None,
+                      language: Optional[str] = None, purpose: Optional[str] = None,
+                      mode: str = SEARCH_MODE_KEYWORD, sort_by: str = "doc_id",
+                      descending: bool = False, limit: Optional[int] = None,
+                      offset: int = 0) -> QueryResult:
         """
-        results = self.db.all()
+        Kombinierte Abfrage über alle Filterfelder mit Sortierung und Seitenbildung.
+
+        Jeder Filter wird zunächst über seinen Index in eine Kandidatenmenge
+        übersetzt; die Mengen werden beginnend mit der kleinsten geschnitten.
+        Bei Sortierung nach ``doc_id`` werden nur die Dokumente der angeforderten
+        Seite geladen.
+
+        :param keyword: Suchbegriff in Titel, Zweck, Prompt-Text oder Notizen.
+        :param category: (Optional) Exakte Kategorie.
+        :param tags: (Optional) Mindestens einer dieser Tags muss vorhanden sein.
+        :param platform: (Optional) Exakte Plattform.
+        :param language: (Optional) Teilzeichenkette der Sprache (ohne Groß-/Kleinschreibung).
+        :param purpose: (Optional) Teilzeichenkette des Zwecks (ohne Groß-/Kleinschreibung).
+        :param mode: Suchmodus ``"keyword"``, ``"substring"`` oder ``"fuzzy"``.
+        :param sort_by: Eines von ``doc_id``, ``title``, ``category``, ``last_modified``
+                        oder ``relevance`` (beste Treffer zuerst, ``descending`` wird ignoriert;
+                        ohne bewertende Suche wie ``doc_id``). Die Relevanz-Auswahl nutzt einen
+                        auf ``offset + limit`` Einträge begrenzten Heap.
+        :param descending: Absteigend sortieren.
+        :param limit: (Optional) Maximale Anzahl zurückgegebener Prompts.
+        :param offset: Anzahl zu überspringender Treffer.
+        :return: QueryResult mit der angeforderten Seite und der Gesamtzahl der Treffer.
+        :raises ValueError: Bei unbekanntem Suchmodus oder Sortierfeld.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unbekannter Suchmodus: {mode}")
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unbekanntes Sortierfeld: {sort_by}")
+        self._ensure_indexes_current()
+
+        candidate_sets: List[Set[int]] = []
+        if category:
+            candidate_sets.append(self._field_indexes["category"].lookup(category))
+        if platform:
+            candidate_sets.append(self._field_indexes["platform"].lookup(platform))
+        if tags:
+            candidate_sets.append(self._field_indexes["tags"].lookup_any(tags))
+        if language:
+            candidate_sets.append(self._field_indexes["language"].lookup_containing(language))
+        if purpose:
+            candidate_sets.append(self._field_indexes["purpose"].lookup_containing(purpose))
+        if keyword and mode == SEARCH_MODE_KEYWORD:
+            candidate_sets.append(self._text_index.search(keyword))
+        fuzzy_scores: Dict[int, float] = {}
+        if keyword and mode == SEARCH_MODE_FUZZY:
+            fuzzy_scores = self._ensure_fuzzy_index().search(keyword)
+            candidate_sets.append(set(fuzzy_scores))
 
-        if keyword:
+        doc_ids = self._intersect(candidate_sets) if candidate_sets else self._all_doc_ids
+        needs_residual_filter = bool(keyword) and mode == SEARCH_MODE_SUBSTRING
+        if sort_by == SORT_RELEVANCE and not (keyword and mode in (SEARCH_MODE_KEYWORD, SEARCH_MODE_FUZZY)):
+            sort_by = "doc_id"
+
+        if sort_by == SORT_RELEVANCE:
+            k = offset + limit if limit is not None else None
+            if mode == SEARCH_MODE_FUZZY:
+                ranked = select_top_k({doc_id: fuzzy_scores[doc_id] for doc_id in doc_ids}, k)
+            else:
+                ranked = self._text_index.top_k(keyword, doc_ids, k)
+            page_ids = [doc_id for doc_id, _ in ranked[offset:]]
+            documents = {doc.doc_id: doc for doc in self._get_documents(page_ids)}
+            return QueryResult([documents[doc_id] for doc_id in page_ids], len(doc_ids))
+
+        if sort_by == "doc_id" and not needs_residual_filter:
+            ordered_ids = sorted(doc_ids, reverse=descending)
+            page_ids = ordered_ids[offset:offset + limit if limit is not None else None]
+            return QueryResult(self._get_documents(page_ids, reverse=descending), len(ordered_ids))
+
+        results = self._get_documents(doc_ids) if doc_ids else []
+        if needs_residual_filter:
             keyword_lower = keyword.lower()
             results = [p for p in results
                        if keyword_lower in p.get("title", "").lower()
                        or keyword_lower in p.get("prompt", "").lower()]
+        if sort_by == "doc_id":
+            if descending:
+                results.reverse()
+        else:
+            results.sort(key=lambda p: (str(p.get(sort_by, "")).lower(), p.doc_id), reverse=descending)
+        page = results[offset:offset + limit if limit is not None else None]
+        return QueryResult(page, len(results))
 
-        if category:
-            results = [p for p in results if p.get("category") == category]
-
-        if tags:
-            results = [p for p in results if any(tag in p.get("tags", []) for tag in tags)]
-
-        return results
+    @staticmethod
+    def _intersect(candidate_sets: List[Set[int]]) -> Set[int]:
+        """Schneidet ID-Mengen, beginnend mit der kleinsten."""
+        ordered = sorted(candidate_sets, key=len)
+        result = set(ordered[0])
+        for candidates in ordered[1:]:
+            if not result:
+                break
+            result &= candidates
+        return result
 
-    def update_prompt(self, doc_id: int, updated_data: Dict) -> None:
+    def update_prompt(self, doc_id: int, updated_data: Dict, expected_revision: Optional[int] = None) -> None:
         """
         Aktualisiert einen bestehenden Prompt.
 
         :param doc_id: ID des zu aktualisierenden Prompts.
         :param updated_data: Wörterbuch mit zu aktualisierenden Feldern.
+        :param expected_revision: (Optional) Revision, auf der die Änderung beruht.
+        :raises RevisionConflictError: Wenn der Prompt inzwischen eine andere Revision hat.
         """
-        updated_data["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         logger.debug("Aktualisierte Daten: %s", updated_data)
-        self.db.update(updated_data, doc_ids=[doc_id])
+        expected = None if expected_revision is None else {doc_id: expected_revision}
+        self.update_prompts({doc_id: updated_data}, expected)
+
+    @synchronized_write
+    def update_prompts(self, updates: Dict[int, Dict],
+                       expected_revisions: Optional[Dict[int, int]] = None) -> List[int]:
+        """
+        Aktualisiert mehrere Prompts mit einem einzigen Schreibvorgang.
+
+        Unbekannte IDs werden wie bei TinyDB übersprungen. Die Revision jedes
+        geänderten Prompts steigt um eins. Prüfung und Schreiben erfolgen unter
+        der exklusiven Dateisperre, sodass kein anderer Prozess dazwischen schreibt.
+
+        :param updates: Zuordnung Dokument-ID → zu aktualisierende Felder.
+        :param expected_revisions: (Optional) Zuordnung Dokument-ID → erwartete Revision.
+        :return: IDs der tatsächlich aktualisierten Prompts.
+        :raises RevisionConflictError: Bei einer veralteten Revision; dann wird nichts geändert.
+        """
+        self._ensure_indexes_current()
+        existing = self._get_documents(updates)
+        for document in existing:
+            expected = (expected_revisions or {}).get(document.doc_id)
+            if expected is not None and document.get("revision", 1) != expected:
+                raise RevisionConflictError(document.doc_id, expected, document.get("revision", 1))
+        existing_ids = [doc.doc_id for doc in existing]
+        if not existing_ids:
+            return []
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for updated_data in updates.values():
+            updated_data["last_modified"] = timestamp
+        # TinyDB ruft die Update-Funktion in der Reihenfolge der übergebenen IDs auf.
+        pending = iter([updates[doc_id] for doc_id in existing_ids])
+
+        def apply(doc):
+            doc.update(next(pending))
+            doc["revision"] = doc.get("revision", 1) + 1
+
+        updated_ids = self.db.update(apply, doc_ids=existing_ids)
+
+        indexed_fields = set(TEXT_INDEX_FIELDS + FUZZY_INDEX_FIELDS + FIELD_INDEX_FIELDS)
+        reindex_ids = [doc_id for doc_id in updated_ids if indexed_fields.intersection(updates[doc_id])]
+        for document in self._get_documents(reindex_ids):
+            changed = updates[document.doc_id]
+            self._index_document(document.doc_id, document,
+                                 include_text=any(field in changed for field in TEXT_INDEX_FIELDS),
+                                 include_fuzzy=any(field in changed for field in FUZZY_INDEX_FIELDS),
+                                 include_minhash="prompt" in changed,
+                                 include_similarity=any(field in changed for field in (*SIMILARITY_FIELDS, "tags")))
+        self._mark_written()
+        return updated_ids
 
     def delete_prompt(self, doc_id: int) -> None:
         """
@@ -96,31 +632,93 @@ class PromptRepository:
         :param doc_id: ID des zu löschenden Prompts.
         """
         logger.debug("Prompt geloescht (ID): %d", doc_id)
-        self.db.remove(doc_ids=[doc_id])
+        self.delete_prompts([doc_id])
+
+    @synchronized_write
+    def delete_prompts(self, doc_ids: Iterable[int]) -> List[int]:
+        """
+        Entfernt mehrere Prompts mit einem einzigen Schreibvorgang.
+
+        :param doc_ids: IDs der zu löschenden Prompts.
+        :return: IDs der tatsächlich gelöschten Prompts.
+        """
+        self._ensure_indexes_current()
+        removed_ids = self.db.remove(doc_ids=list(doc_ids))
+        for doc_id in removed_ids:
+            self._unindex_document(doc_id)
+        self._mark_written()
+        return removed_ids
+
+    @synchronized
+    def find_near_duplicates(self, prompt_text: str, threshold: Optional[float] = None,
+                             exclude_id: Optional[int] = None, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Sucht Prompts, deren Text nahezu identisch ist (MinHash/LSH, ohne Vergleich mit allen Prompts).
+
+        :param prompt_text: Zu prüfender Prompt-Text.
+        :param threshold: (Optional) Mindestähnlichkeit, Standard 0.6.
+        :param exclude_id: (Optional) Diesen Prompt nicht melden, z. B. den geprüften selbst.
+        :param limit: (Optional) Höchstens so viele Treffer.
+        :return: (Dokument-ID, geschätzte Ähnlichkeit), ähnlichste zuerst.
+        """
+        return self._ensure_minhash_index().query(prompt_text, threshold, exclude_id, limit)
 
+    @synchronized
+    def find_duplicate_clusters(self, threshold: Optional[float] = None) -> List[List[int]]:
+        """
+        Gruppiert alle Prompts mit nahezu identischem Text in einem Durchlauf.
+
+        :param threshold: (Optional) Mindestähnlichkeit, Standard 0.6.
+        :return: Cluster aus mindestens zwei Dokument-IDs.
+        """
+        return self._ensure_minhash_index().clusters(threshold)
+
+    @synchronized
+    def find_similar_prompts(self, doc_ids: Iterable[int],
+                             limit: int = DEFAULT_SIMILAR_LIMIT) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Sucht zu mehreren Prompts die inhaltlich ähnlichsten (TF-IDF, Kosinus-Ähnlichkeit).
+
+        :param doc_ids: IDs der Prompts, z. B. der aufgeklappten Einträge einer Seite.
+        :param limit: Anzahl der ähnlichen Prompts je Eintrag.
+        :return: Zuordnung ID → [(ähnliche ID, Ähnlichkeit)], ähnlichste zuerst; unbekannte IDs fehlen.
+        """
+        return self._ensure_similarity_index().most_similar(doc_ids, limit)
+
+    @synchronized
     def get_all_categories(self) -> List[str]:
         """
         Gibt eine alphabetisch sortierte Liste aller eindeutigen Kategorien zurück.
 
         :return: Liste der Kategorien.
         """
-        prompts = self.db.all()
+        self._ensure_indexes_current()
         logger.debug("Liste Aller Kategorien ermittelt")
-        return sorted(set(p.get("category", "") for p in prompts if p.get("category")))
+        return self._field_indexes["category"].values()
 
+    @synchronized
     def get_all_tags(self) -> List[str]:
         """
         Gibt eine alphabetisch sortierte Liste aller verwendeten Tags zurück.
 
         :return: Liste der Tags.
         """
-        prompts = self.db.all()
-        all_tags = []
-        for p in prompts:
-            tags = p.get("tags", [])
-            if isinstance(tags, list):
-                all_tags.extend(tags)
-        return sorted(set(all_tags))
+        self._ensure_indexes_current()
+        return self._field_indexes["tags"].values()
+
+    @synchronized
+    def get_distinct_values(self, field: str) -> List[str]:
+        """
+        Gibt die sortierten eindeutigen Werte eines indizierten Feldes zurück.
+
+        :param field: Eines der Felder category, tags, platform, language, purpose.
+        :return: Liste der Werte.
+        :raises ValueError: Wenn das Feld nicht indiziert ist.
+        """
+        if field not in self._field_indexes:
+            raise ValueError(f"Feld ist nicht indiziert: {field}")
+        self._ensure_indexes_current()
+        return self._field_indexes[field].values()
 
 
 
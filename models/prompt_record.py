@@ -0,0 +1,145 @@
+"""
+Prompt – kompakter, unveränderlicher Datensatz für gelesene Prompts.
+
+Die Repositories geben Prompts als ``Prompt`` statt als TinyDB-``Document``
+zurück. Ein ``Prompt`` speichert seine Felder in ``__slots__`` (kein
+``__dict__`` je Objekt), hält Tags als Tupel und verwendet für kategoriale
+Werte (Kategorie, Plattform, Sprache, Zweck, Tags) internierte Strings: Bei
+einer großen Bibliothek teilen sich alle Datensätze z. B. eine einzige
+"Marketing"-Zeichenkette statt je einer eigenen Kopie aus dem JSON-Parser.
+Freitextfelder werden ohne Kopie übernommen.
+
+Die Textfelder ``prompt`` und ``notes`` (``BODY_FIELDS``) dürfen statt eines
+Strings einen Verweis mit ``load()``-Methode enthalten, z. B. ``LazyText`` aus
+``models.body_storage``. Er wird erst beim ersten Zugriff auf das Feld gelesen
+und danach im Datensatz gehalten; Listen, Filter und Sortierungen über die
+übrigen Felder lesen die Texte nie.
+
+Für bestehenden Code verhält sich ein ``Prompt`` wie ein schreibgeschütztes
+Dictionary (``prompt["title"]``, ``prompt.get("notes", "-")``, ``dict(prompt)``)
+und trägt wie ein ``Document`` die ``doc_id``.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+PROMPT_FIELDS = ("title", "category", "platform", "tags", "prompt", "language", "purpose", "notes",
+                 "last_modified", "revision")
+INTERNED_FIELDS = ("category", "platform", "language", "purpose")
+BODY_FIELDS = ("prompt", "notes")
+
+_FIELD_SET = frozenset(PROMPT_FIELDS)
+
+
+def _intern(value: Any) -> str:
+    return sys.intern(value) if isinstance(value, str) else ("" if value is None else str(value))
+
+
+class Prompt(Mapping):
+    """
+    Unveränderlicher Prompt-Datensatz mit ``doc_id``.
+    """
+
+    __slots__ = ("doc_id",) + tuple("_" + field if field in BODY_FIELDS else field for field in PROMPT_FIELDS)
+
+    def __init__(self, doc_id: int, title: str = "", category: str = "", platform: str = "",
+                 tags: Tuple[str, ...] = (), prompt: str = "", language: str = "", purpose: str = "",
+                 notes: str = "", last_modified: str = "", revision: int = 1):
+        """
+        Legt einen Datensatz an, ohne Werte zu kopieren oder zu internieren (siehe ``from_document``).
+        """
+        set_field = object.__setattr__
+        set_field(self, "doc_id", doc_id)
+        set_field(self, "title", title)
+        set_field(self, "category", category)
+        set_field(self, "platform", platform)
+        set_field(self, "tags", tags)
+        set_field(self, "_prompt", prompt)
+        set_field(self, "language", language)
+        set_field(self, "purpose", purpose)
+        set_field(self, "_notes", notes)
+        set_field(self, "last_modified", last_modified)
+        set_field(self, "revision", revision)
+
+    @classmethod
+    def from_document(cls, doc: Dict, doc_id: Optional[int] = None,
+                      lazy_body: Optional[Callable[[Dict, str], Any]] = None) -> "Prompt":
+        """
+        Wandelt ein gelesenes Dokument (TinyDB-``Document`` oder dict) um.
+
+        Kategoriale Werte und Tags werden interniert; fehlende Felder erhalten
+        Standardwerte, unbekannte Felder werden verworfen.
+
+        :param doc: Gelesenes Dokument
+        :param doc_id: Dokument-ID (Standard: ``doc.doc_id``)
+        :param lazy_body: (Optional) Liefert zu ``(doc, field)`` den Text oder einen Verweis darauf
+        :return: Unveränderlicher Datensatz
+        """
+        get = doc.get
+        if lazy_body is not None:
+            prompt, notes = lazy_body(doc, "prompt"), lazy_body(doc, "notes")
+        else:
+            prompt, notes = get("prompt") or "", get("notes") or ""
+        return cls(
+            doc.doc_id if doc_id is None else doc_id,
+            get("title") or "",
+            _intern(get("category")),
+            _intern(get("platform")),
+            tuple(map(_intern, get("tags") or ())),
+            prompt,
+            _intern(get("language")),
+            _intern(get("purpose")),
+            notes,
+            get("last_modified") or "",
+            int(get("revision") or 1),
+        )
+
+    def _body(self, slot: str) -> str:
+        value = getattr(self, slot)
+        if not isinstance(value, str):
+            value = value.load()
+            object.__setattr__(self, slot, value)
+        return value
+
+    @property
+    def prompt(self) -> str:
+        return self._body("_prompt")
+
+    @property
+    def notes(self) -> str:
+        return self._body("_notes")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Prompt ist unveränderlich")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Prompt ist unveränderlich")
+
+    def __reduce__(self):
+        return type(self), (self.doc_id, *(getattr(self, field) for field in PROMPT_FIELDS))
+
+    # === Mapping-Schnittstelle ===
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PROMPT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PROMPT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Prompt(doc_id={self.doc_id!r}, title={self.title!r}, category={self.category!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Veränderbare Kopie der Felder (Tags als Liste), z. B. für JSON oder Formulare."""
+        data = dict(self)
+        data["tags"] = list(self.tags)
+        return data
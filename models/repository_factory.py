@@ -0,0 +1,38 @@
+"""
+Erzeugt das konfigurierte Repository (TinyDB oder SQLite).
+"""
+
+from typing import Dict, Optional
+
+from config.database_config import load_database_settings
+
+
+def create_repository(settings: Optional[Dict[str, str]] = None):
+    """
+    Erstellt eine Repository-Instanz gemäß der Datenbank-Einstellungen.
+
+    :param settings: (Optional) Einstellungen; Standard ist ``load_database_settings()``.
+    :return: PromptRepository oder SQLitePromptRepository
+    :raises ValueError: Bei unbekanntem Backend oder unbekannter Storage.
+    """
+    settings = settings or load_database_settings()
+    backend = settings.get("backend", "tinydb")
+
+    if backend == "sqlite":
+        from models.sqlite_repository import SQLitePromptRepository
+        return SQLitePromptRepository(settings["path"])
+
+    if backend == "tinydb":
+        from models.prompt_model import PromptRepository
+        storage = settings.get("storage", "json")
+        if storage == "journal":
+            from models.journal_storage import JournalStorage
+            return PromptRepository(settings["path"], storage=JournalStorage)
+        if storage == "split":
+            from models.body_storage import BodyStorage
+            return PromptRepository(settings["path"], storage=BodyStorage)
+        if storage != "json":
+            raise ValueError(f"Unbekannte TinyDB-Storage: {storage}")
+        return PromptRepository(settings["path"])
+
+    raise ValueError(f"Unbekanntes Datenbank-Backend: {backend}")
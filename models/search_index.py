@@ -0,0 +1,289 @@
+"""
+InvertedIndex – Invertierter Volltextindex für die Stichwortsuche.
+
+Jedes normalisierte Token verweist auf eine Posting-Liste (doc_id → Häufigkeit
+je Feld). Suchanfragen berühren dadurch nur die Dokumente, die tatsächlich
+passende Tokens enthalten, statt den gesamten Datenbestand zu durchlaufen.
+
+Aus den Posting-Listen und den laufend mitgeführten Feldlängen wird die
+Relevanz nach BM25F berechnet: Die Häufigkeiten der Felder werden nach
+Feldlänge normalisiert, gewichtet summiert und dann wie bei BM25 gesättigt.
+"""
+
+import heapq
+import json
+import math
+import os
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from utils.text_normalizer import tokenize
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class InvertedIndex:
+    """
+    Speicherresidenter invertierter Index mit optionaler Persistenz als JSON-Datei.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, field_weights: Sequence[float] = (1.0,)):
+        """
+        :param field_weights: Gewicht je Textfeld in der Reihenfolge von ``add_document``.
+        """
+        self.field_weights = tuple(field_weights)
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._doc_lengths: Dict[int, Tuple[int, ...]] = {}
+        self._total_lengths = [0] * len(self.field_weights)
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add_document(self, doc_id: int, texts: Iterable[str]) -> None:
+        """
+        Indiziert ein Dokument. Ein bereits indiziertes Dokument wird ersetzt.
+
+        :param doc_id: Dokument-ID
+        :param texts: Textfelder in der Reihenfolge von ``field_weights``
+        :raises ValueError: Bei mehr Textfeldern als Gewichten
+        """
+        self.remove_document(doc_id)
+        field_count = len(self.field_weights)
+        frequencies: Dict[str, List[int]] = {}
+        lengths = [0] * field_count
+        for field, text in enumerate(texts):
+            if field >= field_count:
+                raise ValueError(f"Mehr Textfelder als Feldgewichte ({field_count})")
+            for token in tokenize(text):
+                counts = frequencies.get(token)
+                if counts is None:
+                    counts = frequencies[token] = [0] * field_count
+                counts[field] += 1
+                lengths[field] += 1
+
+        for term, counts in frequencies.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._vocabulary_dirty = True
+            posting[doc_id] = tuple(counts)
+        self._doc_terms[doc_id] = set(frequencies)
+        self._set_lengths(doc_id, tuple(lengths))
+
+    def _set_lengths(self, doc_id: int, lengths: Optional[Tuple[int, ...]]) -> None:
+        previous = self._doc_lengths.pop(doc_id, None)
+        if previous is not None:
+            for field, length in enumerate(previous):
+                self._total_lengths[field] -= length
+        if lengths is None:
+            return
+        self._doc_lengths[doc_id] = lengths
+        for field, length in enumerate(lengths):
+            self._total_lengths[field] += length
+
+    def remove_document(self, doc_id: int) -> None:
+        """
+        Entfernt ein Dokument aus allen Posting-Listen.
+
+        :param doc_id: Dokument-ID
+        """
+        self._set_lengths(doc_id, None)
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+
+    def clear(self) -> None:
+        """Leert den Index vollständig."""
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_lengths = [0] * len(self.field_weights)
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def search(self, query: str) -> Set[int]:
+        """
+        Liefert alle Dokumente, die jedes Token der Anfrage enthalten.
+
+        Jedes Token der Anfrage wird als Präfix behandelt, damit Teileingaben
+        ("Schlüss") während des Tippens bereits Treffer liefern.
+
+        :param query: Suchbegriff(e)
+        :return: Menge passender Dokument-IDs
+        """
+        tokens = sorted(set(tokenize(query)))
+        if not tokens:
+            return set()
+
+        candidate_sets = [self._match_prefix(token) for token in tokens]
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            if not result:
+                break
+            result &= candidates
+        return result
+
+    def _match_prefix(self, prefix: str) -> Set[int]:
+        matches: Set[int] = set()
+        for term in self._prefix_terms(prefix):
+            matches.update(self._postings[term])
+        return matches
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        terms = []
+        position = bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary):
+            term = self._vocabulary[position]
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+            position += 1
+        return terms
+
+    # === Relevanz (BM25F) ===
+
+    def scores(self, query: str, doc_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Berechnet die BM25F-Relevanz der Anfrage für die angegebenen Dokumente.
+
+        Passen mehrere Wörter des Index auf ein Präfix der Anfrage, zählt
+        je Dokument das am besten bewertete.
+
+        :param query: Suchbegriff(e)
+        :param doc_ids: Zu bewertende Dokumente, z. B. das Ergebnis von ``search``
+        :return: Zuordnung Dokument-ID → Score (höher ist relevanter)
+        """
+        candidates = doc_ids if isinstance(doc_ids, (set, frozenset, dict)) else set(doc_ids)
+        doc_count = len(self._doc_terms)
+        if not candidates or not doc_count:
+            return {}
+        averages = [total / doc_count for total in self._total_lengths]
+        weights = [(field, weight, averages[field])
+                   for field, weight in enumerate(self.field_weights) if averages[field]]
+        totals: Dict[int, float] = dict.fromkeys(candidates, 0.0)
+
+        for token in set(tokenize(query)):
+            best: Dict[int, float] = {}
+            for term in self._prefix_terms(token):
+                posting = self._postings[term]
+                idf = math.log(1.0 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                if len(posting) <= len(candidates):
+                    matches = ((doc_id, counts) for doc_id, counts in posting.items() if doc_id in candidates)
+                else:
+                    matches = ((doc_id, posting[doc_id]) for doc_id in candidates if doc_id in posting)
+                for doc_id, counts in matches:
+                    lengths = self._doc_lengths[doc_id]
+                    tf = 0.0
+                    for field, weight, average in weights:
+                        if counts[field]:
+                            tf += weight * counts[field] / (1.0 - BM25_B + BM25_B * lengths[field] / average)
+                    score = idf * tf * (BM25_K1 + 1.0) / (BM25_K1 + tf)
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                totals[doc_id] += score
+        return totals
+
+    def top_k(self, query: str, doc_ids: Iterable[int], k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Liefert die ``k`` relevantesten Dokumente, absteigend nach Score.
+
+        Die Auswahl nutzt einen auf ``k`` Einträge begrenzten Heap; ohne ``k``
+        werden alle Dokumente sortiert.
+
+        :param query: Suchbegriff(e)
+        :param doc_ids: Zu bewertende Dokumente
+        :param k: (Optional) Anzahl gewünschter Treffer
+        :return: Liste von (Dokument-ID, Score); bei Gleichstand kleinere ID zuerst
+        """
+        return select_top_k(self.scores(query, doc_ids), k)
+
+    # === Persistenz ===
+
+    def save(self, path: str, fingerprint: List[int]) -> None:
+        """
+        Schreibt den Index zusammen mit dem Fingerabdruck der Datenbankdatei.
+
+        :param path: Zielpfad der Indexdatei
+        :param fingerprint: Größe und Änderungszeit der Datenbank beim Speichern
+        """
+        data = {
+            "version": self.FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "field_weights": list(self.field_weights),
+            "postings": {term: {str(k): list(v) for k, v in posting.items()}
+                         for term, posting in self._postings.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # json.dumps nutzt den C-Encoder, json.dump mit Datei nicht.
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: List[int],
+             field_weights: Sequence[float] = (1.0,)) -> Optional["InvertedIndex"]:
+        """
+        Lädt einen gespeicherten Index, sofern er zur aktuellen Datenbank passt.
+
+        :param path: Pfad der Indexdatei
+        :param fingerprint: Aktueller Fingerabdruck der Datenbankdatei
+        :param field_weights: Erwartete Feldgewichte; bei Abweichung wird neu aufgebaut
+        :return: Index oder None, wenn die Datei fehlt oder veraltet ist
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (data.get("version") != cls.FORMAT_VERSION or data.get("fingerprint") != fingerprint
+                or data.get("field_weights") != list(field_weights)):
+            return None
+
+        index = cls(field_weights)
+        lengths: Dict[int, List[int]] = {}
+        for term, posting in data.get("postings", {}).items():
+            converted = {int(k): tuple(v) for k, v in posting.items()}
+            index._postings[term] = converted
+            for doc_id, counts in converted.items():
+                index._doc_terms.setdefault(doc_id, set()).add(term)
+                doc_lengths = lengths.setdefault(doc_id, [0] * len(index.field_weights))
+                for field, count in enumerate(counts):
+                    doc_lengths[field] += count
+        for doc_id, doc_lengths in lengths.items():
+            index._set_lengths(doc_id, tuple(doc_lengths))
+        index._vocabulary_dirty = True
+        return index
+
+
+def select_top_k(scores: Dict[int, float], k: Optional[int] = None) -> List[Tuple[int, float]]:
+    """
+    Wählt die ``k`` besten Einträge über einen begrenzten Heap (O(n log k)).
+
+    :param scores: Zuordnung Dokument-ID → Score
+    :param k: (Optional) Anzahl gewünschter Einträge; ohne Angabe alle
+    :return: Liste von (Dokument-ID, Score), absteigend nach Score, bei Gleichstand nach ID
+    """
+    def key(item):
+        return item[1], -item[0]
+    if k is None:
+        return sorted(scores.items(), key=key, reverse=True)
+    return heapq.nlargest(k, scores.items(), key=key)
@@ -0,0 +1,214 @@
+"""
+SimilarityIndex – "Ähnliche Prompts" per TF-IDF und Kosinus-Ähnlichkeit.
+
+Jeder Prompt wird als dünn besetzter Vektor (Token → Gewicht) gespeichert,
+gewichtet mit ``(1 + log tf) * idf``. Eine Anfrage läuft über die
+Posting-Listen: Nur Dokumente, die mindestens einen der gewichtigsten Terme
+des Anfrage-Prompts enthalten, erhalten einen Score, und nur die besten
+``k`` werden per Heap ausgewählt.
+
+Die Terme der Anfrage werden nach Seltenheit abgearbeitet. Sobald
+``MAX_CANDIDATES`` Dokumente einen Score haben, erhöhen häufigere Terme nur
+noch die Scores vorhandener Kandidaten, statt neue aufzunehmen
+("Continue"-Strategie mit begrenzten Akkumulatoren). Die Kosten einer Anfrage
+bleiben damit auch bei Zehntausenden Prompts und langen Posting-Listen
+häufiger Wörter begrenzt.
+
+Die Vektornormen hängen von den idf-Werten und damit vom gesamten Bestand
+ab. Damit Schreibvorgänge nicht jedes Mal alle Normen neu berechnen, wird
+die Norm eines Dokuments beim Einfügen mit den aktuellen idf-Werten
+bestimmt und erst neu berechnet, wenn sich die Zahl der Dokumente seit der
+letzten vollständigen Berechnung um mehr als ``NORM_REFRESH_RATIO`` verändert
+hat.
+"""
+
+import heapq
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.text_normalizer import tokenize
+
+SIMILARITY_FIELDS = ("title", "purpose", "prompt")
+DEFAULT_SIMILAR_LIMIT = 5
+MAX_QUERY_TERMS = 24
+MAX_CANDIDATES = 500
+NORM_REFRESH_RATIO = 0.2
+
+
+def similarity_text(doc: Dict) -> str:
+    """Text eines Prompts, der in den Ähnlichkeitsvergleich eingeht (inkl. Tags)."""
+    parts = [doc.get(field, "") or "" for field in SIMILARITY_FIELDS]
+    parts.extend(doc.get("tags") or [])
+    return " ".join(parts)
+
+
+class SimilarityIndex:
+    """
+    TF-IDF-Index mit Top-k-Abfrage nach Kosinus-Ähnlichkeit und Persistenz als JSON-Datei.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self._term_counts: Dict[int, Dict[str, int]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._norms: Dict[int, float] = {}
+        self._norm_doc_count = 0
+
+    def __len__(self) -> int:
+        return len(self._term_counts)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._term_counts
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._term_counts)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _norm(self, doc_id: int) -> float:
+        return math.sqrt(sum((weight * self._idf(term)) ** 2
+                             for term, weight in self._weights(self._term_counts[doc_id]).items()))
+
+    @staticmethod
+    def _weights(counts: Dict[str, int]) -> Dict[str, float]:
+        return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+    def add_document(self, doc_id: int, text: str) -> None:
+        """Nimmt einen Prompt auf bzw. ersetzt seinen bisherigen Vektor."""
+        self.remove_document(doc_id)
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        self._term_counts[doc_id] = counts
+        for term, weight in self._weights(counts).items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+        self._norms[doc_id] = self._norm(doc_id)
+
+    def remove_document(self, doc_id: int) -> None:
+        counts = self._term_counts.pop(doc_id, None)
+        if counts is None:
+            return
+        self._norms.pop(doc_id, None)
+        for term in counts:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def clear(self) -> None:
+        self._term_counts.clear()
+        self._postings.clear()
+        self._norms.clear()
+        self._norm_doc_count = 0
+
+    def _refresh_norms(self) -> None:
+        """Berechnet alle Normen neu, wenn sich der Bestand seit dem letzten Mal stark verändert hat."""
+        size = len(self._term_counts)
+        if abs(size - self._norm_doc_count) <= NORM_REFRESH_RATIO * max(self._norm_doc_count, 1):
+            return
+        self._norms = {doc_id: self._norm(doc_id) for doc_id in self._term_counts}
+        self._norm_doc_count = size
+
+    def most_similar(self, doc_ids: Iterable[int], limit: int = DEFAULT_SIMILAR_LIMIT,
+                     ) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Sucht die ähnlichsten Prompts zu mehreren Prompts in einem Aufruf.
+
+        :param doc_ids: IDs der Prompts, zu denen Nachbarn gesucht werden (unbekannte IDs werden übersprungen)
+        :param limit: Anzahl der Nachbarn je Prompt
+        :return: Zuordnung ID → [(Nachbar-ID, Kosinus-Ähnlichkeit)], ähnlichste zuerst
+        """
+        self._refresh_norms()
+        results = {}
+        for doc_id in doc_ids:
+            counts = self._term_counts.get(doc_id)
+            if counts is not None:
+                results[doc_id] = self._top_k(self._weights(counts), limit, exclude=doc_id)
+        return results
+
+    def similar_to_text(self, text: str, limit: int = DEFAULT_SIMILAR_LIMIT) -> List[Tuple[int, float]]:
+        """Sucht die ähnlichsten Prompts zu einem beliebigen Text."""
+        self._refresh_norms()
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        return self._top_k(self._weights(counts), limit)
+
+    def _top_k(self, weights: Dict[str, float], limit: int,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        query = {term: weight * self._idf(term) for term, weight in weights.items()}
+        query_norm = math.sqrt(sum(value * value for value in query.values()))
+        if not query_norm:
+            return []
+        terms = heapq.nlargest(MAX_QUERY_TERMS, query, key=query.get)
+        terms.sort(key=lambda term: len(self._postings.get(term, ())))
+        scores: Dict[int, float] = {}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            factor = query[term] * self._idf(term)
+            if len(scores) < MAX_CANDIDATES:
+                for doc_id, weight in posting.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + factor * weight
+            elif len(posting) < len(scores):
+                for doc_id, weight in posting.items():
+                    if doc_id in scores:
+                        scores[doc_id] += factor * weight
+            else:
+                for doc_id in scores:
+                    weight = posting.get(doc_id)
+                    if weight is not None:
+                        scores[doc_id] += factor * weight
+        scores.pop(exclude, None)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1] / self._norms[item[0]], -item[0]))
+        return [(doc_id, round(min(1.0, score / (self._norms[doc_id] * query_norm)), 4))
+                for doc_id, score in best]
+
+    def save(self, path: str, fingerprint: List[int]) -> None:
+        """
+        Schreibt die Termhäufigkeiten zusammen mit dem Fingerabdruck der Datenbank.
+
+        :param path: Zielpfad der Indexdatei
+        :param fingerprint: Stand der Datenbank beim Speichern
+        """
+        data = {
+            "version": self.FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "documents": {str(doc_id): counts for doc_id, counts in self._term_counts.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # json.dumps nutzt den C-Encoder, json.dump mit Datei nicht.
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: List[int]) -> Optional["SimilarityIndex"]:
+        """
+        Lädt einen gespeicherten Index, sofern er zum aktuellen Stand der Datenbank passt.
+
+        :param path: Pfad der Indexdatei
+        :param fingerprint: Aktueller Fingerabdruck der Datenbank
+        :return: Index oder None, wenn die Datei fehlt oder veraltet ist
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != cls.FORMAT_VERSION or data.get("fingerprint") != fingerprint:
+            return None
+
+        index = cls()
+        for key, counts in data.get("documents", {}).items():
+            doc_id = int(key)
+            index._term_counts[doc_id] = counts
+            for term, weight in cls._weights(counts).items():
+                index._postings.setdefault(term, {})[doc_id] = weight
+        index._refresh_norms()
+        return index
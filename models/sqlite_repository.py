@@ -0,0 +1,760 @@
+"""
+SQLitePromptRepository – Alternative Datenzugriffsschicht auf Basis von sqlite3.
+
+Implementiert dieselben Methoden wie ``PromptRepository`` und liefert ebenfalls
+``Prompt``-Datensätze mit ``doc_id``, sodass ``PromptService`` und die UI
+unverändert weiterarbeiten. Die Datenbank läuft im WAL-Modus; Tags liegen in
+normalisierten Tabellen, die Stichwortsuche nutzt einen FTS5-Index über die
+normalisierten Tokens von Titel, Zweck, Prompt-Text und Notizen und sortiert
+nach ``bm25()`` mit denselben Feldgewichten wie ``PromptRepository``. Für die unscharfe Suche
+werden Wortschatz und Wort-Trigramme in eigenen Tabellen gepflegt.
+
+Einmalige Migration einer bestehenden TinyDB-Datei::
+
+    python -m models.sqlite_repository database.json database.sqlite3
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from models.prompt_model import (
+    FIELD_INDEX_FIELDS, FUZZY_INDEX_FIELDS, TEXT_FIELD_WEIGHTS, TEXT_INDEX_FIELDS, SEARCH_MODE_FUZZY, SEARCH_MODE_KEYWORD, SEARCH_MODE_SUBSTRING,
+    SEARCH_MODES, SORT_FIELDS, SORT_RELEVANCE, QueryResult, RevisionConflictError,
+)
+from models.minhash_index import MinHashIndex
+from models.prompt_record import Prompt
+from models.similarity_index import DEFAULT_SIMILAR_LIMIT, SIMILARITY_FIELDS, SimilarityIndex, similarity_text
+from models.trigram_index import DEFAULT_FUZZY_THRESHOLD, rank_documents, trigram_similarity, trigrams
+from utils.instrumentation import instrument_methods, metrics_enabled, record_bytes, record_rows
+from utils.logger import configure_logger
+from utils.text_normalizer import tokenize
+
+logger = configure_logger(__name__)
+
+PROMPT_COLUMNS = ("title", "category", "platform", "prompt", "language", "purpose", "notes", "last_modified")
+_SQL_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompts (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    title         TEXT NOT NULL,
+    category      TEXT NOT NULL DEFAULT '',
+    platform      TEXT NOT NULL DEFAULT '',
+    prompt        TEXT NOT NULL DEFAULT '',
+    language      TEXT NOT NULL DEFAULT '',
+    purpose       TEXT NOT NULL DEFAULT '',
+    notes         TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    revision      INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_prompts_category ON prompts(category);
+CREATE INDEX IF NOT EXISTS idx_prompts_platform ON prompts(platform);
+CREATE INDEX IF NOT EXISTS idx_prompts_language ON prompts(language);
+CREATE INDEX IF NOT EXISTS idx_prompts_purpose  ON prompts(purpose);
+
+CREATE TABLE IF NOT EXISTS tags (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS prompt_tags (
+    prompt_id INTEGER NOT NULL REFERENCES prompts(id) ON DELETE CASCADE,
+    tag_id    INTEGER NOT NULL REFERENCES tags(id),
+    position  INTEGER NOT NULL,
+    PRIMARY KEY (prompt_id, tag_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_prompt_tags_tag ON prompt_tags(tag_id, prompt_id);
+
+CREATE TABLE IF NOT EXISTS fuzzy_terms (
+    term      TEXT NOT NULL,
+    prompt_id INTEGER NOT NULL REFERENCES prompts(id) ON DELETE CASCADE,
+    PRIMARY KEY (term, prompt_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_fuzzy_terms_prompt ON fuzzy_terms(prompt_id);
+CREATE TABLE IF NOT EXISTS term_trigrams (
+    trigram TEXT NOT NULL,
+    term    TEXT NOT NULL,
+    PRIMARY KEY (trigram, term)
+) WITHOUT ROWID;
+
+-- Änderungszähler über alle Verbindungen; Fingerabdruck für gespeicherte Indexdateien
+CREATE TABLE IF NOT EXISTS change_counter (
+    id    INTEGER PRIMARY KEY CHECK (id = 1),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO change_counter(id, value) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS prompts_changed_insert AFTER INSERT ON prompts
+BEGIN UPDATE change_counter SET value = value + 1; END;
+CREATE TRIGGER IF NOT EXISTS prompts_changed_update AFTER UPDATE ON prompts
+BEGIN UPDATE change_counter SET value = value + 1; END;
+CREATE TRIGGER IF NOT EXISTS prompts_changed_delete AFTER DELETE ON prompts
+BEGIN UPDATE change_counter SET value = value + 1; END;
+"""
+
+# Spalten in der Reihenfolge von TEXT_INDEX_FIELDS (Gewichte für bm25())
+FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+    {', '.join(TEXT_INDEX_FIELDS)}, tokenize = "unicode61 remove_diacritics 0 tokenchars '_'"
+);
+"""
+BM25_ORDER = f"bm25(prompts_fts, {', '.join(str(w) for w in TEXT_FIELD_WEIGHTS.values())})"
+
+
+def _contains_ci(haystack: Optional[str], needle: str) -> bool:
+    return needle in (haystack or "").lower()
+
+
+def _lower(value: Optional[str]) -> str:
+    return (value or "").lower()
+
+
+@instrument_methods
+class SQLitePromptRepository:
+    """
+    Repository für AI-Prompts in einer SQLite-Datenbank mit FTS5-Volltextsuche.
+    """
+
+    def __init__(self, db_path: str = "database.sqlite3"):
+        """
+        Öffnet (bzw. erstellt) die SQLite-Datenbank.
+
+        :param db_path: Pfad zur SQLite-Datei.
+        """
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.create_function("contains_ci", 2, _contains_ci, deterministic=True)
+        self.conn.create_function("py_lower", 1, _lower, deterministic=True)
+        self.fuzzy_threshold = DEFAULT_FUZZY_THRESHOLD
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self._ensure_revision_column(self.conn)
+            self._ensure_fts_table(self.conn)
+            self._backfill_fuzzy_terms(self.conn)
+        self._data_version = 0
+        self._sqlite_data_version = self._read_sqlite_data_version()
+        # Indizes im Speicher, erst bei der ersten Duplikat- bzw. Ähnlichkeitsabfrage aufgebaut
+        self.similarity_path = db_path + ".similar.json"
+        self.minhash_path = db_path + ".minhash.json"
+        self._minhash_index: Optional[MinHashIndex] = None
+        self._similarity_index: Optional[SimilarityIndex] = None
+        self._memory_index_version = -1
+
+    def close(self):
+        """Speichert Ähnlichkeits- und Duplikatindex und schließt die Datenbankverbindung."""
+        with self._lock:
+            if self._memory_index_version == self.get_data_version():
+                fingerprint = self._change_fingerprint()
+                if self._similarity_index is not None:
+                    self._similarity_index.save(self.similarity_path, fingerprint)
+                if self._minhash_index is not None:
+                    self._minhash_index.save(self.minhash_path, fingerprint)
+            self.conn.close()
+
+    def checkpoint(self) -> None:
+        """Überträgt das WAL in die Hauptdatei, z. B. vor einem Backup."""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            try:
+                with self.conn:
+                    yield self.conn
+            except BaseException:
+                # Bereits nachgeführte Speicherindizes passen nicht mehr zur zurückgerollten Datenbank.
+                self._minhash_index = None
+                self._similarity_index = None
+                raise
+            memory_indexes_current = self._memory_index_version == self._data_version
+            self._data_version += 1
+            if memory_indexes_current:
+                self._memory_index_version = self._data_version
+
+    def _change_fingerprint(self) -> List[int]:
+        return [self.conn.execute("SELECT value FROM change_counter").fetchone()[0],
+                self.conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]]
+
+    def _read_sqlite_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_data_version(self) -> int:
+        """
+        Liefert einen Zähler, der sich bei jeder Datenänderung erhöht – auch bei
+        Änderungen über andere Verbindungen bzw. Prozesse (``PRAGMA data_version``).
+        """
+        with self._lock:
+            sqlite_version = self._read_sqlite_data_version()
+            if sqlite_version != self._sqlite_data_version:
+                self._sqlite_data_version = sqlite_version
+                self._data_version += 1
+            return self._data_version
+
+    # === Hilfsfunktionen ===
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _fts_text(text: str) -> str:
+        return " ".join(tokenize(text or ""))
+
+    def _write_fts(self, conn: sqlite3.Connection, doc_id: int, values) -> None:
+        conn.execute("DELETE FROM prompts_fts WHERE rowid = ?", (doc_id,))
+        conn.execute(
+            f"INSERT INTO prompts_fts(rowid, {', '.join(TEXT_INDEX_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' * len(TEXT_INDEX_FIELDS))})",
+            [doc_id, *(self._fts_text(values[field]) for field in TEXT_INDEX_FIELDS)])
+
+    @staticmethod
+    def _ensure_revision_column(conn: sqlite3.Connection) -> None:
+        """Ergänzt die Revisionsspalte in Datenbanken aus älteren Versionen."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(prompts)")}
+        if "revision" not in columns:
+            conn.execute("ALTER TABLE prompts ADD COLUMN revision INTEGER NOT NULL DEFAULT 1")
+
+    def _ensure_fts_table(self, conn: sqlite3.Connection) -> None:
+        """Legt den FTS5-Index an bzw. baut ihn neu auf, wenn er andere Spalten hat (ältere Dateien)."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompts_fts'").fetchone()
+        if exists:
+            columns = [d[0] for d in conn.execute("SELECT * FROM prompts_fts LIMIT 0").description]
+            if columns == list(TEXT_INDEX_FIELDS):
+                return
+            logger.info("FTS5-Index wird mit den Feldern %s neu aufgebaut", ", ".join(TEXT_INDEX_FIELDS))
+            conn.execute("DROP TABLE prompts_fts")
+        conn.executescript(FTS_SCHEMA)
+        for row in conn.execute(f"SELECT id, {', '.join(TEXT_INDEX_FIELDS)} FROM prompts").fetchall():
+            self._write_fts(conn, row["id"], row)
+
+    def _backfill_fuzzy_terms(self, conn: sqlite3.Connection) -> None:
+        """Füllt die Trigramm-Tabellen für Datenbanken, die vor der unscharfen Suche angelegt wurden."""
+        needs_backfill = conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM prompts) AND NOT EXISTS(SELECT 1 FROM fuzzy_terms)").fetchone()[0]
+        if not needs_backfill:
+            return
+        logger.info("Trigramm-Index für die unscharfe Suche wird aufgebaut")
+        for row in conn.execute(f"SELECT id, {', '.join(FUZZY_INDEX_FIELDS)} FROM prompts").fetchall():
+            self._write_fuzzy_terms(conn, row["id"], (row[field] for field in FUZZY_INDEX_FIELDS))
+
+    @staticmethod
+    def _write_fuzzy_terms(conn: sqlite3.Connection, doc_id: int, texts: Iterable[str]) -> None:
+        SQLitePromptRepository._remove_fuzzy_terms(conn, doc_id)
+        terms = {token for text in texts for token in tokenize(text or "")}
+        for term in terms:
+            conn.execute("INSERT INTO fuzzy_terms(term, prompt_id) VALUES (?, ?)", (term, doc_id))
+            conn.executemany("INSERT OR IGNORE INTO term_trigrams(trigram, term) VALUES (?, ?)",
+                             [(trigram, term) for trigram in trigrams(term)])
+
+    @staticmethod
+    def _remove_fuzzy_terms(conn: sqlite3.Connection, doc_id: int) -> None:
+        terms = [row[0] for row in conn.execute("SELECT term FROM fuzzy_terms WHERE prompt_id = ?", (doc_id,))]
+        conn.execute("DELETE FROM fuzzy_terms WHERE prompt_id = ?", (doc_id,))
+        for term in terms:
+            if conn.execute("SELECT 1 FROM fuzzy_terms WHERE term = ? LIMIT 1", (term,)).fetchone() is None:
+                conn.execute("DELETE FROM term_trigrams WHERE term = ?", (term,))
+
+    def _similar_terms(self, token: str) -> Dict[str, float]:
+        token_trigrams = trigrams(token)
+        rows = self.conn.execute(
+            f"SELECT term, COUNT(*) FROM term_trigrams WHERE trigram IN ({', '.join('?' * len(token_trigrams))}) "
+            f"GROUP BY term", list(token_trigrams))
+        return {term: trigram_similarity(shared, len(token_trigrams), len(trigrams(term)))
+                for term, shared in rows}
+
+    def _fuzzy_scores(self, keyword: str) -> Dict[int, float]:
+        return rank_documents(
+            keyword, self._similar_terms,
+            lambda term: [row[0] for row in self.conn.execute(
+                "SELECT prompt_id FROM fuzzy_terms WHERE term = ?", (term,))],
+            self.fuzzy_threshold)
+
+    @staticmethod
+    def _write_tags(conn: sqlite3.Connection, doc_id: int, tags: Iterable[str]) -> None:
+        conn.execute("DELETE FROM prompt_tags WHERE prompt_id = ?", (doc_id,))
+        for position, tag in enumerate(dict.fromkeys(t for t in tags if t)):
+            conn.execute("INSERT OR IGNORE INTO tags(name) VALUES (?)", (tag,))
+            conn.execute(
+                "INSERT INTO prompt_tags(prompt_id, tag_id, position) "
+                "SELECT ?, id, ? FROM tags WHERE name = ?", (doc_id, position, tag))
+
+    @staticmethod
+    def _record_payload(values: Iterable) -> None:
+        """Meldet die Nutzdaten eines Schreibvorgangs (UTF-8-Bytes der Felder) an die Messung."""
+        if metrics_enabled():
+            record_bytes(sum(len(str(value).encode("utf-8")) for value in values))
+
+    def _insert(self, conn: sqlite3.Connection, values: Dict, doc_id: Optional[int] = None) -> int:
+        row = [values.get(column, "") or "" for column in PROMPT_COLUMNS]
+        self._record_payload([*row, *(values.get("tags") or [])])
+        revision = int(values.get("revision") or 1)
+        if doc_id is None:
+            cursor = conn.execute(
+                f"INSERT INTO prompts({', '.join(PROMPT_COLUMNS)}, revision) "
+                f"VALUES ({', '.join('?' * len(PROMPT_COLUMNS))}, ?)",
+                [*row, revision])
+            doc_id = cursor.lastrowid
+        else:
+            conn.execute(
+                f"INSERT INTO prompts(id, {', '.join(PROMPT_COLUMNS)}, revision) "
+                f"VALUES (?, {', '.join('?' * len(PROMPT_COLUMNS))}, ?)",
+                [doc_id, *row, revision])
+        self._write_tags(conn, doc_id, values.get("tags") or [])
+        self._write_fts(conn, doc_id, {field: values.get(field, "") for field in TEXT_INDEX_FIELDS})
+        self._write_fuzzy_terms(conn, doc_id, (values.get(field, "") for field in FUZZY_INDEX_FIELDS))
+        if self._minhash_index is not None:
+            self._minhash_index.add_document(doc_id, values.get("prompt", "") or "")
+        if self._similarity_index is not None:
+            self._similarity_index.add_document(doc_id, similarity_text(values))
+        return doc_id
+
+    def _load_documents(self, rows: Sequence[sqlite3.Row]) -> List[Prompt]:
+        """Wandelt Zeilen in ``Prompt``-Datensätze um und ergänzt die Tags in Positionsreihenfolge."""
+        record_rows(len(rows))
+        tags: Dict[int, List[str]] = {row["id"]: [] for row in rows}
+        ids = list(tags)
+        for start in range(0, len(ids), _SQL_CHUNK_SIZE):
+            chunk = ids[start:start + _SQL_CHUNK_SIZE]
+            for prompt_id, name in self.conn.execute(
+                    f"SELECT pt.prompt_id, t.name FROM prompt_tags pt JOIN tags t ON t.id = pt.tag_id "
+                    f"WHERE pt.prompt_id IN ({', '.join('?' * len(chunk))}) "
+                    f"ORDER BY pt.prompt_id, pt.position", chunk):
+                tags[prompt_id].append(name)
+
+        documents = []
+        for row in rows:
+            data = {column: row[column] for column in PROMPT_COLUMNS}
+            data["tags"] = tags[row["id"]]
+            data["revision"] = row["revision"]
+            documents.append(Prompt.from_document(data, row["id"]))
+        return documents
+
+    # === Repository-Schnittstelle ===
+
+    def add_prompt(self, title: str, category: str, platform: str,
+                   tags: List[str], prompt_text: str,
+                   language: str = "", purpose: str = "", notes: str = "") -> int:
+        with self._transaction() as conn:
+            return self._insert(conn, {
+                "title": title,
+                "category": category,
+                "platform": platform,
+                "tags": tags,
+                "prompt": prompt_text,
+                "language": language,
+                "purpose": purpose,
+                "notes": notes,
+                "last_modified": self._now(),
+            })
+
+    def get_all_prompts(self) -> List[Prompt]:
+        """Gibt alle gespeicherten Prompts zurück."""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM prompts ORDER BY id").fetchall()
+            return self._load_documents(rows)
+
+    def get_prompt(self, doc_id: int) -> Optional[Prompt]:
+        """Lädt einen einzelnen Prompt (None, wenn die ID unbekannt ist)."""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM prompts WHERE id = ?", (doc_id,)).fetchall()
+            documents = self._load_documents(rows)
+        return documents[0] if documents else None
+
+    def get_prompts(self, doc_ids: Iterable[int]) -> List[Prompt]:
+        """Lädt mehrere Prompts in der Reihenfolge von ``doc_ids``; unbekannte IDs fehlen."""
+        doc_ids = list(doc_ids)
+        unique_ids = list(dict.fromkeys(doc_ids))
+        documents: Dict[int, Prompt] = {}
+        with self._lock:
+            for start in range(0, len(unique_ids), _SQL_CHUNK_SIZE):
+                chunk = unique_ids[start:start + _SQL_CHUNK_SIZE]
+                rows = self.conn.execute(
+                    f"SELECT * FROM prompts WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+                documents.update((doc.doc_id, doc) for doc in self._load_documents(rows))
+        return [documents[doc_id] for doc_id in doc_ids if doc_id in documents]
+
+    def iter_prompts(self, batch_size: int = _SQL_CHUNK_SIZE) -> Iterator[Prompt]:
+        """Iteriert blockweise über alle Prompts, ohne eine Ergebnisliste aufzubauen."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT * FROM prompts WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)).fetchall()
+                documents = self._load_documents(rows)
+            if not documents:
+                return
+            yield from documents
+            last_id = documents[-1].doc_id
+
+    def search_prompts(self, keyword: str = "", category: Optional[str] = None,
+                       tags: Optional[List[str]] = None,
+                       mode: str = SEARCH_MODE_KEYWORD, limit: Optional[int] = None) -> List[Prompt]:
+        """Durchsucht die Datenbank nach Prompts; Treffer einer Stichwortsuche nach Relevanz sortiert."""
+        return self.query_prompts(keyword=keyword, category=category, tags=tags, mode=mode,
+                                  sort_by=SORT_RELEVANCE, limit=limit).items
+
+    def query_prompts(self, keyword: str = "", category: Optional[str] = None,
+                      tags: Optional[List[str]] = None, platform: Optional[str] = None,
+                      language: Optional[str] = None, purpose: Optional[str] = None,
+                      mode: str = SEARCH_MODE_KEYWORD, sort_by: str = "doc_id",
+                      descending: bool = False, limit: Optional[int] = None,
+                      offset: int = 0) -> QueryResult:
+        """
+        Kombinierte Abfrage über alle Filterfelder mit Sortierung und Seitenbildung.
+
+        Gleiche Semantik wie ``PromptRepository.query_prompts``; Sprache und Zweck
+        werden über die eindeutigen Werte des jeweiligen Index aufgelöst. Die
+        Relevanz der Stichwortsuche liefert FTS5 (``bm25()``), wobei SQLite bei
+        ``LIMIT`` nur die besten ``offset + limit`` Zeilen vorhält.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unbekannter Suchmodus: {mode}")
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unbekanntes Sortierfeld: {sort_by}")
+
+        clauses: List[str] = []
+        params: List = []
+        source = "prompts p"
+        ranked_by_fts = False
+        with self._lock:
+            if category:
+                clauses.append("p.category = ?")
+                params.append(category)
+            if platform:
+                clauses.append("p.platform = ?")
+                params.append(platform)
+            if tags:
+                clauses.append(
+                    "p.id IN (SELECT pt.prompt_id FROM prompt_tags pt JOIN tags t ON t.id = pt.tag_id "
+                    f"WHERE t.name IN ({', '.join('?' * len(tags))}))")
+                params.extend(tags)
+            for field, text in (("language", language), ("purpose", purpose)):
+                if not text:
+                    continue
+                values = [v for v in self.get_distinct_values(field) if text.lower() in v.lower()]
+                if not values:
+                    return QueryResult([], 0)
+                clauses.append(f"p.{field} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            if keyword and mode == SEARCH_MODE_KEYWORD:
+                tokens = sorted(set(tokenize(keyword)))
+                if not tokens:
+                    return QueryResult([], 0)
+                ranked_by_fts = sort_by == SORT_RELEVANCE
+                if ranked_by_fts:
+                    source = "prompts p JOIN prompts_fts ON prompts_fts.rowid = p.id"
+                    clauses.append("prompts_fts MATCH ?")
+                else:
+                    clauses.append("p.id IN (SELECT rowid FROM prompts_fts WHERE prompts_fts MATCH ?)")
+                params.append(" AND ".join(f'"{token}"*' for token in tokens))
+            scores: Dict[int, float] = {}
+            if keyword and mode == SEARCH_MODE_FUZZY:
+                scores = self._fuzzy_scores(keyword)
+                if not scores:
+                    return QueryResult([], 0)
+            if keyword and mode == SEARCH_MODE_SUBSTRING:
+                clauses.append("(contains_ci(p.title, ?) OR contains_ci(p.prompt, ?))")
+                params.extend([keyword.lower(), keyword.lower()])
+
+            where = " AND ".join(clauses) or "1"
+            if scores:
+                return self._query_scored(where, params, scores, sort_by, descending, limit, offset)
+            direction = "DESC" if descending else "ASC"
+            if ranked_by_fts:
+                order = f"{BM25_ORDER}, p.id"
+            elif sort_by in ("doc_id", SORT_RELEVANCE):
+                order = f"p.id {direction}"
+            else:
+                order = f"py_lower(p.{sort_by}) {direction}, p.id {direction}"
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT p.* FROM {source} WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset]).fetchall()
+            return QueryResult(self._load_documents(rows), total)
+
+    def _query_scored(self, where: str, params: List, scores: Dict[int, float], sort_by: str,
+                      descending: bool, limit: Optional[int], offset: int) -> QueryResult:
+        """Schneidet bewertete Treffer mit den übrigen Filtern und sortiert sie in Python."""
+        sort_column = "p.id" if sort_by in ("doc_id", SORT_RELEVANCE) else f"py_lower(p.{sort_by})"
+        sort_keys: Dict[int, tuple] = {}
+        candidates = list(scores)
+        for start in range(0, len(candidates), _SQL_CHUNK_SIZE):
+            chunk = candidates[start:start + _SQL_CHUNK_SIZE]
+            for doc_id, value in self.conn.execute(
+                    f"SELECT p.id, {sort_column} FROM prompts p "
+                    f"WHERE {where} AND p.id IN ({', '.join('?' * len(chunk))})", [*params, *chunk]):
+                sort_keys[doc_id] = (-scores[doc_id], doc_id) if sort_by == SORT_RELEVANCE else (value, doc_id)
+        record_rows(len(sort_keys))
+        doc_ids = sorted(sort_keys, key=sort_keys.__getitem__, reverse=descending and sort_by != SORT_RELEVANCE)
+        page_ids = doc_ids[offset:offset + limit if limit is not None else None]
+        rows = {}
+        for start in range(0, len(page_ids), _SQL_CHUNK_SIZE):
+            chunk = page_ids[start:start + _SQL_CHUNK_SIZE]
+            rows.update((row["id"], row) for row in self.conn.execute(
+                f"SELECT * FROM prompts WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        return QueryResult(self._load_documents([rows[doc_id] for doc_id in page_ids]), len(doc_ids))
+
+    def add_prompts(self, records: Iterable[Dict]) -> List[int]:
+        """
+        Fügt mehrere Prompts in einer einzigen Transaktion ein.
+
+        :param records: Prompt-Dictionaries (Felder wie in der Datenbank, Text unter ``prompt``).
+        :return: Dokument-IDs in Eingabereihenfolge.
+        """
+        timestamp = self._now()
+        with self._transaction() as conn:
+            return [self._insert(conn, {**record, "last_modified": timestamp}) for record in records]
+
+    def update_prompt(self, doc_id: int, updated_data: Dict, expected_revision: Optional[int] = None) -> None:
+        """
+        Aktualisiert einen bestehenden Prompt.
+
+        Wie bei TinyDB werden unbekannte IDs stillschweigend übersprungen.
+
+        :param doc_id: ID des zu aktualisierenden Prompts.
+        :param updated_data: Wörterbuch mit zu aktualisierenden Feldern.
+        :param expected_revision: (Optional) Revision, auf der die Änderung beruht.
+        :raises ValueError: Bei unbekannten Feldern.
+        :raises RevisionConflictError: Wenn der Prompt inzwischen eine andere Revision hat.
+        """
+        logger.debug("Aktualisierte Daten: %s", updated_data)
+        expected = None if expected_revision is None else {doc_id: expected_revision}
+        self.update_prompts({doc_id: updated_data}, expected)
+
+    def update_prompts(self, updates: Dict[int, Dict],
+                       expected_revisions: Optional[Dict[int, int]] = None) -> List[int]:
+        """
+        Aktualisiert mehrere Prompts in einer einzigen Transaktion.
+
+        Die Revision jedes geänderten Prompts steigt um eins. Bei einer veralteten
+        erwarteten Revision wird die gesamte Transaktion zurückgerollt.
+
+        :param updates: Zuordnung Dokument-ID → zu aktualisierende Felder.
+        :param expected_revisions: (Optional) Zuordnung Dokument-ID → erwartete Revision.
+        :return: IDs der tatsächlich aktualisierten Prompts.
+        :raises ValueError: Bei unbekannten Feldern (vor jeder Änderung geprüft).
+        :raises RevisionConflictError: Bei einer veralteten Revision.
+        """
+        for updated_data in updates.values():
+            unknown = set(updated_data) - set(PROMPT_COLUMNS) - {"tags"}
+            if unknown:
+                raise ValueError(f"Unbekannte Felder: {', '.join(sorted(unknown))}")
+        timestamp = self._now()
+        updated_ids = []
+        with self._transaction() as conn:
+            for doc_id, updated_data in updates.items():
+                updated_data["last_modified"] = timestamp
+                if self._update(conn, doc_id, updated_data, (expected_revisions or {}).get(doc_id)):
+                    updated_ids.append(doc_id)
+        return updated_ids
+
+    def _update(self, conn: sqlite3.Connection, doc_id: int, updated_data: Dict,
+                expected_revision: Optional[int] = None) -> bool:
+        columns = [c for c in PROMPT_COLUMNS if c in updated_data]
+        params = [updated_data[c] or "" for c in columns] + [doc_id]
+        condition = "id = ?"
+        if expected_revision is not None:
+            condition += " AND revision = ?"
+            params.append(expected_revision)
+        cursor = conn.execute(
+            f"UPDATE prompts SET {', '.join(f'{c} = ?' for c in columns)}, revision = revision + 1 "
+            f"WHERE {condition}", params)
+        if cursor.rowcount == 0:
+            if expected_revision is not None:
+                row = conn.execute("SELECT revision FROM prompts WHERE id = ?", (doc_id,)).fetchone()
+                if row is not None:
+                    raise RevisionConflictError(doc_id, expected_revision, row[0])
+            return False
+        self._record_payload([updated_data[c] or "" for c in columns] + list(updated_data.get("tags") or []))
+        if "tags" in updated_data:
+            self._write_tags(conn, doc_id, updated_data["tags"] or [])
+        if any(field in updated_data for field in FUZZY_INDEX_FIELDS):
+            row = conn.execute(f"SELECT {', '.join(FUZZY_INDEX_FIELDS)} FROM prompts WHERE id = ?",
+                               (doc_id,)).fetchone()
+            if any(field in updated_data for field in TEXT_INDEX_FIELDS):
+                self._write_fts(conn, doc_id, row)
+            self._write_fuzzy_terms(conn, doc_id, (row[field] for field in FUZZY_INDEX_FIELDS))
+        if "prompt" in updated_data and self._minhash_index is not None:
+            self._minhash_index.add_document(doc_id, updated_data["prompt"] or "")
+        if self._similarity_index is not None and any(field in updated_data for field in (*SIMILARITY_FIELDS, "tags")):
+            doc = self._load_documents(conn.execute("SELECT * FROM prompts WHERE id = ?", (doc_id,)).fetchall())[0]
+            self._similarity_index.add_document(doc_id, similarity_text(doc))
+        return True
+
+    def delete_prompt(self, doc_id: int) -> None:
+        """
+        Entfernt einen Prompt aus der Datenbank.
+
+        Wie bei TinyDB werden unbekannte IDs stillschweigend übersprungen.
+
+        :param doc_id: ID des zu löschenden Prompts.
+        """
+        logger.debug("Prompt geloescht (ID): %d", doc_id)
+        self.delete_prompts([doc_id])
+
+    def delete_prompts(self, doc_ids: Iterable[int]) -> List[int]:
+        """
+        Entfernt mehrere Prompts in einer einzigen Transaktion.
+
+        :param doc_ids: IDs der zu löschenden Prompts.
+        :return: IDs der tatsächlich gelöschten Prompts.
+        """
+        removed_ids = []
+        with self._transaction() as conn:
+            for doc_id in doc_ids:
+                self._remove_fuzzy_terms(conn, doc_id)
+                if conn.execute("DELETE FROM prompts WHERE id = ?", (doc_id,)).rowcount:
+                    conn.execute("DELETE FROM prompts_fts WHERE rowid = ?", (doc_id,))
+                    if self._minhash_index is not None:
+                        self._minhash_index.remove_document(doc_id)
+                    if self._similarity_index is not None:
+                        self._similarity_index.remove_document(doc_id)
+                    removed_ids.append(doc_id)
+        return removed_ids
+
+    def _ensure_memory_indexes_current(self) -> None:
+        """Verwirft die Speicherindizes, wenn eine andere Verbindung Daten geändert hat."""
+        version = self.get_data_version()
+        if self._memory_index_version != version:
+            self._minhash_index = None
+            self._similarity_index = None
+            self._memory_index_version = version
+
+    def _ensure_minhash_index(self) -> MinHashIndex:
+        self._ensure_memory_indexes_current()
+        if self._minhash_index is None:
+            fingerprint = self._change_fingerprint()
+            index = MinHashIndex.load(self.minhash_path, fingerprint)
+            if index is None:
+                index = MinHashIndex()
+                rows = self.conn.execute("SELECT id, prompt FROM prompts").fetchall()
+                record_rows(len(rows))
+                for doc_id, text in rows:
+                    index.add_document(doc_id, text or "")
+                index.save(self.minhash_path, fingerprint)
+            self._minhash_index = index
+        return self._minhash_index
+
+    def _ensure_similarity_index(self) -> SimilarityIndex:
+        self._ensure_memory_indexes_current()
+        if self._similarity_index is None:
+            fingerprint = self._change_fingerprint()
+            index = SimilarityIndex.load(self.similarity_path, fingerprint)
+            if index is None:
+                index = SimilarityIndex()
+                rows = self.conn.execute("SELECT * FROM prompts").fetchall()
+                for start in range(0, len(rows), _SQL_CHUNK_SIZE):
+                    for doc in self._load_documents(rows[start:start + _SQL_CHUNK_SIZE]):
+                        index.add_document(doc.doc_id, similarity_text(doc))
+                index.save(self.similarity_path, fingerprint)
+            self._similarity_index = index
+        return self._similarity_index
+
+    def find_similar_prompts(self, doc_ids: Iterable[int],
+                             limit: int = DEFAULT_SIMILAR_LIMIT) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Sucht zu mehreren Prompts die inhaltlich ähnlichsten (TF-IDF, Kosinus-Ähnlichkeit).
+
+        :param doc_ids: IDs der Prompts, z. B. der aufgeklappten Einträge einer Seite.
+        :param limit: Anzahl der ähnlichen Prompts je Eintrag.
+        :return: Zuordnung ID → [(ähnliche ID, Ähnlichkeit)], ähnlichste zuerst; unbekannte IDs fehlen.
+        """
+        with self._lock:
+            return self._ensure_similarity_index().most_similar(doc_ids, limit)
+
+    def find_near_duplicates(self, prompt_text: str, threshold: Optional[float] = None,
+                             exclude_id: Optional[int] = None, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Sucht Prompts, deren Text nahezu identisch ist (MinHash/LSH, ohne Vergleich mit allen Prompts).
+
+        :param prompt_text: Zu prüfender Prompt-Text.
+        :param threshold: (Optional) Mindestähnlichkeit, Standard 0.6.
+        :param exclude_id: (Optional) Diesen Prompt nicht melden, z. B. den geprüften selbst.
+        :param limit: (Optional) Höchstens so viele Treffer.
+        :return: (Dokument-ID, geschätzte Ähnlichkeit), ähnlichste zuerst.
+        """
+        with self._lock:
+            return self._ensure_minhash_index().query(prompt_text, threshold, exclude_id, limit)
+
+    def find_duplicate_clusters(self, threshold: Optional[float] = None) -> List[List[int]]:
+        """
+        Gruppiert alle Prompts mit nahezu identischem Text in einem Durchlauf.
+
+        :param threshold: (Optional) Mindestähnlichkeit, Standard 0.6.
+        :return: Cluster aus mindestens zwei Dokument-IDs.
+        """
+        with self._lock:
+            return self._ensure_minhash_index().clusters(threshold)
+
+    def get_all_categories(self) -> List[str]:
+        """Gibt eine alphabetisch sortierte Liste aller eindeutigen Kategorien zurück."""
+        return self.get_distinct_values("category")
+
+    def get_all_tags(self) -> List[str]:
+        """Gibt eine alphabetisch sortierte Liste aller verwendeten Tags zurück."""
+        return self.get_distinct_values("tags")
+
+    def get_distinct_values(self, field: str) -> List[str]:
+        """
+        Gibt die sortierten eindeutigen Werte eines indizierten Feldes zurück.
+
+        :raises ValueError: Wenn das Feld nicht indiziert ist.
+        """
+        if field not in FIELD_INDEX_FIELDS:
+            raise ValueError(f"Feld ist nicht indiziert: {field}")
+        with self._lock:
+            if field == "tags":
+                rows = self.conn.execute(
+                    "SELECT name FROM tags t WHERE EXISTS "
+                    "(SELECT 1 FROM prompt_tags pt WHERE pt.tag_id = t.id) ORDER BY name")
+            else:
+                rows = self.conn.execute(
+                    f"SELECT DISTINCT {field} FROM prompts WHERE {field} != '' ORDER BY {field}")
+            return [row[0] for row in rows]
+
+
+def migrate_tinydb_to_sqlite(json_path: str = "database.json",
+                             sqlite_path: str = "database.sqlite3") -> int:
+    """
+    Überträgt alle Prompts einer TinyDB-Datei in eine leere SQLite-Datenbank.
+
+    Die Dokument-IDs bleiben erhalten.
+
+    :param json_path: Pfad zur TinyDB-JSON-Datei.
+    :param sqlite_path: Pfad zur Ziel-SQLite-Datei.
+    :return: Anzahl der übertragenen Prompts.
+    :raises ValueError: Wenn die Zieldatenbank bereits Prompts enthält.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    documents = (json.loads(content) if content.strip() else {}).get("_default", {})
+
+    repo = SQLitePromptRepository(sqlite_path)
+    try:
+        if repo.conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]:
+            raise ValueError(f"Zieldatenbank ist nicht leer: {sqlite_path}")
+        with repo._transaction() as conn:
+            for doc_id, document in sorted(documents.items(), key=lambda item: int(item[0])):
+                repo._insert(conn, document, doc_id=int(doc_id))
+    finally:
+        repo.close()
+    logger.info("%d Prompts nach %s migriert", len(documents), sqlite_path)
+    return len(documents)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migriert eine TinyDB-Datenbank nach SQLite")
+    parser.add_argument("source", nargs="?", default="database.json", help="TinyDB-JSON-Datei")
+    parser.add_argument("target", nargs="?", default="database.sqlite3", help="Ziel-SQLite-Datei")
+    args = parser.parse_args()
+    count = migrate_tinydb_to_sqlite(args.source, args.target)
+    print(f"✅ {count} Prompts migriert nach {args.target}")
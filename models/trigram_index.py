@@ -0,0 +1,166 @@
+"""
+TrigramIndex – Zeichen-Trigramm-Index für die tippfehlertolerante Suche.
+
+Indiziert werden nicht die Dokumente selbst, sondern ihr Wortschatz: Jedes
+normalisierte Wort wird in Trigramme zerlegt (``"  wort "`` → ``"  w"``,
+``" wo"``, ``"wor"``, ``"ort"``, ``"rt "``). Eine Anfrage berührt daher nur die
+Wörter, die mindestens ein Trigramm mit ihr teilen, und anschließend die
+Dokumente dieser Wörter – der Aufwand wächst mit dem Wortschatz, nicht mit
+der Anzahl der Prompts.
+"""
+
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set
+
+from utils.text_normalizer import tokenize
+
+DEFAULT_FUZZY_THRESHOLD = 0.3
+
+
+def trigrams(term: str) -> Set[str]:
+    """
+    Zerlegt ein normalisiertes Wort in seine Trigramme (mit Randmarkierung wie pg_trgm).
+
+    :param term: Normalisiertes Wort
+    :return: Menge der Trigramme
+    """
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(shared: int, left_count: int, right_count: int) -> float:
+    """
+    Jaccard-Ähnlichkeit zweier Trigramm-Mengen aus der Anzahl gemeinsamer Trigramme.
+
+    :param shared: Anzahl gemeinsamer Trigramme
+    :param left_count: Anzahl Trigramme des ersten Wortes
+    :param right_count: Anzahl Trigramme des zweiten Wortes
+    """
+    union = left_count + right_count - shared
+    return shared / union if union else 0.0
+
+
+def rank_documents(query: str, similar_terms: Callable[[str], Mapping[str, float]],
+                   documents_for: Callable[[str], Iterable[int]],
+                   threshold: float = DEFAULT_FUZZY_THRESHOLD) -> Dict[int, float]:
+    """
+    Bewertet Dokumente nach der Trigramm-Überdeckung mit einer Anfrage.
+
+    Für jedes Wort der Anfrage zählt das ähnlichste Wort des Dokuments; der
+    Score ist der Mittelwert über alle Anfragewörter.
+
+    :param query: Suchbegriff(e)
+    :param similar_terms: Liefert zu einem Anfragewort die ähnlichen Wörter mit Ähnlichkeit
+    :param documents_for: Liefert die Dokument-IDs, die ein Wort enthalten
+    :param threshold: Mindestscore (0–1), ab dem ein Dokument als Treffer gilt
+    :return: Zuordnung Dokument-ID → Score (nur Treffer)
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return {}
+    totals: Dict[int, float] = {}
+    for token in tokens:
+        best: Dict[int, float] = {}
+        for term, similarity in similar_terms(token).items():
+            if similarity < threshold:
+                continue
+            for doc_id in documents_for(term):
+                if similarity > best.get(doc_id, 0.0):
+                    best[doc_id] = similarity
+        for doc_id, similarity in best.items():
+            totals[doc_id] = totals.get(doc_id, 0.0) + similarity
+    scores = {doc_id: total / len(tokens) for doc_id, total in totals.items()}
+    return {doc_id: score for doc_id, score in scores.items() if score >= threshold}
+
+
+class TrigramIndex:
+    """
+    Speicherresidenter Trigramm-Index über den Wortschatz der indizierten Dokumente.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_FUZZY_THRESHOLD):
+        """
+        :param threshold: Standard-Mindestähnlichkeit (0–1) für ``search``.
+        """
+        self.threshold = threshold
+        self._term_docs: Dict[str, Set[int]] = {}
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._trigram_terms: Dict[str, Set[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add_document(self, doc_id: int, texts: Iterable[str]) -> None:
+        """
+        Indiziert ein Dokument. Ein bereits indiziertes Dokument wird ersetzt.
+
+        :param doc_id: Dokument-ID
+        :param texts: Textfelder, die unscharf durchsuchbar sein sollen
+        """
+        self.remove_document(doc_id)
+        terms = {token for text in texts for token in tokenize(text)}
+        for term in terms:
+            docs = self._term_docs.get(term)
+            if docs is None:
+                docs = self._term_docs[term] = set()
+                term_trigrams = trigrams(term)
+                self._trigram_counts[term] = len(term_trigrams)
+                for trigram in term_trigrams:
+                    self._trigram_terms.setdefault(trigram, set()).add(term)
+            docs.add(doc_id)
+        self._doc_terms[doc_id] = terms
+
+    def remove_document(self, doc_id: int) -> None:
+        """
+        Entfernt ein Dokument; nicht mehr verwendete Wörter verlassen den Index.
+
+        :param doc_id: Dokument-ID
+        """
+        for term in self._doc_terms.pop(doc_id, ()):
+            docs = self._term_docs.get(term)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if docs:
+                continue
+            del self._term_docs[term]
+            del self._trigram_counts[term]
+            for trigram in trigrams(term):
+                terms = self._trigram_terms.get(trigram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._trigram_terms[trigram]
+
+    def clear(self) -> None:
+        """Leert den Index vollständig."""
+        self._term_docs.clear()
+        self._doc_terms.clear()
+        self._trigram_terms.clear()
+        self._trigram_counts.clear()
+
+    def similar_terms(self, token: str) -> Dict[str, float]:
+        """
+        Ermittelt alle indizierten Wörter, die mindestens ein Trigramm mit ``token`` teilen.
+
+        :param token: Normalisiertes Anfragewort
+        :return: Zuordnung Wort → Jaccard-Ähnlichkeit
+        """
+        token_trigrams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for trigram in token_trigrams:
+            for term in self._trigram_terms.get(trigram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        return {term: trigram_similarity(count, len(token_trigrams), self._trigram_counts[term])
+                for term, count in shared.items()}
+
+    def search(self, query: str, threshold: Optional[float] = None) -> Dict[int, float]:
+        """
+        Unscharfe Suche mit Ähnlichkeitsschwelle.
+
+        :param query: Suchbegriff(e), auch mit Tippfehlern
+        :param threshold: (Optional) Mindestscore; Standard ist ``self.threshold``
+        :return: Zuordnung Dokument-ID → Score, höher ist ähnlicher
+        """
+        return rank_documents(query, self.similar_terms, lambda term: self._term_docs.get(term, ()),
+                              self.threshold if threshold is None else threshold)
@@ -5,35 +5,149 @@ Diese Schicht kapselt die logische Verarbeitung und Validierung von Prompts,
 unabhängig von UI oder Datenbankimplementierung.
 """
 
-from typing import List, Optional, Dict
-from models.prompt_model import PromptRepository
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+from models.prompt_model import PromptRepository, QueryResult, SEARCH_MODE_KEYWORD
+from models.prompt_record import Prompt
+from models.similarity_index import DEFAULT_SIMILAR_LIMIT
+from models.repository_factory import create_repository
+from utils.importers import detect_import_format, iter_import_records
+from utils.instrumentation import instrument_methods
 from utils.logger import configure_logger
 
 
 logger = configure_logger(__name__)
 
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+FILTER_ARGUMENTS = ("keyword", "category", "tags", "platform", "language", "purpose")
+DEFAULT_CACHE_SIZE = 256
+DUPLICATE_WARNING_LIMIT = 5
+
+
+class BulkValidationError(ValueError):
+    """
+    Sammelfehler einer Massenoperation; ``errors`` enthält (Position bzw. ID, Meldung).
+    """
+
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} ungültige Datensätze, z. B. #{errors[0][0]}: {errors[0][1]}")
+
+
+class ImportReport(NamedTuple):
+    """Ergebnis von ``import_prompts``: Anzahl importierter Prompts und Fehler je Zeile."""
+    imported: int
+    errors: List[Tuple[int, str]]
+
+
+def validate_prompt_record(record: Dict, partial: bool = False) -> List[str]:
+    """
+    Prüft einen Prompt-Datensatz und gibt alle gefundenen Fehler zurück.
+
+    :param record: Datensatz mit Feldern wie in der Datenbank (Text unter ``prompt``)
+    :param partial: True für Updates, bei denen fehlende Felder erlaubt sind
+    :return: Liste der Fehlermeldungen (leer, wenn gültig)
+    """
+    errors = []
+    for field, message in (("title", "Titel darf nicht leer sein."),
+                           ("prompt", "Prompt-Text darf nicht leer sein.")):
+        if partial and field not in record:
+            continue
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(message)
+    tags = record.get("tags", [])
+    if not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags):
+        errors.append("Tags müssen eine Liste von Texten sein.")
+    return errors
+
+
+@instrument_methods
 class PromptService:
     """
     Service-Klasse zur zentralen Steuerung von Prompt-bezogenen Operationen.
+
+    Lesende Abfragen (Kategorien, Tags, Suchergebnisse) werden zwischengespeichert
+    und mit der Datenversion des Repositorys versehen; ändert sich die Version
+    durch einen Schreibvorgang oder eine externe Dateiänderung, wird neu berechnet.
+    Zwischengespeicherte Ergebnisse dürfen vom Aufrufer nicht verändert werden.
     """
 
-    def __init__(self, repository: Optional[PromptRepository] = None):
+    def __init__(self, repository: Optional[PromptRepository] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
         """
         Initialisiert den Service mit einer PromptRepository-Instanz.
 
+        Ohne Angabe wird das in settings/database.json bzw. über Umgebungsvariablen
+        konfigurierte Backend verwendet (siehe ``config.database_config``).
+
         :param repository: Optionale Repository-Instanz (für Tests/Mocking).
+        :param cache_size: Maximale Anzahl zwischengespeicherter Abfrageergebnisse.
+        """
+        self.repo = repository or create_repository()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def get_data_version(self) -> Optional[int]:
+        """
+        Aktuelle Datenversion des Repositorys (None, wenn das Backend keine anbietet).
         """
-        self.repo = repository or PromptRepository()
+        get_version = getattr(self.repo, "get_data_version", None)
+        return get_version() if get_version else None
+
+    def _cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Liefert ein zwischengespeichertes Ergebnis, solange die Datenversion unverändert ist."""
+        version = self.get_data_version()
+        if version is None or self.cache_size <= 0:
+            return compute()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == version:
+                self._cache.move_to_end(key)
+                return entry[1]
+        value = compute()
+        with self._cache_lock:
+            self._cache[key] = (version, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
 
     def create_prompt(self, title: str, category: str, platform: str,
                   tags: List[str], prompt_text: str,
-                  language: str = "", purpose: str = "", notes: str = "") -> int:
+                  language: str = "", purpose: str = "", notes: str = "",
+                  check_duplicates: bool = True) -> int:
         """
         Validiert und erstellt einen neuen Prompt.
 
+        :param check_duplicates: Vorher nach wahrscheinlichen Duplikaten suchen und sie protokollieren.
         :return: Dokument-ID des gespeicherten Prompts.
         :raises ValueError: Bei ungültigen Eingaben.
         """
+        doc_id, _ = self._create_prompt(title, category, platform, tags, prompt_text, language, purpose, notes,
+                                        check_duplicates)
+        return doc_id
+
+    def create_prompt_with_duplicates(self, title: str, category: str, platform: str,
+                                      tags: List[str], prompt_text: str, language: str = "",
+                                      purpose: str = "", notes: str = "",
+                                      check_duplicates: bool = True) -> Tuple[int, List[Tuple[Prompt, float]]]:
+        """
+        Wie ``create_prompt``, liefert zusätzlich die vor dem Speichern gefundenen Duplikate.
+
+        :param check_duplicates: Ohne Prüfung ist die Duplikatliste leer.
+        :return: Dokument-ID und (Prompt, geschätzte Ähnlichkeit) der wahrscheinlichen Duplikate.
+        :raises ValueError: Bei ungültigen Eingaben.
+        """
+        return self._create_prompt(title, category, platform, tags, prompt_text, language, purpose, notes,
+                                   check_duplicates)
+
+    def _create_prompt(self, title: str, category: str, platform: str, tags: List[str], prompt_text: str,
+                       language: str, purpose: str, notes: str,
+                       check_duplicates: bool) -> Tuple[int, List[Tuple[Prompt, float]]]:
         logger.info("Neuer Prompt erstellt: %s", title)
         
         if not title.strip():
@@ -42,35 +156,225 @@ class PromptService:
         if not prompt_text.strip():
             logger.error("Titel darf nicht leer sein.")
             raise ValueError("Prompt-Text darf nicht leer sein.")
-        return self.repo.add_prompt(title, category, platform, tags, prompt_text, language, purpose, notes)
+        duplicates = self.find_near_duplicates(prompt_text) if check_duplicates else []
+        if duplicates:
+            logger.warning("Prompt '%s' ähnelt bestehenden Prompts: %s", title,
+                           ", ".join(f"ID {prompt.doc_id} ({similarity:.0%})" for prompt, similarity in duplicates))
+        doc_id = self.repo.add_prompt(title, category, platform, tags, prompt_text, language, purpose, notes)
+        return doc_id, duplicates
+
+    def create_prompts_bulk(self, records: Iterable[Dict]) -> List[int]:
+        """
+        Validiert alle Datensätze und speichert sie mit einem einzigen Schreibvorgang.
+
+        :param records: Prompt-Datensätze (Text unter ``prompt``).
+        :return: Dokument-IDs in Eingabereihenfolge.
+        :raises BulkValidationError: Wenn mindestens ein Datensatz ungültig ist; dann wird nichts gespeichert.
+        """
+        records = list(records)
+        errors = [(position, message)
+                  for position, record in enumerate(records)
+                  for message in validate_prompt_record(record)]
+        if errors:
+            logger.error("Massenimport abgelehnt: %d Fehler", len(errors))
+            raise BulkValidationError(errors)
+        doc_ids = self.repo.add_prompts(records)
+        logger.info("%d Prompts gespeichert", len(doc_ids))
+        return doc_ids
+
+    def update_many(self, updates: Dict[int, Dict],
+                    expected_revisions: Optional[Dict[int, int]] = None) -> List[int]:
+        """
+        Validiert und aktualisiert mehrere Prompts mit einem einzigen Schreibvorgang.
+
+        :param updates: Zuordnung Dokument-ID → zu aktualisierende Felder.
+        :param expected_revisions: (Optional) Zuordnung Dokument-ID → erwartete Revision.
+        :return: IDs der tatsächlich aktualisierten Prompts.
+        :raises BulkValidationError: Wenn mindestens ein Update ungültig ist; dann wird nichts geändert.
+        :raises RevisionConflictError: Wenn ein Prompt inzwischen geändert wurde; dann wird nichts geändert.
+        """
+        errors = [(doc_id, message)
+                  for doc_id, updated_data in updates.items()
+                  for message in validate_prompt_record(updated_data, partial=True)]
+        if errors:
+            logger.error("Massenänderung abgelehnt: %d Fehler", len(errors))
+            raise BulkValidationError(errors)
+        return self.repo.update_prompts(updates, expected_revisions)
 
-    def get_all_prompts(self) -> List[Dict]:
+    def delete_many(self, doc_ids: Iterable[int]) -> List[int]:
+        """Löscht mehrere Prompts mit einem einzigen Schreibvorgang."""
+        return self.repo.delete_prompts(doc_ids)
+
+    def import_prompts(self, source: Union[str, TextIO, io.BufferedIOBase], fmt: Optional[str] = None,
+                       batch_size: int = DEFAULT_IMPORT_BATCH_SIZE) -> ImportReport:
+        """
+        Importiert Prompts streamend aus einer CSV- oder JSONL-Quelle.
+
+        Die Quelle wird zeilenweise gelesen; gültige Datensätze werden in Blöcken
+        zu je ``batch_size`` mit einem Schreibvorgang gespeichert, ungültige
+        Zeilen übersprungen und mit Zeilennummer gemeldet.
+
+        :param source: Dateipfad oder geöffnete Datei (Text oder Binär, UTF-8).
+        :param fmt: "csv" oder "jsonl"; bei Dateipfaden aus der Endung ermittelt.
+        :param batch_size: Anzahl Datensätze pro Schreibvorgang.
+        :return: ImportReport mit Anzahl importierter Prompts und Zeilenfehlern.
+        """
+        if isinstance(source, str):
+            fmt = fmt or detect_import_format(source)
+            with open(source, "r", encoding="utf-8", newline="") as stream:
+                return self._import_stream(stream, fmt, batch_size)
+        if fmt is None:
+            fmt = detect_import_format(getattr(source, "name", ""))
+        if not isinstance(source, io.TextIOBase):
+            source = io.TextIOWrapper(source, encoding="utf-8", newline="")
+        return self._import_stream(source, fmt, batch_size)
+
+    def _import_stream(self, stream: TextIO, fmt: str, batch_size: int) -> ImportReport:
+        imported = 0
+        errors: List[Tuple[int, str]] = []
+        batch: List[Dict] = []
+        for line_no, record, error in iter_import_records(stream, fmt):
+            if error is None:
+                problems = validate_prompt_record(record)
+                error = " ".join(problems) if problems else None
+            if error is not None:
+                errors.append((line_no, error))
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                imported += len(self.repo.add_prompts(batch))
+                batch = []
+        if batch:
+            imported += len(self.repo.add_prompts(batch))
+        logger.info("Import abgeschlossen: %d Prompts, %d Fehler", imported, len(errors))
+        return ImportReport(imported, errors)
+
+    def get_all_prompts(self) -> List[Prompt]:
         """Gibt alle gespeicherten Prompts zurück."""
         return self.repo.get_all_prompts()
 
+    def get_prompt(self, doc_id: int) -> Optional[Prompt]:
+        """Gibt einen einzelnen Prompt zurück (None, wenn die ID unbekannt ist)."""
+        return self._cached(("get", doc_id), lambda: self.repo.get_prompt(doc_id))
+
+    def iter_prompts(self, **filters) -> Iterator[Prompt]:
+        """
+        Iteriert über alle (bzw. die gefilterten) Prompts.
+
+        Gefilterte Abfragen laufen genau einmal; Seiten per ``offset`` würden die
+        Abfrage je Seite wiederholen und sich bei gleichzeitigen Schreibvorgängen
+        verschieben.
+
+        :param filters: Filterargumente wie bei ``query_prompts``.
+        :return: Iterator über Prompt-Datensätze, z. B. für streamende Exporte.
+        """
+        if not any(value for key, value in filters.items() if key in FILTER_ARGUMENTS):
+            return self.repo.iter_prompts()
+        return iter(self.repo.query_prompts(limit=None, **filters).items)
+
     def search_prompts(self, keyword: str = "", category: Optional[str] = None,
-                       tags: Optional[List[str]] = None) -> List[Dict]:
-        """Sucht nach Prompts anhand von Stichwort, Kategorie und Tags."""
-        return self.repo.search_prompts(keyword, category, tags)
+                       tags: Optional[List[str]] = None,
+                       mode: str = SEARCH_MODE_KEYWORD, limit: Optional[int] = None) -> List[Prompt]:
+        """Sucht nach Prompts anhand von Stichwort, Kategorie und Tags (beste Treffer zuerst)."""
+        key = ("search", keyword, category, tuple(tags or ()), mode, limit)
+        return self._cached(key, lambda: self.repo.search_prompts(keyword, category, tags, mode, limit))
 
-    def update_prompt(self, doc_id: int, updated_data: Dict) -> None:
-        """Aktualisiert einen bestehenden Prompt."""
+    def query_prompts(self, keyword: str = "", category: Optional[str] = None,
+                      tags: Optional[List[str]] = None, platform: Optional[str] = None,
+                      language: Optional[str] = None, purpose: Optional[str] = None,
+                      mode: str = SEARCH_MODE_KEYWORD, sort_by: str = "doc_id",
+                      descending: bool = False, limit: Optional[int] = None,
+                      offset: int = 0) -> QueryResult:
+        """Kombinierte Abfrage über alle Filterfelder mit Sortierung und Seitenbildung."""
+        key = ("query", keyword, category, tuple(tags or ()), platform, language, purpose,
+               mode, sort_by, descending, limit, offset)
+        return self._cached(key, lambda: self.repo.query_prompts(
+            keyword=keyword, category=category, tags=tags, platform=platform,
+            language=language, purpose=purpose, mode=mode, sort_by=sort_by,
+            descending=descending, limit=limit, offset=offset
+        ))
+
+    def update_prompt(self, doc_id: int, updated_data: Dict, expected_revision: Optional[int] = None) -> None:
+        """
+        Aktualisiert einen bestehenden Prompt.
+
+        :param expected_revision: (Optional) Revision, die der Aufrufer zuletzt gelesen hat.
+        :raises RevisionConflictError: Wenn der Prompt inzwischen geändert wurde.
+        """
         if "title" in updated_data and not updated_data["title"].strip():
             logger.error("Titel darf nicht leer sein.")
             raise ValueError("Titel darf nicht leer sein.")
         if "prompt" in updated_data and not updated_data["prompt"].strip():
             logger.error("Prompt-Text darf nicht leer sein.")
             raise ValueError("Prompt-Text darf nicht leer sein.")
-        self.repo.update_prompt(doc_id, updated_data)
+        self.repo.update_prompt(doc_id, updated_data, expected_revision)
 
     def delete_prompt(self, doc_id: int) -> None:
         """Löscht einen Prompt anhand der Dokument-ID."""
         self.repo.delete_prompt(doc_id)
 
+    def find_near_duplicates(self, prompt_text: str, exclude_id: Optional[int] = None,
+                             limit: int = DUPLICATE_WARNING_LIMIT) -> List[Tuple[Prompt, float]]:
+        """
+        Sucht wahrscheinliche Duplikate eines Prompt-Textes.
+
+        :param prompt_text: Zu prüfender Prompt-Text.
+        :param exclude_id: (Optional) ID des Prompts selbst, z. B. direkt nach dem Speichern.
+        :param limit: Höchstens so viele Treffer.
+        :return: (Prompt, geschätzte Ähnlichkeit), ähnlichste zuerst.
+        """
+        matches = self.repo.find_near_duplicates(prompt_text, exclude_id=exclude_id, limit=limit)
+        return list(zip(self.repo.get_prompts(doc_id for doc_id, _ in matches), (s for _, s in matches)))
+
+    def find_similar_prompts(self, doc_ids: Iterable[int],
+                             limit: int = DEFAULT_SIMILAR_LIMIT) -> Dict[int, List[Tuple[Prompt, float]]]:
+        """
+        Liefert zu mehreren Prompts die inhaltlich ähnlichsten in einer Abfrage.
+
+        :param doc_ids: IDs der Prompts, z. B. der aufgeklappten Einträge einer Seite.
+        :param limit: Anzahl der ähnlichen Prompts je Eintrag.
+        :return: Zuordnung ID → [(Prompt, Ähnlichkeit)], ähnlichste zuerst.
+        """
+        doc_ids = tuple(doc_ids)
+
+        def compute():
+            neighbours = self.repo.find_similar_prompts(doc_ids, limit)
+            prompts = {prompt.doc_id: prompt for prompt in self.repo.get_prompts(
+                {other_id for matches in neighbours.values() for other_id, _ in matches})}
+            return {doc_id: [(prompts[other_id], similarity) for other_id, similarity in matches]
+                    for doc_id, matches in neighbours.items()}
+        return self._cached(("similar", doc_ids, limit), compute)
+
+    def find_duplicate_clusters(self, threshold: Optional[float] = None) -> List[List[Prompt]]:
+        """
+        Bericht über alle Gruppen nahezu identischer Prompts der Datenbank.
+
+        :param threshold: (Optional) Mindestähnlichkeit, Standard 0.6.
+        :return: Cluster aus mindestens zwei Prompts.
+        """
+        def compute():
+            clusters = self.repo.find_duplicate_clusters(threshold)
+            prompts = {prompt.doc_id: prompt for prompt in
+                       self.repo.get_prompts(doc_id for cluster in clusters for doc_id in cluster)}
+            return [[prompts[doc_id] for doc_id in cluster] for cluster in clusters]
+        return self._cached(("duplicate_clusters", threshold), compute)
+
     def get_all_categories(self) -> List[str]:
         """Gibt alle eindeutigen Kategorien zurück."""
-        return self.repo.get_all_categories()
+        return self._cached(("categories",), self.repo.get_all_categories)
 
     def get_all_tags(self) -> List[str]:
         """Gibt alle eindeutigen Tags zurück."""
-        return self.repo.get_all_tags()
+        return self._cached(("tags",), self.repo.get_all_tags)
+
+    def get_distinct_values(self, field: str) -> List[str]:
+        """Gibt alle eindeutigen Werte eines indizierten Feldes zurück."""
+        return self._cached(("distinct", field), lambda: self.repo.get_distinct_values(field))
+
+    def checkpoint(self) -> None:
+        """Schreibt ausstehende Journal-Einträge in die Datenbankdatei (z. B. vor Backups)."""
+        self.repo.checkpoint()
+
+    def close(self) -> None:
+        """Speichert die Suchindizes des Repositorys und schließt die Datenbank."""
+        self.repo.close()
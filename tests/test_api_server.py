@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from api.server import PromptApiServer
+from models.prompt_model import PromptRepository
+from services.prompt_service import PromptService
+
+TEST_DB_PATH = "test_api_database.json"
+TEST_INDEX_PATH = "test_api_database.index.json"
+
+
+class TestApiServer(unittest.TestCase):
+    def setUp(self):
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.server = PromptApiServer(PromptService(self.repo), port=0)
+        self.loop = asyncio.new_event_loop()
+        host, port = self.loop.run_until_complete(self.server.start())
+        self.base_url = f"http://{host}:{port}"
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+        self.loop.close()
+        self.repo.close()
+        for path in (TEST_DB_PATH, TEST_DB_PATH + ".lock", TEST_INDEX_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def request(self, method, path, payload=None, headers=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def create(self, title, **fields):
+        status, _, body = self.request("POST", "/prompts", dict(title=title, prompt=f"Text {title}", **fields))
+        self.assertEqual(status, 201)
+        return json.loads(body)["id"]
+
+    def test_crud_and_validation(self):
+        """Anlegen, Lesen, Ändern, Löschen sowie 400/404-Antworten"""
+        doc_id = self.create("Newsletter", tags=["mail"])
+        status, _, body = self.request("GET", f"/prompts/{doc_id}")
+        self.assertEqual((status, json.loads(body)["tags"]), (200, ["mail"]))
+
+        status, headers, body = self.request("PATCH", f"/prompts/{doc_id}", {"title": "Rundbrief"},
+                                             headers={"If-Match": '"1"'})
+        self.assertEqual((status, json.loads(body)["title"], headers["ETag"]), (200, "Rundbrief", '"2"'))
+        status, _, body = self.request("PATCH", f"/prompts/{doc_id}", {"title": "Veraltet"},
+                                       headers={"If-Match": '"1"'})
+        self.assertEqual((status, json.loads(body)["revision"]), (409, 2))
+
+        self.assertEqual(self.request("POST", "/prompts", {"title": " ", "prompt": "x"})[0], 400)
+        self.assertEqual(self.request("POST", "/prompts", {"title": "a", "prompt": "x", "foo": 1})[0], 400)
+        self.assertEqual(self.request("PATCH", "/prompts/999", {"title": "x"})[0], 404)
+        self.assertEqual(self.request("GET", "/unbekannt")[0], 404)
+        self.assertEqual(self.request("PUT", "/prompts")[0], 405)
+
+        self.assertEqual(self.request("DELETE", f"/prompts/{doc_id}")[0], 204)
+        self.assertEqual(self.request("GET", f"/prompts/{doc_id}")[0], 404)
+        self.assertEqual(self.request("DELETE", f"/prompts/{doc_id}")[0], 404)
+
+    def test_list_pages_as_json_and_ndjson(self):
+        """Seitenweise Abfrage mit next_offset bzw. Link-Header bei NDJSON"""
+        status, _, body = self.request("POST", "/prompts", [
+            {"title": f"Newsletter {i}", "prompt": "Text", "category": "A" if i % 2 else "B"} for i in range(5)])
+        self.assertEqual(len(json.loads(body)["ids"]), 5)
+
+        page = json.loads(self.request("GET", "/prompts?category=A&limit=1")[2])
+        self.assertEqual((page["total"], page["next_offset"], len(page["items"])), (2, 1, 1))
+
+        status, headers, body = self.request("GET", "/prompts?q=newsletter&limit=2&offset=2",
+                                             headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body.decode("utf-8").splitlines()), 2)
+        self.assertEqual((headers["X-Total-Count"], headers["X-Next-Offset"]), ("5", "4"))
+        self.assertIn("offset=4", headers["Link"])
+        self.assertEqual(self.request("GET", "/prompts?limit=abc")[0], 400)
+
+    def test_list_version_matches_result(self):
+        """Ändert ein Schreibvorgang die Daten während der Abfrage, wird sie mit der neuen Version wiederholt"""
+        self.create("Erster")
+        service = self.server.service
+        original = service.query_prompts
+        calls = []
+
+        def query_with_concurrent_write(**kwargs):
+            if not calls:
+                self.repo.add_prompt("Zweiter", "A", "ChatGPT", [], "Text", "", "", "")
+            calls.append(kwargs)
+            return original(**kwargs)
+
+        with mock.patch.object(service, "query_prompts", side_effect=query_with_concurrent_write):
+            page = json.loads(self.request("GET", "/prompts")[2])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((page["total"], page["data_version"]), (2, service.get_data_version()))
+
+    def test_streaming_export(self):
+        """Export wird als (optional komprimierter) Datenstrom ausgeliefert"""
+        self.create("A", category="X")
+        self.create("B", category="Y")
+        status, _, body = self.request("GET", "/export?format=ndjson&category=X&gzip=1")
+        self.assertEqual(status, 200)
+        lines = gzip.decompress(body).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["A"])
+        self.assertEqual(self.request("GET", "/export?format=xml")[0], 400)
+
+    def test_concurrent_writes_are_serialized(self):
+        """Parallele Schreib- und Leseanfragen führen zu eindeutigen IDs und vollständigem Bestand"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(lambda i: self.create(f"Prompt {i}"), range(20)))
+            reads = list(pool.map(lambda i: self.request("GET", "/prompts?limit=1")[0], range(20)))
+        self.assertEqual(len(set(ids)), 20)
+        self.assertEqual(set(reads), {200})
+        self.assertEqual(json.loads(self.request("GET", "/prompts")[2])["total"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from utils.background_job import DONE, FAILED, BackgroundJob, get_job, start_job
+
+
+class TestBackgroundJob(unittest.TestCase):
+    def test_status_reports_progress_and_result(self):
+        """Fortschritt ist während des Laufs abrufbar, danach das Ergebnis"""
+        proceed = threading.Event()
+        reported = threading.Event()
+
+        def task(progress):
+            progress("Sichern", 1, 4)
+            reported.set()
+            proceed.wait(5)
+            return "fertig"
+
+        job = BackgroundJob("test", task).start()
+        self.assertTrue(reported.wait(5))
+        status = job.status()
+        self.assertTrue(job.running)
+        self.assertEqual((status["phase"], status["progress"]), ("Sichern", 0.25))
+        proceed.set()
+        self.assertEqual(job.wait(5), "fertig")
+        self.assertEqual((job.status()["state"], job.status()["progress"]), (DONE, 1.0))
+
+    def test_failure_is_reported(self):
+        """Eine Ausnahme beendet die Aufgabe mit Zustand failed"""
+        def task(progress):
+            raise ValueError("kaputt")
+
+        job = BackgroundJob("test", task).start()
+        with self.assertRaises(RuntimeError):
+            job.wait(5)
+        self.assertEqual((job.status()["state"], job.status()["error"]), (FAILED, "kaputt"))
+
+    def test_start_job_reuses_running_job(self):
+        """Solange eine Aufgabe läuft, startet derselbe Schlüssel keine zweite"""
+        proceed = threading.Event()
+        first = start_job("test-reuse", lambda progress: proceed.wait(5))
+        second = start_job("test-reuse", lambda progress: None)
+        self.assertIs(first, second)
+        proceed.set()
+        first.wait(5)
+        third = start_job("test-reuse", lambda progress: "neu")
+        self.assertIsNot(third, first)
+        self.assertEqual(third.wait(5), "neu")
+        self.assertIs(get_job("test-reuse"), third)
+
+
+if __name__ == "__main__":
+    unittest.main()
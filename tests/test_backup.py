@@ -0,0 +1,202 @@
+import io
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import utils.backup as backup
+from models.sqlite_repository import SQLitePromptRepository
+
+from utils.backup import (COMPRESSION, apply_retention, backup_database, iter_chunks, list_backups, load_manifest,
+                          restore_backup, run_backup, select_backups_to_keep, verify_backup, _chunk_path)
+
+TEST_DB_PATH = "test_backup_database.json"
+TEST_BACKUP_DIR = "test_backups"
+TEST_RESTORE_PATH = "test_backup_restored.json"
+TEST_SQLITE_PATH = "test_backup_database.sqlite3"
+
+
+def _database(count, changed=None):
+    documents = {str(i): {"title": f"Titel {i}", "prompt": f"Prompt Nummer {i} " * 8, "tags": ["a", "b"]}
+                 for i in range(1, count + 1)}
+    if changed:
+        documents[str(changed)]["title"] = "Geändert"
+    return json.dumps({"_default": documents}).encode("utf-8")
+
+
+class TestBackup(unittest.TestCase):
+    def setUp(self):
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    @staticmethod
+    def _cleanup():
+        shutil.rmtree(TEST_BACKUP_DIR, ignore_errors=True)
+        for path in (TEST_DB_PATH, TEST_DB_PATH + ".bodies", TEST_DB_PATH + ".bodies.1", TEST_DB_PATH + ".lock",
+                     TEST_RESTORE_PATH, TEST_RESTORE_PATH + ".bodies", TEST_RESTORE_PATH + ".bodies.1",
+                     TEST_RESTORE_PATH + ".lock", TEST_SQLITE_PATH, TEST_SQLITE_PATH + "-wal",
+                     TEST_SQLITE_PATH + "-shm", TEST_SQLITE_PATH + ".similar.json",
+                     TEST_SQLITE_PATH + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write(self, data, suffix=""):
+        with open(TEST_DB_PATH + suffix, "wb") as f:
+            f.write(data)
+
+    def test_chunks_resynchronize_after_local_change(self):
+        """Eine Änderung betrifft nur die Chunks in ihrer Umgebung"""
+        original = list(iter_chunks(io.BytesIO(_database(3000))))
+        changed = list(iter_chunks(io.BytesIO(_database(3000, changed=1500))))
+        self.assertEqual(b"".join(original), _database(3000))
+        self.assertGreater(len(original), 10)
+        self.assertLessEqual(len(set(changed) - set(original)), 2)
+
+    def test_incremental_backup_stores_only_changes(self):
+        """Ein zweites Backup speichert nur neue Chunks, ein unverändertes gar keine"""
+        self._write(_database(3000))
+        first = load_manifest(backup_database(TEST_DB_PATH, TEST_BACKUP_DIR))
+        self._write(_database(3000, changed=1500))
+        second = load_manifest(backup_database(TEST_DB_PATH, TEST_BACKUP_DIR))
+        third = load_manifest(backup_database(TEST_DB_PATH, TEST_BACKUP_DIR))
+        self.assertEqual(first["new_bytes"], len(_database(3000)))
+        self.assertLess(first["stored_bytes"], first["new_bytes"] / 3)
+        self.assertLess(second["new_bytes"], first["new_bytes"] / 5)
+        self.assertEqual(third["new_chunks"], 0)
+        self.assertEqual(len(list_backups(TEST_BACKUP_DIR)), 3)
+
+    def test_restore_roundtrip_with_companion_file(self):
+        """Wiederherstellung liefert Datenbank und Blob-Datei des Backups zurück"""
+        self._write(_database(100))
+        self._write(b"Texte", ".bodies")
+        manifest = backup_database(TEST_DB_PATH, TEST_BACKUP_DIR)
+        with open(TEST_RESTORE_PATH + ".bodies", "wb") as f:
+            f.write(b"veraltet")
+        restore_backup(manifest, TEST_RESTORE_PATH)
+        with open(TEST_RESTORE_PATH, "rb") as f:
+            self.assertEqual(f.read(), _database(100))
+        with open(TEST_RESTORE_PATH + ".bodies", "rb") as f:
+            self.assertEqual(f.read(), b"Texte")
+
+        os.remove(TEST_DB_PATH + ".bodies")
+        self._write(b"Kompaktiert", ".bodies.1")
+        restore_backup(backup_database(TEST_DB_PATH, TEST_BACKUP_DIR), TEST_RESTORE_PATH)
+        self.assertFalse(os.path.exists(TEST_RESTORE_PATH + ".bodies"))
+        with open(TEST_RESTORE_PATH + ".bodies.1", "rb") as f:
+            self.assertEqual(f.read(), b"Kompaktiert")
+
+    def test_verify_detects_corrupt_chunk(self):
+        """Ein beschädigter Chunk wird erkannt und verhindert die Wiederherstellung"""
+        self._write(_database(100))
+        manifest = backup_database(TEST_DB_PATH, TEST_BACKUP_DIR)
+        self.assertEqual(verify_backup(manifest), [])
+        digest = load_manifest(manifest)["files"][0]["chunks"][0]
+        with open(_chunk_path(TEST_BACKUP_DIR, digest, COMPRESSION), "ab") as f:
+            f.write(b"x")
+        self.assertEqual(len(verify_backup(manifest)), 1)
+        with self.assertRaises(ValueError):
+            restore_backup(manifest, TEST_RESTORE_PATH)
+        self.assertFalse(os.path.exists(TEST_RESTORE_PATH))
+
+    def test_parallel_verify_reports_progress(self):
+        """Die parallele Prüfung meldet jeden Chunk und erkennt fehlende Chunks"""
+        self._write(_database(3000))
+        manifest = backup_database(TEST_DB_PATH, TEST_BACKUP_DIR)
+        chunks = load_manifest(manifest)["files"][0]["chunks"]
+        reports = []
+        self.assertEqual(verify_backup(manifest, workers=4, progress=lambda *args: reports.append(args)), [])
+        self.assertEqual(reports[-1], ("Prüfen", len(set(chunks)), len(set(chunks))))
+        os.remove(_chunk_path(TEST_BACKUP_DIR, chunks[-1], COMPRESSION))
+        self.assertEqual(verify_backup(manifest, workers=4), [f"Chunk {chunks[-1]} fehlt"])
+
+    def test_sqlite_backup_is_consistent_during_writes(self):
+        """Ein SQLite-Backup enthält das WAL und bleibt bei gleichzeitigen Schreibvorgängen konsistent"""
+        repo = SQLitePromptRepository(TEST_SQLITE_PATH)
+        for i in range(50):
+            repo.add_prompt(f"Titel {i}", "A", "ChatGPT", ["x"], "Text " * 50, "de", "", "")
+        self.assertGreater(os.path.getsize(TEST_SQLITE_PATH + "-wal"), 0)
+
+        writing = threading.Event()
+        stop = threading.Event()
+
+        def writer():
+            while not stop.is_set():
+                repo.add_prompt("Nebenläufig", "B", "ChatGPT", ["y"], "Text " * 50, "de", "", "")
+                writing.set()
+
+        def store_while_writing(*args, **kwargs):
+            writing.clear()
+            writing.wait(5)
+            return store_file(*args, **kwargs)
+
+        store_file = backup._store_file
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            with mock.patch.object(backup, "_store_file", side_effect=store_while_writing):
+                manifest = backup_database(TEST_SQLITE_PATH, TEST_BACKUP_DIR)
+        finally:
+            stop.set()
+            thread.join()
+            repo.close()
+
+        self.assertEqual(verify_backup(manifest), [])
+        restore_backup(manifest, TEST_SQLITE_PATH)
+        self.assertFalse(os.path.exists(TEST_SQLITE_PATH + "-wal"))
+        conn = sqlite3.connect(TEST_SQLITE_PATH)
+        try:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM prompts WHERE category = 'A'").fetchone()[0], 50)
+        finally:
+            conn.close()
+        restored = SQLitePromptRepository(TEST_SQLITE_PATH)
+        try:
+            self.assertEqual(len(restored.search_prompts("titel")), 50)
+        finally:
+            restored.close()
+
+    def test_select_backups_to_keep(self):
+        """Je Stunde, Tag und Woche bleibt das jüngste Backup erhalten"""
+        now = datetime(2025, 8, 1, 12, 30)
+        created = {f"h{i}": now - timedelta(minutes=20 * i) for i in range(6)}
+        created.update({f"d{i}": now - timedelta(days=i, hours=3) for i in range(1, 10)})
+        keep = select_backups_to_keep(created, keep_hourly=2, keep_daily=3, keep_weekly=0)
+        self.assertEqual(keep, {"h0", "h2", "d1", "d2"})
+        self.assertEqual(select_backups_to_keep(created, 0, 0, 0), {"h0"})
+
+    def test_retention_removes_manifests_and_unreferenced_chunks(self):
+        """Gelöschte Backups geben ihre Chunks frei; das neueste bleibt wiederherstellbar"""
+        for count in (500, 1000, 1500):
+            self._write(_database(count))
+            backup_database(TEST_DB_PATH, TEST_BACKUP_DIR)
+        for age, path in enumerate(reversed(list_backups(TEST_BACKUP_DIR))):
+            data = load_manifest(path)
+            data["created"] = (datetime(2025, 8, 1) - timedelta(days=age)).strftime("%Y-%m-%d %H:%M:%S")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        removed = apply_retention(TEST_BACKUP_DIR, keep_hourly=0, keep_daily=1, keep_weekly=0)
+        self.assertEqual(len(removed), 2)
+        newest = list_backups(TEST_BACKUP_DIR)
+        self.assertEqual(len(newest), 1)
+        chunk_files = [name for _, _, names in os.walk(os.path.join(TEST_BACKUP_DIR, "chunks")) for name in names]
+        self.assertEqual(len(chunk_files), len(set(load_manifest(newest[0])["files"][0]["chunks"])))
+        self.assertEqual(verify_backup(newest[0]), [])
+
+    def test_run_backup_reports_phases(self):
+        """Sichern, Prüfen und Aufräumen in einem Aufruf mit Fortschrittsmeldungen"""
+        self._write(_database(1000))
+        phases = []
+        result = run_backup(TEST_DB_PATH, TEST_BACKUP_DIR, progress=lambda phase, done, total: phases.append(phase))
+        self.assertEqual(result["problems"], [])
+        self.assertTrue(os.path.exists(result["manifest"]))
+        self.assertEqual(sorted(set(phases), key=phases.index), ["Sichern", "Prüfen", "Aufräumen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
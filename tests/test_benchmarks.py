@@ -0,0 +1,37 @@
+import unittest
+from benchmarks.corpus import generate_prompts
+from benchmarks.memory_footprint import measure_memory
+from benchmarks.run_benchmarks import compare_with_baseline, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        """Gleicher Seed erzeugt denselben Bestand mit Platzhaltern"""
+        first = list(generate_prompts(50, seed=7))
+        self.assertEqual(first, list(generate_prompts(50, seed=7)))
+        self.assertNotEqual(first, list(generate_prompts(50, seed=8)))
+        self.assertTrue(any("[" in record["prompt"] for record in first))
+        self.assertEqual({record["language"] for record in first}, {"Deutsch", "Englisch"})
+
+    def test_small_run_and_baseline_comparison(self):
+        """Ein Mini-Lauf liefert alle Operationen; langsamere Mediane werden gemeldet"""
+        results = run_benchmarks([30], repeat=2)
+        operations = results["results"]["30"]
+        for name in ("add_prompt", "search_keyword", "search_tags", "update_prompt",
+                     "delete_prompt", "get_all_tags", "export_csv", "backup"):
+            self.assertIn("median_ms", operations[name])
+        self.assertEqual(compare_with_baseline(results, results), [])
+
+        baseline = {"results": {"30": {"search_keyword": {"median_ms": 1e-6}, "unbekannt": {"median_ms": 1.0}}}}
+        regressions = compare_with_baseline(results, baseline, tolerance=0.5)
+        self.assertEqual([r.operation for r in regressions], ["search_keyword"])
+
+    def test_prompt_records_use_less_memory(self):
+        """Prompt-Datensätze belegen weniger Speicher als TinyDB-Documents"""
+        result = measure_memory(300)
+        self.assertLess(result["prompt_bytes"], result["document_bytes"])
+        self.assertGreater(result["reduction_percent"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
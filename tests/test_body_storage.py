@@ -0,0 +1,121 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from tinydb import TinyDB
+from models.body_storage import BodyStorage, LazyText, body_generations, body_path_for
+from models.prompt_model import PromptRepository
+
+TEST_DB_PATH = "test_body_database.json"
+TEST_FILES = [
+    TEST_DB_PATH,
+    "test_body_database.index.json",
+    "test_body_database.similar.json",
+    TEST_DB_PATH + ".lock",
+]
+
+
+class TestBodyStorage(unittest.TestCase):
+    def setUp(self):
+        self._cleanup()
+        self.repo = PromptRepository(TEST_DB_PATH, storage=BodyStorage)
+
+    def tearDown(self):
+        try:
+            self.repo.close()
+        finally:
+            self._cleanup()
+
+    @staticmethod
+    def _cleanup():
+        for path in TEST_FILES + list(body_generations(TEST_DB_PATH).values()):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _reopen(self, **options):
+        self.repo.close()
+        self.repo = PromptRepository(TEST_DB_PATH, storage=BodyStorage, **options)
+
+    def test_metadata_file_contains_no_body_text(self):
+        """Prompt-Text und Notizen liegen nur in der Blob-Datei"""
+        doc_id = self.repo.add_prompt("Titel", "A", "ChatGPT", ["x"], "Langer Prompt-Text", "de", "", "Notiz")
+        with open(TEST_DB_PATH, encoding="utf-8") as f:
+            metadata = f.read()
+        self.assertNotIn("Langer Prompt-Text", metadata)
+        self.assertNotIn("Notiz", metadata)
+        self._reopen()
+        prompt = self.repo.get_prompt(doc_id)
+        self.assertEqual((prompt["title"], prompt["prompt"], prompt["notes"]), ("Titel", "Langer Prompt-Text", "Notiz"))
+
+    def test_list_and_filter_do_not_load_bodies(self):
+        """Gefilterte, sortierte Listenseiten lesen keinen Prompt-Text"""
+        self.repo.add_prompts({"title": f"T{i}", "category": "A" if i % 2 else "B", "prompt": f"Text {i}"}
+                              for i in range(20))
+        self._reopen()
+        with mock.patch.object(LazyText, "load", autospec=True, side_effect=LazyText.load) as load:
+            result = self.repo.query_prompts(category="A", sort_by="title", limit=5)
+            titles = [p["title"] for p in result.items]
+            self.repo.get_all_prompts()
+            self.assertEqual(load.call_count, 0)
+            self.assertEqual(result.items[0]["prompt"], "Text 1")
+            self.assertEqual(load.call_count, 1)
+        self.assertEqual((titles, result.total), (["T1", "T11", "T13", "T15", "T17"], 10))
+
+    def test_update_replaces_body_and_search_sees_it(self):
+        """Geänderte Texte werden angehängt; Suche und unscharfe Suche finden sie"""
+        doc_id = self.repo.add_prompt("Titel", "A", "ChatGPT", [], "alter Text", "de", "", "")
+        self.repo.update_prompt(doc_id, {"prompt": "neuer Inhalt"})
+        self.repo.update_prompt(doc_id, {"title": "Anderer Titel"})
+        self._reopen()
+        self.assertEqual(self.repo.get_prompt(doc_id)["prompt"], "neuer Inhalt")
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("inhalt")], [doc_id])
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("inhallt", mode="fuzzy")], [doc_id])
+
+    def test_existing_json_database_is_migrated(self):
+        """Eine bestehende TinyDB-JSON-Datei bleibt lesbar und wird beim ersten Schreiben aufgeteilt"""
+        self.repo.close()
+        self._cleanup()
+        with TinyDB(TEST_DB_PATH) as db:
+            db.insert({"title": "Alt", "category": "A", "prompt": "eingebetteter Text", "notes": "", "tags": []})
+        self.repo = PromptRepository(TEST_DB_PATH, storage=BodyStorage)
+        self.assertEqual(self.repo.get_prompt(1)["prompt"], "eingebetteter Text")
+        self.repo.add_prompt("Neu", "A", "ChatGPT", [], "zweiter Text", "de", "", "")
+        with open(TEST_DB_PATH, encoding="utf-8") as f:
+            self.assertNotIn("eingebetteter Text", f.read())
+        self.assertEqual([p["prompt"] for p in self.repo.get_all_prompts()], ["eingebetteter Text", "zweiter Text"])
+
+    def test_compact_drops_stale_bodies(self):
+        """Die Kompaktierung entfernt überschriebene Texte; gelesene Prompts bleiben gültig"""
+        doc_id = self.repo.add_prompt("Titel", "A", "ChatGPT", [], "x" * 1000, "de", "", "")
+        self.repo.update_prompt(doc_id, {"prompt": "kurz"})
+        stale = self.repo.get_prompt(doc_id)
+        self.assertEqual(os.path.getsize(body_path_for(TEST_DB_PATH)), 1004)
+        self.repo.checkpoint()
+        self.assertEqual(list(body_generations(TEST_DB_PATH)), [1])
+        self.assertEqual(os.path.getsize(body_path_for(TEST_DB_PATH, 1)), 4)
+        self.assertEqual(stale["prompt"], "kurz")
+        self.assertEqual(self.repo.get_prompt(doc_id)["prompt"], "kurz")
+        with open(TEST_DB_PATH, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["_default"][str(doc_id)]["_body"], {"prompt": [0, 4]})
+
+    def test_crash_during_compaction_keeps_old_layout_readable(self):
+        """Ein Absturz zwischen neuer Blob-Datei und Metadaten lässt die alten Verweise gültig"""
+        doc_id = self.repo.add_prompt("Titel", "A", "ChatGPT", [], "x" * 1000, "de", "", "Notiz")
+        self.repo.update_prompt(doc_id, {"prompt": "kurzer Text"})
+        with mock.patch.object(BodyStorage, "_write_metadata", side_effect=OSError("Absturz")):
+            with self.assertRaises(OSError):
+                self.repo.checkpoint()
+        self.assertEqual(sorted(body_generations(TEST_DB_PATH)), [0, 1])
+        self._reopen()
+        prompt = self.repo.get_prompt(doc_id)
+        self.assertEqual((prompt["prompt"], prompt["notes"]), ("kurzer Text", "Notiz"))
+
+        self.repo.checkpoint()
+        self.assertEqual(list(body_generations(TEST_DB_PATH)), [1])
+        self._reopen()
+        self.assertEqual(self.repo.get_prompt(doc_id)["prompt"], "kurzer Text")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Das Skript richtet beim Import ein Logging in cleanup.log ein; im Test nicht.
+with mock.patch("logging.basicConfig"):
+    cleanup = importlib.import_module("tools.cleanup_suggestions")
+
+TEST_PROJECT_DIR = "test_cleanup_project"
+# Außerhalb des Projekts, sonst ändert das Schreiben des Caches die mtime der Wurzel.
+TEST_CACHE_PATH = os.path.abspath("test_cleanup_scan_cache.json")
+SCRIPT_PATH = os.path.abspath(cleanup.__file__)
+
+
+class TestCleanupSuggestions(unittest.TestCase):
+    def setUp(self):
+        self.tearDown()
+        for path in ("main.py", "a/old_helper.py", "a/b/demo.py", ".git/tmp_hook.py", "notes_tmp.txt"):
+            self._write(path)
+        self._settle()
+
+    def tearDown(self):
+        shutil.rmtree(TEST_PROJECT_DIR, ignore_errors=True)
+        if os.path.exists(TEST_CACHE_PATH):
+            os.remove(TEST_CACHE_PATH)
+
+    @staticmethod
+    def _write(path, content="x = 1\n"):
+        full_path = os.path.join(TEST_PROJECT_DIR, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    @staticmethod
+    def _settle():
+        """Setzt alle Verzeichnis-mtimes vor das Racy-Fenster, damit der Cache sie übernehmen darf."""
+        old_ns = time.time_ns() - 2 * cleanup.RACY_WINDOW_NS
+        for directory, _, _ in os.walk(TEST_PROJECT_DIR):
+            os.utime(directory, ns=(old_ns, old_ns))
+
+    def _scan(self):
+        candidates, stats = cleanup.scan_candidates(TEST_PROJECT_DIR, cache_file=TEST_CACHE_PATH)
+        names = sorted(os.path.relpath(path, TEST_PROJECT_DIR).replace("\\", "/") for path in candidates)
+        return names, stats
+
+    def test_scan_finds_candidates_outside_excluded_dirs(self):
+        """Nur .py-Dateien mit verdächtigem Namen, .git wird übersprungen"""
+        names, stats = self._scan()
+        self.assertEqual(names, ["a/b/demo.py", "a/old_helper.py"])
+        self.assertEqual(stats, {"directories": 3, "cached_directories": 0, "candidates": 2})
+
+    def test_unchanged_directories_are_reused(self):
+        """Ein zweiter Lauf übernimmt alle Verzeichnisse aus dem Cache, Größen bleiben aktuell"""
+        self._scan()
+        self._write("a/old_helper.py", "x = 1\n" * 100)
+        candidates, stats = cleanup.scan_candidates(TEST_PROJECT_DIR, cache_file=TEST_CACHE_PATH)
+        self.assertEqual(stats["cached_directories"], 3)
+        self.assertEqual(candidates[f"{TEST_PROJECT_DIR}/a/old_helper.py"].st_size, 600)
+
+    def test_recent_directories_are_not_cached(self):
+        """Verzeichnisse im Racy-Fenster werden ohne mtime gespeichert und erneut gelesen"""
+        now_ns = time.time_ns()
+        os.utime(os.path.join(TEST_PROJECT_DIR, "a"), ns=(now_ns, now_ns))
+        self._scan()
+        cache = cleanup.load_scan_cache(TEST_CACHE_PATH)
+        self.assertIsNone(cache["a"]["mtime_ns"])
+        self.assertIsNotNone(cache[""]["mtime_ns"])
+        self.assertEqual(self._scan()[1]["cached_directories"], 2)
+
+    def test_new_file_invalidates_its_directory(self):
+        """Eine neue Datei ändert die Verzeichnis-mtime und wird gefunden"""
+        self._scan()
+        self._write("a/tmp_new.py")
+        names, stats = self._scan()
+        self.assertIn("a/tmp_new.py", names)
+        self.assertEqual(stats["cached_directories"], 2)
+
+    def test_renamed_subdirectory_is_rescanned(self):
+        """Nach dem Umbenennen eines Unterverzeichnisses stimmen die Pfade wieder"""
+        self._scan()
+        os.rename(os.path.join(TEST_PROJECT_DIR, "a", "b"), os.path.join(TEST_PROJECT_DIR, "a", "c"))
+        names, _ = self._scan()
+        self.assertEqual(names, ["a/c/demo.py", "a/old_helper.py"])
+
+    def test_changed_filter_signature_discards_cache(self):
+        """Geänderte Schlüsselwörter machen den gespeicherten Cache ungültig"""
+        self._scan()
+        self.assertEqual(len(cleanup.load_scan_cache(TEST_CACHE_PATH)), 3)
+        with mock.patch.object(cleanup, "UNWANTED_KEYWORDS", [*cleanup.UNWANTED_KEYWORDS, "main"]):
+            self.assertEqual(cleanup.load_scan_cache(TEST_CACHE_PATH), {})
+            names, stats = self._scan()
+        self.assertIn("main.py", names)
+        self.assertEqual(stats["cached_directories"], 0)
+
+    def test_save_and_load_scan_cache(self):
+        """Der Cache wird atomar geschrieben; defekte Dateien gelten als leer"""
+        directories = {"": {"mtime_ns": 1, "dirs": ["a"], "files": []}}
+        cleanup.save_scan_cache(TEST_CACHE_PATH, directories)
+        self.assertEqual(cleanup.load_scan_cache(TEST_CACHE_PATH), directories)
+        self.assertFalse(os.path.exists(TEST_CACHE_PATH + ".tmp"))
+        with open(TEST_CACHE_PATH, "w", encoding="utf-8") as f:
+            f.write("{kaputt")
+        self.assertEqual(cleanup.load_scan_cache(TEST_CACHE_PATH), {})
+
+    def test_json_report_uses_scanned_stats(self):
+        """Der JSON-Bericht nutzt die stat-Ergebnisse des Scans statt die Dateien erneut abzufragen"""
+        candidates = {"gone/tmp_x.py": SimpleNamespace(st_size=2048, st_mtime=time.time() - 2 * 86400)}
+        report = json.loads(cleanup.generate_json_report(["gone/tmp_x.py"], candidates, {"candidates": 1}))
+        self.assertEqual(report["count"], 1)
+        self.assertEqual((report["files"][0]["size_kb"], round(report["files"][0]["age_days"])), (2.0, 2))
+        self.assertEqual(report["scan"], {"candidates": 1})
+
+    def test_json_mode_exit_code(self):
+        """--json meldet Funde mit Exit-Code 1 und ohne Funde mit 0"""
+        def run():
+            return subprocess.run([sys.executable, SCRIPT_PATH, "--json", "--no-cache"], cwd=TEST_PROJECT_DIR,
+                                  capture_output=True, text=True, timeout=60)
+
+        result = run()
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(json.loads(result.stdout)["count"], 2)
+        shutil.rmtree(os.path.join(TEST_PROJECT_DIR, "a"))
+        result = run()
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout)["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import cli
+
+TEST_DB_PATH = "test_cli_database.json"
+TEST_INDEX_PATH = "test_cli_database.index.json"
+TEST_MINHASH_PATH = "test_cli_database.minhash.json"
+TEST_EXPORT_PATH = "test_cli_export.jsonl"
+TEST_BACKUP_DIR = "test_cli_backups"
+
+
+def run_cli(*argv):
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        code = cli.main(["--db", TEST_DB_PATH, *argv])
+    return code, out.getvalue(), err.getvalue()
+
+
+class TestCli(unittest.TestCase):
+    def tearDown(self):
+        for path in (TEST_DB_PATH, TEST_DB_PATH + ".lock", TEST_INDEX_PATH, TEST_MINHASH_PATH, TEST_EXPORT_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_BACKUP_DIR, ignore_errors=True)
+
+    def test_add_search_update_delete(self):
+        """Anlegen, Suchen, Ändern und Löschen über die Kommandozeile"""
+        code, out, _ = run_cli("add", "--title", "Newsletter", "--category", "Marketing",
+                               "--tags", "mail, blog", "--prompt", "Schreibe einen Newsletter")
+        self.assertEqual(code, 0)
+        doc_id = int(out)
+
+        code, out, _ = run_cli("search", "newsletter", "--json")
+        record = json.loads(out.splitlines()[0])
+        self.assertEqual((record["id"], record["tags"]), (doc_id, ["mail", "blog"]))
+
+        self.assertEqual(run_cli("update", str(doc_id), "--title", "Rundbrief")[0], 0)
+        self.assertIn("Rundbrief", run_cli("search")[1])
+        self.assertEqual(run_cli("update", "999", "--title", "X")[0], 1)
+        self.assertEqual(run_cli("update", str(doc_id), "--title", " ")[0], 1)
+
+        self.assertEqual(run_cli("delete", str(doc_id), "999")[0], 1)
+        self.assertEqual(run_cli("search")[1], "")
+
+    def test_repeated_tag_matches_any(self):
+        """Mehrere --tag-Angaben finden Prompts mit mindestens einem der Tags"""
+        run_cli("add", "--title", "Mail", "--tags", "mail", "--prompt", "Text")
+        run_cli("add", "--title", "Blog", "--tags", "blog", "--prompt", "Text")
+        run_cli("add", "--title", "Sonstiges", "--tags", "misc", "--prompt", "Text")
+        code, out, _ = run_cli("search", "--tag", "mail", "--tag", "blog", "--json")
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(json.loads(line)["title"] for line in out.splitlines()), ["Blog", "Mail"])
+
+    def test_add_checks_duplicates_only_on_request(self):
+        """Die Duplikatprüfung beim Anlegen ist optional und meldet Treffer auf stderr"""
+        text = "Schreibe einen freundlichen Newsletter über unser neues Produkt und nenne drei Vorteile."
+        first = int(run_cli("add", "--title", "Eins", "--prompt", text)[1])
+        self.assertEqual(run_cli("add", "--title", "Zwei", "--prompt", text)[2], "")
+        code, _, err = run_cli("add", "--title", "Drei", "--prompt", text, "--check-duplicates")
+        self.assertEqual(code, 0)
+        self.assertIn(f"ID {first} Eins", err)
+
+    def test_export_import_and_backup(self):
+        """Export als NDJSON lässt sich wieder importieren; ein Backup lässt sich prüfen und wiederherstellen"""
+        run_cli("add", "--title", "A", "--prompt", "Text A")
+        run_cli("add", "--title", "B", "--prompt", "Text B", "--category", "X")
+        self.assertEqual(run_cli("export", "--category", "X", "--output", TEST_EXPORT_PATH)[0], 0)
+        with open(TEST_EXPORT_PATH, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line)["title"] for line in f], ["B"])
+
+        code, _, err = run_cli("import", TEST_EXPORT_PATH)
+        self.assertEqual(code, 0)
+        self.assertIn("1 Prompts importiert", err)
+        self.assertEqual(len(run_cli("search", "--category", "X")[1].splitlines()), 2)
+        code, out, _ = run_cli("duplicates", "--json")
+        self.assertEqual([[entry["title"] for entry in json.loads(line)] for line in out.splitlines()], [["B", "B"]])
+
+        code, out, _ = run_cli("backup", "--dir", TEST_BACKUP_DIR)
+        self.assertEqual(code, 0)
+        manifest = out.strip()
+        self.assertTrue(os.path.exists(manifest))
+        self.assertEqual(run_cli("verify-backup", manifest)[0], 0)
+        run_cli("delete", "1", "2", "3")
+        self.assertEqual(run_cli("restore", manifest)[0], 0)
+        self.assertEqual(len(run_cli("search")[1].splitlines()), 3)
+
+    def test_help_does_not_load_database_modules(self):
+        """Der Parser allein importiert weder Service, TinyDB noch Streamlit"""
+        check = ("import sys, cli; cli.build_parser(); "
+                 "print(sorted(m for m in ('tinydb', 'streamlit', 'services.prompt_service') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
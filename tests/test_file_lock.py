@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from utils.file_lock import EXCLUSIVE, SHARED, FileLock
+
+TEST_LOCK_PATH = "test_file_lock.lock"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Versucht in einem zweiten Prozess, die Sperre im angegebenen Modus zu erhalten.
+CHILD = """
+import sys
+from utils.file_lock import FileLock
+lock = FileLock(sys.argv[1], timeout=0.2)
+try:
+    with getattr(lock, sys.argv[2])():
+        print("ok")
+except TimeoutError:
+    print("timeout")
+"""
+
+
+def try_in_other_process(mode):
+    result = subprocess.run([sys.executable, "-c", CHILD, os.path.abspath(TEST_LOCK_PATH), mode],
+                            capture_output=True, text=True, cwd=PROJECT_ROOT, timeout=30)
+    return result.stdout.strip()
+
+
+@unittest.skipIf(sys.platform == "win32", "Windows kennt nur exklusive Sperren")
+class TestFileLock(unittest.TestCase):
+    def setUp(self):
+        self.lock = FileLock(TEST_LOCK_PATH)
+
+    def tearDown(self):
+        if os.path.exists(TEST_LOCK_PATH):
+            os.remove(TEST_LOCK_PATH)
+
+    def test_readers_do_not_block_each_other(self):
+        """Eine gemeinsame Sperre erlaubt weitere Leser, aber keinen Schreiber"""
+        with self.lock.shared():
+            self.assertEqual(try_in_other_process("shared"), "ok")
+            self.assertEqual(try_in_other_process("exclusive"), "timeout")
+        self.assertEqual(try_in_other_process("exclusive"), "ok")
+
+    def test_exclusive_blocks_readers(self):
+        """Eine exklusive Sperre hält auch Leser anderer Prozesse fern"""
+        with self.lock.exclusive():
+            self.assertEqual(try_in_other_process("shared"), "timeout")
+
+    def test_reentrant_upgrade_and_downgrade(self):
+        """Verschachtelte Sperren werden hochgestuft und danach wieder auf gemeinsam zurückgesetzt"""
+        with self.lock.shared():
+            with self.lock.exclusive():
+                self.assertEqual(self.lock.mode, EXCLUSIVE)
+                with self.lock.shared():
+                    self.assertEqual(self.lock.mode, EXCLUSIVE)
+            self.assertEqual(self.lock.mode, SHARED)
+            self.assertEqual(try_in_other_process("shared"), "ok")
+        self.assertIsNone(self.lock.mode)
+
+    def test_threads_share_the_shared_lock(self):
+        """Zwei Threads halten die gemeinsame Sperre derselben Instanz gleichzeitig"""
+        both_inside = threading.Barrier(2, timeout=5)
+
+        def read():
+            with self.lock.shared():
+                both_inside.wait()
+                return self.lock.mode
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            modes = list(pool.map(lambda _: read(), range(2)))
+        self.assertEqual(modes, [SHARED, SHARED])
+        self.assertEqual(try_in_other_process("exclusive"), "ok")
+
+    def test_exclusive_excludes_other_threads(self):
+        """Die exklusive Sperre hält andere Threads fern, die gemeinsame nur Schreiber"""
+        lock = FileLock(TEST_LOCK_PATH, timeout=0.2)
+
+        def attempt(mode):
+            try:
+                with getattr(lock, mode)():
+                    return "ok"
+            except TimeoutError:
+                return "timeout"
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with lock.exclusive():
+                self.assertEqual(pool.submit(attempt, "shared").result(), "timeout")
+            with lock.shared():
+                self.assertEqual(pool.submit(attempt, "shared").result(), "ok")
+                self.assertEqual(pool.submit(attempt, "exclusive").result(), "timeout")
+            self.assertEqual(pool.submit(attempt, "exclusive").result(), "ok")
+
+    def test_concurrent_upgrades_do_not_deadlock(self):
+        """Zwei Leser stufen gleichzeitig hoch; die Schreibabschnitte folgen nacheinander"""
+        both_reading = threading.Barrier(2, timeout=5)
+        writers = []
+
+        def upgrade():
+            with self.lock.shared():
+                both_reading.wait()
+                with self.lock.exclusive():
+                    writers.append(threading.get_ident())
+                    time.sleep(0.05)
+                    inside = len(writers)
+                    writers.pop()
+                self.assertEqual(self.lock.mode, SHARED)
+                return inside
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(upgrade) for _ in range(2)]
+            self.assertEqual([future.result(timeout=10) for future in futures], [1, 1])
+        self.assertIsNone(self.lock.mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
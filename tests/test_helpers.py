@@ -0,0 +1,42 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from utils.helpers import iter_csv_export, iter_export, iter_markdown_export
+
+PROMPTS = [
+    {"title": f"Titel {i}", "category": "Blog", "platform": "ChatGPT", "tags": ["a", "b"],
+     "prompt": f"Schreibe über [Thema] – Nr. {i}\nZweite Zeile", "language": "Deutsch",
+     "purpose": "Test", "notes": "", "last_modified": "2025-08-01 10:00:00"}
+    for i in range(50)
+]
+
+
+class TestStreamingExport(unittest.TestCase):
+    def test_csv_chunks_form_valid_csv(self):
+        """CSV-Blöcke ergeben zusammen eine gültige CSV-Datei"""
+        chunks = list(iter_csv_export(iter(PROMPTS), chunk_size=256))
+        self.assertGreater(len(chunks), 1)
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(rows[7]["tags"], "a, b")
+        self.assertEqual(rows[7]["prompt"], PROMPTS[7]["prompt"])
+
+    def test_gzip_ndjson_roundtrip(self):
+        """gzip-komprimierter NDJSON-Export lässt sich zeilenweise lesen"""
+        data = b"".join(iter_export(iter(PROMPTS), "ndjson", compress=True, chunk_size=512))
+        lines = gzip.decompress(data).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(json.loads(lines[3])["tags"], ["a", "b"])
+
+    def test_markdown_and_unknown_format(self):
+        """Markdown-Export enthält alle Einträge; unbekannte Formate werden abgelehnt"""
+        text = b"".join(iter_markdown_export(PROMPTS)).decode("utf-8")
+        self.assertEqual(text.count("## Titel"), 50)
+        with self.assertRaises(ValueError):
+            iter_export(PROMPTS, "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
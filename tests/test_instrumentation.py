@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+from models.prompt_model import PromptRepository
+from services.prompt_service import PromptService
+from utils.instrumentation import (
+    dump_metrics, enable_metrics, get_metrics, instrumented, reset_metrics,
+)
+
+TEST_DB_PATH = "test_metrics_database.json"
+TEST_INDEX_PATH = "test_metrics_database.index.json"
+TEST_MINHASH_PATH = "test_metrics_database.minhash.json"
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.service = PromptService(self.repo, cache_size=0)
+        reset_metrics()
+        enable_metrics()
+
+    def tearDown(self):
+        enable_metrics(False)
+        reset_metrics()
+        try:
+            self.repo.close()
+        finally:
+            for path in (TEST_DB_PATH, TEST_DB_PATH + ".lock", TEST_INDEX_PATH, TEST_MINHASH_PATH):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_service_and_repository_calls_are_measured(self):
+        """Aufrufe, Perzentile, gelesene Zeilen und geschriebene Bytes je Operation"""
+        for i in range(5):
+            self.service.create_prompt(f"Titel {i}", "A", "ChatGPT", ["x"], "Text")
+        self.service.search_prompts("titel")
+        with self.assertRaises(ValueError):
+            self.service.create_prompt("", "A", "ChatGPT", [], "Text")
+
+        metrics = get_metrics()
+        create = metrics["PromptService.create_prompt"]
+        self.assertEqual((create["calls"], create["errors"]), (6, 1))
+        self.assertGreater(create["bytes_written"], 0)
+        self.assertLessEqual(create["p50_ms"], create["p99_ms"])
+        self.assertLessEqual(create["p99_ms"], create["max_ms"])
+        self.assertEqual(metrics["PromptRepository.add_prompt"]["calls"], 5)
+        self.assertEqual(metrics["PromptService.search_prompts"]["rows_scanned"], 5)
+        self.assertEqual(metrics["PromptRepository.query_prompts"]["rows_scanned"], 5)
+        self.assertEqual(json.loads(dump_metrics())["operations"], metrics)
+
+    def test_disabled_metrics_record_nothing(self):
+        """Ohne Aktivierung werden keine Messwerte gesammelt"""
+        enable_metrics(False)
+        self.service.create_prompt("Titel", "A", "ChatGPT", [], "Text")
+        self.assertEqual(get_metrics(), {})
+
+    def test_generators_are_measured_over_full_iteration(self):
+        """Generatoren zählen über die gesamte Iteration, vorzeitiger Abbruch ist kein Fehler"""
+        @instrumented("demo.numbers")
+        def numbers():
+            yield from range(3)
+
+        self.assertEqual(list(numbers()), [0, 1, 2])
+        next(numbers())
+        stats = get_metrics()["demo.numbers"]
+        self.assertEqual((stats["calls"], stats["errors"]), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import unittest
+from models.journal_storage import JournalStorage, journal_path_for
+from models.prompt_model import PromptRepository
+
+TEST_DB_PATH = "test_journal_database.json"
+TEST_FILES = [
+    TEST_DB_PATH,
+    journal_path_for(TEST_DB_PATH),
+    journal_path_for(TEST_DB_PATH) + ".compacting",
+    "test_journal_database.similar.json",
+    "test_journal_database.index.json",
+    TEST_DB_PATH + ".lock",
+]
+
+
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        self._cleanup()
+        self.repo = PromptRepository(TEST_DB_PATH, storage=JournalStorage, background_compaction=False)
+
+    def tearDown(self):
+        try:
+            self.repo.close()
+        finally:
+            self._cleanup()
+
+    @staticmethod
+    def _cleanup():
+        for path in TEST_FILES:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _reopen(self, **options):
+        self.repo.close()
+        options.setdefault("background_compaction", False)
+        self.repo = PromptRepository(TEST_DB_PATH, storage=JournalStorage, **options)
+
+    def test_writes_append_only_changed_documents(self):
+        """Ein Update schreibt nur das geänderte Dokument ins Journal"""
+        for i in range(5):
+            self.repo.add_prompt(f"T{i}", "A", "ChatGPT", [], "p", "de", "", "")
+        journal = journal_path_for(TEST_DB_PATH)
+        size_before = os.path.getsize(journal)
+        self.repo.update_prompt(3, {"title": "Neu"})
+        with open(journal, "rb") as f:
+            f.seek(size_before)
+            record = json.loads(f.read())
+        self.assertEqual([(op["op"], op["id"]) for op in record["ops"]], [("put", "3")])
+        self.assertEqual(os.path.getsize(TEST_DB_PATH), 0)
+
+    def test_replay_ignores_truncated_final_record(self):
+        """Ein abgeschnittener letzter Eintrag wird beim Öffnen verworfen"""
+        self.repo.add_prompt("Erster", "A", "ChatGPT", [], "p", "de", "", "")
+        self.repo.close()
+        with open(journal_path_for(TEST_DB_PATH), "ab") as f:
+            f.write(b'{"ops": [{"op": "put", "table": "_default", "id": "2", "doc": {"tit')
+        self._reopen()
+        self.assertEqual([p["title"] for p in self.repo.get_all_prompts()], ["Erster"])
+        self.repo.add_prompt("Zweiter", "A", "ChatGPT", [], "p", "de", "", "")
+        self._reopen()
+        self.assertEqual([p["title"] for p in self.repo.get_all_prompts()], ["Erster", "Zweiter"])
+
+    def test_compaction_writes_tinydb_snapshot(self):
+        """Kompaktierung schreibt eine gewöhnliche TinyDB-Datei und leert das Journal"""
+        self._reopen(compact_threshold=1)
+        self.repo.add_prompt("Erster", "A", "ChatGPT", [], "p", "de", "", "")
+        self.repo.delete_prompt(1)
+        self.repo.add_prompt("Zweiter", "A", "ChatGPT", [], "p", "de", "", "")
+        self.assertEqual(os.path.getsize(journal_path_for(TEST_DB_PATH)), 0)
+        with open(TEST_DB_PATH, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertEqual([d["title"] for d in snapshot["_default"].values()], ["Zweiter"])
+        self.assertEqual(len(self.repo.search_prompts("zweiter")), 1)
+
+    def test_external_writes_bump_data_version(self):
+        """Änderungen eines zweiten Prozesses erhöhen die Datenversion, eigene Kompaktierung nicht"""
+        self._reopen(compact_threshold=1)
+        self.repo.add_prompt("Erster", "A", "ChatGPT", [], "p", "de", "", "")
+        version = self.repo.get_data_version()
+        self.assertEqual(self.repo.get_data_version(), version)
+
+        other = PromptRepository(TEST_DB_PATH, storage=JournalStorage, background_compaction=False)
+        try:
+            other.add_prompt("Zweiter", "A", "ChatGPT", [], "p", "de", "", "")
+        finally:
+            other.db.close()
+        self.assertGreater(self.repo.get_data_version(), version)
+        self.assertEqual(len(self.repo.search_prompts("zweiter")), 1)
+
+    def test_stale_background_snapshot_is_discarded(self):
+        """Ein Snapshot, dessen Kompaktierung ein anderer Prozess abgeschlossen hat, überschreibt nichts"""
+        self._reopen(compact_threshold=1, background_compaction=True)
+        self.repo.add_prompt("Erster", "A", "ChatGPT", [], "p", "de", "", "")
+        self.repo.db.storage._join_compaction()
+
+        other = PromptRepository(TEST_DB_PATH, storage=JournalStorage, background_compaction=False,
+                                 compact_threshold=1)
+        try:
+            self.assertEqual([p["title"] for p in other.get_all_prompts()], ["Erster"])
+            other.add_prompt("Zweiter", "A", "ChatGPT", [], "p", "de", "", "")
+        finally:
+            other.close()
+
+        self.repo.checkpoint()
+        self._reopen()
+        prompts = self.repo.get_all_prompts()
+        self.assertEqual([(p.doc_id, p["title"]) for p in prompts], [(1, "Erster"), (2, "Zweiter")])
+        self.repo.add_prompt("Dritter", "A", "ChatGPT", [], "p", "de", "", "")
+        self.assertEqual(len({p.doc_id for p in self.repo.get_all_prompts()}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+from models.minhash_index import MinHashIndex, estimate_similarity, minhash_signature
+
+TEST_INDEX_PATH = "test_minhash.minhash.json"
+BASE = "Schreibe einen freundlichen Newsletter für {zielgruppe} über unser neues Produkt und nenne drei Vorteile."
+
+
+class TestMinHashIndex(unittest.TestCase):
+    def test_signature_estimates_similarity(self):
+        """Fast gleiche Texte haben ähnliche Signaturen, fremde Texte nicht"""
+        near = BASE.replace("{zielgruppe}", "{kunden}")
+        other = "Erkläre die Relativitätstheorie in einfachen Worten für Kinder im Grundschulalter."
+        self.assertEqual(minhash_signature(BASE), minhash_signature(BASE.upper()))
+        self.assertGreater(estimate_similarity(minhash_signature(BASE), minhash_signature(near)), 0.6)
+        self.assertLess(estimate_similarity(minhash_signature(BASE), minhash_signature(other)), 0.3)
+        self.assertIsNone(minhash_signature("  ...  "))
+
+    def test_query_and_incremental_maintenance(self):
+        """Treffer folgen dem Hinzufügen, Ersetzen und Entfernen von Dokumenten"""
+        index = MinHashIndex()
+        index.add_document(1, BASE)
+        index.add_document(2, "Fasse den folgenden Text in drei Sätzen zusammen.")
+        self.assertEqual([doc_id for doc_id, _ in index.query(BASE + " Danke.")], [1])
+        self.assertEqual(index.query(BASE, exclude=1), [])
+
+        index.add_document(1, "Übersetze den Text ins Englische.")
+        self.assertEqual(index.query(BASE), [])
+        index.remove_document(2)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.query("Fasse den folgenden Text in drei Sätzen zusammen."), [])
+
+    def test_clusters(self):
+        """Der Clusterbericht gruppiert transitive Duplikate"""
+        index = MinHashIndex()
+        for doc_id, text in enumerate([BASE, "Völlig anderer Prompt über Rezepte mit Kartoffeln und Quark.",
+                                       BASE, BASE + " Bitte kurz.", "Noch etwas ganz anderes."], start=1):
+            index.add_document(doc_id, text)
+        self.assertEqual(index.clusters(), [[1, 3, 4]])
+        self.assertEqual(index.clusters(threshold=1.0), [[1, 3]])
+
+    def test_save_and_load_with_fingerprint(self):
+        """Gespeicherte Signaturen werden nur bei passendem Fingerabdruck und gleichen Parametern geladen"""
+        index = MinHashIndex()
+        for doc_id, text in enumerate([BASE, BASE + " Bitte kurz.", "Noch etwas ganz anderes."], start=1):
+            index.add_document(doc_id, text)
+        try:
+            index.save(TEST_INDEX_PATH, [3, 4])
+            self.assertIsNone(MinHashIndex.load(TEST_INDEX_PATH, [4, 4]))
+            self.assertIsNone(MinHashIndex.load(TEST_INDEX_PATH, [3, 4], num_perm=64, bands=16))
+            loaded = MinHashIndex.load(TEST_INDEX_PATH, [3, 4])
+        finally:
+            os.remove(TEST_INDEX_PATH)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.query(BASE), index.query(BASE))
+        self.assertEqual(loaded.clusters(), [[1, 2]])
+
+    def test_invalid_band_configuration(self):
+        with self.assertRaises(ValueError):
+            MinHashIndex(num_perm=64, bands=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import unittest
+import zipfile
+from unittest import mock
+
+import utils.project_zipper as project_zipper
+from utils.project_zipper import manifest_path_for, scan_project, start_snapshot_job, snapshot_status, zip_project
+
+TEST_PROJECT_DIR = "test_zipper_project"
+TEST_ZIP_PATH = "test_zipper_snapshot.zip"
+
+
+class TestProjectZipper(unittest.TestCase):
+    def setUp(self):
+        self._cleanup()
+        for path, content in {"main.py": "print('x')\n" * 2000, "pkg/mod.py": "", "database.json": "{}",
+                              "notes.txt": "nein", ".git/hook.py": "nein", "pkg/__pycache__/mod.py": "nein"}.items():
+            full_path = os.path.join(TEST_PROJECT_DIR, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def tearDown(self):
+        self._cleanup()
+
+    @staticmethod
+    def _cleanup():
+        shutil.rmtree(TEST_PROJECT_DIR, ignore_errors=True)
+        for path in (TEST_ZIP_PATH, manifest_path_for(TEST_ZIP_PATH)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _assert_zip_matches_project(self):
+        with zipfile.ZipFile(TEST_ZIP_PATH) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), list(scan_project(TEST_PROJECT_DIR)))
+            for name in archive.namelist():
+                with open(os.path.join(TEST_PROJECT_DIR, name), "rb") as f:
+                    self.assertEqual(archive.read(name), f.read())
+
+    def test_scan_skips_unwanted_files_and_directories(self):
+        """Nur Quelltexte, requirements.txt und database.json außerhalb von .git/__pycache__"""
+        self.assertEqual(list(scan_project(TEST_PROJECT_DIR)), ["database.json", "main.py", "pkg/mod.py"])
+
+    def test_scan_includes_database_companions(self):
+        """Journal und ausgelagerte Texte gehören zur Datenbank, Zwischendateien nicht"""
+        for name in ("database.json.journal", "database.json.bodies", "database.json.bodies.2",
+                     "database.json.bodies.tmp", "database.json.lock", "other.json.journal"):
+            with open(os.path.join(TEST_PROJECT_DIR, name), "w", encoding="utf-8") as f:
+                f.write("x")
+        self.assertEqual(list(scan_project(TEST_PROJECT_DIR)),
+                         ["database.json", "database.json.bodies", "database.json.bodies.2",
+                          "database.json.journal", "main.py", "pkg/mod.py"])
+
+    def test_multi_block_files_are_compressed_in_parallel(self):
+        """Große Dateien werden blockweise parallel komprimiert und bleiben gültige ZIP-Mitglieder"""
+        with mock.patch.object(project_zipper, "BLOCK_SIZE", 1000):
+            result = zip_project(TEST_PROJECT_DIR, TEST_ZIP_PATH, workers=3)
+        self.assertEqual((result["files"], result["compressed"]), (3, 3))
+        self._assert_zip_matches_project()
+
+    def test_unchanged_files_are_reused(self):
+        """Nur geänderte Dateien werden neu komprimiert; gelöschte verschwinden aus dem ZIP"""
+        zip_project(TEST_PROJECT_DIR, TEST_ZIP_PATH)
+        with open(os.path.join(TEST_PROJECT_DIR, "pkg", "mod.py"), "w", encoding="utf-8") as f:
+            f.write("x = 1\n")
+        os.remove(os.path.join(TEST_PROJECT_DIR, "database.json"))
+        result = zip_project(TEST_PROJECT_DIR, TEST_ZIP_PATH)
+        self.assertEqual((result["files"], result["compressed"], result["reused"]), (2, 1, 1))
+        self._assert_zip_matches_project()
+
+    def test_snapshot_runs_as_background_job(self):
+        """Der Snapshot läuft als Hintergrundaufgabe mit abrufbarem Status"""
+        job = start_snapshot_job(TEST_PROJECT_DIR, TEST_ZIP_PATH)
+        result = job.wait(10)
+        status = snapshot_status()
+        self.assertEqual((status["state"], status["progress"]), ("done", 1.0))
+        self.assertEqual(status["result"], result)
+        self._assert_zip_matches_project()
+
+
+if __name__ == "__main__":
+    unittest.main()
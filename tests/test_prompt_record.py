@@ -0,0 +1,42 @@
+import json
+import pickle
+import unittest
+from models.prompt_record import Prompt
+
+
+class TestPromptRecord(unittest.TestCase):
+    def setUp(self):
+        self.prompt = Prompt.from_document(
+            {"title": "Newsletter", "category": "Marketing", "tags": ["mail", "blog"], "prompt": "Schreibe ...",
+             "revision": 3, "unbekannt": "wird verworfen"}, 7)
+
+    def test_mapping_interface(self):
+        """Ein Prompt lässt sich wie ein schreibgeschütztes Dictionary lesen"""
+        self.assertEqual(self.prompt.doc_id, 7)
+        self.assertEqual(self.prompt["title"], "Newsletter")
+        self.assertEqual(self.prompt.get("platform", "-"), "")
+        self.assertEqual(self.prompt["tags"], ("mail", "blog"))
+        self.assertEqual(self.prompt["revision"], 3)
+        self.assertNotIn("unbekannt", self.prompt)
+        with self.assertRaises(KeyError):
+            self.prompt["unbekannt"]
+        self.assertEqual(json.loads(json.dumps(self.prompt.to_dict()))["tags"], ["mail", "blog"])
+        self.assertEqual(dict(self.prompt)["category"], "Marketing")
+
+    def test_immutable_and_compact(self):
+        """Keine Zuweisung, kein __dict__ je Objekt; Pickle bleibt möglich"""
+        with self.assertRaises(AttributeError):
+            self.prompt.title = "Neu"
+        self.assertFalse(hasattr(self.prompt, "__dict__"))
+        copy = pickle.loads(pickle.dumps(self.prompt))
+        self.assertEqual((copy.doc_id, copy), (7, self.prompt))
+
+    def test_categorical_values_are_interned(self):
+        """Gleiche Kategorien und Tags verschiedener Datensätze teilen sich ein Objekt"""
+        other = Prompt.from_document(json.loads('{"category": "Marketing", "tags": ["mail"]}'), 8)
+        self.assertIs(other["category"], self.prompt["category"])
+        self.assertIs(other["tags"][0], self.prompt["tags"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
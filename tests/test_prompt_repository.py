@@ -1,8 +1,14 @@
 import unittest
 import os
-from models.prompt_model import PromptRepository
+from unittest import mock
+from models import prompt_model
+from models.prompt_model import TEXT_FIELD_WEIGHTS, PromptRepository, RevisionConflictError
+from models.minhash_index import MinHashIndex
+from models.search_index import InvertedIndex
 
 TEST_DB_PATH = "test_database.json"
+TEST_INDEX_PATH = "test_database.index.json"
+TEST_MINHASH_PATH = "test_database.minhash.json"
 
 class TestPromptRepository(unittest.TestCase):
     def setUp(self):
@@ -14,8 +20,9 @@ class TestPromptRepository(unittest.TestCase):
             if hasattr(self.repo, "db"):
                 self.repo.close()
         finally:
-            if os.path.exists(TEST_DB_PATH):
-                os.remove(TEST_DB_PATH)
+            for path in (TEST_DB_PATH, TEST_DB_PATH + ".lock", TEST_INDEX_PATH, TEST_MINHASH_PATH):
+                if os.path.exists(path):
+                    os.remove(path)
 
     def test_add_and_get_prompt(self):
         """Prompt speichern und wieder abrufen"""
@@ -32,6 +39,8 @@ class TestPromptRepository(unittest.TestCase):
         all_prompts = self.repo.get_all_prompts()
         self.assertEqual(len(all_prompts), 1)
         self.assertEqual(all_prompts[0]["title"], "Testprompt")
+        self.assertEqual(self.repo.get_prompt(doc_id)["purpose"], "UnitTest")
+        self.assertIsNone(self.repo.get_prompt(doc_id + 1))
 
     def test_search_by_tag(self):
         """Prompt suche nach Tag"""
@@ -41,6 +50,161 @@ class TestPromptRepository(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["title"], "T1")
 
+    def test_keyword_search_normalizes_umlauts(self):
+        """Stichwortsuche findet Umlaute auch in Ersatzschreibweise"""
+        self.repo.add_prompt("Schlüsselwörter finden", "SEO", "ChatGPT", [], "Liste", "de", "", "")
+        self.repo.add_prompt("Anderes", "SEO", "ChatGPT", [], "Straße und Weg", "de", "", "")
+        self.assertEqual([p["title"] for p in self.repo.search_prompts("schluesselwoerter")],
+                         ["Schlüsselwörter finden"])
+        self.assertEqual([p["title"] for p in self.repo.search_prompts("STRASSE")], ["Anderes"])
+        self.assertEqual(len(self.repo.search_prompts("schlüss")), 1)
+
+    def test_keyword_index_follows_update_and_delete(self):
+        """Index wird bei Änderungen und Löschungen nachgeführt"""
+        doc_id = self.repo.add_prompt("Alpha", "A", "ChatGPT", [], "erster Text", "de", "", "")
+        self.repo.update_prompt(doc_id, {"prompt": "zweiter Text"})
+        self.assertEqual(self.repo.search_prompts("erster"), [])
+        self.assertEqual(len(self.repo.search_prompts("zweiter")), 1)
+        self.repo.delete_prompt(doc_id)
+        self.assertEqual(self.repo.search_prompts("zweiter"), [])
+
+    def test_substring_mode_and_persisted_index(self):
+        """Teilwortsuche bleibt verfügbar, Index übersteht Neustart"""
+        self.repo.add_prompt("Blogkalender", "Blog", "ChatGPT", [], "Plan", "de", "", "")
+        self.assertEqual(self.repo.search_prompts("kalender"), [])
+        self.assertEqual(len(self.repo.search_prompts("kalender", mode="substring")), 1)
+        self.repo.close()
+        self.assertTrue(os.path.exists(TEST_INDEX_PATH))
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.assertEqual(len(self.repo.search_prompts("blogk")), 1)
+
+    def test_index_is_saved_without_close(self):
+        """Langlebige Instanzen speichern den Index beim Start und gedrosselt nach Schreibvorgängen"""
+        weights = tuple(TEXT_FIELD_WEIGHTS.values())
+        self.repo.db.close()
+        os.remove(TEST_INDEX_PATH)
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.assertIsNotNone(InvertedIndex.load(TEST_INDEX_PATH, self.repo._file_fingerprint(), weights))
+        self.repo.add_prompt("Erster", "Blog", "ChatGPT", [], "Plan", "de", "", "")
+        self.assertIsNone(InvertedIndex.load(TEST_INDEX_PATH, self.repo._file_fingerprint(), weights))
+        with mock.patch.object(prompt_model, "INDEX_SAVE_INTERVAL", 0):
+            self.repo.add_prompt("Zweiter", "Blog", "ChatGPT", [], "Plan", "de", "", "")
+        index = InvertedIndex.load(TEST_INDEX_PATH, self.repo._file_fingerprint(), weights)
+        self.assertEqual(len(index.search("plan")), 2)
+
+        self.repo.close()
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.repo.search_prompts("plan")
+        with mock.patch.object(InvertedIndex, "save") as save:
+            self.repo.close()
+        save.assert_not_called()
+
+    def test_minhash_index_is_reused_by_new_instances(self):
+        """Eine neue Instanz lädt die gespeicherten Signaturen, statt alle Texte erneut zu hashen"""
+        text = "Schreibe einen freundlichen Newsletter über unser neues Produkt und nenne drei Vorteile."
+        first = self.repo.add_prompt("Eins", "Blog", "ChatGPT", [], text, "de", "", "")
+        self.assertEqual([doc_id for doc_id, _ in self.repo.find_near_duplicates(text)], [first])
+        second = self.repo.add_prompt("Zwei", "Blog", "ChatGPT", [], text + " Danke!", "de", "", "")
+        self.repo.close()
+
+        self.repo = PromptRepository(TEST_DB_PATH)
+        with mock.patch.object(MinHashIndex, "add_document") as add_document:
+            self.assertEqual(self.repo.find_duplicate_clusters(), [[first, second]])
+        add_document.assert_not_called()
+
+    def test_keyword_results_ranked_by_weighted_bm25(self):
+        """Treffer im Titel vor Zweck vor Prompt-Text vor Notizen; Top-k über limit"""
+        in_notes = self.repo.add_prompt("A", "X", "ChatGPT", [], "p", "de", "", "Newsletter")
+        in_prompt = self.repo.add_prompt("B", "X", "ChatGPT", [], "Schreibe einen Newsletter", "de", "", "")
+        in_title = self.repo.add_prompt("Newsletter", "X", "ChatGPT", [], "p", "de", "", "")
+        in_purpose = self.repo.add_prompt("C", "X", "ChatGPT", [], "p", "de", "Newsletter", "")
+        results = self.repo.search_prompts("newsletter")
+        self.assertEqual([p.doc_id for p in results], [in_title, in_purpose, in_prompt, in_notes])
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("news", limit=2)], [in_title, in_purpose])
+        result = self.repo.query_prompts("newsletter", sort_by="relevance", limit=2, offset=1)
+        self.assertEqual((result.total, [p.doc_id for p in result.items]), (4, [in_purpose, in_prompt]))
+        self.repo.close()
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("newsletter")],
+                         [in_title, in_purpose, in_prompt, in_notes])
+
+    def test_fuzzy_mode_tolerates_typos_and_ranks(self):
+        """Unscharfe Suche findet Tippfehler in Titel, Zweck und Notizen und sortiert nach Ähnlichkeit"""
+        exact = self.repo.add_prompt("Schlüsselwörter finden", "SEO", "ChatGPT", [], "Liste", "de", "", "")
+        other = self.repo.add_prompt("Texte", "SEO", "ChatGPT", [], "p", "de", "Schlüssel", "")
+        self.repo.add_prompt("Kochrezept", "Küche", "ChatGPT", [], "Nudeln", "de", "", "Für Gäste")
+        results = self.repo.search_prompts("Schlüselwörter", mode="fuzzy")
+        self.assertEqual([p.doc_id for p in results], [exact, other])
+        self.assertEqual(self.repo.search_prompts("Schlüselwörter", mode="keyword"), [])
+        self.assertEqual(len(self.repo.search_prompts("Gäste", mode="fuzzy")), 1)
+        self.repo.update_prompt(exact, {"title": "Überschriften"})
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("Schlüselwörter", mode="fuzzy")], [other])
+
+    def test_distinct_values_follow_writes(self):
+        """Eindeutige Kategorien und Tags werden inkrementell gepflegt"""
+        id1 = self.repo.add_prompt("T1", "Blog", "ChatGPT", ["seo", "plan"], "p", "de", "", "")
+        self.repo.add_prompt("T2", "Code", "Claude", ["seo"], "p", "en", "", "")
+        self.assertEqual(self.repo.get_all_categories(), ["Blog", "Code"])
+        self.assertEqual(self.repo.get_all_tags(), ["plan", "seo"])
+        self.repo.update_prompt(id1, {"category": "Code", "tags": ["seo"]})
+        self.assertEqual(self.repo.get_all_categories(), ["Code"])
+        self.assertEqual(self.repo.get_all_tags(), ["seo"])
+        self.assertEqual(self.repo.get_distinct_values("language"), ["de", "en"])
+
+    def test_combined_category_tag_keyword_filter(self):
+        """Kategorie-, Tag- und Stichwortfilter werden geschnitten"""
+        self.repo.add_prompt("Blog planen", "Blog", "ChatGPT", ["seo"], "p", "de", "", "")
+        self.repo.add_prompt("Blog schreiben", "Blog", "ChatGPT", ["text"], "p", "de", "", "")
+        self.repo.add_prompt("Blog prüfen", "Review", "ChatGPT", ["seo"], "p", "de", "", "")
+        results = self.repo.search_prompts("blog", category="Blog", tags=["seo", "x"])
+        self.assertEqual([p["title"] for p in results], ["Blog planen"])
+
+    def test_query_prompts_filters_sorts_and_pages(self):
+        """Kombinierte Abfrage mit Sprache, Zweck, Sortierung und Seiten"""
+        for i, language in enumerate(["Deutsch", "Englisch", "deutsch", "Deutsch"]):
+            self.repo.add_prompt(f"T{i}", "A", "ChatGPT", [], "p", language, "SEO-Texte" if i else "Code", "")
+        result = self.repo.query_prompts(language="deutsch", purpose="seo", limit=1)
+        self.assertEqual(result.total, 2)
+        self.assertEqual([p["title"] for p in result.items], ["T2"])
+        result = self.repo.query_prompts(language="deutsch", descending=True, offset=1)
+        self.assertEqual([p["title"] for p in result.items], ["T2", "T0"])
+        result = self.repo.query_prompts(sort_by="title", descending=True, limit=2)
+        self.assertEqual([p["title"] for p in result.items], ["T3", "T2"])
+        with self.assertRaises(ValueError):
+            self.repo.query_prompts(sort_by="prompt")
+
+
+    def test_revision_rejects_stale_update(self):
+        """Jedes Update erhöht die Revision; veraltete Revisionen werden abgelehnt"""
+        doc_id = self.repo.add_prompt("A", "X", "ChatGPT", [], "p")
+        self.assertEqual(self.repo.get_prompt(doc_id)["revision"], 1)
+        self.repo.update_prompt(doc_id, {"title": "B"}, expected_revision=1)
+        self.assertEqual(self.repo.get_prompt(doc_id)["revision"], 2)
+        with self.assertRaises(RevisionConflictError) as context:
+            self.repo.update_prompt(doc_id, {"title": "C"}, expected_revision=1)
+        self.assertEqual(context.exception.actual, 2)
+        self.assertEqual(self.repo.get_prompt(doc_id)["title"], "B")
+        self.repo.update_prompt(doc_id, {"title": "D"})
+        self.assertEqual(self.repo.get_prompt(doc_id)["revision"], 3)
+
+    def test_two_instances_on_same_file(self):
+        """Zwei Instanzen (wie zwei Prozesse) verlieren weder Einfügungen noch Updates"""
+        other = PromptRepository(TEST_DB_PATH)
+        try:
+            first = self.repo.add_prompt("Erster", "X", "ChatGPT", [], "p")
+            second = other.add_prompt("Zweiter", "X", "ChatGPT", [], "p")
+            third = self.repo.add_prompt("Dritter", "X", "ChatGPT", [], "p")
+            self.assertEqual(len({first, second, third}), 3)
+            self.assertEqual(len(other.get_all_prompts()), 3)
+
+            revision = self.repo.get_prompt(second)["revision"]
+            other.update_prompt(second, {"notes": "von other"}, expected_revision=revision)
+            with self.assertRaises(RevisionConflictError):
+                self.repo.update_prompt(second, {"notes": "veraltet"}, expected_revision=revision)
+            self.assertEqual(self.repo.get_prompt(second)["notes"], "von other")
+        finally:
+            other.db.close()
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import io
+import os
+import unittest
+from unittest import mock
+from models.prompt_model import PromptRepository
+from services.prompt_service import BulkValidationError, PromptService
+
+TEST_DB_PATH = "test_service_database.json"
+TEST_INDEX_PATH = "test_service_database.index.json"
+TEST_SIMILARITY_PATH = "test_service_database.similar.json"
+TEST_MINHASH_PATH = "test_service_database.minhash.json"
+
+
+class TestPromptServiceBulk(unittest.TestCase):
+    def setUp(self):
+        self.repo = PromptRepository(TEST_DB_PATH)
+        self.repo.db.truncate()
+        self.service = PromptService(self.repo)
+
+    def tearDown(self):
+        try:
+            self.repo.close()
+        finally:
+            for path in (TEST_DB_PATH, TEST_DB_PATH + ".lock", TEST_INDEX_PATH, TEST_SIMILARITY_PATH, TEST_MINHASH_PATH):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        """Ein ungültiger Datensatz verhindert den gesamten Massenimport"""
+        records = [
+            {"title": "A", "category": "X", "platform": "ChatGPT", "tags": ["t"], "prompt": "p"},
+            {"title": " ", "category": "X", "platform": "ChatGPT", "tags": [], "prompt": "p"},
+        ]
+        with self.assertRaises(BulkValidationError) as ctx:
+            self.service.create_prompts_bulk(records)
+        self.assertEqual(ctx.exception.errors, [(1, "Titel darf nicht leer sein.")])
+        self.assertEqual(self.service.get_all_prompts(), [])
+
+        doc_ids = self.service.create_prompts_bulk(records[:1] * 3)
+        self.assertEqual(len(doc_ids), 3)
+        self.assertEqual(len(self.service.search_prompts(tags=["t"])), 3)
+
+    def test_update_and_delete_many(self):
+        """Massenänderung und -löschung in einem Schreibvorgang"""
+        ids = self.service.create_prompts_bulk(
+            [{"title": f"T{i}", "category": "A", "tags": [], "prompt": "p"} for i in range(4)])
+        self.assertEqual(self.service.update_many({ids[0]: {"category": "B"}, ids[2]: {"title": "Neu"}, 99: {}}),
+                         [ids[0], ids[2]])
+        self.assertEqual(self.service.get_all_categories(), ["A", "B"])
+        self.assertEqual(len(self.service.search_prompts("neu")), 1)
+        with self.assertRaises(BulkValidationError):
+            self.service.update_many({ids[1]: {"prompt": ""}})
+        self.assertEqual(self.service.delete_many([ids[1], ids[3], 99]), [ids[1], ids[3]])
+        self.assertEqual(len(self.service.get_all_prompts()), 2)
+
+    def test_filtered_iteration_queries_once(self):
+        """Gefilterte Exporte führen die Abfrage einmal aus und liefern alle Treffer in Reihenfolge"""
+        ids = self.service.create_prompts_bulk(
+            [{"title": f"T{i}", "category": "A" if i % 2 else "B", "tags": [], "prompt": "p"} for i in range(5)])
+        with mock.patch.object(self.repo, "query_prompts", wraps=self.repo.query_prompts) as query:
+            exported = [prompt.doc_id for prompt in self.service.iter_prompts(category="A", sort_by="title")]
+        self.assertEqual(exported, [ids[1], ids[3]])
+        query.assert_called_once()
+        self.assertEqual(len(list(self.service.iter_prompts(category=None))), 5)
+
+    def test_streaming_import_reports_row_errors(self):
+        """JSONL- und CSV-Import in Blöcken mit Fehlern je Zeile"""
+        jsonl = io.StringIO(
+            '{"title": "Eins", "prompt": "p", "tags": "a, b"}\n'
+            '{"title": "", "prompt": "p"}\n'
+            'kein json\n'
+            '{"title": "Drei", "prompt": "p"}\n')
+        report = self.service.import_prompts(jsonl, fmt="jsonl", batch_size=1)
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([line for line, _ in report.errors], [2, 3])
+        self.assertEqual(self.service.get_all_tags(), ["a", "b"])
+
+        csv_data = io.BytesIO("title,prompt,tags\nVier,Text,x\n,Text,\n".encode("utf-8"))
+        report = self.service.import_prompts(csv_data, fmt="csv")
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.errors, [(3, "Titel darf nicht leer sein.")])
+
+    def test_cached_results_follow_data_version(self):
+        """Abfragen werden zwischengespeichert und nach Schreibvorgängen neu berechnet"""
+        self.service.create_prompt("Eins", "A", "ChatGPT", ["x"], "p")
+        version = self.service.get_data_version()
+        categories = self.service.get_all_categories()
+        self.assertIs(self.service.get_all_categories(), categories)
+        self.assertIs(self.service.search_prompts(tags=["x"]), self.service.search_prompts(tags=["x"]))
+
+        self.service.create_prompt("Zwei", "B", "ChatGPT", ["x"], "p")
+        self.assertGreater(self.service.get_data_version(), version)
+        self.assertEqual(self.service.get_all_categories(), ["A", "B"])
+        self.assertEqual(len(self.service.search_prompts(tags=["x"])), 2)
+
+    def test_near_duplicates_and_clusters(self):
+        """Duplikatprüfung beim Anlegen und Clusterbericht über alle Prompts"""
+        text = "Schreibe einen freundlichen Newsletter über unser neues Produkt und nenne drei Vorteile."
+        first = self.service.create_prompt("Eins", "A", "ChatGPT", [], text)
+        self.service.create_prompt("Zwei", "A", "ChatGPT", [], "Fasse den Text in drei Sätzen zusammen.")
+        with self.assertLogs("services.prompt_service", level="WARNING") as logs:
+            second = self.service.create_prompt("Drei", "A", "ChatGPT", [], text + " Danke!")
+        self.assertIn(f"ID {first}", logs.output[0])
+
+        third, duplicates = self.service.create_prompt_with_duplicates("Vier", "A", "ChatGPT", [], text)
+        self.assertEqual([prompt.doc_id for prompt, _ in duplicates], [first, second])
+        self.service.delete_prompt(third)
+
+        matches = self.service.find_near_duplicates(text + " Danke!", exclude_id=second)
+        self.assertEqual([(prompt.doc_id, prompt["title"]) for prompt, _ in matches], [(first, "Eins")])
+        self.assertEqual([[prompt.doc_id for prompt in cluster] for cluster in self.service.find_duplicate_clusters()],
+                         [[first, second]])
+
+        self.service.update_prompt(second, {"prompt": "Übersetze den Text ins Englische."})
+        self.assertEqual(self.service.find_duplicate_clusters(), [])
+
+    def test_similar_prompts(self):
+        """Ähnliche Prompts für mehrere Einträge, nachgeführt bei Änderungen"""
+        ids = self.service.create_prompts_bulk([
+            {"title": "Kaffee-Newsletter", "tags": ["mail"], "prompt": "Schreibe einen Newsletter über Kaffee"},
+            {"title": "Kuchen-Newsletter", "tags": ["mail"], "prompt": "Schreibe einen Newsletter über Kuchen"},
+            {"title": "Python", "tags": ["code"], "prompt": "Erkläre Dekoratoren in Python"},
+            {"title": "Python-Tests", "tags": ["code"], "prompt": "Schreibe Tests für Python"},
+        ])
+        similar = self.service.find_similar_prompts([ids[0], ids[2]], limit=1)
+        self.assertEqual([prompt["title"] for prompt, _ in similar[ids[0]]], ["Kuchen-Newsletter"])
+        self.assertEqual([prompt["title"] for prompt, _ in similar[ids[2]]], ["Python-Tests"])
+
+        self.service.update_prompt(ids[3], {"title": "Kaffee", "prompt": "Newsletter über Kaffee für Stammkunden",
+                                            "tags": ["mail"]})
+        self.assertEqual([prompt.doc_id for prompt, _ in self.service.find_similar_prompts([ids[0]], 1)[ids[0]]],
+                         [ids[3]])
+        self.repo.close()
+        self.assertTrue(os.path.exists(TEST_SIMILARITY_PATH))
+
+    def test_cache_size_is_bounded(self):
+        """Der Ergebnis-Cache verdrängt die ältesten Einträge"""
+        service = PromptService(self.repo, cache_size=2)
+        for keyword in ("a", "b", "c"):
+            service.search_prompts(keyword)
+        self.assertEqual(len(service._cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
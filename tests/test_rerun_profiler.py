@@ -0,0 +1,65 @@
+import os
+import shutil
+import time
+import unittest
+from utils.rerun_profiler import RerunProfiler
+
+TEST_PROFILE_DIR = "test_profiles"
+
+
+class TestRerunProfiler(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(TEST_PROFILE_DIR, ignore_errors=True)
+
+    def test_disabled_profiler_records_nothing(self):
+        """Ohne Aktivierung werden weder Reruns noch Dateien erfasst"""
+        profiler = RerunProfiler(TEST_PROFILE_DIR, keep=2)
+        with profiler.rerun("Prompts"):
+            with profiler.section("Suche"):
+                pass
+        self.assertEqual(profiler.history(), [])
+        self.assertFalse(os.path.exists(TEST_PROFILE_DIR))
+
+    def test_sections_are_summed_per_rerun(self):
+        """Abschnittszeiten werden je Rerun gesammelt, gleiche Namen addiert"""
+        profiler = RerunProfiler(TEST_PROFILE_DIR, keep=2, enabled=True)
+        with profiler.rerun("Prompts"):
+            with profiler.section("Suche"):
+                time.sleep(0.01)
+            with profiler.section("Suche"):
+                time.sleep(0.01)
+            with profiler.section("Darstellung"):
+                pass
+        last = profiler.history()[0]
+        self.assertEqual(last["label"], "Prompts")
+        self.assertEqual(set(last["sections"]), {"Suche", "Darstellung"})
+        self.assertGreaterEqual(last["sections"]["Suche"], 20)
+        self.assertGreaterEqual(last["total_ms"], last["sections"]["Suche"])
+
+    def test_only_slowest_reruns_are_kept(self):
+        """Nur die N langsamsten Reruns bleiben als pstats-Datei erhalten, auch nach Neustart"""
+        profiler = RerunProfiler(TEST_PROFILE_DIR, keep=2, enabled=True)
+        for delay in (0.03, 0.0, 0.02, 0.0):
+            with profiler.rerun():
+                time.sleep(delay)
+        slowest = profiler.slowest()
+        self.assertEqual(len(slowest), 2)
+        self.assertGreaterEqual(slowest[0]["total_ms"], 30)
+        self.assertGreaterEqual(slowest[1]["total_ms"], 20)
+        files = sorted(f for f in os.listdir(TEST_PROFILE_DIR) if f.endswith(".pstats"))
+        self.assertEqual(sorted(os.path.basename(e["stats_file"]) for e in slowest), files)
+
+        reopened = RerunProfiler(TEST_PROFILE_DIR, keep=2, enabled=True)
+        self.assertEqual([e["stats_file"] for e in reopened.slowest()], [e["stats_file"] for e in slowest])
+
+    def test_aborted_rerun_is_recorded(self):
+        """Ein per Ausnahme abgebrochener Rerun wird erfasst und die Ausnahme weitergereicht"""
+        profiler = RerunProfiler(TEST_PROFILE_DIR, keep=2, enabled=True)
+        with self.assertRaises(RuntimeError):
+            with profiler.rerun():
+                raise RuntimeError("rerun")
+        self.assertEqual(len(profiler.history()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import unittest
+from models.similarity_index import SimilarityIndex, similarity_text
+
+TEST_INDEX_PATH = "test_similarity.similar.json"
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SimilarityIndex()
+        self.index.add_document(1, "Schreibe einen Newsletter über Kaffee und Kuchen")
+        self.index.add_document(2, "Newsletter über Kaffee für Stammkunden")
+        self.index.add_document(3, "Erkläre Python-Dekoratoren mit Beispielen")
+        self.index.add_document(4, "Python Beispiele für Dekoratoren und Generatoren")
+
+    def tearDown(self):
+        if os.path.exists(TEST_INDEX_PATH):
+            os.remove(TEST_INDEX_PATH)
+
+    def test_most_similar_in_one_batch(self):
+        """Die Nachbarn mehrerer Prompts werden in einem Aufruf und absteigend geliefert"""
+        result = self.index.most_similar([1, 3, 99], limit=2)
+        self.assertEqual(set(result), {1, 3})
+        self.assertEqual(result[1][0][0], 2)
+        self.assertEqual(result[3][0][0], 4)
+        self.assertGreater(result[1][0][1], result[1][1][1] if len(result[1]) > 1 else 0.0)
+        self.assertNotIn(1, [doc_id for doc_id, _ in result[1]])
+
+    def test_incremental_updates(self):
+        """Ersetzen und Entfernen wirken sich sofort auf die Nachbarn aus"""
+        before = dict(self.index.most_similar([1])[1])[2]
+        self.index.add_document(2, "Gedicht über den Herbst")
+        self.assertLess(dict(self.index.most_similar([1])[1])[2], before)
+        self.index.remove_document(4)
+        self.assertEqual([doc_id for doc_id, _ in self.index.most_similar([3])[3]], [])
+        self.assertEqual(self.index.similar_to_text("Kaffee Kuchen Newsletter")[0][0], 1)
+
+    def test_save_and_load_with_fingerprint(self):
+        """Ein gespeicherter Index wird nur bei passendem Fingerabdruck geladen"""
+        self.index.save(TEST_INDEX_PATH, [3, 4])
+        self.assertIsNone(SimilarityIndex.load(TEST_INDEX_PATH, [4, 4]))
+        loaded = SimilarityIndex.load(TEST_INDEX_PATH, [3, 4])
+        self.assertEqual(len(loaded), 4)
+        self.assertEqual(loaded.most_similar([1, 3]), self.index.most_similar([1, 3]))
+
+    def test_similarity_text_includes_tags(self):
+        doc = {"title": "Titel", "prompt": "Text", "purpose": "", "tags": ["seo", "blog"], "notes": "ignoriert"}
+        self.assertEqual(similarity_text(doc), "Titel  Text seo blog")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import unittest
+from models.prompt_model import RevisionConflictError
+from models.similarity_index import SimilarityIndex
+from models.sqlite_repository import SQLitePromptRepository, migrate_tinydb_to_sqlite
+
+TEST_DB_PATH = "test_database.sqlite3"
+TEST_JSON_PATH = "test_migration.json"
+
+
+class TestSQLitePromptRepository(unittest.TestCase):
+    def setUp(self):
+        self._cleanup()
+        self.repo = SQLitePromptRepository(TEST_DB_PATH)
+
+    def tearDown(self):
+        try:
+            self.repo.close()
+        finally:
+            self._cleanup()
+
+    @staticmethod
+    def _cleanup():
+        for path in (TEST_DB_PATH, TEST_DB_PATH + "-wal", TEST_DB_PATH + "-shm", TEST_DB_PATH + ".similar.json",
+                     TEST_DB_PATH + ".minhash.json", TEST_JSON_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_add_and_get_prompt(self):
+        """Prompt speichern und als Prompt-Datensatz mit doc_id abrufen"""
+        doc_id = self.repo.add_prompt("Testprompt", "Test", "ChatGPT", ["b", "a"],
+                                      "Dies ist ein Test.", "Deutsch", "UnitTest", "Keine")
+        prompts = self.repo.get_all_prompts()
+        self.assertEqual(len(prompts), 1)
+        self.assertEqual(prompts[0].doc_id, doc_id)
+        self.assertEqual(prompts[0]["tags"], ("b", "a"))
+        self.assertEqual(self.repo.get_all_tags(), ["a", "b"])
+        self.assertEqual(self.repo.get_prompt(doc_id)["tags"], ("b", "a"))
+        self.assertIsNone(self.repo.get_prompt(doc_id + 1))
+
+    def test_keyword_search_and_filters(self):
+        """FTS5-Stichwortsuche mit Umlautnormalisierung und Filtern"""
+        self.repo.add_prompt("Schlüsselwörter finden", "SEO", "ChatGPT", ["seo"], "Liste", "Deutsch", "Blog", "")
+        self.repo.add_prompt("Schlüssel drehen", "Code", "Claude", ["dev"], "Text", "Englisch", "Code", "")
+        self.assertEqual(len(self.repo.search_prompts("schluessel")), 2)
+        self.assertEqual([p["title"] for p in self.repo.search_prompts("schlüssel", tags=["seo"])],
+                         ["Schlüsselwörter finden"])
+        result = self.repo.query_prompts(language="engl", sort_by="title")
+        self.assertEqual(result.total, 1)
+        self.assertEqual(result.items[0]["category"], "Code")
+        self.assertEqual(len(self.repo.search_prompts("rter", mode="substring")), 1)
+
+    def test_fuzzy_search_uses_trigram_tables(self):
+        """Unscharfe Suche über die Trigramm-Tabellen, gepflegt bei Updates und Löschungen"""
+        exact = self.repo.add_prompt("Schlüsselwörter finden", "SEO", "ChatGPT", [], "Liste", "", "", "")
+        other = self.repo.add_prompt("Texte", "SEO", "ChatGPT", [], "p", "", "Schlüssel", "")
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("Schlüsselwörtr", mode="fuzzy")],
+                         [exact, other])
+        result = self.repo.query_prompts("Schlüsselwörtr", mode="fuzzy", sort_by="title")
+        self.assertEqual([p["title"] for p in result.items], ["Schlüsselwörter finden", "Texte"])
+        self.repo.update_prompt(other, {"purpose": "Blog"})
+        self.repo.delete_prompt(exact)
+        self.assertEqual(self.repo.search_prompts("Schlüsselwörtr", mode="fuzzy"), [])
+        self.assertEqual(self.repo.conn.execute(
+            "SELECT COUNT(*) FROM term_trigrams WHERE term LIKE 'schl%'").fetchone()[0], 0)
+
+    def test_keyword_results_ranked_by_bm25(self):
+        """bm25() mit Feldgewichten: Titel vor Zweck vor Prompt-Text vor Notizen"""
+        in_notes = self.repo.add_prompt("A", "X", "ChatGPT", [], "p", "", "", "Newsletter")
+        in_prompt = self.repo.add_prompt("B", "X", "ChatGPT", [], "Schreibe einen Newsletter", "", "", "")
+        in_title = self.repo.add_prompt("Newsletter", "X", "ChatGPT", [], "p", "", "", "")
+        in_purpose = self.repo.add_prompt("C", "X", "ChatGPT", [], "p", "", "Newsletter", "")
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("newsletter")],
+                         [in_title, in_purpose, in_prompt, in_notes])
+        result = self.repo.query_prompts("news", sort_by="relevance", limit=2, offset=1)
+        self.assertEqual((result.total, [p.doc_id for p in result.items]), (4, [in_purpose, in_prompt]))
+
+    def test_old_fts_table_is_rebuilt(self):
+        """Ein FTS-Index mit den alten Spalten (Titel, Prompt) wird beim Öffnen neu aufgebaut"""
+        doc_id = self.repo.add_prompt("Alpha", "A", "ChatGPT", [], "p", "", "Zielgruppe", "")
+        with self.repo.conn:
+            self.repo.conn.execute("DROP TABLE prompts_fts")
+            self.repo.conn.execute("CREATE VIRTUAL TABLE prompts_fts USING fts5(title, prompt)")
+        self.repo.close()
+        self.repo = SQLitePromptRepository(TEST_DB_PATH)
+        self.assertEqual([p.doc_id for p in self.repo.search_prompts("zielgruppe")], [doc_id])
+
+    def test_update_and_delete_maintain_indexes(self):
+        """Tags und Volltextindex folgen Updates und Löschungen"""
+        doc_id = self.repo.add_prompt("Alpha", "A", "ChatGPT", ["alt"], "erster", "", "", "")
+        self.repo.update_prompt(doc_id, {"prompt": "zweiter", "tags": ["neu"]})
+        self.assertEqual(self.repo.search_prompts("erster"), [])
+        self.assertEqual(self.repo.get_all_tags(), ["neu"])
+        self.repo.delete_prompt(doc_id)
+        self.assertEqual(self.repo.search_prompts("zweiter"), [])
+        self.assertEqual(self.repo.get_all_categories(), [])
+        self.repo.delete_prompt(doc_id)
+
+    def test_near_duplicate_index_follows_writes(self):
+        """Der MinHash-Index folgt Einfügungen, Updates, Löschungen und Rollbacks"""
+        text = "Schreibe einen freundlichen Newsletter über unser neues Produkt und nenne drei Vorteile."
+        first = self.repo.add_prompt("Eins", "A", "ChatGPT", [], text, "", "", "")
+        self.assertEqual([doc_id for doc_id, _ in self.repo.find_near_duplicates(text + " Danke!")], [first])
+        second = self.repo.add_prompt("Zwei", "A", "ChatGPT", [], text + " Danke!", "", "", "")
+        self.assertEqual(self.repo.find_duplicate_clusters(), [[first, second]])
+
+        with self.assertRaises(RevisionConflictError):
+            self.repo.update_prompts({second: {"prompt": "Etwas anderes"}, first: {"prompt": "Neu"}},
+                                     expected_revisions={first: 99})
+        self.assertEqual(self.repo.find_duplicate_clusters(), [[first, second]])
+
+        self.repo.update_prompt(second, {"prompt": "Übersetze den Text ins Englische."})
+        self.assertEqual(self.repo.find_duplicate_clusters(), [])
+        self.repo.delete_prompt(first)
+        self.assertEqual(self.repo.find_near_duplicates(text), [])
+
+    def test_similar_prompts_persisted_and_maintained(self):
+        """Der TF-IDF-Index wird gespeichert, wiederverwendet und bei Schreibvorgängen nachgeführt"""
+        coffee = self.repo.add_prompt("Kaffee-Newsletter", "A", "ChatGPT", ["mail"], "Newsletter über Kaffee", "", "", "")
+        cake = self.repo.add_prompt("Kuchen-Newsletter", "A", "ChatGPT", ["mail"], "Newsletter über Kuchen", "", "", "")
+        python = self.repo.add_prompt("Python", "B", "ChatGPT", [], "Erkläre Dekoratoren", "", "", "")
+        self.assertEqual(self.repo.find_similar_prompts([coffee])[coffee][0][0], cake)
+        self.assertTrue(os.path.exists(TEST_DB_PATH + ".similar.json"))
+
+        self.repo.update_prompt(python, {"title": "Kaffee", "prompt": "Newsletter über Kaffee und Kuchen"})
+        self.assertEqual(self.repo.find_similar_prompts([coffee])[coffee][0][0], python)
+        self.repo.close()
+
+        self.repo = SQLitePromptRepository(TEST_DB_PATH)
+        self.assertEqual(len(SimilarityIndex.load(TEST_DB_PATH + ".similar.json", self.repo._change_fingerprint())), 3)
+        self.repo.delete_prompt(python)
+        self.assertEqual([doc_id for doc_id, _ in self.repo.find_similar_prompts([coffee, 99])[coffee]], [cake])
+
+    def test_batched_writes(self):
+        """Massenoperationen in einer Transaktion"""
+        ids = self.repo.add_prompts([{"title": f"T{i}", "prompt": "p", "tags": ["x"]} for i in range(3)])
+        self.assertEqual(self.repo.update_prompts({ids[0]: {"title": "Neu"}, 99: {"title": "X"}}), [ids[0]])
+        self.assertEqual(len(self.repo.search_prompts("neu")), 1)
+        self.assertEqual(self.repo.delete_prompts([ids[1], 99]), [ids[1]])
+        self.assertEqual(len(self.repo.search_prompts(tags=["x"])), 2)
+
+    def test_revision_rejects_stale_update(self):
+        """Revision steigt je Update; eine veraltete Revision rollt die ganze Transaktion zurück"""
+        ids = self.repo.add_prompts([{"title": "A", "prompt": "p"}, {"title": "B", "prompt": "p"}])
+        self.repo.update_prompt(ids[0], {"title": "A2"}, expected_revision=1)
+        self.assertEqual(self.repo.get_prompt(ids[0])["revision"], 2)
+        with self.assertRaises(RevisionConflictError):
+            self.repo.update_prompts({ids[1]: {"title": "B2"}, ids[0]: {"title": "A3"}},
+                                     expected_revisions={ids[0]: 1, ids[1]: 1})
+        self.assertEqual([p["title"] for p in self.repo.get_all_prompts()], ["A2", "B"])
+
+    def test_old_schema_gets_revision_column(self):
+        """Bestehende Datenbanken ohne Revisionsspalte werden beim Öffnen ergänzt"""
+        self.repo.close()
+        for path in (TEST_DB_PATH, TEST_DB_PATH + "-wal", TEST_DB_PATH + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        conn = sqlite3.connect(TEST_DB_PATH)
+        conn.executescript("CREATE TABLE prompts (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                           "category TEXT NOT NULL DEFAULT '', platform TEXT NOT NULL DEFAULT '', "
+                           "prompt TEXT NOT NULL DEFAULT '', language TEXT NOT NULL DEFAULT '', "
+                           "purpose TEXT NOT NULL DEFAULT '', notes TEXT NOT NULL DEFAULT '', "
+                           "last_modified TEXT NOT NULL DEFAULT ''); "
+                           "INSERT INTO prompts(title, prompt) VALUES ('Alt', 'p');")
+        conn.close()
+        self.repo = SQLitePromptRepository(TEST_DB_PATH)
+        self.assertEqual(self.repo.get_prompt(1)["revision"], 1)
+
+    def test_data_version_tracks_own_and_external_writes(self):
+        """Datenversion steigt bei eigenen Schreibvorgängen und bei Änderungen anderer Verbindungen"""
+        version = self.repo.get_data_version()
+        self.repo.add_prompt("Eins", "A", "ChatGPT", [], "p")
+        self.assertGreater(self.repo.get_data_version(), version)
+        version = self.repo.get_data_version()
+        self.assertEqual(self.repo.get_data_version(), version)
+
+        other = SQLitePromptRepository(TEST_DB_PATH)
+        try:
+            other.add_prompt("Zwei", "A", "ChatGPT", [], "p")
+        finally:
+            other.close()
+        self.assertGreater(self.repo.get_data_version(), version)
+
+    def test_migration_keeps_doc_ids(self):
+        """Migration aus TinyDB übernimmt Dokument-IDs"""
+        with open(TEST_JSON_PATH, "w", encoding="utf-8") as f:
+            json.dump({"_default": {"3": {"title": "Drei", "category": "X", "platform": "ChatGPT",
+                                          "tags": ["t"], "prompt": "p", "last_modified": "2025"}}}, f)
+        self.repo.close()
+        os.remove(TEST_DB_PATH)
+        self.assertEqual(migrate_tinydb_to_sqlite(TEST_JSON_PATH, TEST_DB_PATH), 1)
+        self.repo = SQLitePromptRepository(TEST_DB_PATH)
+        self.assertEqual(self.repo.get_all_prompts()[0].doc_id, 3)
+        self.assertEqual(self.repo.add_prompt("Vier", "X", "ChatGPT", [], "p"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,9 @@ Funktionen:
 - Optionales ZIP-Backup vor Löschung (--backup)
 - Optionaler Dry-Run (Simulationsmodus ohne Änderungen)
 - Logging aller Aktionen in cleanup.log
-- Berichte in Markdown und HTML
+- Berichte in Markdown und HTML, für CI zusätzlich als JSON (--json)
+- Paralleler Verzeichnis-Scan mit Scan-Cache: Wiederholte Läufe lesen nur
+  Verzeichnisse neu ein, deren mtime sich geändert hat (--no-cache, --workers)
 
 
 ## ⚙️ Beispielaufrufe
@@ -33,13 +35,19 @@ python tools/cleanup_suggestions.py --dry-run
 
 # Kombination: Backup + direktes Löschen + Filter
 python tools/cleanup_suggestions.py --force --backup --min-size 3 --min-age 14
+
+# CI: JSON-Bericht auf stdout, nichts löschen, Exit-Code 1 bei Funden
+python tools/cleanup_suggestions.py --json
 """
 
 import os
+import sys
+import json
 import argparse
 import time
 import zipfile
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 # === Konfiguration ===
@@ -54,6 +62,11 @@ REPORT_MD = "cleanup_report.md"
 REPORT_HTML = "cleanup_report.html"
 BACKUP_DIR = ".backup"
 LOG_FILE = "cleanup.log"
+SCAN_CACHE = ".cleanup_scan_cache.json"
+SCAN_CACHE_VERSION = 1
+# Verzeichnisse, deren mtime jünger ist, werden nicht gecacht: Änderungen im
+# selben Zeitstempel-Takt wären sonst beim nächsten Lauf unsichtbar.
+RACY_WINDOW_NS = 2 * 10**9
 
 # === Logging Setup ===
 
@@ -75,35 +88,165 @@ def is_protected(path):
 
 # === Datei-Suche ===
 
-def find_unwanted_files(project_root=".", min_size_kb=0, min_age_days=0):
+def is_candidate(name):
     """
-    Scannt das Projekt nach verdächtigen .py-Dateien basierend auf:
-    - Namen mit bestimmten Schlüsselwörtern
-    - Größe und Alter
+    Prüft, ob ein Dateiname Endung und Schlüsselwort eines Löschkandidaten hat.
+    """
+    return (any(name.endswith(ext) for ext in TARGET_EXTENSIONS)
+            and any(keyword in name.lower() for keyword in UNWANTED_KEYWORDS))
+
+
+def _cache_signature():
+    """
+    Filterkonfiguration, unter der ein Scan-Cache gültig ist.
+    """
+    return [SCAN_CACHE_VERSION, sorted(UNWANTED_KEYWORDS), sorted(TARGET_EXTENSIONS), sorted(EXCLUDED_DIRS)]
+
+
+def load_scan_cache(cache_path):
+    """
+    Lädt den Scan-Cache; bei fehlender, defekter oder veralteter Datei ein leeres Dictionary.
+
+    Rückgabe: {relativer Verzeichnispfad: {"mtime_ns", "dirs", "files"}}
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("signature") != _cache_signature():
+        return {}
+    return data.get("dirs", {})
+
+
+def save_scan_cache(cache_path, directories):
+    """
+    Schreibt den Scan-Cache atomar (temporäre Datei + os.replace).
+    """
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"signature": _cache_signature(), "dirs": directories}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def _scan_directory(project_root, rel_dir, cached, scan_started_ns):
+    """
+    Liest ein Verzeichnis ein – oder übernimmt Unterverzeichnisse und Kandidaten
+    aus dem Cache, wenn sich seine mtime nicht geändert hat.
+
+    Rückgabe: (Cache-Eintrag, {Dateipfad: os.stat_result}, aus dem Cache übernommen?)
+    """
+    directory = os.path.join(project_root, rel_dir) if rel_dir else project_root
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError as e:
+        logging.warning(f"Verzeichnis nicht lesbar: {directory} → {e}")
+        return None, {}, False
+
+    stats = {}
+    if cached and cached.get("mtime_ns") == mtime_ns:
+        # Inhalte von Dateien ändern die Verzeichnis-mtime nicht: Größe und Alter
+        # der (wenigen) Kandidaten werden daher immer frisch ermittelt.
+        for name in cached["files"]:
+            path = os.path.join(directory, name)
+            try:
+                stats[path] = os.stat(path)
+            except OSError:
+                continue
+        return cached, stats, True
+
+    dirs, files = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in EXCLUDED_DIRS:
+                            dirs.append(entry.name)
+                    elif is_candidate(entry.name) and entry.is_file():
+                        stats[entry.path] = entry.stat()
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError as e:
+        logging.warning(f"Verzeichnis nicht lesbar: {directory} → {e}")
+        return None, {}, False
+
+    racy = scan_started_ns - mtime_ns < RACY_WINDOW_NS
+    return {"mtime_ns": None if racy else mtime_ns, "dirs": sorted(dirs), "files": sorted(files)}, stats, False
+
+
+def scan_candidates(project_root=".", cache_file=SCAN_CACHE, workers=None):
+    """
+    Durchsucht das Projekt parallel nach Dateien mit verdächtigem Namen.
+
+    Jedes Verzeichnis wird mit os.scandir in einem Thread-Pool eingelesen; nur
+    Kandidaten werden (einmal) per stat abgefragt. Mit Scan-Cache werden
+    Verzeichnisse mit unveränderter mtime nicht erneut aufgelistet.
 
-    Rückgabe: Liste der verdächtigen Dateipfade
+    :param project_root: Wurzelverzeichnis des Scans
+    :param cache_file: Cache-Datei relativ zu project_root (None = ohne Cache)
+    :param workers: Anzahl Threads (None = Standard von ThreadPoolExecutor)
+    Rückgabe: ({Dateipfad: os.stat_result}, Statistik mit directories, cached_directories, candidates)
+    """
+    cache_path = os.path.join(project_root, cache_file) if cache_file else None
+    cache = load_scan_cache(cache_path) if cache_path else {}
+    scan_started_ns = time.time_ns()
+    directories, candidates, cached_count = {}, {}, 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_directory, project_root, "", cache.get(""), scan_started_ns): ""}
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                rel_dir = pending.pop(future)
+                entry, stats, from_cache = future.result()
+                if entry is None:
+                    continue
+                directories[rel_dir] = entry
+                candidates.update(stats)
+                cached_count += from_cache
+                for name in entry["dirs"]:
+                    child = f"{rel_dir}/{name}" if rel_dir else name
+                    pending[pool.submit(_scan_directory, project_root, child, cache.get(child), scan_started_ns)] = child
+
+    if cache_path:
+        try:
+            save_scan_cache(cache_path, directories)
+        except OSError as e:
+            logging.warning(f"Scan-Cache nicht gespeichert: {cache_path} → {e}")
+
+    stats = {"directories": len(directories), "cached_directories": cached_count, "candidates": len(candidates)}
+    return {path.replace("\\", "/"): st for path, st in candidates.items()}, stats
+
+
+def filter_candidates(candidates, min_size_kb=0, min_age_days=0):
+    """
+    Filtert Kandidaten aus scan_candidates nach Mindestgröße und Mindestalter.
+
+    Rückgabe: Sortierte Liste der verdächtigen Dateipfade
     """
     suggestions = []
     now = time.time()
     min_age_secs = min_age_days * 86400
 
-    for root, dirs, files in os.walk(project_root):
-        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+    for file_path, st in sorted(candidates.items()):
+        if st.st_size / 1024 >= min_size_kb and now - st.st_mtime >= min_age_secs:
+            suggestions.append(file_path)
+            logging.info(f"Datei zur Löschung vorgeschlagen: {file_path}")
+    return suggestions
 
-        for file in files:
-            if not any(file.endswith(ext) for ext in TARGET_EXTENSIONS):
-                continue
-            if not any(keyword in file.lower() for keyword in UNWANTED_KEYWORDS):
-                continue
 
-            file_path = os.path.join(root, file).replace("\\", "/").strip()
-            size_kb = os.path.getsize(file_path) / 1024
-            age_secs = now - os.path.getmtime(file_path)
+def find_unwanted_files(project_root=".", min_size_kb=0, min_age_days=0, cache_file=SCAN_CACHE, workers=None):
+    """
+    Scannt das Projekt nach verdächtigen .py-Dateien basierend auf:
+    - Namen mit bestimmten Schlüsselwörtern
+    - Größe und Alter
 
-            if size_kb >= min_size_kb and age_secs >= min_age_secs:
-                suggestions.append(file_path)
-                logging.info(f"Datei zur Löschung vorgeschlagen: {file_path}")
-    return suggestions
+    Rückgabe: Sortierte Liste der verdächtigen Dateipfade
+    """
+    candidates, _ = scan_candidates(project_root, cache_file=cache_file, workers=workers)
+    return filter_candidates(candidates, min_size_kb, min_age_days)
 
 # === Backup ===
 
@@ -190,6 +333,27 @@ def generate_html_report(file_list):
             html.write("</table>")
         html.write("</body></html>")
 
+def generate_json_report(file_list, candidates, scan_stats=None):
+    """
+    Erstellt einen maschinenlesbaren Bericht (z. B. für CI).
+
+    Größe und Alter stammen aus den stat-Ergebnissen von scan_candidates; die
+    Dateien werden nicht erneut abgefragt.
+
+    Rückgabe: JSON-Text mit Dateien (Pfad, Größe, Alter, Schutzstatus) und Scan-Statistik
+    """
+    now = time.time()
+    files = []
+    for f in file_list:
+        st = candidates[f]
+        files.append({
+            "path": f,
+            "size_kb": round(st.st_size / 1024, 2),
+            "age_days": round((now - st.st_mtime) / 86400, 2),
+            "protected": is_protected(f),
+        })
+    return json.dumps({"count": len(files), "files": files, "scan": scan_stats or {}}, ensure_ascii=False, indent=2)
+
 # === Hauptprogramm ===
 
 if __name__ == "__main__":
@@ -199,15 +363,30 @@ if __name__ == "__main__":
     parser.add_argument("--dry-run", action="store_true", help="Nur anzeigen, nichts löschen")
     parser.add_argument("--min-size", type=int, default=0, help="Nur Dateien größer als X KB einbeziehen")
     parser.add_argument("--min-age", type=int, default=0, help="Nur Dateien älter als X Tage einbeziehen")
+    parser.add_argument("--json", action="store_true",
+                        help="JSON-Bericht auf stdout ausgeben, nichts löschen; Exit-Code 1 bei Funden (für CI)")
+    parser.add_argument("--no-cache", action="store_true", help="Scan-Cache weder lesen noch schreiben")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl paralleler Scan-Threads")
     args = parser.parse_args()
 
-    print("\n🔍 Starte Bereinigungsscanner...\n")
     logging.info("Cleanup gestartet")
+    cache_file = None if args.no_cache else SCAN_CACHE
+
+    if args.json:
+        candidates, scan_stats = scan_candidates(".", cache_file=cache_file, workers=args.workers)
+        unwanted_files = filter_candidates(candidates, args.min_size, args.min_age)
+        print(generate_json_report(unwanted_files, candidates, scan_stats))
+        logging.info(f"JSON-Bericht erstellt: {len(unwanted_files)} Datei(en)")
+        sys.exit(1 if unwanted_files else 0)
+
+    print("\n🔍 Starte Bereinigungsscanner...\n")
 
     unwanted_files = find_unwanted_files(
         project_root=".",
         min_size_kb=args.min_size,
-        min_age_days=args.min_age
+        min_age_days=args.min_age,
+        cache_file=cache_file,
+        workers=args.workers
     )
 
     generate_markdown_report(unwanted_files)
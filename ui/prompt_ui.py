@@ -2,18 +2,62 @@
 PromptDatabaseUI – Streamlit-basierte Benutzeroberfläche zur Verwaltung von AI-Prompts.
 """
 
+import atexit
+import io
+import time
+from typing import Dict, Optional
 import streamlit as st
 from services.prompt_service import PromptService
-from utils.helpers import export_prompts_to_csv, export_prompts_to_markdown
-from utils.backup import backup_database
-from utils.project_zipper import zip_project
+from models.prompt_model import SEARCH_MODE_FUZZY, SEARCH_MODE_KEYWORD, SEARCH_MODE_SUBSTRING, SORT_RELEVANCE
+from utils.helpers import EXPORT_FORMATS, export_file_name, iter_export
+from utils.instrumentation import dump_metrics, enable_metrics, get_metrics, metrics_enabled, reset_metrics
+from utils.rerun_profiler import RerunProfiler
+from utils.background_job import DONE, FAILED, RUNNING, get_job, start_job
+from utils.backup import run_backup
+from utils.project_zipper import SNAPSHOT_JOB, start_snapshot_job
 from utils.logger import configure_logger
+from utils.session_state_manager import (clear_edit_target, get_edit_target, get_list_page, set_edit_target,
+                                         set_list_page)
 from config.theme_manager import get_theme, apply_color_scheme
+from config.profiling_config import load_profiling_settings
+from config.backup_config import load_backup_settings
 import subprocess
 from streamlit_option_menu import option_menu
 
 logger = configure_logger(__name__)
 
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+BACKUP_JOB = "backup"
+PROGRESS_REFRESH_SECONDS = 0.5
+SEARCH_MODE_LABELS = {
+    "Stichwort": SEARCH_MODE_KEYWORD,
+    "Unscharf (tippfehlertolerant)": SEARCH_MODE_FUZZY,
+    "Teilwort (langsamer, findet auch Wortteile)": SEARCH_MODE_SUBSTRING,
+}
+
+
+@st.cache_resource
+def get_shared_service() -> PromptService:
+    """
+    Ein PromptService (und damit ein geöffnetes Repository) für alle Reruns und Sitzungen,
+    damit die Datenbank nicht bei jeder Interaktion neu eingelesen wird. Die Suchindizes
+    speichert das Repository nach Schreibvorgängen gedrosselt und beim Beenden des Prozesses.
+    """
+    logger.info("Gemeinsamen PromptService initialisiert")
+    service = PromptService()
+    # Die Ressource wird nie freigegeben: Beim Beenden des Servers Indizes speichern und schließen.
+    atexit.register(service.close)
+    return service
+
+
+@st.cache_resource
+def get_rerun_profiler() -> RerunProfiler:
+    """
+    Gemeinsamer Rerun-Profiler; aktiv über settings/profiling.json oder PROMPT_DB_PROFILE=1.
+    """
+    settings = load_profiling_settings()
+    return RerunProfiler(settings["directory"], settings["keep"], settings["enabled"])
+
 
 class PromptDatabaseUI:
     """
@@ -21,9 +65,8 @@ class PromptDatabaseUI:
     """
 
     def __init__(self):
-        self.service = PromptService()
-        self.edit_mode = False
-        self.edit_doc_id = None
+        self.service = get_shared_service()
+        self.profiler = get_rerun_profiler()
 
     def run(self):
         """Startet die UI mit Icon-Menü."""
@@ -32,8 +75,8 @@ class PromptDatabaseUI:
 
         selected = option_menu(
             menu_title=None,
-            options=["Prompts", "Tests", "Backup", "Einstellungen", "Über"],
-            icons=["file-earmark-text", "bug", "cloud-download", "gear", "info-circle"],
+            options=["Prompts", "Tests", "Backup", "Diagnose", "Einstellungen", "Über"],
+            icons=["file-earmark-text", "bug", "cloud-download", "speedometer2", "gear", "info-circle"],
             menu_icon="cast",
             default_index=0,
             orientation="horizontal",
@@ -43,39 +86,180 @@ class PromptDatabaseUI:
             }
         )
 
-        if selected == "Prompts":
-            st.caption("📋 Erstellen, durchsuchen und verwalten Sie Ihre Prompts.")
-            self._show_input_form()
-            st.markdown("---")
-            self._show_prompt_table()
+        with self.profiler.rerun(selected):
+            if selected == "Prompts":
+                st.caption("📋 Erstellen, durchsuchen und verwalten Sie Ihre Prompts.")
+                with self.profiler.section("Formular"):
+                    self._show_input_form()
+                st.markdown("---")
+                self._show_prompt_table()
+
+            elif selected == "Tests":
+                st.caption("🧪 Führen Sie Unittests für Ihre Anwendung aus.")
+                st.subheader("🧪 Tests ausführen (run_tests.py)")
+                button_style = apply_color_scheme("light", "secondary")
+                if st.button("Jetzt testen", type=button_style):
+                    result = subprocess.run(["python", "run_tests.py"], capture_output=True, text=True)
+                    st.code(result.stdout + result.stderr, language="bash")
 
-        elif selected == "Tests":
-            st.caption("🧪 Führen Sie Unittests für Ihre Anwendung aus.")
-            st.subheader("🧪 Tests ausführen (run_tests.py)")
-            button_style = apply_color_scheme("light", "secondary")
-            if st.button("Jetzt testen", type=button_style):
-                result = subprocess.run(["python", "run_tests.py"], capture_output=True, text=True)
-                st.code(result.stdout + result.stderr, language="bash")
+            elif selected == "Backup":
+                self._show_backup()
 
-        elif selected == "Backup":
-            self._show_backup()
+            elif selected == "Diagnose":
+                self._show_diagnostics()
 
-        elif selected == "Einstellungen":
-            self._show_settings()
+            elif selected == "Einstellungen":
+                self._show_settings()
 
-        elif selected == "Über":
-            self._show_about()
+            elif selected == "Über":
+                self._show_about()
 
     def _show_backup(self):
         st.subheader("💾 Backup & Projektarchiv")
         button_style = apply_color_scheme("primary", "secondary")
         if st.button("Backup der Datenbank erstellen", type=button_style):
-            path = backup_database()
-            st.success(f"Backup gespeichert: {path}")
+            self._start_backup()
+        backup_running = self._show_backup_status()
 
         if st.button("📦 Projektstruktur als ZIP sichern", type=button_style):
-            zip_project()
-            st.success("Projektstruktur als ZIP gespeichert.")
+            start_snapshot_job()
+        snapshot_running = self._show_snapshot_status()
+
+        st.markdown("---")
+        st.subheader("📥 Prompts importieren (CSV / JSONL)")
+        uploaded = st.file_uploader("Datei auswählen", type=["csv", "jsonl", "ndjson"])
+        if uploaded is not None and st.button("Import starten", type=button_style):
+            try:
+                report = self.service.import_prompts(uploaded)
+            except ValueError as ve:
+                st.error(str(ve))
+            else:
+                st.success(f"{report.imported} Prompts importiert.")
+                if report.errors:
+                    st.warning(f"{len(report.errors)} Zeilen übersprungen:")
+                    st.code("\n".join(f"Zeile {line}: {message}" for line, message in report.errors[:100]))
+
+        st.markdown("---")
+        st.subheader("🧬 Doppelte Prompts")
+        if st.button("Duplikat-Cluster ermitteln", type=button_style):
+            clusters = self.service.find_duplicate_clusters()
+            if not clusters:
+                st.info("Keine nahezu identischen Prompts gefunden.")
+            for number, cluster in enumerate(clusters, start=1):
+                st.markdown(f"**Cluster {number}** ({len(cluster)} Prompts)")
+                st.dataframe([{"ID": prompt.doc_id, "Titel": prompt.get("title", ""),
+                               "Kategorie": prompt.get("category", "")} for prompt in cluster],
+                             use_container_width=True, hide_index=True)
+
+        if backup_running or snapshot_running:
+            # Erst die ganze Seite darstellen, dann für den nächsten Fortschrittsstand neu ausführen.
+            time.sleep(PROGRESS_REFRESH_SECONDS)
+            st.experimental_rerun()
+
+    def _show_diagnostics(self):
+        st.subheader("📈 Diagnose – Laufzeiten je Operation")
+        enabled = st.toggle("Messung aktiv", value=metrics_enabled(),
+                            help="Alternativ beim Start mit PROMPT_DB_METRICS=1 aktivieren.")
+        if enabled != metrics_enabled():
+            enable_metrics(enabled)
+        metrics = get_metrics()
+        if not metrics:
+            st.info("Noch keine Messwerte. Messung aktivieren und die App benutzen.")
+        else:
+            st.dataframe([{"Operation": name, **stats} for name, stats in metrics.items()],
+                         use_container_width=True, hide_index=True)
+        col_reset, col_download = st.columns([1, 1])
+        with col_reset:
+            if st.button("Messwerte zurücksetzen"):
+                reset_metrics()
+                st.experimental_rerun()
+        with col_download:
+            st.download_button("⬇️ Als JSON herunterladen", data=dump_metrics(),
+                               file_name="prompt_db_metrics.json", mime="application/json")
+
+        st.markdown("---")
+        st.subheader("🐢 Rerun-Profiling")
+        profiling = st.toggle("Reruns profilieren", value=self.profiler.enabled,
+                              help="Alternativ mit PROMPT_DB_PROFILE=1 oder settings/profiling.json aktivieren.")
+        if profiling != self.profiler.enabled:
+            self.profiler.enabled = profiling
+        history = self.profiler.history()
+        if not history:
+            st.info("Noch keine profilierten Reruns.")
+            return
+        st.caption("Letzte Reruns – Laufzeit je Abschnitt in ms")
+        st.dataframe([{"Zeit": entry["started"], "Seite": entry["label"], "Gesamt": entry["total_ms"],
+                       **entry["sections"]} for entry in history],
+                     use_container_width=True, hide_index=True)
+        st.caption(f"Die {self.profiler.keep} langsamsten Reruns (pstats-Dateien, z. B. für snakeviz/flameprof)")
+        st.dataframe([{"Gesamt": entry["total_ms"], "Seite": entry["label"], "Datei": entry["stats_file"]}
+                      for entry in self.profiler.slowest()],
+                     use_container_width=True, hide_index=True)
+
+    def _start_backup(self):
+        """
+        Startet Checkpoint, Backup, Prüfung und Aufräumen als Hintergrundaufgabe;
+        der Rerun kehrt sofort zurück. Läuft bereits ein Backup, wird kein zweites gestartet.
+        """
+        settings = load_backup_settings()
+        service = self.service
+
+        def task(progress):
+            service.checkpoint()
+            return run_backup(service.repo.db_path, settings["directory"], settings["keep_hourly"],
+                              settings["keep_daily"], settings["keep_weekly"], progress=progress)
+
+        start_job(BACKUP_JOB, task, name="Datenbank-Backup")
+
+    @staticmethod
+    def _show_job_status(job_key: str) -> Optional[Dict]:
+        """
+        Zeigt den Fortschritt einer Hintergrundaufgabe bzw. ihren Fehler.
+
+        :return: ``BackgroundJob.status()`` oder None, wenn die Aufgabe noch nie gestartet wurde
+        """
+        job = get_job(job_key)
+        if job is None:
+            return None
+        status = job.status()
+        if status["state"] == RUNNING:
+            st.progress(status["progress"], text=f"{job.name}: {status['phase'] or 'Start'} …")
+        elif status["state"] == FAILED:
+            st.error(f"{job.name} fehlgeschlagen: {status['error']}")
+        return status
+
+    def _show_snapshot_status(self) -> bool:
+        """
+        Zeigt Fortschritt bzw. Ergebnis des letzten Projekt-Snapshots.
+
+        :return: True, solange der Snapshot noch läuft
+        """
+        status = self._show_job_status(SNAPSHOT_JOB)
+        if status is None:
+            return False
+        if status["state"] == DONE:
+            result = status["result"]
+            st.success(f"Projektstruktur gespeichert: {result['zip']} ({result['files']} Dateien, "
+                       f"{result['compressed']} neu komprimiert, {status['duration']:.1f} s)")
+        return status["state"] == RUNNING
+
+    def _show_backup_status(self) -> bool:
+        """
+        Zeigt Fortschritt bzw. Ergebnis des letzten Backups.
+
+        :return: True, solange das Backup noch läuft
+        """
+        status = self._show_job_status(BACKUP_JOB)
+        if status is None or status["state"] != DONE:
+            return status is not None and status["state"] == RUNNING
+        if status["result"]["problems"]:
+            st.error("Backup fehlerhaft:\n\n" + "\n".join(f"- {problem}" for problem in status["result"]["problems"]))
+        else:
+            result = status["result"]
+            st.success(f"Backup gespeichert und geprüft: {result['manifest']} "
+                       f"({result['stored_bytes'] / 1024:.0f} KiB neu, {len(result['removed'])} alte Backups entfernt, "
+                       f"{status['duration']:.1f} s)")
+        return False
 
     def _show_settings(self):
         st.subheader("⚙️ Einstellungen")
@@ -95,26 +279,49 @@ class PromptDatabaseUI:
         Lizenz: MIT
         """)
 
+    def _offer_export(self, fmt: str, compress: bool, filters: dict):
+        """Erzeugt den Export blockweise und bietet ihn direkt zum Download an."""
+        buffer = io.BytesIO()
+        for chunk in iter_export(self.service.iter_prompts(**filters), fmt, compress=compress):
+            buffer.write(chunk)
+        buffer.seek(0)
+        mime = "application/gzip" if compress else EXPORT_FORMATS[fmt][1]
+        st.download_button("⬇️ Export herunterladen", data=buffer,
+                           file_name=export_file_name(fmt, compress), mime=mime)
+        logger.info("Export erstellt: %s (%d Bytes)", fmt, buffer.getbuffer().nbytes)
+
     def _show_input_form(self):
-        st.subheader("➕ Prompt hinzufügen" if not self.edit_mode else "✏️ Prompt bearbeiten")
-
-        with st.form(key="prompt_form", clear_on_submit=not self.edit_mode):
-            title = st.text_input("Titel", value="")
-            category = st.text_input("Kategorie", value="")
-            platform = st.selectbox("Plattform", ["ChatGPT", "Claude", "Gemini", "Andere"])
-            language = st.text_input("Sprache (optional)", value="")
-            purpose = st.text_input("Zweck / Verwendungsziel", value="")
-            tags_input = st.text_input("Tags (durch Komma getrennt)", value="")
-            prompt_text = st.text_area("Prompt-Text", height=150)
-            notes = st.text_area("Notizen (optional)", height=100)
+        # Bearbeitungsziel und Revision liegen im Session-State: Die UI-Instanz überlebt keinen Rerun.
+        edit_target = get_edit_target()
+        editing = self.service.get_prompt(edit_target[0]) if edit_target else None
+        if edit_target and editing is None:
+            clear_edit_target()
+            edit_target = None
+        st.subheader("✏️ Prompt bearbeiten" if editing is not None else "➕ Prompt hinzufügen")
+
+        platforms = ["ChatGPT", "Claude", "Gemini", "Andere"]
+        current = editing if editing is not None else {}
+        form_key = f"prompt_form_{edit_target[0]}" if edit_target else "prompt_form"
+        with st.form(key=form_key, clear_on_submit=editing is None):
+            title = st.text_input("Titel", value=current.get("title", ""))
+            category = st.text_input("Kategorie", value=current.get("category", ""))
+            platform = st.selectbox("Plattform", platforms,
+                                    index=platforms.index(current["platform"])
+                                    if current.get("platform") in platforms else 0)
+            language = st.text_input("Sprache (optional)", value=current.get("language", ""))
+            purpose = st.text_input("Zweck / Verwendungsziel", value=current.get("purpose", ""))
+            tags_input = st.text_input("Tags (durch Komma getrennt)", value=", ".join(current.get("tags", [])))
+            prompt_text = st.text_area("Prompt-Text", value=current.get("prompt", ""), height=150)
+            notes = st.text_area("Notizen (optional)", value=current.get("notes", ""), height=100)
 
             submit = st.form_submit_button("Prompt speichern")
 
             if submit:
                 tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
                 try:
-                    if self.edit_mode:
-                        self.service.update_prompt(self.edit_doc_id, {
+                    if editing is not None:
+                        doc_id, revision = edit_target
+                        self.service.update_prompt(doc_id, {
                             "title": title,
                             "category": category,
                             "platform": platform,
@@ -123,17 +330,20 @@ class PromptDatabaseUI:
                             "language": language,
                             "purpose": purpose,
                             "notes": notes
-                        })
+                        }, expected_revision=revision)
                         st.success("Prompt erfolgreich aktualisiert.")
-                        logger.info("Prompt aktualisiert: ID %s", self.edit_doc_id)
-                        self.edit_mode = False
-                        self.edit_doc_id = None
+                        logger.info("Prompt aktualisiert: ID %s", doc_id)
+                        clear_edit_target()
                     else:
-                        doc_id = self.service.create_prompt(
+                        doc_id, duplicates = self.service.create_prompt_with_duplicates(
                             title, category, platform, tags, prompt_text, language, purpose, notes
                         )
                         st.success(f"Prompt gespeichert (ID: {doc_id})")
                         logger.info("Neuer Prompt gespeichert: ID %s", doc_id)
+                        if duplicates:
+                            st.warning("Sehr ähnliche Prompts existieren bereits:\n" + "\n".join(
+                                f"- ID {duplicate.doc_id}: {duplicate.get('title', '')} ({similarity:.0%})"
+                                for duplicate, similarity in duplicates))
                 except ValueError as ve:
                     st.error(str(ve))
                     logger.warning("Validierungsfehler: %s", str(ve))
@@ -141,69 +351,142 @@ class PromptDatabaseUI:
     def _show_prompt_table(self):
         st.subheader("🔍 Prompts durchsuchen")
 
-        theme = get_theme()
-        keyword = st.text_input("Suchbegriff (Titel oder Prompt-Inhalt)")
-        category_filter = st.selectbox("Kategorie-Filter", ["Alle"] + self.service.get_all_categories())
-        tag_filter = st.multiselect("Tags auswählen", self.service.get_all_tags())
-        language_filter = st.text_input("Sprache (optional)")
-        purpose_filter = st.text_input("Zweck / Verwendungsziel (optional)")
-
-        filtered_prompts = self.service.search_prompts(
-            keyword=keyword,
-            category=None if category_filter == "Alle" else category_filter,
-            tags=tag_filter
-        )
+        with self.profiler.section("Filter"):
+            theme = get_theme()
+            keyword = st.text_input("Suchbegriff (Titel, Zweck, Prompt-Inhalt oder Notizen)")
+            search_mode = SEARCH_MODE_LABELS[st.radio("Suchmodus", list(SEARCH_MODE_LABELS), horizontal=True)]
+            category_filter = st.selectbox("Kategorie-Filter", ["Alle"] + self.service.get_all_categories())
+            tag_filter = st.multiselect("Tags auswählen", self.service.get_all_tags())
+            language_filter = st.text_input("Sprache (optional)")
+            purpose_filter = st.text_input("Zweck / Verwendungsziel (optional)")
+
+            filters = dict(
+                keyword=keyword,
+                category=None if category_filter == "Alle" else category_filter,
+                tags=tag_filter,
+                language=language_filter or None,
+                purpose=purpose_filter or None,
+                mode=search_mode
+            )
+            col_size, col_order = st.columns([1, 1])
+            with col_size:
+                page_size = st.selectbox("Einträge pro Seite", PAGE_SIZE_OPTIONS, index=1)
+            with col_order:
+                newest_first = st.checkbox("Neueste zuerst", value=False)
+            # Suchtreffer werden nach Relevanz sortiert, sofern nicht "Neueste zuerst" gewählt ist.
+            ranked = keyword and search_mode != SEARCH_MODE_SUBSTRING and not newest_first
+            sort_by = SORT_RELEVANCE if ranked else "doc_id"
 
-        if language_filter:
-            filtered_prompts = [r for r in filtered_prompts if language_filter.lower() in r.get("language", "").lower()]
-        if purpose_filter:
-            filtered_prompts = [r for r in filtered_prompts if purpose_filter.lower() in r.get("purpose", "").lower()]
-
-        st.write(f"🔎 {len(filtered_prompts)} Prompts gefunden")
-
-        with st.expander("📤 Export & Sicherung", expanded=False):
-            export_choice = st.selectbox("Aktion wählen:", [
-                "-- bitte wählen --",
-                "Export als CSV",
-                "Export als Markdown",
-                "Datenbank Backup",
-                "Projektstruktur ZIP"
-            ])
-            button_style = apply_color_scheme("primary", "secondary")
-            if st.button("Ausführen", type=button_style):
-                if export_choice == "Export als CSV":
-                    export_prompts_to_csv(filtered_prompts)
-                    st.success("CSV exportiert.")
-                elif export_choice == "Export als Markdown":
-                    export_prompts_to_markdown(filtered_prompts)
-                    st.success("Markdown exportiert.")
-                elif export_choice == "Datenbank Backup":
-                    path = backup_database()
-                    st.success(f"Backup gespeichert: {path}")
+        with self.profiler.section("Suche"):
+            page = get_list_page(repr(sorted(filters.items())) + f"|{page_size}|{newest_first}")
+            result = self.service.query_prompts(
+                **filters, sort_by=sort_by, descending=newest_first, limit=page_size, offset=(page - 1) * page_size
+            )
+            total_pages = max(1, -(-result.total // page_size))
+            if page > total_pages:
+                page = total_pages
+                set_list_page(page)
+                result = self.service.query_prompts(
+                    **filters, sort_by=sort_by, descending=newest_first, limit=page_size, offset=(page - 1) * page_size
+                )
+
+        st.write(f"🔎 {result.total} Prompts gefunden – Seite {page} von {total_pages}")
+
+        with self.profiler.section("Export"):
+            with st.expander("📤 Export & Sicherung", expanded=False):
+                export_choice = st.selectbox("Aktion wählen:", [
+                    "-- bitte wählen --",
+                    "Export als CSV",
+                    "Export als Markdown",
+                    "Export als NDJSON",
+                    "Datenbank Backup",
+                    "Projektstruktur ZIP"
+                ])
+                compress = st.checkbox("gzip-komprimiert", value=False)
+                export_formats = {
+                    "Export als CSV": "csv",
+                    "Export als Markdown": "markdown",
+                    "Export als NDJSON": "ndjson",
+                }
+                button_style = apply_color_scheme("primary", "secondary")
+                if st.button("Ausführen", type=button_style):
+                    if export_choice in export_formats:
+                        self._offer_export(export_formats[export_choice], compress, filters)
+                    elif export_choice == "Datenbank Backup":
+                        self._start_backup()
+                    elif export_choice == "Projektstruktur ZIP":
+                        start_snapshot_job()
+                # Nur der aktuelle Stand; aktualisiert wird mit der nächsten Interaktion bzw. auf der Backup-Seite.
+                if export_choice == "Datenbank Backup":
+                    self._show_backup_status()
                 elif export_choice == "Projektstruktur ZIP":
-                    zip_project()
-                    st.success("Projektstruktur gespeichert.")
-
-        for prompt in filtered_prompts:
-            with st.expander(f"{prompt['title']} ({prompt['category']})", expanded=False):
-                st.markdown(f"**Plattform:** {prompt['platform']}")
-                st.markdown(f"**Sprache:** {prompt.get('language', '-')}")
-                st.markdown(f"**Zweck:** {prompt.get('purpose', '-')}")
-                st.markdown(f"**Tags:** {', '.join(prompt['tags'])}")
-                st.markdown(f"**Letzte Änderung:** {prompt['last_modified']}")
-                st.markdown(f"**Prompt:**\n\n```text\n{prompt['prompt']}\n```")
-                st.markdown(f"**Notizen:**\n{prompt.get('notes', '-')}")
-
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("✏️ Bearbeiten", key=f"edit_{prompt.doc_id}"):
-                        self.edit_mode = True
-                        self.edit_doc_id = prompt.doc_id
-                        logger.info("Bearbeitungsmodus aktiviert: ID %s", prompt.doc_id)
-                        st.experimental_rerun()
-                with col2:
-                    if st.button("🗑️ Löschen", key=f"delete_{prompt.doc_id}"):
-                        self.service.delete_prompt(prompt.doc_id)
-                        st.success("Prompt gelöscht.")
-                        logger.info("Prompt gelöscht: ID %s", prompt.doc_id)
-                        st.experimental_rerun()
\ No newline at end of file
+                    self._show_snapshot_status()
+
+        with self.profiler.section("Ähnliche Prompts"):
+            # Eine gebündelte Abfrage für alle aufgeklappten Einträge der Seite
+            expanded_ids = [prompt.doc_id for prompt in result.items
+                            if st.session_state.get(f"details_{prompt.doc_id}")]
+            similar = self.service.find_similar_prompts(expanded_ids) if expanded_ids else {}
+
+        with self.profiler.section("Darstellung"):
+            for prompt in result.items:
+                self._show_prompt_entry(prompt, similar.get(prompt.doc_id, []))
+
+            self._show_pagination(page, total_pages)
+
+    def _show_pagination(self, page: int, total_pages: int):
+        """Blättern zwischen den Seiten der Prompt-Liste."""
+        if total_pages <= 1:
+            return
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ Zurück", disabled=page <= 1, key="page_prev"):
+                set_list_page(page - 1)
+                st.experimental_rerun()
+        with col_page:
+            selected = st.number_input("Seite", min_value=1, max_value=total_pages, value=page, step=1)
+            if selected != page:
+                set_list_page(int(selected))
+                st.experimental_rerun()
+        with col_next:
+            if st.button("Weiter ▶", disabled=page >= total_pages, key="page_next"):
+                set_list_page(page + 1)
+                st.experimental_rerun()
+
+    def _show_prompt_entry(self, prompt, similar_prompts=()):
+        """
+        Zeigt einen Prompt als kompakte Zeile; Prompt-Text, Notizen, ähnliche
+        Prompts und Aktionen werden erst nach dem Aufklappen gerendert.
+        """
+        with st.container(border=True):
+            col_title, col_toggle = st.columns([5, 1])
+            with col_title:
+                st.markdown(f"**{prompt['title']}** ({prompt['category']})")
+                st.caption(f"{', '.join(prompt['tags'])} · {prompt['last_modified']}")
+            with col_toggle:
+                expanded = st.toggle("Details", key=f"details_{prompt.doc_id}")
+            if not expanded:
+                return
+
+            st.markdown(f"**Plattform:** {prompt['platform']}")
+            st.markdown(f"**Sprache:** {prompt.get('language', '-')}")
+            st.markdown(f"**Zweck:** {prompt.get('purpose', '-')}")
+            st.markdown(f"**Prompt:**\n\n```text\n{prompt['prompt']}\n```")
+            st.markdown(f"**Notizen:**\n{prompt.get('notes', '-')}")
+            if similar_prompts:
+                st.markdown("**Ähnliche Prompts:**\n" + "\n".join(
+                    f"- {other['title']} ({other['category']}, ID {other.doc_id}) – {similarity:.0%}"
+                    for other, similarity in similar_prompts))
+
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("✏️ Bearbeiten", key=f"edit_{prompt.doc_id}"):
+                    set_edit_target(prompt.doc_id, prompt.get("revision"))
+                    logger.info("Bearbeitungsmodus aktiviert: ID %s", prompt.doc_id)
+                    st.experimental_rerun()
+            with col2:
+                if st.button("🗑️ Löschen", key=f"delete_{prompt.doc_id}"):
+                    self.service.delete_prompt(prompt.doc_id)
+                    st.success("Prompt gelöscht.")
+                    logger.info("Prompt gelöscht: ID %s", prompt.doc_id)
+                    st.experimental_rerun()
\ No newline at end of file
@@ -0,0 +1,149 @@
+# utils/background_job.py
+
+"""
+Hintergrundaufgaben mit Fortschrittsanzeige, z. B. für Backups aus der UI.
+
+Eine Aufgabe läuft in einem eigenen Thread und meldet ihren Fortschritt über
+die übergebene Funktion ``progress(phase, done, total)``. ``status()`` liefert
+jederzeit eine Momentaufnahme, die ein Streamlit-Rerun anzeigen kann, ohne
+auf das Ende der Aufgabe zu warten.
+
+Aufgaben werden prozessweit unter einem Schlüssel registriert: Solange eine
+Aufgabe läuft, liefert ``start_job`` mit demselben Schlüssel die laufende
+Aufgabe zurück, statt eine zweite zu starten (z. B. bei Doppelklicks oder
+mehreren Browser-Sitzungen).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+ProgressCallback = Callable[[str, int, int], None]
+
+_jobs: Dict[str, "BackgroundJob"] = {}
+_jobs_lock = threading.Lock()
+
+
+class BackgroundJob:
+    """
+    Führt ``target(progress)`` in einem Daemon-Thread aus und merkt sich Fortschritt und Ergebnis.
+    """
+
+    def __init__(self, name: str, target: Callable[[ProgressCallback], Any]):
+        """
+        :param name: Anzeigename der Aufgabe
+        :param target: Auszuführende Funktion; erhält die Fortschrittsfunktion als einziges Argument
+        """
+        self.name = name
+        self._target = target
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state = PENDING
+        self._phase = ""
+        self._done = 0
+        self._total = 0
+        self._result: Any = None
+        self._error: Optional[str] = None
+        self._started: Optional[float] = None
+        self._ended: Optional[float] = None
+
+    def start(self) -> "BackgroundJob":
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._state = RUNNING
+            self._started = time.time()
+            self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            result = self._target(self.report)
+        except Exception as error:
+            logger.exception("Hintergrundaufgabe '%s' fehlgeschlagen", self.name)
+            with self._lock:
+                self._state, self._error = FAILED, str(error)
+        else:
+            with self._lock:
+                self._state, self._result = DONE, result
+        finally:
+            with self._lock:
+                self._ended = time.time()
+            self._finished.set()
+
+    def report(self, phase: str, done: int, total: int) -> None:
+        """Fortschrittsmeldung der Aufgabe: ``done`` von ``total`` Einheiten in ``phase``."""
+        with self._lock:
+            self._phase, self._done, self._total = phase, done, total
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wartet auf das Ende der Aufgabe.
+
+        :param timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+        :return: Ergebnis der Aufgabe
+        :raises TimeoutError: Wenn die Aufgabe nicht rechtzeitig endet.
+        :raises RuntimeError: Wenn die Aufgabe fehlgeschlagen ist.
+        """
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"Hintergrundaufgabe '{self.name}' läuft noch")
+        if self._state == FAILED:
+            raise RuntimeError(self._error)
+        return self._result
+
+    def status(self) -> Dict:
+        """
+        Momentaufnahme des Zustands.
+
+        :return: name, state, phase, done, total, progress (0.0–1.0), result, error und duration (Sekunden)
+        """
+        with self._lock:
+            end = self._ended or time.time()
+            return {
+                "name": self.name,
+                "state": self._state,
+                "phase": self._phase,
+                "done": self._done,
+                "total": self._total,
+                "progress": 1.0 if self._state == DONE else (min(1.0, self._done / self._total) if self._total else 0.0),
+                "result": self._result,
+                "error": self._error,
+                "duration": round(end - self._started, 3) if self._started else 0.0,
+            }
+
+
+def start_job(key: str, target: Callable[[ProgressCallback], Any], name: Optional[str] = None) -> BackgroundJob:
+    """
+    Startet eine Hintergrundaufgabe, sofern unter ``key`` nicht bereits eine läuft.
+
+    :param key: Schlüssel der Aufgabe, z. B. ``"backup"``
+    :param target: Auszuführende Funktion (siehe ``BackgroundJob``)
+    :param name: (Optional) Anzeigename, Standard ist ``key``
+    :return: Die gestartete oder bereits laufende Aufgabe
+    """
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None or not job.running:
+            job = _jobs[key] = BackgroundJob(name or key, target).start()
+        return job
+
+
+def get_job(key: str) -> Optional[BackgroundJob]:
+    """Zuletzt unter ``key`` gestartete Aufgabe (laufend oder beendet) oder None."""
+    with _jobs_lock:
+        return _jobs.get(key)
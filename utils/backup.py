@@ -1,23 +1,585 @@
 # utils/backup.py
-import shutil
+
+"""
+Inkrementelle, inhaltsadressierte Backups der Datenbank.
+
+Ein Backup besteht aus einem kleinen Manifest und Chunks im Backup-Verzeichnis::
+
+    backups/
+        manifests/database_backup_20250801_120000.json
+        chunks/3f/3fa2….z   (SHA-256 des unkomprimierten Inhalts, zlib-komprimiert)
+
+Die Datenbankdatei (und ihre Begleitdateien ``.journal`` und ``.bodies[.<n>]``)
+wird beim Lesen inhaltsabhängig in Chunks zerlegt: Schnittstellen liegen
+hinter Dokumentgrenzen (``},``) bzw. Zeilenumbrüchen, deren nachfolgende
+Bytes einen passenden Hash haben. Eine Änderung verschiebt daher nur die
+Chunks in ihrer Umgebung, nicht alle folgenden. Bereits vorhandene Chunks
+werden nicht erneut geschrieben, und Dateien mit unveränderter Größe und
+mtime übernimmt das Manifest ohne sie zu lesen aus dem letzten Backup.
+Zeit und Speicherplatz eines Backups wachsen damit mit dem Umfang der
+Änderungen, nicht mit der Größe der Datenbank.
+
+Die Quelldatei wird blockweise gelesen und jeder Chunk einzeln komprimiert
+geschrieben; weder Datei noch Backup liegen vollständig im Speicher.
+
+SQLite-Datenbanken (WAL-Modus) werden nicht als Datei kopiert: Die
+Online-Backup-API (``sqlite3.Connection.backup``) erzeugt in einer
+Lesetransaktion eine konsistente Momentaufnahme inklusive WAL-Inhalt, die
+anschließend wie eine gewöhnliche Datei gesichert wird. Gleichzeitige
+Schreibvorgänge anderer Verbindungen ergeben so kein zerrissenes Backup.
+
+``restore_backup`` setzt die Dateien Chunk für Chunk wieder zusammen und
+prüft dabei jeden Chunk sowie die Prüfsumme der ganzen Datei;
+``verify_backup`` prüft alle Chunks eines Backups parallel in einem
+Thread-Pool (``hashlib`` und ``zlib`` geben bei großen Puffern den GIL frei).
+``apply_retention`` behält je Stunde, Tag und Woche das jüngste Backup
+(``keep_hourly``/``keep_daily``/``keep_weekly`` Zeiträume), löscht die
+übrigen Manifeste und danach alle nicht mehr referenzierten Chunks.
+``run_backup`` verbindet Sichern, Prüfen und Aufräumen und meldet den
+Fortschritt, z. B. an eine ``BackgroundJob``-Aufgabe der UI.
+"""
+
+import hashlib
+import json
 import os
+import re
+import sqlite3
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from utils.file_lock import FileLock
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+MANIFEST_DIR = "manifests"
+CHUNK_DIR = "chunks"
+MANIFEST_VERSION = 2
+SUPPORTED_MANIFEST_VERSIONS = (1, 2)
+LOCK_SUFFIX = ".lock"
+BACKUP_LOCK_FILE = "backup.lock"
+COMPRESSION = "zlib"
+COMPRESSION_LEVEL = 6
+CREATED_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_KEEP_HOURLY = 24
+DEFAULT_KEEP_DAILY = 7
+DEFAULT_KEEP_WEEKLY = 4
+RETENTION_PERIODS = (("keep_hourly", "%Y%m%d%H"), ("keep_daily", "%Y%m%d"), ("keep_weekly", "%G%V"))
+COMPANION_SUFFIXES = (".journal", ".bodies")
+# Kompaktierte Blob-Dateien der BodyStorage tragen eine Generationsnummer.
+_GENERATION_SUFFIX = re.compile(r"\.bodies\.\d+")
+SQLITE_HEADER = b"SQLite format 3\x00"
+# Begleitdateien einer SQLite-Datenbank; nach einer Wiederherstellung wären sie veraltet.
+SQLITE_SUFFIXES = ("-wal", "-shm", "-journal")
+SQLITE_SNAPSHOT_FILE = "sqlite_snapshot.tmp"
+
+MIN_CHUNK_SIZE = 8 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+READ_BLOCK_SIZE = 1024 * 1024
+CUT_WINDOW = 16
+CUT_MASK = 0x3F
+_CUT_CANDIDATES = re.compile(rb"\n|\},")
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+# === Chunking ===
+
+def _find_cut(buffer: bytearray, start: int) -> int:
+    """
+    Ende des Chunks ab ``start``: erste passende Schnittstelle, sonst nach MAX_CHUNK_SIZE.
+
+    Vor dem Dateiende enthält der Puffer stets MAX_CHUNK_SIZE + CUT_WINDOW Bytes ab ``start``;
+    ist er kürzer, endet der letzte Chunk mit dem Puffer.
+    """
+    limit = min(len(buffer), start + MAX_CHUNK_SIZE)
+    for match in _CUT_CANDIDATES.finditer(buffer, start + MIN_CHUNK_SIZE, limit):
+        position = match.end()
+        if zlib.crc32(buffer[position:position + CUT_WINDOW]) & CUT_MASK == 0:
+            return position
+    return limit
+
+
+def iter_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    Zerlegt einen Datenstrom inhaltsabhängig in Chunks (8 KiB bis 256 KiB).
+
+    Die Schnittstellen hängen nur vom Inhalt ab, nicht von der Blockgröße beim Lesen.
+
+    :param stream: Binär geöffnete Quelle
+    :return: Iterator über die Chunks in Dateireihenfolge
+    """
+    buffer = bytearray()
+    start = 0
+    eof = False
+    while True:
+        while not eof and len(buffer) - start < MAX_CHUNK_SIZE + CUT_WINDOW:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                eof = True
+                break
+            del buffer[:start]
+            start = 0
+            buffer += block
+        if start >= len(buffer):
+            return
+        end = _find_cut(buffer, start)
+        yield bytes(buffer[start:end])
+        start = end
+
+
+# === Chunk-Speicher ===
+
+def _chunk_path(backup_dir: str, digest: str, compression: Optional[str] = None) -> str:
+    name = digest + ".z" if compression == COMPRESSION else digest
+    return os.path.join(backup_dir, CHUNK_DIR, digest[:2], name)
+
+
+def _store_chunk(backup_dir: str, data: bytes) -> Tuple[str, int]:
+    """Speichert einen Chunk komprimiert; liefert Digest und geschriebene Bytes (0, wenn schon vorhanden)."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(backup_dir, digest, COMPRESSION)
+    if os.path.exists(path):
+        return digest, 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compressed = zlib.compress(data, COMPRESSION_LEVEL)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp_path, path)
+    return digest, len(compressed)
+
+
+def _read_chunk(backup_dir: str, digest: str, compression: Optional[str]) -> bytes:
+    """Liest und prüft einen Chunk."""
+    try:
+        with open(_chunk_path(backup_dir, digest, compression), "rb") as f:
+            data = f.read()
+    except OSError:
+        raise ValueError(f"Chunk {digest} fehlt") from None
+    if compression == COMPRESSION:
+        decompressor = zlib.decompressobj()
+        try:
+            data = decompressor.decompress(data)
+        except zlib.error:
+            raise ValueError(f"Chunk {digest} ist beschädigt") from None
+        if not decompressor.eof or decompressor.unused_data:
+            raise ValueError(f"Chunk {digest} ist beschädigt")
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Chunk {digest} ist beschädigt")
+    return data
+
+
+def _store_file(backup_dir: str, path: str, suffix: str, stat: os.stat_result, stats: Dict[str, int],
+                report: Callable[[int], None]) -> Dict:
+    file_hash = hashlib.sha256()
+    chunks = []
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter_chunks(f):
+            file_hash.update(chunk)
+            digest, written = _store_chunk(backup_dir, chunk)
+            chunks.append(digest)
+            size += len(chunk)
+            report(len(chunk))
+            if written:
+                stats["new_chunks"] += 1
+                stats["new_bytes"] += len(chunk)
+                stats["stored_bytes"] += written
+    return {"suffix": suffix, "size": size, "mtime_ns": stat.st_mtime_ns, "compression": COMPRESSION,
+            "sha256": file_hash.hexdigest(), "chunks": chunks}
+
+
+# === Manifeste ===
+
+def list_backups(backup_dir: str = "backups") -> List[str]:
+    """
+    Pfade aller Manifeste im Backup-Verzeichnis, älteste zuerst.
+
+    :param backup_dir: Backup-Verzeichnis
+    :return: Manifest-Pfade
+    """
+    manifest_dir = os.path.join(backup_dir, MANIFEST_DIR)
+    if not os.path.isdir(manifest_dir):
+        return []
+    return [os.path.join(manifest_dir, name) for name in sorted(os.listdir(manifest_dir)) if name.endswith(".json")]
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """
+    Liest ein Manifest.
+
+    :param manifest_path: Pfad zum Manifest
+    :return: Manifest-Daten
+    :raises ValueError: Wenn die Datei kein gültiges Manifest ist.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as error:
+        raise ValueError(f"Manifest {manifest_path} ist nicht lesbar: {error}") from error
+    if manifest.get("version") not in SUPPORTED_MANIFEST_VERSIONS:
+        raise ValueError(f"Nicht unterstützte Manifest-Version in {manifest_path}")
+    return manifest
+
+
+def _backup_dir_of(manifest_path: str) -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(manifest_path)))
+
+
+def _new_manifest_path(backup_dir: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    manifest_dir = os.path.join(backup_dir, MANIFEST_DIR)
+    path = os.path.join(manifest_dir, f"database_backup_{timestamp}.json")
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(manifest_dir, f"database_backup_{timestamp}_{counter}.json")
+        counter += 1
+    return path
+
+
+def _reusable_entry(previous: Optional[Dict], suffix: str, stat: os.stat_result, backup_dir: str) -> Optional[Dict]:
+    """Eintrag des letzten Backups für eine seitdem unveränderte Datei (Größe und mtime gleich)."""
+    for entry in (previous or {}).get("files", []):
+        if (entry["suffix"] == suffix and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+                and all(os.path.exists(_chunk_path(backup_dir, digest, entry.get("compression")))
+                        for digest in entry["chunks"])):
+            return entry
+    return None
+
+
+def is_companion_suffix(suffix: str) -> bool:
+    """Ob ``<datenbank><suffix>`` eine Begleitdatei der Datenbank ist (Journal, Texte, Textgenerationen)."""
+    return suffix in COMPANION_SUFFIXES or _GENERATION_SUFFIX.fullmatch(suffix) is not None
 
-def backup_database(source_path="database.json", backup_dir="backups") -> str:
+
+def _companion_suffixes(path: str) -> List[str]:
+    """Endungen der vorhandenen Begleitdateien einer Datenbankdatei."""
+    directory = os.path.dirname(path) or "."
+    base = os.path.basename(path)
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    suffixes = [suffix for suffix in COMPANION_SUFFIXES if base + suffix in names]
+    suffixes += sorted(name[len(base):] for name in names
+                       if name.startswith(base) and _GENERATION_SUFFIX.fullmatch(name[len(base):]))
+    return suffixes
+
+
+def _is_sqlite(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _copy_sqlite(source_path: str, target_path: str) -> None:
+    """Konsistente Kopie einer SQLite-Datenbank über die Online-Backup-API (inklusive WAL)."""
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def _backup_lock(backup_dir: str) -> FileLock:
+    """Sperre des Backup-Verzeichnisses: Sichern und Aufräumen laufen nicht gleichzeitig."""
+    os.makedirs(backup_dir, exist_ok=True)
+    return FileLock(os.path.join(backup_dir, BACKUP_LOCK_FILE))
+
+
+def backup_database(source_path="database.json", backup_dir="backups",
+                    progress: Optional[ProgressCallback] = None) -> str:
     """
-    Erstellt eine zeitgestempelte Kopie der JSON-Datenbank im Backup-Verzeichnis.
+    Erstellt ein inkrementelles, komprimiertes Backup der Datenbank im Backup-Verzeichnis.
+
+    Gesichert werden die Datenbankdatei sowie vorhandene Begleitdateien
+    (``.journal``, ``.bodies`` samt Generationen). Während des Lesens wird die gemeinsame
+    Dateisperre der Datenbank gehalten. Von SQLite-Datenbanken wird eine
+    Momentaufnahme über die Online-Backup-API gesichert.
 
     :param source_path: Pfad zur Originaldatenbank
     :param backup_dir: Zielverzeichnis für Backups
-    :return: Pfad zur erstellten Backup-Datei
+    :param progress: (Optional) Fortschritt ``progress("Sichern", gelesene Bytes, Bytes gesamt)``
+    :return: Pfad zum Manifest des Backups
     """
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
+    with _backup_lock(backup_dir).exclusive():
+        return _backup_database(source_path, backup_dir, progress)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = os.path.join(backup_dir, f"database_backup_{timestamp}.json")
-    shutil.copy2(source_path, backup_file)
-    return backup_file
+
+def _backup_database(source_path: str, backup_dir: str, progress: Optional[ProgressCallback]) -> str:
+    backups = list_backups(backup_dir)
+    try:
+        previous = load_manifest(backups[-1]) if backups else None
+    except ValueError:
+        previous = None
+    if previous is not None and previous.get("source") != os.path.abspath(source_path):
+        previous = None
+
+    stats = {"new_chunks": 0, "new_bytes": 0, "stored_bytes": 0}
+    if _is_sqlite(source_path):
+        snapshot_path = os.path.join(backup_dir, SQLITE_SNAPSHOT_FILE)
+        try:
+            _copy_sqlite(source_path, snapshot_path)
+            files = _store_sources(backup_dir, [("", snapshot_path, os.stat(snapshot_path), None)], stats, progress)
+        finally:
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+        # Die mtime der Momentaufnahme sagt nichts über die Quelle: nie ungelesen übernehmen.
+        files[0]["mtime_ns"] = None
+    else:
+        with FileLock(source_path + LOCK_SUFFIX).shared():
+            sources = []
+            for suffix in [""] + _companion_suffixes(source_path):
+                path = source_path + suffix
+                stat = os.stat(path)
+                sources.append((suffix, path, stat, _reusable_entry(previous, suffix, stat, backup_dir)))
+            files = _store_sources(backup_dir, sources, stats, progress)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created": datetime.now().strftime(CREATED_FORMAT),
+        "source": os.path.abspath(source_path),
+        "files": files,
+        **stats,
+    }
+    manifest_path = _new_manifest_path(backup_dir)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def _store_sources(backup_dir: str, sources: List[Tuple[str, str, os.stat_result, Optional[Dict]]],
+                   stats: Dict[str, int], progress: Optional[ProgressCallback]) -> List[Dict]:
+    """Sichert die Quelldateien (Endung, Pfad, stat, wiederverwendbarer Eintrag) und liefert ihre Einträge."""
+    total = sum(stat.st_size for _, _, stat, entry in sources if entry is None)
+    done = 0
+
+    def report(size: int) -> None:
+        nonlocal done
+        done += size
+        if progress is not None:
+            progress("Sichern", done, total)
+
+    return [entry or _store_file(backup_dir, path, suffix, stat, stats, report)
+            for suffix, path, stat, entry in sources]
+
+
+# === Wiederherstellen und Prüfen ===
+
+def _iter_verified_chunks(backup_dir: str, entry: Dict) -> Iterator[bytes]:
+    """Liest die Chunks einer gesicherten Datei und prüft Chunk- und Dateiprüfsummen."""
+    file_hash = hashlib.sha256()
+    size = 0
+    for digest in entry["chunks"]:
+        data = _read_chunk(backup_dir, digest, entry.get("compression"))
+        file_hash.update(data)
+        size += len(data)
+        yield data
+    if size != entry["size"] or file_hash.hexdigest() != entry["sha256"]:
+        raise ValueError(f"Prüfsumme der Datei '{entry['suffix'] or 'Datenbank'}' stimmt nicht")
+
+
+def verify_backup(manifest_path: str, workers: Optional[int] = None,
+                  progress: Optional[ProgressCallback] = None) -> List[str]:
+    """
+    Prüft parallel, ob alle Chunks eines Backups vorhanden und unbeschädigt sind.
+
+    Jeder Chunk wird gelesen, entpackt und gegen seinen SHA-256 geprüft;
+    anschließend wird die Größe jeder Datei mit dem Manifest verglichen.
+
+    :param manifest_path: Pfad zum Manifest
+    :param workers: (Optional) Anzahl der Prüf-Threads, Standard wie ``ThreadPoolExecutor``
+    :param progress: (Optional) Fortschritt ``progress("Prüfen", geprüfte Chunks, Chunks gesamt)``
+    :return: Gefundene Probleme (leer, wenn das Backup in Ordnung ist)
+    """
+    try:
+        manifest = load_manifest(manifest_path)
+    except ValueError as error:
+        return [str(error)]
+    backup_dir = _backup_dir_of(manifest_path)
+    chunks = {(digest, entry.get("compression")) for entry in manifest["files"] for digest in entry["chunks"]}
+    sizes: Dict[str, int] = {}
+    problems = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_read_chunk, backup_dir, digest, compression): digest
+                   for digest, compression in chunks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                sizes[futures[future]] = len(future.result())
+            except ValueError as error:
+                problems.append(str(error))
+            if progress is not None:
+                progress("Prüfen", done, len(futures))
+    for entry in manifest["files"]:
+        if (all(digest in sizes for digest in entry["chunks"])
+                and sum(sizes[digest] for digest in entry["chunks"]) != entry["size"]):
+            problems.append(f"Größe der Datei '{entry['suffix'] or 'Datenbank'}' stimmt nicht")
+    return sorted(problems)
 
 
+def restore_backup(manifest_path: str, target_path: Optional[str] = None) -> str:
+    """
+    Stellt die Datenbank aus einem Backup wieder her.
+
+    Jede Datei wird zunächst vollständig und geprüft in eine temporäre Datei
+    geschrieben; erst wenn alle Dateien in Ordnung sind, werden sie unter der
+    exklusiven Dateisperre an ihren Platz verschoben. Begleitdateien, die das
+    Backup nicht enthält (z. B. ein neueres Journal oder ein SQLite-WAL), werden
+    entfernt. Eine SQLite-Datenbank sollte dabei von keinem Prozess geöffnet sein.
+
+    :param manifest_path: Pfad zum Manifest
+    :param target_path: (Optional) Zielpfad der Datenbank, Standard ist der gesicherte Pfad
+    :return: Pfad der wiederhergestellten Datenbank
+    :raises ValueError: Wenn das Backup unvollständig oder beschädigt ist.
+    """
+    manifest = load_manifest(manifest_path)
+    backup_dir = _backup_dir_of(manifest_path)
+    target_path = target_path or manifest["source"]
+    restored = {}
+    try:
+        for entry in manifest["files"]:
+            tmp_path = target_path + entry["suffix"] + ".restore"
+            restored[entry["suffix"]] = tmp_path
+            with open(tmp_path, "wb") as f:
+                for data in _iter_verified_chunks(backup_dir, entry):
+                    f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        for tmp_path in restored.values():
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    with FileLock(target_path + LOCK_SUFFIX).exclusive():
+        for suffix in _companion_suffixes(target_path) + list(SQLITE_SUFFIXES):
+            if suffix not in restored and os.path.exists(target_path + suffix):
+                os.remove(target_path + suffix)
+        for suffix, tmp_path in restored.items():
+            os.replace(tmp_path, target_path + suffix)
+    return target_path
+
+
+# === Aufbewahrung ===
 
+def select_backups_to_keep(created: Dict[str, datetime], keep_hourly: int = DEFAULT_KEEP_HOURLY,
+                           keep_daily: int = DEFAULT_KEEP_DAILY,
+                           keep_weekly: int = DEFAULT_KEEP_WEEKLY) -> Set[str]:
+    """
+    Wählt die aufzubewahrenden Backups.
+
+    Für jede der letzten ``keep_hourly`` Stunden, ``keep_daily`` Tage und
+    ``keep_weekly`` Kalenderwochen, in denen Backups entstanden sind, bleibt
+    das jüngste Backup des Zeitraums erhalten; das neueste Backup immer.
+
+    :param created: Zuordnung Backup → Erstellungszeitpunkt
+    :return: Schlüssel der aufzubewahrenden Backups
+    """
+    newest_first = sorted(created, key=lambda name: (created[name], name), reverse=True)
+    keep = set(newest_first[:1])
+    limits = {"keep_hourly": keep_hourly, "keep_daily": keep_daily, "keep_weekly": keep_weekly}
+    for setting, period_format in RETENTION_PERIODS:
+        periods = set()
+        for name in newest_first:
+            period = created[name].strftime(period_format)
+            if period in periods:
+                continue
+            if len(periods) >= limits[setting]:
+                break
+            periods.add(period)
+            keep.add(name)
+    return keep
+
+
+def apply_retention(backup_dir: str = "backups", keep_hourly: int = DEFAULT_KEEP_HOURLY,
+                    keep_daily: int = DEFAULT_KEEP_DAILY, keep_weekly: int = DEFAULT_KEEP_WEEKLY) -> List[str]:
+    """
+    Löscht Backups außerhalb der Aufbewahrungsregel und danach nicht mehr referenzierte Chunks.
+
+    Manifeste, die sich nicht lesen lassen, bleiben erhalten; solange es solche
+    gibt, werden keine Chunks gelöscht.
+
+    :param backup_dir: Backup-Verzeichnis
+    :return: Pfade der gelöschten Manifeste
+    """
+    with _backup_lock(backup_dir).exclusive():
+        manifests = {}
+        readable = True
+        for path in list_backups(backup_dir):
+            try:
+                manifests[path] = load_manifest(path)
+                created = datetime.strptime(manifests[path]["created"], CREATED_FORMAT)
+            except (ValueError, KeyError):
+                manifests.pop(path, None)
+                readable = False
+                continue
+            manifests[path]["_created"] = created
+
+        keep = select_backups_to_keep({path: manifest["_created"] for path, manifest in manifests.items()},
+                                      keep_hourly, keep_daily, keep_weekly)
+        removed = sorted(path for path in manifests if path not in keep)
+        for path in removed:
+            os.remove(path)
+        if readable:
+            referenced = {_chunk_path(backup_dir, digest, entry.get("compression"))
+                          for path in keep for entry in manifests[path]["files"] for digest in entry["chunks"]}
+            freed = _collect_garbage(backup_dir, referenced)
+            logger.info("Aufbewahrung: %d Backups gelöscht, %d Bytes freigegeben", len(removed), freed)
+        return removed
+
+
+def _collect_garbage(backup_dir: str, referenced: Set[str]) -> int:
+    freed = 0
+    chunk_root = os.path.join(backup_dir, CHUNK_DIR)
+    if not os.path.isdir(chunk_root):
+        return 0
+    referenced = {os.path.normpath(path) for path in referenced}
+    with os.scandir(chunk_root) as prefixes:
+        for prefix in prefixes:
+            if not prefix.is_dir():
+                continue
+            with os.scandir(prefix.path) as entries:
+                for entry in entries:
+                    if os.path.normpath(entry.path) not in referenced:
+                        freed += entry.stat().st_size
+                        os.remove(entry.path)
+    return freed
+
+
+def run_backup(source_path: str = "database.json", backup_dir: str = "backups",
+               keep_hourly: int = DEFAULT_KEEP_HOURLY, keep_daily: int = DEFAULT_KEEP_DAILY,
+               keep_weekly: int = DEFAULT_KEEP_WEEKLY, workers: Optional[int] = None,
+               progress: Optional[ProgressCallback] = None) -> Dict:
+    """
+    Sichert die Datenbank, prüft das neue Backup und wendet die Aufbewahrungsregel an.
+
+    Ist das neue Backup fehlerhaft, werden keine älteren Backups gelöscht.
+
+    :param source_path: Pfad zur Originaldatenbank
+    :param backup_dir: Backup-Verzeichnis
+    :param workers: (Optional) Anzahl der Prüf-Threads
+    :param progress: (Optional) Fortschritt ``progress(Phase, erledigt, gesamt)``
+    :return: manifest (Pfad), new_bytes, stored_bytes, problems (Liste) und removed (gelöschte Manifeste)
+    """
+    manifest_path = backup_database(source_path, backup_dir, progress)
+    problems = verify_backup(manifest_path, workers, progress)
+    removed = []
+    if not problems:
+        if progress is not None:
+            progress("Aufräumen", 0, 1)
+        removed = apply_retention(backup_dir, keep_hourly, keep_daily, keep_weekly)
+    manifest = load_manifest(manifest_path)
+    return {"manifest": manifest_path, "new_bytes": manifest["new_bytes"],
+            "stored_bytes": manifest.get("stored_bytes", manifest["new_bytes"]),
+            "problems": problems, "removed": removed}
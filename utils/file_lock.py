@@ -0,0 +1,210 @@
+# utils/file_lock.py
+
+"""
+Prozessübergreifende Lese-/Schreibsperre über eine Sperrdatei.
+
+Unter POSIX wird ``fcntl.flock`` verwendet: beliebig viele Prozesse können die
+Sperre gemeinsam (lesend) halten, ein schreibender Prozess hält sie exklusiv.
+Unter Windows steht nur eine exklusive Sperre (``msvcrt.locking``) zur
+Verfügung; lesende Zugriffe werden dort ebenfalls exklusiv gesperrt.
+
+Die Sperre ist innerhalb eines Threads wiedereintrittsfähig und gilt auch
+zwischen den Threads eines Prozesses. Wird eine gemeinsame Sperre zu einer
+exklusiven hochgestuft, gibt ``flock`` sie dabei kurz frei, und andere
+Threads können zuvor schreiben; Schreibvorgänge sollten die exklusive Sperre
+daher von Anfang an anfordern.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SHARED = "shared"
+EXCLUSIVE = "exclusive"
+_POLL_INTERVAL = 0.01
+
+
+class FileLock:
+    """
+    Lese-/Schreibsperre auf ``path`` (die Datei wird bei Bedarf angelegt).
+
+    Mehrere Threads derselben Instanz können die gemeinsame Sperre gleichzeitig
+    halten; die exklusive Sperre schließt auch die übrigen Threads aus. Die
+    Sperrdatei bleibt geöffnet, solange irgendein Thread die Sperre hält.
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        """
+        :param path: Pfad der Sperrdatei, z. B. ``database.json.lock``
+        :param timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+        """
+        self.path = path
+        self.timeout = timeout
+        # Schützt nur den Zustand (Dateideskriptor, Modus, Halter), nicht die gesperrten Abschnitte.
+        self._state = threading.Condition()
+        self._fd: Optional[int] = None
+        self._mode: Optional[str] = None
+        self._holders = 0
+        self._upgrading = 0
+        self._exclusive_owner: Optional[int] = None
+        self._busy = False
+        # Je Thread: Verschachtelungstiefe und gehaltener Modus.
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self):
+        """Gemeinsame Sperre für Lesezugriffe."""
+        with self._held(SHARED):
+            yield
+
+    @contextmanager
+    def exclusive(self):
+        """Exklusive Sperre für Schreibzugriffe."""
+        with self._held(EXCLUSIVE):
+            yield
+
+    @property
+    def mode(self) -> Optional[str]:
+        """Vom aktuellen Thread gehaltener Modus (None, wenn er die Sperre nicht hält)."""
+        return getattr(self._local, "mode", None)
+
+    @contextmanager
+    def _held(self, mode: str):
+        held_mode = self.mode
+        if held_mode is None:
+            self._acquire(mode)
+            self._local.mode, self._local.depth = mode, 1
+        elif mode == EXCLUSIVE and held_mode == SHARED:
+            self._upgrade()
+            self._local.mode = EXCLUSIVE
+            self._local.depth += 1
+        else:
+            self._local.depth += 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._local.mode = None
+                self._release(held_mode or mode)
+            elif held_mode == SHARED and mode == EXCLUSIVE:
+                self._downgrade()
+                self._local.mode = SHARED
+
+    def _deadline(self) -> Optional[float]:
+        return None if self.timeout is None else time.monotonic() + self.timeout
+
+    def _wait_for(self, predicate, deadline: Optional[float]) -> None:
+        """Wartet (mit gehaltenem ``_state``), bis ``predicate`` gilt und kein Thread die Datei sperrt."""
+        while self._busy or not predicate():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"Sperre {self.path} nicht innerhalb von {self.timeout} s erhalten")
+            self._state.wait(remaining)
+
+    def _change_fd(self, mode: Optional[str], deadline: Optional[float]) -> None:
+        """
+        Sperrt die Datei im Modus ``mode`` bzw. gibt sie frei (None).
+
+        Wird mit gehaltenem ``_state`` aufgerufen; während eines blockierenden
+        ``flock`` ist ``_state`` freigegeben und ``_busy`` gesetzt.
+        """
+        self._busy = True
+        self._state.release()
+        try:
+            if mode is None:
+                self._unlock_fd()
+                os.close(self._fd)
+                self._fd = None
+            else:
+                opened = self._fd is None
+                if opened:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    self._lock_fd(mode, deadline)
+                except BaseException:
+                    if opened:
+                        os.close(self._fd)
+                        self._fd = None
+                    raise
+            self._mode = mode
+        finally:
+            self._state.acquire()
+            self._busy = False
+            self._state.notify_all()
+
+    def _acquire(self, mode: str) -> None:
+        deadline = self._deadline()
+        with self._state:
+            if mode == SHARED:
+                self._wait_for(lambda: self._exclusive_owner is None, deadline)
+            else:
+                self._wait_for(lambda: self._exclusive_owner is None and self._holders == self._upgrading, deadline)
+            if self._mode != mode and (mode == EXCLUSIVE or self._mode is None):
+                self._change_fd(mode, deadline)
+            self._holders += 1
+            if mode == EXCLUSIVE:
+                self._exclusive_owner = threading.get_ident()
+
+    def _upgrade(self) -> None:
+        # Wartende Hochstufer zählen nicht als Leser: zwei gleichzeitige Hochstufungen blockieren sich nicht.
+        deadline = self._deadline()
+        with self._state:
+            self._upgrading += 1
+            try:
+                self._wait_for(lambda: self._exclusive_owner is None and self._holders == self._upgrading, deadline)
+                self._change_fd(EXCLUSIVE, deadline)
+            finally:
+                self._upgrading -= 1
+            self._exclusive_owner = threading.get_ident()
+
+    def _downgrade(self) -> None:
+        with self._state:
+            self._exclusive_owner = None
+            self._change_fd(SHARED, self._deadline())
+
+    def _release(self, mode: str) -> None:
+        with self._state:
+            self._wait_for(lambda: True, None)
+            self._holders -= 1
+            if mode == EXCLUSIVE:
+                self._exclusive_owner = None
+            if self._holders == 0:
+                self._change_fd(None, None)
+            elif mode == EXCLUSIVE:
+                # Noch haltende Threads warten auf eine Hochstufung und halten die Sperre gemeinsam.
+                self._change_fd(SHARED, self._deadline())
+            self._state.notify_all()
+
+    def _lock_fd(self, mode: str, deadline: Optional[float]) -> None:
+        while True:
+            try:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_SH if mode == SHARED else fcntl.LOCK_EX
+                    if deadline is None:
+                        fcntl.flock(self._fd, flags)
+                        return
+                    fcntl.flock(self._fd, flags | fcntl.LOCK_NB)
+                elif self._mode is None:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Sperre {self.path} nicht innerhalb von {self.timeout} s erhalten")
+                time.sleep(_POLL_INTERVAL)
+
+    def _unlock_fd(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
@@ -1,48 +1,177 @@
 import csv
-from typing import List, Dict
-import os
+import io
+import json
+import zlib
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List
 
-def export_prompts_to_csv(prompts: List[Dict], file_path: str = "exported_prompts.csv") -> None:
+EXPORT_FIELDS = [
+    "title", "category", "platform", "language",
+    "purpose", "tags", "prompt", "notes", "last_modified"
+]
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _field_value(prompt: Dict, key: str):
+    value = prompt.get(key, "")
+    return ", ".join(value) if isinstance(value, (list, tuple)) else value
+
+
+def _chunked(parts: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    """Fasst viele kleine Textstücke zu UTF-8-Blöcken von etwa ``chunk_size`` Bytes zusammen."""
+    buffer: List[str] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
     """
-    Exportiert eine Liste von Prompts als CSV-Datei.
+    Komprimiert einen Byte-Strom blockweise im gzip-Format.
+
+    :param chunks: Unkomprimierte Byte-Blöcke
+    :param level: Kompressionsstufe (1–9)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _csv_parts(prompts: Iterable[Dict], chunk_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for p in prompts:
+        writer.writerow([_field_value(p, k) for k in EXPORT_FIELDS])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _markdown_parts(prompts: Iterable[Dict]) -> Iterator[str]:
+    for p in prompts:
+        yield (
+            f"## {p.get('title', '-')}\n"
+            f"**Kategorie:** {p.get('category', '-')}\n\n"
+            f"**Plattform:** {p.get('platform', '-')}\n\n"
+            f"**Sprache:** {p.get('language', '-')}\n\n"
+            f"**Zweck:** {p.get('purpose', '-')}\n\n"
+            f"**Tags:** {', '.join(p.get('tags', []))}\n\n"
+            f"**Letzte Änderung:** {p.get('last_modified', '-')}\n\n"
+            f"**Prompt:**\n\n{p.get('prompt', '-')}\n\n"
+            f"**Notizen:**\n\n{p.get('notes', '-')}\n\n"
+            "---\n\n"
+        )
 
-    :param prompts: Liste von Prompt-Dictionaries
+
+def _ndjson_parts(prompts: Iterable[Dict]) -> Iterator[str]:
+    for p in prompts:
+        record = {k: p.get(k, [] if k == "tags" else "") for k in EXPORT_FIELDS}
+        record["tags"] = list(record["tags"])
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_csv_export(prompts: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Erzeugt einen CSV-Export als Strom von Byte-Blöcken.
+
+    :param prompts: Iterator über Prompt-Dictionaries
+    :param chunk_size: Ungefähre Blockgröße in Bytes
+    """
+    return _chunked(_csv_parts(prompts, chunk_size), chunk_size)
+
+
+def iter_markdown_export(prompts: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Erzeugt einen Markdown-Export als Strom von Byte-Blöcken.
+
+    :param prompts: Iterator über Prompt-Dictionaries
+    :param chunk_size: Ungefähre Blockgröße in Bytes
+    """
+    return _chunked(_markdown_parts(prompts), chunk_size)
+
+
+def iter_ndjson_export(prompts: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Erzeugt einen NDJSON-Export (ein JSON-Objekt pro Zeile) als Strom von Byte-Blöcken.
+
+    Das Format kann mit ``PromptService.import_prompts`` wieder eingelesen werden.
+
+    :param prompts: Iterator über Prompt-Dictionaries
+    :param chunk_size: Ungefähre Blockgröße in Bytes
+    """
+    return _chunked(_ndjson_parts(prompts), chunk_size)
+
+
+# Format → (Exporter, MIME-Typ, Dateiendung)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "csv": (iter_csv_export, "text/csv", ".csv"),
+    "markdown": (iter_markdown_export, "text/markdown", ".md"),
+    "ndjson": (iter_ndjson_export, "application/x-ndjson", ".jsonl"),
+}
+
+
+def iter_export(prompts: Iterable[Dict], fmt: str, compress: bool = False,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Erzeugt einen Export im gewünschten Format, optional gzip-komprimiert.
+
+    :param prompts: Iterator über Prompt-Dictionaries
+    :param fmt: "csv", "markdown" oder "ndjson"
+    :param compress: gzip-Komprimierung aktivieren
+    :param chunk_size: Ungefähre Blockgröße in Bytes
+    :raises ValueError: Bei unbekanntem Format
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Exportformat: {fmt}")
+    exporter: Callable[..., Iterator[bytes]] = EXPORT_FORMATS[fmt][0]
+    chunks = exporter(prompts, chunk_size)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_file_name(fmt: str, compress: bool = False, base_name: str = "exported_prompts") -> str:
+    """Dateiname für einen Export, z. B. ``exported_prompts.csv.gz``."""
+    return base_name + EXPORT_FORMATS[fmt][2] + (".gz" if compress else "")
+
+
+def write_chunks(chunks: Iterable[bytes], file_path: str) -> None:
+    """Schreibt einen Byte-Strom in eine Datei."""
+    with open(file_path, mode="wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def export_prompts_to_csv(prompts: Iterable[Dict], file_path: str = "exported_prompts.csv") -> None:
+    """
+    Exportiert Prompts als CSV-Datei.
+
+    :param prompts: Iterator über Prompt-Dictionaries
     :param file_path: Pfad zur CSV-Datei
     """
-    if not prompts:
+    iterator = iter(prompts)
+    first = next(iterator, None)
+    if first is None:
         return
+    write_chunks(iter_csv_export(chain([first], iterator)), file_path)
 
-    keys = [
-        "title", "category", "platform", "language",
-        "purpose", "tags", "prompt", "notes", "last_modified"
-    ]
-
-    with open(file_path, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.DictWriter(file, fieldnames=keys)
-        writer.writeheader()
-        for p in prompts:
-            row = {
-                k: (", ".join(p[k]) if isinstance(p[k], list) else p.get(k, ""))
-                for k in keys
-            }
-            writer.writerow(row)
 
-def export_prompts_to_markdown(prompts: List[Dict], file_path: str = "exported_prompts.md") -> None:
+def export_prompts_to_markdown(prompts: Iterable[Dict], file_path: str = "exported_prompts.md") -> None:
     """
     Exportiert Prompts als Markdown-Datei.
 
-    :param prompts: Liste von Prompts
+    :param prompts: Iterator über Prompt-Dictionaries
     :param file_path: Pfad zur Markdown-Datei
     """
-    with open(file_path, mode="w", encoding="utf-8") as f:
-        for p in prompts:
-            f.write(f"## {p.get('title', '-')}\n")
-            f.write(f"**Kategorie:** {p.get('category', '-')}\n\n")
-            f.write(f"**Plattform:** {p.get('platform', '-')}\n\n")
-            f.write(f"**Sprache:** {p.get('language', '-')}\n\n")
-            f.write(f"**Zweck:** {p.get('purpose', '-')}\n\n")
-            f.write(f"**Tags:** {', '.join(p.get('tags', []))}\n\n")
-            f.write(f"**Letzte Änderung:** {p.get('last_modified', '-')}\n\n")
-            f.write(f"**Prompt:**\n\n{p.get('prompt', '-')}\n\n")
-            f.write(f"**Notizen:**\n\n{p.get('notes', '-')}\n\n")
-            f.write("---\n\n")
+    write_chunks(iter_markdown_export(prompts), file_path)
@@ -0,0 +1,103 @@
+# utils/importers.py
+
+"""
+Streamende Leser für den Prompt-Import aus CSV- und JSONL-Dateien.
+
+Die Dateien werden zeilenweise gelesen, sodass auch sehr große Importe nie
+vollständig im Speicher liegen müssen.
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterator, Optional, TextIO, Tuple
+
+PROMPT_FIELDS = (
+    "title", "category", "platform", "language",
+    "purpose", "tags", "prompt", "notes"
+)
+
+# (Zeilennummer, Datensatz oder None, Fehlermeldung oder None)
+ImportRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+def detect_import_format(file_name: str) -> str:
+    """
+    Ermittelt das Importformat anhand der Dateiendung.
+
+    :param file_name: Dateiname oder Pfad
+    :return: "csv" oder "jsonl"
+    :raises ValueError: Bei unbekannter Dateiendung
+    """
+    extension = os.path.splitext(file_name.lower())[1]
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unbekanntes Importformat: {file_name}")
+
+
+def _split_tags(value) -> list:
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    return [tag.strip() for tag in str(value).split(",") if tag.strip()]
+
+
+def iter_csv_records(stream: TextIO) -> Iterator[ImportRow]:
+    """
+    Liest Prompts aus einer CSV-Datei im Format von ``export_prompts_to_csv``.
+
+    :param stream: Geöffnete Textdatei
+    :return: Iterator über (Zeilennummer, Datensatz, Fehler)
+    """
+    reader = csv.DictReader(stream)
+    missing = {"title", "prompt"} - set(reader.fieldnames or [])
+    if missing:
+        yield 1, None, f"Fehlende Spalten: {', '.join(sorted(missing))}"
+        return
+    for row in reader:
+        record = {field: row.get(field) or "" for field in PROMPT_FIELDS}
+        record["tags"] = _split_tags(row.get("tags"))
+        yield reader.line_num, record, None
+
+
+def iter_jsonl_records(stream: TextIO) -> Iterator[ImportRow]:
+    """
+    Liest Prompts aus einer JSONL-Datei (ein JSON-Objekt pro Zeile).
+
+    :param stream: Geöffnete Textdatei
+    :return: Iterator über (Zeilennummer, Datensatz, Fehler)
+    """
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Ungültiges JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "Zeile enthält kein JSON-Objekt."
+            continue
+        record = {field: data.get(field, "") for field in PROMPT_FIELDS}
+        if "prompt" not in data and "prompt_text" in data:
+            record["prompt"] = data["prompt_text"]
+        record["tags"] = _split_tags(data.get("tags"))
+        yield line_no, record, None
+
+
+def iter_import_records(stream: TextIO, fmt: str) -> Iterator[ImportRow]:
+    """
+    Wählt den passenden Leser für das Importformat.
+
+    :param stream: Geöffnete Textdatei
+    :param fmt: "csv" oder "jsonl"
+    :raises ValueError: Bei unbekanntem Format
+    """
+    if fmt == "csv":
+        return iter_csv_records(stream)
+    if fmt == "jsonl":
+        return iter_jsonl_records(stream)
+    raise ValueError(f"Unbekanntes Importformat: {fmt}")
@@ -0,0 +1,259 @@
+# utils/instrumentation.py
+
+"""
+Messpunkte für PromptService und Repositorys.
+
+Jede öffentliche Methode einer mit ``@instrument_methods`` markierten Klasse
+zählt Aufrufe, Fehler und Laufzeiten (logarithmisches Histogramm für
+p50/p95/p99). Innerhalb eines Aufrufs gemeldete gelesene Zeilen
+(``record_rows``) und geschriebene Bytes (``record_bytes``) werden allen
+gerade aktiven Operationen des Threads zugerechnet, also z. B. sowohl
+``PromptService.search_prompts`` als auch ``PromptRepository.query_prompts``.
+
+Die Messung ist standardmäßig aus und kostet dann nur eine Flag-Abfrage je
+Aufruf. Aktivierung per ``enable_metrics()`` oder ``PROMPT_DB_METRICS=1``.
+"""
+
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+METRICS_ENV_VAR = "PROMPT_DB_METRICS"
+# Relative Auflösung des Histogramms: Bucket-Grenzen wachsen um 10 %
+_BUCKET_GROWTH = 1.1
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+
+
+class OperationStats:
+    """Kennzahlen einer Operation."""
+
+    __slots__ = ("calls", "errors", "total_seconds", "max_seconds", "buckets",
+                 "rows_scanned", "bytes_written")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets: Dict[int, int] = {}
+        self.rows_scanned = 0
+        self.bytes_written = 0
+
+    def observe(self, seconds: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        micros = seconds * 1e6
+        bucket = math.ceil(math.log(micros) / _LOG_GROWTH) if micros > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Näherungswert eines Perzentils in Sekunden (obere Grenze des Histogramm-Buckets).
+
+        :param fraction: z. B. 0.95 für p95
+        """
+        if not self.calls:
+            return 0.0
+        threshold = fraction * self.calls
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                return min(_BUCKET_GROWTH ** bucket / 1e6, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows_scanned": self.rows_scanned,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class MetricsRegistry:
+    """Threadsichere Sammlung der Kennzahlen aller Operationen."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats: Dict[str, OperationStats] = {}
+        self._local = threading.local()
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _get(self, operation: str) -> OperationStats:
+        stats = self._stats.get(operation)
+        if stats is None:
+            stats = self._stats[operation] = OperationStats()
+        return stats
+
+    def observe(self, operation: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self._get(operation).observe(seconds, failed)
+
+    def add_counters(self, rows_scanned: int = 0, bytes_written: int = 0) -> None:
+        """Rechnet Zeilen bzw. Bytes allen aktiven Operationen des aktuellen Threads zu."""
+        stack = self._stack()
+        if not stack:
+            return
+        with self._lock:
+            for operation in set(stack):
+                stats = self._get(operation)
+                stats.rows_scanned += rows_scanned
+                stats.bytes_written += bytes_written
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Aktuelle Kennzahlen je Operation, alphabetisch sortiert."""
+        with self._lock:
+            return {operation: self._stats[operation].to_dict() for operation in sorted(self._stats)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def to_json(self) -> str:
+        return json.dumps({"enabled": self.enabled, "operations": self.snapshot()}, indent=2)
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR, "").lower() in ("1", "true", "yes"))
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    """Schaltet die Messung ein bzw. aus."""
+    METRICS.enabled = enabled
+
+
+def metrics_enabled() -> bool:
+    return METRICS.enabled
+
+
+def get_metrics() -> Dict[str, Dict]:
+    """
+    Liefert die gesammelten Kennzahlen.
+
+    :return: Zuordnung Operation → {calls, errors, total_ms, mean_ms, p50_ms, p95_ms,
+             p99_ms, max_ms, rows_scanned, bytes_written}
+    """
+    return METRICS.snapshot()
+
+
+def reset_metrics() -> None:
+    """Verwirft alle gesammelten Kennzahlen."""
+    METRICS.reset()
+
+
+def dump_metrics(path: Optional[str] = None) -> str:
+    """
+    Gibt die Kennzahlen als JSON zurück und schreibt sie optional in eine Datei.
+
+    :param path: (Optional) Zieldatei
+    :return: JSON-Text
+    """
+    text = METRICS.to_json()
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def record_rows(count: int) -> None:
+    """Meldet gelesene bzw. geprüfte Datensätze für die laufende Operation."""
+    if METRICS.enabled and count:
+        METRICS.add_counters(rows_scanned=count)
+
+
+def record_bytes(count: int) -> None:
+    """Meldet geschriebene Bytes für die laufende Operation."""
+    if METRICS.enabled and count:
+        METRICS.add_counters(bytes_written=count)
+
+
+def instrumented(operation: str) -> Callable:
+    """
+    Decorator, der Aufrufe einer Funktion unter dem Namen ``operation`` misst.
+
+    Bei Generatorfunktionen wird die gesamte Iteration gemessen.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not METRICS.enabled:
+                    return (yield from func(*args, **kwargs))
+                return (yield from _measure_generator(operation, func(*args, **kwargs)))
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            stack = METRICS._stack()
+            stack.append(operation)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                METRICS.observe(operation, time.perf_counter() - start, failed)
+                stack.pop()
+        return wrapper
+    return decorator
+
+
+def _measure_generator(operation: str, generator):
+    stack = METRICS._stack()
+    elapsed = 0.0
+    failed = True
+    try:
+        while True:
+            stack.append(operation)
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration as stop:
+                failed = False
+                return stop.value
+            finally:
+                elapsed += time.perf_counter() - start
+                stack.pop()
+            try:
+                yield item
+            except GeneratorExit:
+                # Vorzeitig beendete Iteration ist kein Fehler.
+                failed = False
+                raise
+    finally:
+        generator.close()
+        METRICS.observe(operation, elapsed, failed)
+
+
+def instrument_methods(cls):
+    """
+    Klassen-Decorator: misst alle öffentlichen Methoden als ``Klassenname.methode``.
+    """
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(member):
+            continue
+        setattr(cls, name, instrumented(f"{cls.__name__}.{name}")(member))
+    return cls
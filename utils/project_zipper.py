@@ -1,21 +1,337 @@
 # utils/project_zipper.py
-import zipfile
+
+"""
+Projekt-Snapshots als ZIP – inkrementell, parallel komprimiert und im Hintergrund.
+
+``zip_project`` durchsucht das Projekt mit ``os.scandir`` (ein ``stat`` je
+Eintrag, Verzeichnisse wie ``.git``, ``__pycache__`` oder virtuelle
+Umgebungen werden übersprungen) und schreibt Quelltexte, ``requirements.txt``
+und ``database.json`` samt Begleitdateien (Journal, ausgelagerte Texte; wie
+beim Backup) in das ZIP.
+
+Neben dem ZIP liegt ein Manifest (``<zip>.manifest.json``) mit Größe, mtime,
+CRC und Lage der komprimierten Daten jedes Mitglieds. Beim nächsten Snapshot
+werden Dateien mit unveränderter Größe und mtime nicht neu gelesen und
+komprimiert: Ihre komprimierten Bytes werden unverändert aus dem bisherigen
+ZIP übernommen. Geänderte Dateien werden in Blöcken von ``BLOCK_SIZE`` in
+einem Thread-Pool komprimiert (``zlib`` gibt dabei den GIL frei); die Blöcke
+einer Datei bilden zusammen einen gültigen Deflate-Strom, sodass auch eine
+große ``database.json`` parallel komprimiert wird.
+
+``start_snapshot_job`` führt den Snapshot als ``BackgroundJob`` aus;
+``snapshot_status`` liefert Phase und Fortschritt, z. B. für die UI.
+"""
+
+import json
 import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.background_job import BackgroundJob, ProgressCallback, get_job, start_job
+from utils.backup import is_companion_suffix
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+DEFAULT_ZIP_NAME = "prompt_manager_snapshot.zip"
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+INCLUDED_SUFFIXES = (".py",)
+DATABASE_NAMES = ("database.json",)
+INCLUDED_NAMES = ("requirements.txt", *DATABASE_NAMES)
+SKIPPED_DIRS = frozenset({".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "env", "node_modules",
+                          ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox", "backups"})
+BLOCK_SIZE = 1024 * 1024
+COMPRESSION_LEVEL = 6
+SNAPSHOT_JOB = "project_snapshot"
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_DATA_DESCRIPTOR = struct.Struct("<4sIII")
+_CENTRAL_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<4sHHHHIIH")
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_DEFLATED = 8
+_VERSION = 20
+_ZIP32_LIMIT = 0xFFFFFFFF
+
+
+# === Verzeichnis durchsuchen ===
+
+def _included(name: str) -> bool:
+    if name.endswith(INCLUDED_SUFFIXES) or name in INCLUDED_NAMES:
+        return True
+    return any(name.startswith(database) and is_companion_suffix(name[len(database):])
+               for database in DATABASE_NAMES)
+
+
+def scan_project(project_dir: str = ".") -> Dict[str, Tuple[int, int]]:
+    """
+    Findet alle zu sichernden Dateien.
+
+    :param project_dir: Projektverzeichnis
+    :return: Zuordnung relativer Pfad (mit ``/``) → (Größe, mtime in ns), sortiert nach Pfad
+    """
+    files = {}
+    pending = [""]
+    while pending:
+        relative_dir = pending.pop()
+        with os.scandir(os.path.join(project_dir, relative_dir)) as entries:
+            for entry in entries:
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_DIRS:
+                        pending.append(relative)
+                elif _included(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    files[relative] = (stat.st_size, stat.st_mtime_ns)
+    return dict(sorted(files.items()))
+
+
+# === ZIP schreiben ===
+
+def _dos_datetime(mtime_ns: int) -> Tuple[int, int]:
+    tm = time.localtime(max(mtime_ns // 1_000_000_000, 315532800))
+    return ((tm.tm_hour << 11) | (tm.tm_min << 5) | (tm.tm_sec // 2),
+            ((tm.tm_year - 1980) << 9) | (tm.tm_mon << 5) | tm.tm_mday)
 
-def zip_project(project_dir: str = ".", zip_name: str = "prompt_manager_snapshot.zip"):
+
+class _ZipWriter:
+    """
+    Minimaler ZIP-Schreiber für bereits Deflate-komprimierte Daten (ohne ZIP64).
+
+    ``zipfile`` kann weder vorab komprimierte Blöcke noch unverändert
+    übernommene Mitglieder schreiben, deshalb werden die Header hier selbst erzeugt.
     """
-    Zippt das gesamte Projektverzeichnis für Sicherung oder Versand.
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._members: List[Dict] = []
+
+    def _check(self, *values: int) -> None:
+        if any(value > _ZIP32_LIMIT for value in values):
+            raise ValueError("Snapshot ist größer als 4 GiB (ZIP64 wird nicht unterstützt)")
+
+    def _local_header(self, name: bytes, mtime_ns: int, flags: int, crc: int, compressed_size: int,
+                      size: int) -> int:
+        offset = self._f.tell()
+        self._check(offset)
+        dos_time, dos_date = _dos_datetime(mtime_ns)
+        self._f.write(_LOCAL_HEADER.pack(b"PK\x03\x04", _VERSION, flags, _DEFLATED, dos_time, dos_date,
+                                         crc, compressed_size, size, len(name), 0))
+        self._f.write(name)
+        return offset
+
+    def add_compressed(self, name: str, mtime_ns: int, crc: int, size: int, data: bytes) -> Dict:
+        """Schreibt ein Mitglied mit bekannten Werten (z. B. aus dem vorigen Snapshot übernommen)."""
+        encoded = name.encode("utf-8")
+        self._check(size, len(data))
+        offset = self._local_header(encoded, mtime_ns, _FLAG_UTF8, crc, len(data), size)
+        data_offset = self._f.tell()
+        self._f.write(data)
+        return self._record(encoded, mtime_ns, _FLAG_UTF8, crc, len(data), size, offset, data_offset)
+
+    def add_stream(self, name: str, mtime_ns: int, blocks: Iterator[Tuple[bytes, bytes]]) -> Dict:
+        """
+        Schreibt ein Mitglied aus (Rohblock, komprimierter Block)-Paaren; Größen und CRC folgen im Data Descriptor.
+        """
+        encoded = name.encode("utf-8")
+        flags = _FLAG_UTF8 | _FLAG_DATA_DESCRIPTOR
+        offset = self._local_header(encoded, mtime_ns, flags, 0, 0, 0)
+        data_offset = self._f.tell()
+        crc = size = compressed_size = 0
+        for raw, compressed in blocks:
+            crc = zlib.crc32(raw, crc)
+            size += len(raw)
+            compressed_size += len(compressed)
+            self._f.write(compressed)
+        self._check(size, compressed_size)
+        self._f.write(_DATA_DESCRIPTOR.pack(b"PK\x07\x08", crc, compressed_size, size))
+        return self._record(encoded, mtime_ns, flags, crc, compressed_size, size, offset, data_offset)
+
+    def _record(self, name: bytes, mtime_ns: int, flags: int, crc: int, compressed_size: int, size: int,
+                offset: int, data_offset: int) -> Dict:
+        member = {"name": name, "mtime_ns": mtime_ns, "flags": flags, "crc": crc,
+                  "compressed_size": compressed_size, "size": size, "offset": offset, "data_offset": data_offset}
+        self._members.append(member)
+        return member
+
+    def close(self) -> None:
+        start = self._f.tell()
+        for member in self._members:
+            dos_time, dos_date = _dos_datetime(member["mtime_ns"])
+            self._f.write(_CENTRAL_HEADER.pack(
+                b"PK\x01\x02", _VERSION, _VERSION, member["flags"], _DEFLATED, dos_time, dos_date,
+                member["crc"], member["compressed_size"], member["size"], len(member["name"]), 0, 0, 0, 0, 0,
+                member["offset"]))
+            self._f.write(member["name"])
+        size = self._f.tell() - start
+        self._check(start, size)
+        if len(self._members) > 0xFFFF:
+            raise ValueError("Snapshot enthält mehr als 65535 Dateien (ZIP64 wird nicht unterstützt)")
+        self._f.write(_END_RECORD.pack(b"PK\x05\x06", 0, 0, len(self._members), len(self._members), size, start, 0))
+
+
+def _deflate(block: bytes, final: bool) -> bytes:
+    """Komprimiert einen Block; nicht-finale Blöcke enden byte-genau (Sync-Flush) und lassen sich aneinanderhängen."""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _read_blocks(path: str) -> Iterator[Tuple[bytes, bool]]:
+    with open(path, "rb") as f:
+        block = f.read(BLOCK_SIZE)
+        while True:
+            following = f.read(BLOCK_SIZE) if block else b""
+            yield block, not following
+            if not following:
+                return
+            block = following
+
+
+def _compress_in_order(pool: ThreadPoolExecutor, window: int, project_dir: str,
+                       names: List[str]) -> Iterator[Tuple[str, bytes, bytes, bool]]:
+    """
+    Komprimiert die Blöcke aller Dateien parallel und liefert sie in Dateireihenfolge.
+
+    Höchstens ``window`` Blöcke sind gleichzeitig in Arbeit bzw. im Speicher.
+
+    :return: Iterator über (Datei, Rohblock, komprimierter Block, letzter Block der Datei)
+    """
+    pending: deque = deque()
+    for name in names:
+        for block, final in _read_blocks(os.path.join(project_dir, name)):
+            pending.append((name, block, final, pool.submit(_deflate, block, final)))
+            if len(pending) >= window:
+                name_, block_, final_, future = pending.popleft()
+                yield name_, block_, future.result(), final_
+    while pending:
+        name_, block_, final_, future = pending.popleft()
+        yield name_, block_, future.result(), final_
+
+
+def _member_blocks(blocks: Iterator[Tuple[str, bytes, bytes, bool]], name: str,
+                   report: Callable[[int], None]) -> Iterator[Tuple[bytes, bytes]]:
+    """Entnimmt dem gemeinsamen Blockstrom die Blöcke einer Datei bis zu ihrem letzten Block."""
+    for block_name, raw, compressed, final in blocks:
+        if block_name != name:
+            raise ValueError(f"Unerwarteter Block von {block_name} statt {name}")
+        report(len(raw))
+        yield raw, compressed
+        if final:
+            return
+
+
+# === Manifest ===
+
+def manifest_path_for(zip_name: str) -> str:
+    """Pfad des Manifests zu einem Snapshot."""
+    return zip_name + MANIFEST_SUFFIX
+
+
+def _load_manifest(zip_name: str) -> Dict:
+    """Manifest des bisherigen Snapshots; leer, wenn es fehlt oder nicht mehr zum ZIP passt."""
+    try:
+        with open(manifest_path_for(zip_name), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = os.stat(zip_name)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("zip") != [stat.st_size, stat.st_mtime_ns]:
+        return {}
+    return manifest.get("files", {})
+
+
+# === Snapshot ===
+
+def zip_project(project_dir: str = ".", zip_name: str = DEFAULT_ZIP_NAME, workers: Optional[int] = None,
+                progress: Optional[ProgressCallback] = None) -> Dict:
+    """
+    Schreibt einen Snapshot des Projektverzeichnisses als ZIP.
+
+    Unveränderte Dateien (gleiche Größe und mtime wie im vorigen Snapshot)
+    werden ohne erneutes Komprimieren übernommen; das ZIP wird erst nach
+    vollständigem Schreiben ersetzt.
 
     :param project_dir: Verzeichnis, das gezippt werden soll
     :param zip_name: Name der ZIP-Datei
+    :param workers: (Optional) Anzahl der Kompressions-Threads, Standard wie ``ThreadPoolExecutor``
+    :param progress: (Optional) Fortschritt ``progress(Phase, erledigt, gesamt)``
+    :return: Pfad des ZIPs sowie Anzahl der Dateien, neu komprimierte und übernommene Dateien
     """
-    with zipfile.ZipFile(zip_name, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for foldername, subfolders, filenames in os.walk(project_dir):
-            for filename in filenames:
-                if filename.endswith(".py") or filename in ["requirements.txt", "database.json"]:
-                    file_path = os.path.join(foldername, filename)
-                    arcname = os.path.relpath(file_path, project_dir)
-                    zipf.write(file_path, arcname)
+    if progress is not None:
+        progress("Durchsuchen", 0, 1)
+    files = scan_project(project_dir)
+    previous = _load_manifest(zip_name)
+    reused = {name for name, (size, mtime_ns) in files.items()
+              if name in previous and previous[name]["size"] == size and previous[name]["mtime_ns"] == mtime_ns}
+    changed = [name for name in files if name not in reused]
+    total_bytes = sum(files[name][0] for name in changed)
+    done_bytes = 0
 
+    def report(size: int) -> None:
+        nonlocal done_bytes
+        done_bytes += size
+        if progress is not None:
+            progress("Komprimieren", done_bytes, total_bytes)
 
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    manifest_files = {}
+    tmp_path = zip_name + ".tmp"
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool, open(tmp_path, "wb") as out, \
+                (open(zip_name, "rb") if reused else nullcontext()) as source:
+            writer = _ZipWriter(out)
+            blocks = _compress_in_order(pool, 2 * workers, project_dir, changed)
+            for name, (size, mtime_ns) in files.items():
+                if name in reused:
+                    entry = previous[name]
+                    source.seek(entry["data_offset"])
+                    member = writer.add_compressed(name, mtime_ns, entry["crc"], entry["size"],
+                                                   source.read(entry["compressed_size"]))
+                else:
+                    member = writer.add_stream(name, mtime_ns, _member_blocks(blocks, name, report))
+                manifest_files[name] = {key: member[key] for key in ("size", "crc", "compressed_size", "data_offset")}
+                manifest_files[name]["mtime_ns"] = mtime_ns
+            writer.close()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, zip_name)
 
+    stat = os.stat(zip_name)
+    manifest = {"version": MANIFEST_VERSION, "zip": [stat.st_size, stat.st_mtime_ns], "files": manifest_files}
+    with open(manifest_path_for(zip_name) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(manifest_path_for(zip_name) + ".tmp", manifest_path_for(zip_name))
+    logger.info("Projekt-Snapshot %s: %d Dateien, %d neu komprimiert", zip_name, len(files), len(changed))
+    return {"zip": zip_name, "files": len(files), "compressed": len(changed), "reused": len(reused)}
+
+
+# === Hintergrundaufgabe ===
+
+def start_snapshot_job(project_dir: str = ".", zip_name: str = DEFAULT_ZIP_NAME,
+                       workers: Optional[int] = None) -> BackgroundJob:
+    """
+    Startet ``zip_project`` als Hintergrundaufgabe (läuft bereits ein Snapshot, wird dieser zurückgegeben).
+
+    :return: Laufende Aufgabe; ``status()["result"]`` enthält nach Abschluss das Ergebnis von ``zip_project``
+    """
+    return start_job(SNAPSHOT_JOB, lambda progress: zip_project(project_dir, zip_name, workers, progress),
+                     name="Projekt-Snapshot")
+
+
+def snapshot_status() -> Optional[Dict]:
+    """
+    Zustand des zuletzt gestarteten Projekt-Snapshots.
+
+    :return: ``BackgroundJob.status()`` oder None, wenn noch kein Snapshot gestartet wurde
+    """
+    job = get_job(SNAPSHOT_JOB)
+    return job.status() if job is not None else None
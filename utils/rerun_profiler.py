@@ -0,0 +1,151 @@
+# utils/rerun_profiler.py
+
+"""
+Profiling einzelner Streamlit-Reruns.
+
+Ist das Profiling aktiv, läuft jeder Rerun unter ``cProfile``. Zusätzlich
+werden benannte Abschnitte (z. B. Formular, Filter, Suche, Darstellung) per
+``section()`` gestoppt. Die ``keep`` langsamsten Reruns werden als
+``.pstats``-Dateien aufbewahrt – auswertbar mit ``python -m pstats``,
+``snakeviz`` oder als Flamegraph mit ``flameprof``. Eine Indexdatei hält
+Laufzeit und Abschnittszeiten der aufbewahrten Reruns fest.
+
+Ohne Aktivierung kosten ``rerun()`` und ``section()`` nur eine Flag-Abfrage.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from utils.logger import configure_logger
+
+logger = configure_logger(__name__)
+
+INDEX_FILE = "index.json"
+HISTORY_SIZE = 20
+
+
+class RerunProfiler:
+    """
+    Profiler für Reruns mit Aufbewahrung der langsamsten Läufe.
+    """
+
+    def __init__(self, directory: str = "profiles", keep: int = 5, enabled: bool = False):
+        """
+        :param directory: Zielverzeichnis für .pstats-Dateien und Index
+        :param keep: Anzahl der langsamsten Reruns, die aufbewahrt werden
+        :param enabled: Profiling sofort aktivieren
+        """
+        self.directory = directory
+        self.keep = keep
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._history: Deque[Dict] = deque(maxlen=HISTORY_SIZE)
+        self._slowest: List[Dict] = self._load_index()
+
+    # === Messung ===
+
+    @contextmanager
+    def rerun(self, label: str = "rerun"):
+        """
+        Misst und profiliert einen vollständigen Rerun.
+
+        Auch ein per Ausnahme abgebrochener Rerun (z. B. ``st.experimental_rerun``)
+        wird erfasst; die Ausnahme wird weitergereicht.
+
+        :param label: Bezeichnung, z. B. die gewählte Seite
+        """
+        if not self.enabled or getattr(self._local, "sections", None) is not None:
+            yield
+            return
+        sections: Dict[str, float] = {}
+        self._local.sections = sections
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            total = time.perf_counter() - start
+            self._local.sections = None
+            self._finish(label, profile, total, sections)
+
+    @contextmanager
+    def section(self, name: str):
+        """
+        Stoppt einen benannten Abschnitt innerhalb des laufenden Reruns.
+
+        :param name: Abschnittsname; mehrfach verwendete Namen werden aufsummiert
+        """
+        sections = getattr(self._local, "sections", None)
+        if sections is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            sections[name] = sections.get(name, 0.0) + (time.perf_counter() - start)
+
+    # === Ergebnisse ===
+
+    def history(self) -> List[Dict]:
+        """Die letzten Reruns (neueste zuerst) mit Gesamtzeit und Abschnittszeiten in ms."""
+        with self._lock:
+            return list(reversed(self._history))
+
+    def slowest(self) -> List[Dict]:
+        """Die aufbewahrten langsamsten Reruns (langsamste zuerst) inkl. Pfad der .pstats-Datei."""
+        with self._lock:
+            return sorted(self._slowest, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def _finish(self, label: str, profile: cProfile.Profile, total: float, sections: Dict[str, float]) -> None:
+        entry = {
+            "label": label,
+            "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total_ms": round(total * 1000, 2),
+            "sections": {name: round(seconds * 1000, 2) for name, seconds in sections.items()},
+        }
+        with self._lock:
+            self._history.append(entry)
+            if len(self._slowest) >= self.keep:
+                fastest = min(self._slowest, key=lambda e: e["total_ms"], default=None)
+                if fastest is None or fastest["total_ms"] >= entry["total_ms"]:
+                    return
+                self._slowest.remove(fastest)
+                self._remove_file(fastest.get("stats_file"))
+            os.makedirs(self.directory, exist_ok=True)
+            file_name = f"rerun_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{int(total * 1000)}ms.pstats"
+            entry["stats_file"] = os.path.join(self.directory, file_name)
+            profile.dump_stats(entry["stats_file"])
+            self._slowest.append(entry)
+            self._write_index()
+        logger.info("Langsamer Rerun profiliert: %.1f ms → %s", entry["total_ms"], entry["stats_file"])
+
+    @staticmethod
+    def _remove_file(path: Optional[str]) -> None:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load_index(self) -> List[Dict]:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return [entry for entry in entries if os.path.exists(entry.get("stats_file", ""))][-self.keep:]
+
+    def _write_index(self) -> None:
+        with open(self._index_path(), "w", encoding="utf-8") as f:
+            json.dump(self._slowest, f, indent=2, ensure_ascii=False)
@@ -5,6 +5,8 @@ Verwaltet benutzerspezifische Session-Daten in Streamlit.
 Speichert z. B. zuletzt bearbeiteten Prompt oder Filterzustände.
 """
 
+from typing import Optional, Tuple
+
 import streamlit as st
 
 
@@ -32,4 +34,48 @@ def clear_last_prompt_id():
         del st.session_state["last_prompt_id"]
 
 
+def get_list_page(filter_signature: str) -> int:
+    """
+    Gibt die aktuelle Seite der Prompt-Liste zurück.
+    Ändern sich die Filter, beginnt die Liste wieder bei Seite 1.
+    :param filter_signature: Eindeutige Darstellung der aktiven Filter
+    :return: Seitennummer (ab 1)
+    """
+    if st.session_state.get("list_filter_signature") != filter_signature:
+        st.session_state["list_filter_signature"] = filter_signature
+        st.session_state["list_page"] = 1
+    return st.session_state.get("list_page", 1)
+
+
+def set_list_page(page: int):
+    """
+    Speichert die aktuelle Seite der Prompt-Liste.
+    :param page: Seitennummer (ab 1)
+    """
+    st.session_state["list_page"] = page
+
+
+def set_edit_target(doc_id: int, revision: Optional[int]):
+    """
+    Merkt sich den Prompt, dessen Bearbeitungsformular geöffnet ist, samt seiner Revision.
+    Die Revision wird beim Speichern geprüft, damit gleichzeitige Änderungen nicht überschrieben werden.
+    :param doc_id: Dokumenten-ID
+    :param revision: Revision beim Öffnen des Formulars
+    """
+    st.session_state["edit_target"] = (doc_id, revision)
+
 
+def get_edit_target() -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Gibt den bearbeiteten Prompt zurück.
+    :return: (Dokumenten-ID, Revision) oder None, wenn kein Prompt bearbeitet wird
+    """
+    return st.session_state.get("edit_target")
+
+
+def clear_edit_target():
+    """
+    Beendet den Bearbeitungsmodus.
+    """
+    if "edit_target" in st.session_state:
+        del st.session_state["edit_target"]
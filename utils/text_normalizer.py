@@ -0,0 +1,46 @@
+# utils/text_normalizer.py
+
+"""
+Normalisierung und Tokenisierung von Freitext für die Suchindizes.
+
+Umlaute werden wie in der deutschen Ersatzschreibweise aufgelöst
+(ä → ae, ö → oe, ü → ue, ß → ss), sodass "Schlüsselwörter" und
+"Schluesselwoerter" auf dieselben Tokens abgebildet werden.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+_UMLAUT_MAP = str.maketrans({
+    "ä": "ae",
+    "ö": "oe",
+    "ü": "ue",
+    "ß": "ss",
+})
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Bringt einen Text in eine vergleichbare Normalform.
+
+    :param text: Beliebiger Unicode-Text
+    :return: Kleingeschriebener Text ohne Umlaute und diakritische Zeichen
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text).casefold().translate(_UMLAUT_MAP)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Zerlegt einen Text in normalisierte Wort-Tokens.
+
+    :param text: Beliebiger Unicode-Text
+    :return: Liste der Tokens in Textreihenfolge
+    """
+    return _TOKEN_PATTERN.findall(normalize_text(text))